@@ -1,40 +1,263 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from flask import Flask, Response, request
-import json, queue, threading, time
+"""Reader event SSE hub: fan-out to every subscriber with replay and resume.
+
+- 每個訂閱者一個有界佇列：慢的消費者只會丟掉自己最舊的事件，不影響其他人
+- 全域 replay 環形緩衝：晚加入的客戶端可用 ?replay=N 取回最近 N 筆，
+  重連時以 Last-Event-ID 續傳
+- 每筆事件只序列化一次（含 id: 行），所有訂閱者共用同一份 bytes
+- 以 asyncio 伺服器運行於單一背景執行緒，沒有訂閱者時事件只進入 replay 緩衝
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_Entry = Tuple[int, bytes]  # (event_id, 已編碼的 SSE 訊框)
+
+
+class _Subscriber:
+    """單一 SSE 連線"""
+
+    def __init__(self, sub_id: int, maxlen: int):
+        self.id = sub_id
+        self.queue: Deque[_Entry] = deque(maxlen=maxlen)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.sent = 0
+
+    def push(self, entry: _Entry) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(entry)
+        self.ready.set()
+
 
 class ReaderEventBroadcaster:
-    def __init__(self, host="127.0.0.1", port=8888):
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8888,
+        *,
+        replay_size: int = 1024,
+        subscriber_queue_size: int = 4096,
+        heartbeat_sec: float = 15.0,
+        retry_ms: int = 1000,
+    ):
         self.host, self.port = host, port
-        self.app = Flask(__name__)
-        self.q = queue.Queue()
-        self._thread = None
+        self.replay_size = replay_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.heartbeat_sec = heartbeat_sec
+        self.retry_ms = retry_ms
 
-        @self.app.route("/events")
-        def events():
-            def gen():
-                yield "retry: 1000\n\n"
-                while True:
-                    data = self.q.get()
-                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-            return Response(gen(), mimetype="text/event-stream")
-
-        @self.app.route("/health")
-        def health(): return "ok", 200
-
-    def broadcast_event(self, data: dict):
-        self.q.put(data)
-
-    def start_server(self):
-        def run():
-            self.app.run(self.host, self.port, debug=False, threaded=True)
-        self._thread = threading.Thread(target=run, daemon=True)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._replay: Deque[_Entry] = deque(maxlen=replay_size)
+        self._pending: Deque[_Entry] = deque()
+        self._wakeup_scheduled = False
+
+        # 只在 event loop 上增刪；增刪與其他執行緒的 stats() 讀取都持有 _lock
+        self._subscribers: Dict[int, _Subscriber] = {}
+        self._sub_ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+        self.published = 0
+
+    # ------------------------------------------------------------------
+    def broadcast_event(self, data: dict) -> int:
+        """發布事件（任何執行緒皆可調用），返回事件 id"""
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            event_id = next(self._ids)
+            entry = (event_id, f"id: {event_id}\ndata: {payload}\n\n".encode("utf-8"))
+            self._replay.append(entry)
+            self.published += 1
+            loop = self._loop
+            if loop is None:
+                return event_id
+            self._pending.append(entry)
+            if self._wakeup_scheduled:
+                return event_id
+            self._wakeup_scheduled = True
+        # 同一批事件只喚醒 event loop 一次
+        try:
+            loop.call_soon_threadsafe(self._fan_out)
+        except RuntimeError:
+            pass  # loop 已關閉
+        return event_id
+
+    # ------------------------------------------------------------------
+    def start_server(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name="ReaderEventBroadcaster", daemon=True)
         self._thread.start()
-        time.sleep(0.2)
+        self._started.wait(timeout=5.0)
 
-    def stop_server(self):
-        # Flask dev server 沒有優雅停止；乾脆丟個標記即可
+    # ------------------------------------------------------------------
+    def stop_server(self) -> None:
         try:
-            self.broadcast_event({"type":"READER_STOPPING","ts":time.time()})
+            self.broadcast_event({"type": "READER_STOPPING", "ts": time.time()})
         except Exception:
-            pass
\ No newline at end of file
+            pass
+        loop = self._loop
+        if loop and loop.is_running():
+            loop.call_soon_threadsafe(self._shutdown)
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        """統計快照（任何執行緒皆可調用）"""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        return {
+            "published": self.published,
+            "replay_buffered": len(self._replay),
+            "subscribers": len(subscribers),
+            "sent": sum(s.sent for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "lagging": sum(len(s.queue) for s in subscribers),
+        }
+
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._stopping = asyncio.Event()
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            logger.error("ReaderEventBroadcaster 無法監聽 %s:%s: %s", self.host, self.port, e)
+            self._started.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        self._started.set()
+        logger.info("ReaderEventBroadcaster listening on http://%s:%s/events", self.host, self.port)
+        try:
+            await self._stopping.wait()
+        finally:
+            with self._lock:
+                self._loop = None
+                self._pending.clear()
+                self._wakeup_scheduled = False
+            self._server.close()
+            for sub in list(self._subscribers.values()):
+                sub.ready.set()
+            await self._server.wait_closed()
+
+    def _shutdown(self) -> None:
+        self._fan_out()
+        self._stopping.set()
+
+    # ------------------------------------------------------------------
+    def _fan_out(self) -> None:
+        with self._lock:
+            entries = list(self._pending)
+            self._pending.clear()
+            self._wakeup_scheduled = False
+        if not entries:
+            return
+        for sub in self._subscribers.values():
+            for entry in entries:
+                sub.push(entry)
+
+    # ------------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10.0)
+            headers: Dict[str, str] = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10.0)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split(" ")
+            method, target = (parts[0], parts[1]) if len(parts) >= 2 else ("", "/")
+            url = urlsplit(target)
+
+            if method != "GET":
+                await self._respond(writer, "405 Method Not Allowed", b"method not allowed")
+            elif url.path == "/health":
+                await self._respond(writer, "200 OK", b"ok")
+            elif url.path == "/events":
+                await self._stream(writer, headers, parse_qs(url.query))
+            else:
+                await self._respond(writer, "404 Not Found", b"not found")
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("ReaderEventBroadcaster request failed")
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: str, body: bytes) -> None:
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: text/plain\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    # ------------------------------------------------------------------
+    async def _stream(self, writer: asyncio.StreamWriter, headers: Dict[str, str], query: Dict[str, List[str]]) -> None:
+        sub = _Subscriber(next(self._sub_ids), self.subscriber_queue_size)
+
+        # 同步取得 replay 並註冊，確保之後發布的事件不會漏掉或重複
+        with self._lock:
+            history = list(self._replay)
+            pending_ids = {event_id for event_id, _ in self._pending}
+        last_id = headers.get("last-event-id", "")
+        if last_id.isdigit():
+            backlog = [entry for entry in history if entry[0] > int(last_id)]
+        else:
+            count = query.get("replay", ["0"])[0]
+            backlog = history[-int(count):] if count.isdigit() and int(count) > 0 else []
+        for entry in backlog:
+            if entry[0] not in pending_ids:
+                sub.push(entry)
+        with self._lock:
+            self._subscribers[sub.id] = sub
+
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\nX-Accel-Buffering: no\r\n\r\n"
+                + f"retry: {self.retry_ms}\n\n".encode("latin-1")
+            )
+            await writer.drain()
+
+            while not self._stopping.is_set():
+                if not sub.queue:
+                    sub.ready.clear()
+                    try:
+                        await asyncio.wait_for(sub.ready.wait(), timeout=self.heartbeat_sec)
+                    except asyncio.TimeoutError:
+                        writer.write(b": keep-alive\n\n")
+                        await writer.drain()
+                        continue
+                # 一次寫出所有已排隊的事件
+                frames = [frame for _, frame in sub.queue]
+                sub.queue.clear()
+                writer.write(b"".join(frames))
+                sub.sent += len(frames)
+                await writer.drain()
+        finally:
+            with self._lock:
+                self._subscribers.pop(sub.id, None)
@@ -0,0 +1,527 @@
+# ipc/t9_async_stream.py
+# -*- coding: utf-8 -*-
+"""Asyncio SSE client that multiplexes many T9-Web-Api result streams on one event loop.
+
+與 T9StreamClient（requests + 每條連線兩個執行緒）相比：
+- 所有桌的串流共用一個 event loop / 一個背景執行緒
+- SSE 以位元組為單位增量解析，data 欄位不逐行解碼，直接交給 json.loads
+- 重連時帶上 Last-Event-ID，退避時間加入隨機抖動（並遵守伺服器 retry:）
+- 序號跳號時呼叫 on_gap 補抓（有 seq 欄位逐桌追蹤，否則以 SSE id 整條串流追蹤），
+  重連後重送的重複事件直接丟棄；event_types 在客戶端過濾，序號檢查看得到完整串流
+- 每條串流提供統計（events/sec、重連次數、解析耗時）
+"""
+
+import asyncio
+import json
+import logging
+import random
+import ssl
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ipc.t9_stream import GapCallback, SequenceGapDetector, parse_event_types
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[str, str, Any], None]  # (stream, event_name, data)
+StatusCallback = Callable[[str, str, Optional[str]], None]  # (stream, status, detail)
+
+
+@dataclass
+class SSEEvent:
+    """一個已分派的 SSE 事件（data 保持為 bytes）"""
+    event: str
+    data: bytes
+    id: Optional[str] = None
+
+    def json(self) -> Any:
+        return json.loads(self.data) if self.data else None
+
+
+class SSEDecoder:
+    """Incremental, byte-level SSE decoder (text/event-stream).
+
+    feed() 可接收任意切分的位元組塊，只在遇到完整行時處理；
+    last_event_id 依規範跨事件保留，retry 記錄伺服器建議的重連間隔（毫秒）。
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._data: List[bytes] = []
+        self._event: Optional[str] = None
+        self.last_event_id: Optional[str] = None
+        self.retry: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        buf = self._buf
+        buf += chunk
+        events: List[SSEEvent] = []
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            end = nl - 1 if nl > start and buf[nl - 1] == 0x0D else nl
+            self._process_line(bytes(buf[start:end]), events)
+            start = nl + 1
+        if start:
+            del buf[:start]
+        return events
+
+    # ------------------------------------------------------------------
+    def reset(self) -> None:
+        """連線中斷時丟棄未完成的事件（last_event_id 保留用於續傳）"""
+        self._buf.clear()
+        self._data.clear()
+        self._event = None
+
+    # ------------------------------------------------------------------
+    def _process_line(self, line: bytes, events: List[SSEEvent]) -> None:
+        if not line:
+            # 空行：分派事件
+            if self._data:
+                events.append(SSEEvent(self._event or "message", b"\n".join(self._data), self.last_event_id))
+                self._data.clear()
+            self._event = None
+            return
+
+        if line[0] == 0x3A:  # ':' 註解 / 心跳
+            return
+
+        name, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value.decode("utf-8", "replace") or None
+        elif name == b"id":
+            if b"\x00" not in value:
+                self.last_event_id = value.decode("utf-8", "replace") or None
+        elif name == b"retry":
+            if value.isdigit():
+                self.retry = int(value)
+
+
+@dataclass
+class StreamStats:
+    """單一串流的統計"""
+    events: int = 0
+    bytes: int = 0
+    connects: int = 0
+    reconnects: int = 0
+    errors: int = 0
+    parse_ns: int = 0
+    last_event_id: Optional[str] = None
+    last_error: Optional[str] = None
+    connected: bool = False
+    _recent: Deque[float] = field(default_factory=lambda: deque(maxlen=4096), repr=False)
+
+    RATE_WINDOW_SEC = 10.0
+
+    def mark_event(self, now: float) -> None:
+        self.events += 1
+        self._recent.append(now)
+
+    def events_per_sec(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        recent = self._recent
+        while recent and now - recent[0] > self.RATE_WINDOW_SEC:
+            recent.popleft()
+        return len(recent) / self.RATE_WINDOW_SEC
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "events_per_sec": round(self.events_per_sec(), 3),
+            "bytes": self.bytes,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "errors": self.errors,
+            "parse_ms_total": round(self.parse_ns / 1e6, 3),
+            "parse_us_avg": round(self.parse_ns / self.events / 1e3, 3) if self.events else 0.0,
+            "last_event_id": self.last_event_id,
+            "last_error": self.last_error,
+            "connected": self.connected,
+        }
+
+
+class _StreamSpec:
+    """已註冊的串流"""
+
+    def __init__(self, name: str, url: str, event_types: Optional[str], on_event: Optional[EventCallback]):
+        self.name = name
+        self.url = url
+        self.event_filter = parse_event_types(event_types)  # 客戶端過濾，序號檢查看完整串流
+        self.on_event = on_event
+        self.decoder = SSEDecoder()
+        self.stats = StreamStats()
+        self.gap_detector = SequenceGapDetector()
+        self.task: Optional[asyncio.Task] = None
+
+
+class AsyncT9StreamClient:
+    """Multiplexes SSE result streams for many tables on a single asyncio loop.
+
+    使用範例:
+        >>> client = AsyncT9StreamClient(on_event=lambda s, e, d: print(s, e, d))
+        >>> client.add_stream("WG7", "http://127.0.0.1:8000/api/stream?table=WG7")
+        >>> client.add_stream("WG8", "http://127.0.0.1:8000/api/stream?table=WG8")
+        >>> client.start()          # 背景執行緒；或在既有 loop 中 await client.run()
+        >>> client.stats()["WG7"]["events_per_sec"]
+        >>> client.stop()
+    """
+
+    def __init__(
+        self,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        request_timeout: float = 60.0,
+        connection_refresh_interval: Optional[float] = 60.0,
+        read_size: int = 65536,
+        on_event: Optional[EventCallback] = None,
+        on_status: Optional[StatusCallback] = None,
+        on_gap: Optional[GapCallback] = None,
+    ) -> None:
+        self.headers = dict(headers or {})
+        self.retry_delay = max(0.05, retry_delay)
+        self.max_retry_delay = max(self.retry_delay, max_retry_delay)
+        self.request_timeout = request_timeout
+        self.connection_refresh_interval = connection_refresh_interval
+        self.read_size = read_size
+        self.on_event = on_event
+        self.on_status = on_status
+        self.on_gap = on_gap
+
+        self._streams: Dict[str, _StreamSpec] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def add_stream(
+        self,
+        name: str,
+        url: str,
+        *,
+        event_types: Optional[str] = "result",
+        on_event: Optional[EventCallback] = None,
+    ) -> None:
+        """註冊一條串流（可在運行中調用）"""
+        spec = _StreamSpec(name, url, event_types, on_event)
+        with self._lock:
+            if name in self._streams:
+                raise ValueError(f"Stream '{name}' already registered")
+            self._streams[name] = spec
+            loop = self._loop
+        if loop and loop.is_running():
+            loop.call_soon_threadsafe(self._spawn, spec)
+
+    # ------------------------------------------------------------------
+    def remove_stream(self, name: str) -> None:
+        with self._lock:
+            spec = self._streams.pop(name, None)
+            loop = self._loop
+        if spec and spec.task and loop and loop.is_running():
+            loop.call_soon_threadsafe(spec.task.cancel)
+
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            specs = list(self._streams.values())
+        return {
+            spec.name: {**spec.stats.to_dict(), "sequence": spec.gap_detector.snapshot()}
+            for spec in specs
+        }
+
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """在目前的 event loop 上運行所有串流，直到 stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        with self._lock:
+            specs = list(self._streams.values())
+        for spec in specs:
+            self._spawn(spec)
+
+        try:
+            await self._stopping.wait()
+        finally:
+            tasks = [spec.task for spec in self._streams.values() if spec.task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for spec in self._streams.values():
+                spec.task = None
+            self._loop = None
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """在背景執行緒中運行 event loop（給 Qt / 同步程式使用）"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            ready = threading.Event()
+
+            def _main() -> None:
+                async def _runner() -> None:
+                    task = asyncio.ensure_future(self.run())
+                    await asyncio.sleep(0)
+                    ready.set()
+                    await task
+
+                asyncio.run(_runner())
+
+            self._thread = threading.Thread(target=_main, name="AsyncT9StreamClient", daemon=True)
+            self._thread.start()
+        ready.wait(timeout=2.0)
+
+    # ------------------------------------------------------------------
+    def stop(self, timeout: float = 2.0) -> None:
+        loop, stopping = self._loop, self._stopping
+        if loop and stopping and loop.is_running():
+            loop.call_soon_threadsafe(stopping.set)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    def _spawn(self, spec: _StreamSpec) -> None:
+        if spec.task is None or spec.task.done():
+            spec.task = asyncio.ensure_future(self._stream_loop(spec))
+
+    # ------------------------------------------------------------------
+    def _emit_status(self, spec: _StreamSpec, status: str, detail: Optional[str] = None) -> None:
+        if self.on_status:
+            try:
+                self.on_status(spec.name, status, detail)
+            except Exception:
+                logger.exception("AsyncT9StreamClient status callback failed")
+
+    # ------------------------------------------------------------------
+    def _backoff(self, spec: _StreamSpec, attempt: int) -> float:
+        """指數退避 + 抖動；伺服器 retry: 作為下限"""
+        base = self.retry_delay
+        if spec.decoder.retry is not None:
+            base = max(base, spec.decoder.retry / 1000.0)
+        delay = min(self.max_retry_delay, base * (2 ** min(attempt, 16)))
+        return random.uniform(delay / 2, delay)
+
+    # ------------------------------------------------------------------
+    async def _stream_loop(self, spec: _StreamSpec) -> None:
+        failures = 0
+        try:
+            # 檢查停止旗標：wait_for 在取消與完成同時發生時可能吞掉 CancelledError
+            while not (self._stopping and self._stopping.is_set()):
+                if spec.stats.connects:
+                    spec.stats.reconnects += 1
+                try:
+                    received = await self._consume(spec)
+                    self._emit_status(spec, "reconnecting", None)
+                    if received:
+                        failures = 0
+                        continue  # 正常結束（伺服器關閉或定期刷新）：立即重連
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    spec.stats.errors += 1
+                    spec.stats.last_error = str(exc) or type(exc).__name__
+                    logger.warning("T9 async stream %s error: %s", spec.name, spec.stats.last_error)
+                    self._emit_status(spec, "error", spec.stats.last_error)
+
+                delay = self._backoff(spec, failures)
+                failures += 1
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            pass
+        self._emit_status(spec, "stopped", None)
+
+    # ------------------------------------------------------------------
+    async def _consume(self, spec: _StreamSpec) -> int:
+        """建立一次連線並讀取直到結束 / 刷新時間到
+
+        Returns:
+            本次連線收到的位元組數（0 表示伺服器立即關閉，重連前需退避）
+        """
+        self._emit_status(spec, "connecting", spec.url)
+        if not spec.decoder.last_event_id:
+            # 不續傳時伺服器從頭送起，舊序號不再適用
+            spec.gap_detector.reset()
+        reader, writer = await self._open(spec)
+        decoder = spec.decoder
+        decoder.reset()
+        stats = spec.stats
+        body = None
+        received = 0
+        try:
+            chunked = await self._read_response_head(reader)
+            stats.connects += 1
+            stats.connected = True
+            self._emit_status(spec, "connected", None)
+
+            deadline = None
+            if self.connection_refresh_interval:
+                deadline = time.monotonic() + self.connection_refresh_interval
+            body = self._iter_body(reader, chunked)
+
+            while True:
+                timeout = self.request_timeout or None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.info("T9 async stream %s refreshing connection", spec.name)
+                        return received
+                    timeout = min(timeout, remaining) if timeout else remaining
+                try:
+                    chunk = await asyncio.wait_for(body.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return received
+                except asyncio.TimeoutError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        logger.info("T9 async stream %s refreshing connection", spec.name)
+                        return received
+                    raise TimeoutError(f"no data for {timeout:.1f}s")
+
+                received += len(chunk)
+                stats.bytes += len(chunk)
+                started = time.perf_counter_ns()
+                events = decoder.feed(chunk)
+                parsed: List[Tuple[str, Any]] = []
+                for event in events:
+                    try:
+                        data = event.json()
+                    except ValueError:
+                        logger.debug("T9 async stream %s JSON decode failed: %r", spec.name, event.data[:200])
+                        continue
+                    if not data or not self._check_sequence(spec, data, event.id):
+                        continue
+                    if spec.event_filter is None or event.event in spec.event_filter:
+                        parsed.append((event.event, data))
+                stats.parse_ns += time.perf_counter_ns() - started
+                stats.last_event_id = decoder.last_event_id
+
+                if parsed:
+                    now = time.monotonic()
+                    for event_name, data in parsed:
+                        stats.mark_event(now)
+                        self._dispatch(spec, event_name, data)
+        finally:
+            stats.connected = False
+            if body is not None:
+                await body.aclose()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    def _check_sequence(self, spec: _StreamSpec, data: Any, event_id: Optional[str]) -> bool:
+        """檢查序號；返回 False 表示重複事件應丟棄"""
+        key = SequenceGapDetector.extract(data, event_id)
+        if key is None:
+            return True
+        table_id, seq = key
+        status, missing = spec.gap_detector.observe(table_id, seq)
+        if status == "duplicate":
+            return False
+        if missing:
+            first, last = missing
+            logger.warning("T9 async stream %s gap: table=%s missing=%s-%s", spec.name, table_id, first, last)
+            self._emit_status(spec, "gap", f"{table_id}:{first}-{last}")
+            if self.on_gap:
+                try:
+                    self.on_gap(table_id, first, last)
+                except Exception:
+                    logger.exception("AsyncT9StreamClient on_gap callback failed")
+        return True
+
+    # ------------------------------------------------------------------
+    def _dispatch(self, spec: _StreamSpec, event_name: str, data: Any) -> None:
+        for callback in (spec.on_event, self.on_event):
+            if callback:
+                try:
+                    callback(spec.name, event_name, data)
+                except Exception:
+                    logger.exception("AsyncT9StreamClient on_event callback failed")
+
+    # ------------------------------------------------------------------
+    async def _open(self, spec: _StreamSpec) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        parts = urlsplit(spec.url)
+        secure = parts.scheme == "https"
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if secure else 80)
+        ssl_ctx = ssl.create_default_context() if secure else None
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_ctx, limit=max(self.read_size, 2 ** 16)),
+            timeout=5.0,
+        )
+
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        headers = {
+            "Host": parts.netloc,
+            "Accept": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+        headers.update(self.headers)
+        if spec.decoder.last_event_id:
+            headers["Last-Event-ID"] = spec.decoder.last_event_id
+
+        head = f"GET {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1"))
+        await writer.drain()
+        return reader, writer
+
+    # ------------------------------------------------------------------
+    async def _read_response_head(self, reader: asyncio.StreamReader) -> bool:
+        """讀取狀態行與標頭；返回是否為 chunked 編碼"""
+        status_line = await asyncio.wait_for(reader.readline(), timeout=self.request_timeout or None)
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise ConnectionError(f"Invalid HTTP response: {status_line[:80]!r}")
+        if int(parts[1]) != 200:
+            raise ConnectionError(f"HTTP {parts[1]}")
+
+        chunked = False
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+        return chunked
+
+    # ------------------------------------------------------------------
+    async def _iter_body(self, reader: asyncio.StreamReader, chunked: bool):
+        if not chunked:
+            while True:
+                data = await reader.read(self.read_size)
+                if not data:
+                    return
+                yield data
+
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                return
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                return
+            data = await reader.readexactly(size)
+            await reader.readline()  # CRLF
+            yield data
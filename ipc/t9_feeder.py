@@ -0,0 +1,155 @@
+# ipc/t9_feeder.py
+# -*- coding: utf-8 -*-
+"""T9 result stream → engine RESULT events.
+
+EngineWorker 的結果來源（ui_config.json 的 result_stream 區段）：
+- 預設以 AsyncT9StreamClient 在單一 event loop 上接收所有桌的串流
+- client = "thread" 時改用舊的 T9StreamClient（每條串流一個執行緒），作為退路
+- 兩者都轉成與圖像檢測相同格式的 RESULT 事件交給 on_event
+
+使用範例:
+    >>> feeder = T9ResultFeeder("http://127.0.0.1:8000/api/stream", events.put, tables=["WG7"])
+    >>> feeder.start()
+    >>> feeder.stats()["WG7"]["events_per_sec"]
+    >>> feeder.stop()
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from ipc.t9_async_stream import AsyncT9StreamClient
+from ipc.t9_stream import GapCallback, T9StreamClient
+
+logger = logging.getLogger(__name__)
+
+CLIENT_ASYNC = "async"
+CLIENT_THREAD = "thread"
+
+DEFAULT_STREAM = "main"
+
+_WINNER_CODES = {
+    "b": "B", "banker": "B", "莊": "B",
+    "p": "P", "player": "P", "閒": "P",
+    "t": "T", "tie": "T", "和": "T",
+}
+
+
+def to_result_event(data: Any, stream: str = DEFAULT_STREAM) -> Optional[Dict[str, Any]]:
+    """將 T9 結果資料轉為引擎 RESULT 事件；沒有可辨識的贏家時返回 None"""
+    if not isinstance(data, dict):
+        return None
+    winner = _WINNER_CODES.get(str(data.get("winner") or data.get("result") or "").strip().lower())
+    if winner is None:
+        return None
+    received_at = data.get("received_at") or data.get("ts")
+    if not isinstance(received_at, (int, float)) or isinstance(received_at, bool):
+        received_at = int(time.time() * 1000)
+    return {
+        "type": "RESULT",
+        "source": "t9_stream",
+        "table_id": str(data.get("table_id") or data.get("table") or stream),
+        "round_id": data.get("round_id"),
+        "winner": winner,
+        "received_at": received_at,
+    }
+
+
+def _table_url(url: str, table_id: str) -> str:
+    parts = urlsplit(url)
+    query = "&".join(q for q in (parts.query, urlencode({"table": table_id})) if q)
+    return urlunsplit(parts._replace(query=query))
+
+
+class T9ResultFeeder:
+    """T9 結果串流事件來源（start / stop / is_running 與 DemoFeeder 相同）"""
+
+    def __init__(
+        self,
+        url: str,
+        on_event: Callable[[Dict[str, Any]], None],
+        *,
+        tables: Optional[List[str]] = None,
+        client: str = CLIENT_ASYNC,
+        headers: Optional[Dict[str, str]] = None,
+        on_gap: Optional[GapCallback] = None,
+        on_status: Optional[Callable[[str, str, Optional[str]], None]] = None,
+    ) -> None:
+        """
+        Args:
+            url: T9 結果串流 URL
+            on_event: 收到 RESULT 事件時調用（在串流執行緒中）
+            tables: 每桌一條串流（URL 加上 ?table=）；未設定時只接一條串流
+            client: "async"（預設）或 "thread"（舊的 T9StreamClient）
+            on_status: (stream, status, detail)
+        """
+        if client not in (CLIENT_ASYNC, CLIENT_THREAD):
+            raise ValueError(f"未知的 T9 串流客戶端: {client} (可用: {CLIENT_ASYNC}, {CLIENT_THREAD})")
+        self.client = client
+        self.on_event = on_event
+        self.on_status = on_status
+        self.on_gap = on_gap
+        self.streams = {table: _table_url(url, table) for table in tables} if tables else {DEFAULT_STREAM: url}
+        self.headers = headers
+        self._async: Optional[AsyncT9StreamClient] = None
+        self._threads: Dict[str, T9StreamClient] = {}
+        self._running = False
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._running:
+            return
+        if self.client == CLIENT_ASYNC:
+            self._async = AsyncT9StreamClient(
+                headers=self.headers,
+                on_event=lambda stream, name, data: self._emit(stream, data),
+                on_status=self._status,
+                on_gap=self.on_gap,
+            )
+            for name, url in self.streams.items():
+                self._async.add_stream(name, url)
+            self._async.start()
+        else:
+            for name, url in self.streams.items():
+                client = T9StreamClient(
+                    url,
+                    headers=self.headers,
+                    on_event=lambda event_name, data, name=name: self._emit(name, data),
+                    on_status=lambda status, detail, name=name: self._status(name, status, detail),
+                    on_gap=self.on_gap,
+                )
+                self._threads[name] = client
+                client.start()
+        self._running = True
+        logger.info("T9ResultFeeder started: client=%s streams=%s", self.client, list(self.streams))
+
+    def stop(self) -> None:
+        if self._async:
+            self._async.stop()
+            self._async = None
+        for client in self._threads.values():
+            client.stop()
+        self._threads.clear()
+        self._running = False
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """每條串流的統計（async 客戶端才有 events/sec 等數據）"""
+        if self._async:
+            return self._async.stats()
+        return {name: {"sequence": client.gap_detector.snapshot()} for name, client in self._threads.items()}
+
+    # ------------------------------------------------------------------
+    def _emit(self, stream: str, data: Any) -> None:
+        event = to_result_event(data, stream)
+        if event is None:
+            logger.debug("T9ResultFeeder ignored event without winner: %r", data)
+            return
+        self.on_event(event)
+
+    def _status(self, stream: str, status: str, detail: Optional[str]) -> None:
+        if self.on_status:
+            self.on_status(stream, status, detail)
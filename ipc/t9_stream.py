@@ -4,14 +4,128 @@
 
 import json
 import logging
+import re
 import threading
 import time
-from typing import Callable, Optional, Dict, Any
+from collections import deque
+from typing import Callable, Optional, Dict, Any, Deque, FrozenSet, Set, Tuple
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+_TRAILING_INT = re.compile(r"(\d+)$")
+
+# SSE id 是整條串流共用的計數器（各桌交錯），以 SSE id 取得的序號記在此 key 下
+STREAM_SEQ_KEY = "*"
+
+
+def parse_event_types(event_types: Optional[str]) -> Optional[FrozenSet[str]]:
+    """解析 "result,status" 形式的事件類型過濾；空值表示不過濾"""
+    if not event_types:
+        return None
+    names = frozenset(name.strip() for name in event_types.split(",") if name.strip())
+    return names or None
+
+
+# (table_id, first_missing_seq, last_missing_seq)；序號取自 SSE id 時 table_id 為 STREAM_SEQ_KEY
+GapCallback = Callable[[str, int, int], None]
+
+
+class SequenceGapDetector:
+    """Sequence tracking for result events.
+
+    事件資料有 seq 欄位時依桌追蹤（桌號取自 table_id / table 欄位）；
+    否則取 SSE id 結尾的整數（例如 "WG7:1024" 或 "1024"）。SSE id 由 hub
+    對所有桌共用一個計數器，各桌事件交錯出現，因此記在 STREAM_SEQ_KEY 下
+    整條串流一起追蹤（因此串流不可在伺服器端依事件類型過濾，否則被濾掉的
+    id 會被誤判為跳號）。同一 key 的序號應連續遞增：
+    - 跳號：返回缺漏區間，由呼叫端觸發補抓
+    - 重複（重連後伺服器重送）：只有最近 history 筆內確實收過的序號才算，
+      返回 duplicate，呼叫端應丟棄
+    - 倒退到沒收過的序號（伺服器 / hub 重啟，計數器重新起算）：視為重新開始
+    """
+
+    def __init__(self, history: int = 1024) -> None:
+        self.history = history
+        self._last: Dict[str, int] = {}
+        self._recent: Dict[str, Deque[int]] = {}
+        self._seen: Dict[str, Set[int]] = {}
+        self.gaps = 0
+        self.missing = 0
+        self.duplicates = 0
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def extract(data: Any, event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+        """從事件取出 (追蹤 key, seq)，無法取得序號時返回 None
+
+        有 seq 欄位時 key 為桌號；序號取自 SSE id 時 key 為 STREAM_SEQ_KEY。
+        """
+        if not isinstance(data, dict):
+            return None
+        seq = data.get("seq")
+        if isinstance(seq, int) and not isinstance(seq, bool):
+            return str(data.get("table_id") or data.get("table") or ""), seq
+        if event_id:
+            match = _TRAILING_INT.search(event_id)
+            if match:
+                return STREAM_SEQ_KEY, int(match.group(1))
+        return None
+
+    # ------------------------------------------------------------------
+    def observe(self, table_id: str, seq: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+        """記錄序號
+
+        Returns:
+            ("new" | "duplicate" | "gap" | "reset", 缺漏區間或 None)
+        """
+        last = self._last.get(table_id)
+        if last is None:
+            self._restart(table_id, seq)
+            return "new", None
+        if seq <= last:
+            if seq in self._seen[table_id]:
+                self.duplicates += 1
+                return "duplicate", None
+            self._restart(table_id, seq)
+            return "reset", None
+        self._last[table_id] = seq
+        self._remember(table_id, seq)
+        if seq == last + 1:
+            return "new", None
+        self.gaps += 1
+        self.missing += seq - last - 1
+        return "gap", (last + 1, seq - 1)
+
+    def reset(self) -> None:
+        """忘記所有序號（重連但沒有從 Last-Event-ID 續傳時調用）"""
+        self._last.clear()
+        self._recent.clear()
+        self._seen.clear()
+
+    def _restart(self, table_id: str, seq: int) -> None:
+        self._last[table_id] = seq
+        self._recent[table_id] = deque(maxlen=self.history)
+        self._seen[table_id] = set()
+        self._remember(table_id, seq)
+
+    def _remember(self, table_id: str, seq: int) -> None:
+        recent, seen = self._recent[table_id], self._seen[table_id]
+        if len(recent) == recent.maxlen:
+            seen.discard(recent[0])
+        recent.append(seq)
+        seen.add(seq)
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "last_seq": dict(self._last),
+            "gaps": self.gaps,
+            "missing": self.missing,
+            "duplicates": self.duplicates,
+        }
+
 
 class T9StreamClient:
     """Background SSE client that pulls result events from T9-Web-Api."""
@@ -20,7 +134,7 @@ class T9StreamClient:
         self,
         base_url: str,
         *,
-        event_types: str = "result",
+        event_types: Optional[str] = "result",
         headers: Optional[Dict[str, str]] = None,
         retry_delay: float = 5.0,
         on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
@@ -28,15 +142,23 @@ class T9StreamClient:
         session: Optional[requests.Session] = None,
         request_timeout: float = 60.0,
         connection_refresh_interval: float = 60.0,  # 每60秒主動重連
+        on_gap: Optional[GapCallback] = None,
     ) -> None:
         self.base_url = base_url
+        # 事件類型在客戶端過濾：序號檢查需要看到完整串流
         self.event_types = event_types
+        self._event_filter = parse_event_types(event_types)
         self.headers = headers or {"Accept": "text/event-stream"}
         self.retry_delay = max(1.0, retry_delay)
         self.request_timeout = max(5.0, request_timeout)
         self.connection_refresh_interval = connection_refresh_interval
         self.on_event = on_event
         self.on_status = on_status
+        self.on_gap = on_gap
+
+        # 斷線續傳：重連時以 Last-Event-ID 告知伺服器從哪裡繼續
+        self.last_event_id: Optional[str] = None
+        self.gap_detector = SequenceGapDetector()
 
         # 創建 session 並配置連接池
         if session:
@@ -86,10 +208,6 @@ class T9StreamClient:
 
     # ------------------------------------------------------------------
     def _run(self) -> None:
-        params = {}
-        if self.event_types:
-            params["event_types"] = self.event_types
-
         while not self._stop.is_set():
             connection_start_time = time.time()
             watchdog_thread = None
@@ -97,10 +215,16 @@ class T9StreamClient:
             try:
                 self._emit_status("connecting", self.base_url)
 
+                headers = dict(self.headers)
+                if self.last_event_id:
+                    headers["Last-Event-ID"] = self.last_event_id
+                else:
+                    # 不續傳時伺服器從頭送起，舊序號不再適用
+                    self.gap_detector.reset()
+
                 response = self._session.get(
                     self.base_url,
-                    params=params,
-                    headers=self.headers,
+                    headers=headers,
                     stream=True,
                     timeout=(5.0, self.request_timeout),
                 )
@@ -134,9 +258,15 @@ class T9StreamClient:
                 for payload in self._iter_sse(response):
                     if payload is None:
                         continue
-                    event_name, data = payload
+                    event_name, data, event_id = payload
+                    if event_id:
+                        self.last_event_id = event_id
                     if not data:
                         continue
+                    if not self._check_sequence(data, event_id):
+                        continue
+                    if self._event_filter is not None and event_name not in self._event_filter:
+                        continue
                     event_count += 1
 
                     if self.on_event:
@@ -182,6 +312,30 @@ class T9StreamClient:
         self._emit_status("stopped", None)
         logger.info("T9 stream client stopped")
 
+    # ------------------------------------------------------------------
+    def _check_sequence(self, data: Any, event_id: Optional[str]) -> bool:
+        """檢查序號；返回 False 表示重複事件應丟棄"""
+        key = SequenceGapDetector.extract(data, event_id)
+        if key is None:
+            return True
+        table_id, seq = key
+        status, missing = self.gap_detector.observe(table_id, seq)
+        if status == "duplicate":
+            logger.debug("T9 stream duplicate event dropped: table=%s seq=%s", table_id, seq)
+            return False
+        if status == "reset":
+            logger.warning("T9 stream sequence reset: table=%s seq=%s", table_id, seq)
+        elif missing:
+            first, last = missing
+            logger.warning("T9 stream gap detected: table=%s missing=%s-%s", table_id, first, last)
+            self._emit_status("gap", f"{table_id}:{first}-{last}")
+            if self.on_gap:
+                try:
+                    self.on_gap(table_id, first, last)
+                except Exception:
+                    logger.exception("T9 stream on_gap callback failed")
+        return True
+
     # ------------------------------------------------------------------
     def _watchdog(self, response: requests.Response, start_time: float, stop_event: threading.Event) -> None:
         """監控連接時間，超時後強制關閉響應以觸發重連"""
@@ -220,7 +374,6 @@ class T9StreamClient:
             if not line:
                 if not data_lines:
                     event_name = None
-                    event_id = None
                     continue
 
                 data_str = "\n".join(data_lines)
@@ -231,12 +384,11 @@ class T9StreamClient:
                 except json.JSONDecodeError:
                     logger.debug("T9 stream JSON decode failed: %s", data_str)
                     event_name = None
-                    event_id = None
                     continue
 
-                yield event_name or "message", parsed
+                # id 依 SSE 規範在事件之間保留
+                yield event_name or "message", parsed, event_id
                 event_name = None
-                event_id = None
                 continue
 
             if line.startswith(":"):
@@ -246,7 +398,7 @@ class T9StreamClient:
             elif line.startswith("event:"):
                 event_name = line[6:].strip() or None
             elif line.startswith("id:"):
-                event_id = line[3:].strip() or None
+                event_id = line[3:].strip() or event_id
 
         # Signal termination with heartbeat to allow reconnect logic
         logger.info(f"T9 stream _iter_sse exited naturally after {line_count} lines")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+LineOrchestrator 壓力測試 CLI
+
+使用方法:
+    python scripts/load_test.py                                  # 預設矩陣
+    python scripts/load_test.py --strategies 10 50 200 --tables 1 8 32 --rounds 300
+    python scripts/load_test.py --json --output load_report.json  # 保存完整報告
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# 添加項目根目錄到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.autobet.lines.loadgen import first_over_budget, format_matrix, run_matrix
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(
+        description="LineOrchestrator 壓力測試（N 策略 × M 桌）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python scripts/load_test.py --strategies 10 50 --tables 4 16
+  python scripts/load_test.py --no-memory            # 不追蹤記憶體（延遲更接近實際）
+  python scripts/load_test.py --budget-ms 20         # p99 超過 20ms 視為撐不住
+        """
+    )
+    parser.add_argument("--strategies", type=int, nargs="+", default=[10, 50, 100], help="策略數量 N")
+    parser.add_argument("--tables", type=int, nargs="+", default=[1, 4, 16], help="桌數 M")
+    parser.add_argument("--rounds", type=int, default=200, help="每張桌的輪數")
+    parser.add_argument("--seed", type=int, default=42, help="隨機種子")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="單次呼叫 p99 預算（毫秒）")
+    parser.add_argument("--no-memory", action="store_true", help="停用 tracemalloc 記憶體追蹤")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON 格式")
+    parser.add_argument("--output", type=str, help="保存完整報告到文件")
+
+    args = parser.parse_args()
+
+    reports = run_matrix(
+        args.strategies,
+        args.tables,
+        rounds=args.rounds,
+        seed=args.seed,
+        track_memory=not args.no_memory,
+        budget_ms=args.budget_ms,
+    )
+
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        print(format_matrix(reports))
+        breaking = first_over_budget(reports)
+        if breaking:
+            print(f"\n⚠️  首個超出預算的情境: N={breaking['strategies']} M={breaking['tables']}")
+        else:
+            print("\n✅ 所有情境都在預算內")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n報告已保存到: {args.output}")
+
+    return 0 if first_over_budget(reports) is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
 # src/autobet/actuator.py
-import time, random, logging, pyautogui
-from typing import Dict, Tuple, List, Optional
+import random, logging
+from typing import Any, Dict, Tuple, List, Optional
 from src.autobet.chip_profile_manager import ChipProfile
+from src.autobet.execution_deadline import ExecutionDeadline
+from src.autobet.input_backends import InputBackend, create_backend
+from src.autobet.click_planner import (
+    STEP_BET, STEP_CHIP, STEP_CONFIRM, ClickPathOptimizer, ClickStep, distance, move_duration,
+)
 
 logger = logging.getLogger(__name__)
 
 class Actuator:
     def __init__(self, chip_profile: Optional[ChipProfile] = None, positions: Optional[Dict] = None,
-                 ui_cfg: Dict = None, dry_run: bool = True, log_callback=None):
+                 ui_cfg: Dict = None, dry_run: bool = True, log_callback=None,
+                 backend: Optional[InputBackend] = None):
         """
         初始化 Actuator
 
@@ -17,13 +23,21 @@ class Actuator:
             ui_cfg: UI 配置
             dry_run: 是否為乾跑模式
             log_callback: 日誌回調函數
+            backend: 輸入後端（None 時依 AUTOBET_INPUT_BACKEND / ui_cfg.input.backend 建立，
+                     都沒有設定時乾跑用 recording）
         """
         self.chip_profile = chip_profile
         self.pos = positions or {}
         self.ui = ui_cfg or {}
         self.dry = bool(dry_run)
         self.log_callback = log_callback
-        pyautogui.FAILSAFE = True
+        self.input = backend or create_backend(ui_cfg=self.ui, dry_run=self.dry)
+        logger.info(f"Actuator 輸入後端: {self.input.name}")
+
+        # 上一次游標位置（用於依距離計算移動時間）
+        self._last_pos: Optional[Tuple[int, int]] = None
+        # 最近一次 execute_sequence 的預估 / 實際時間
+        self.last_execution: Dict[str, Any] = {}
 
         # 建立 value -> chip 的映射（用於快速查找）
         self.chip_map = {}
@@ -35,7 +49,7 @@ class Actuator:
             }
             logger.info(f"Actuator 使用 ChipProfile，已校準籌碼: {list(self.chip_map.keys())}")
 
-    def _click_point(self, name: str) -> bool:
+    def _click_point(self, name: str, repeat: int = 1) -> bool:
         pt = self.pos.get("points", {}).get(name)
         if not pt:
             logger.error(f"point missing: {name}")
@@ -45,11 +59,10 @@ class Actuator:
         rx = x + random.randint(-jitter, jitter)
         ry = y + random.randint(-jitter, jitter)
 
-        mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
         ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
 
-        # 模擬模式和真實模式都使用配置的延遲
-        md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+        # 移動時間依距離計算，點擊延遲使用配置範圍
+        md = self._move_duration(rx, ry)
         cd = random.randint(int(ck[0]), int(ck[1]))/1000.0
 
         if self.dry:
@@ -57,17 +70,16 @@ class Actuator:
             logger.info(log_msg)
             if self.log_callback:
                 self.log_callback("INFO", "Actuator", log_msg)
-            pyautogui.moveTo(rx, ry, duration=md)  # 乾跑使用快速移動
-            time.sleep(cd)
+            self._move_to(rx, ry, md)  # 乾跑使用快速移動
+            self.input.sleep(cd)
             return True
         else:
-            log_msg = f"移動滑鼠到 {name} -> ({rx},{ry}) 並點擊"
+            log_msg = f"移動滑鼠到 {name} -> ({rx},{ry}) 並點擊" + (f" ×{repeat}" if repeat > 1 else "")
             logger.info(log_msg)
             if self.log_callback:
                 self.log_callback("INFO", "Actuator", log_msg)
-            pyautogui.moveTo(rx, ry, duration=md)
-            pyautogui.click()
-            time.sleep(cd)
+            self._move_to(rx, ry, md)
+            self._click_repeat(repeat, cd)
             return True
 
     def click_chip_value(self, value: int) -> bool:
@@ -88,11 +100,10 @@ class Actuator:
             rx = x + random.randint(-jitter, jitter)
             ry = y + random.randint(-jitter, jitter)
 
-            mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
             ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
 
-            # 模擬模式和真實模式都使用配置的延遲
-            md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+            # 移動時間依距離計算，點擊延遲使用配置範圍
+            md = self._move_duration(rx, ry)
             cd = random.randint(int(ck[0]), int(ck[1]))/1000.0
 
             if self.dry:
@@ -100,17 +111,17 @@ class Actuator:
                 logger.info(log_msg)
                 if self.log_callback:
                     self.log_callback("INFO", "Actuator", log_msg)
-                pyautogui.moveTo(rx, ry, duration=md)
-                time.sleep(cd)
+                self._move_to(rx, ry, md)
+                self.input.sleep(cd)
                 return True
             else:
                 log_msg = f"移動滑鼠到 {chip.label or f'{value}元籌碼'} -> ({rx},{ry}) 並點擊"
                 logger.info(log_msg)
                 if self.log_callback:
                     self.log_callback("INFO", "Actuator", log_msg)
-                pyautogui.moveTo(rx, ry, duration=md)
-                pyautogui.click()
-                time.sleep(cd)
+                self._move_to(rx, ry, md)
+                self.input.click()
+                self.input.sleep(cd)
                 return True
 
         # 舊系統回退：使用 positions.json
@@ -123,7 +134,7 @@ class Actuator:
         logger.warning(f"使用舊系統點擊籌碼: {key} (建議使用 ChipProfile)")
         return self._click_point(key)
 
-    def click_bet(self, target: str) -> bool:
+    def click_bet(self, target: str, repeat: int = 1) -> bool:
         """
         點擊下注目標（莊家/閒家/和局）
 
@@ -131,6 +142,7 @@ class Actuator:
 
         Args:
             target: 下注目標名稱 (banker/player/tie)
+            repeat: 移動一次後連續點擊的次數（同一籌碼放多顆）
         """
         # 新系統：使用 ChipProfile
         if self.chip_profile:
@@ -143,11 +155,10 @@ class Actuator:
                 rx = x + random.randint(-jitter, jitter)
                 ry = y + random.randint(-jitter, jitter)
 
-                mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
                 ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
 
-                # 模擬模式和真實模式都使用配置的延遲
-                md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+                # 移動時間依距離計算，點擊延遲使用配置範圍
+                md = self._move_duration(rx, ry)
                 cd = random.randint(int(ck[0]), int(ck[1]))/1000.0
 
                 target_name_map = {
@@ -163,18 +174,17 @@ class Actuator:
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
                     logger.info(f"[DEBUG] 開始移動滑鼠，duration={md}")
-                    pyautogui.moveTo(rx, ry, duration=md)
+                    self._move_to(rx, ry, md)
                     logger.info(f"[DEBUG] 滑鼠移動完成")
-                    time.sleep(cd)
+                    self.input.sleep(cd)
                     return True
                 else:
-                    log_msg = f"移動滑鼠到 {target_name} -> ({rx},{ry}) 並點擊"
+                    log_msg = f"移動滑鼠到 {target_name} -> ({rx},{ry}) 並點擊" + (f" ×{repeat}" if repeat > 1 else "")
                     logger.info(log_msg)
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
-                    pyautogui.moveTo(rx, ry, duration=md)
-                    pyautogui.click()
-                    time.sleep(cd)
+                    self._move_to(rx, ry, md)
+                    self._click_repeat(repeat, cd)
                     return True
             else:
                 logger.error(f"下注目標 {target} 未校準")
@@ -182,7 +192,151 @@ class Actuator:
 
         # 舊系統回退
         logger.warning(f"使用舊系統點擊下注目標: {target} (建議使用 ChipProfile)")
-        return self._click_point(target)
+        return self._click_point(target, repeat)
+
+    def _click_repeat(self, repeat: int, click_delay: float) -> None:
+        """在目前位置點擊 repeat 次（每次之間等待 click_delay）"""
+        for _ in range(max(1, repeat)):
+            self.input.click()
+            self.input.sleep(click_delay)
+
+    def execute_sequence(self, sequence, stop_on_failure: bool = True, optimize: bool = True,
+                         deadline: Optional[ExecutionDeadline] = None) -> Tuple[bool, List[str]]:
+        """
+        執行 ClickSequencePlanner 產生的點擊序列
+
+        Args:
+            sequence: ClickSequence 或 ClickStep 列表
+            stop_on_failure: 任一步驟失敗即停止（乾跑模式下不視為失敗）
+            optimize: 依座標重排點擊順序，使游標移動距離最短
+            deadline: 下注窗口期限；每一步前預估剩餘步驟，放不下就中止並 cancel()
+
+        Returns:
+            (是否全部成功, 已執行步驟描述)
+
+        執行後 self.last_execution 記錄預估 / 實際時間與移動距離，
+        有期限時另含 deadline: {aborted, missed, slack_ms}。
+        """
+        steps = list(getattr(sequence, "steps", sequence))
+        optimizer = ClickPathOptimizer(self.position_of)
+        travel_before = optimizer.path_length(steps, self._last_pos)
+        if optimize and hasattr(sequence, "steps"):
+            steps = optimizer.optimize(sequence, self._last_pos).steps
+        travel = optimizer.path_length(steps, self._last_pos)
+        estimated = self.estimate_steps(steps)
+
+        started = self.input.now()
+        ok, executed, aborted = self._run_steps(steps, stop_on_failure, deadline)
+        actual = self.input.now() - started
+
+        self.last_execution = {
+            "ok": ok,
+            "steps": len(executed),
+            "estimated_ms": round(estimated * 1000, 1),
+            "actual_ms": round(actual * 1000, 1),
+            "travel_px": round(travel, 1),
+            "travel_px_unoptimized": round(travel_before, 1),
+        }
+        if deadline is not None:
+            slack = deadline.remaining()
+            self.last_execution["deadline"] = {
+                "aborted": aborted,
+                "missed": not aborted and ok and slack < 0,
+                "slack_ms": round(slack * 1000, 1),
+            }
+        if aborted:
+            logger.warning(f"點擊序列已中止 ({aborted})，已執行 {len(executed)}/{len(steps)} 步")
+            return False, executed
+        logger.info(
+            f"點擊序列完成: 預估 {self.last_execution['estimated_ms']}ms / 實際 {self.last_execution['actual_ms']}ms，"
+            f"移動 {travel:.0f}px (原順序 {travel_before:.0f}px)"
+        )
+        return ok, executed
+
+    def _run_steps(self, steps: List[ClickStep], stop_on_failure: bool,
+                   deadline: Optional[ExecutionDeadline] = None) -> Tuple[bool, List[str], Optional[str]]:
+        executed: List[str] = []
+        placed = False  # 是否已有籌碼放在桌上（中止時需要 cancel）
+        for index, step in enumerate(steps):
+            if deadline is not None:
+                reason = deadline.check(self.estimate_steps(steps[index:]))
+                if reason:
+                    if placed:
+                        logger.warning(f"下注窗口不足 ({reason})，取消已放置的籌碼")
+                        self.cancel()
+                    return False, executed, reason
+
+            if step.kind == STEP_CHIP:
+                ok = self.click_chip_value(int(step.key))
+            elif step.kind == STEP_BET:
+                ok = self.click_bet(step.key, repeat=step.repeat)
+            elif step.kind == STEP_CONFIRM:
+                ok = self.confirm()
+            else:
+                logger.error(f"未知的點擊步驟: {step.kind}")
+                ok = False
+            executed.append(step.describe())
+            placed = placed or step.kind == STEP_BET
+            if not ok and not self.dry and stop_on_failure:
+                return False, executed, None
+        return True, executed, None
+
+    def position_of(self, step: ClickStep) -> Optional[Tuple[int, int]]:
+        """點擊步驟對應的螢幕座標（ChipProfile 優先，其次 positions.json）"""
+        if step.kind == STEP_CHIP:
+            chip = self.chip_map.get(int(step.key))
+            if chip is not None:
+                return chip.x, chip.y
+            value = int(step.key)
+            name = {100: "chip_100", 1000: "chip_1k", 5000: "chip_5k", 10000: "chip_10k", 50000: "chip_50k"}.get(
+                value, f"chip_{value//1000}k" if value >= 1000 else f"chip_{value}"
+            )
+        else:
+            name = step.key if step.kind == STEP_BET else step.kind
+            if self.chip_profile:
+                pos = self.chip_profile.get_bet_position(name)
+                if pos and pos.get("calibrated", False):
+                    return pos["x"], pos["y"]
+        pt = self.pos.get("points", {}).get(name)
+        return (pt["x"], pt["y"]) if pt else None
+
+    def estimate_steps(self, steps: List[ClickStep]) -> float:
+        """預估執行點擊序列所需秒數（移動時間依距離，點擊延遲取配置範圍中值）"""
+        lo, hi = self._move_range()
+        ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
+        click_sec = (int(ck[0]) + int(ck[1])) / 2000.0
+        guard_sec = int(self.ui.get("safety", {}).get("pre_confirm_guard_ms", 120)) / 1000.0
+        total, current = 0.0, self._last_pos
+        for step in steps:
+            point = self.position_of(step)
+            total += move_duration(distance(current, point), lo, hi, **self._fitts_params())
+            clicks = step.repeat if (step.kind == STEP_BET and not self.dry) else 1
+            total += click_sec * clicks
+            if step.kind == STEP_CONFIRM:
+                total += guard_sec
+            current = point or current
+        return total
+
+    def _move_range(self) -> Tuple[float, float]:
+        mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
+        return int(mv[0]) / 1000.0, int(mv[1]) / 1000.0
+
+    def _fitts_params(self) -> Dict[str, float]:
+        click_cfg = self.ui.get("click", {})
+        return {
+            "per_bit_sec": float(click_cfg.get("move_per_bit_ms", 60)) / 1000.0,
+            "target_px": float(click_cfg.get("target_px", 40)),
+        }
+
+    def _move_duration(self, x: int, y: int) -> float:
+        """依與上一次游標位置的距離計算移動時間（±10% 隨機，不超出 move_delay_ms 範圍）"""
+        lo, hi = self._move_range()
+        base = move_duration(distance(self._last_pos, (x, y)), lo, hi, **self._fitts_params())
+        return max(lo, min(hi, base * random.uniform(0.9, 1.1)))
+
+    def _move_to(self, x: int, y: int, duration: float) -> None:
+        self.input.move_to(x, y, duration)
+        self._last_pos = (x, y)
 
     def confirm(self) -> bool:
         """
@@ -191,7 +345,7 @@ class Actuator:
         優先使用 ChipProfile 中的座標，若無則回退到舊系統
         """
         guard_ms = int(self.ui.get("safety", {}).get("pre_confirm_guard_ms", 120))
-        time.sleep(guard_ms/1000.0)
+        self.input.sleep(guard_ms/1000.0)
 
         # 新系統：使用 ChipProfile
         if self.chip_profile:
@@ -202,11 +356,10 @@ class Actuator:
                 rx = x + random.randint(-jitter, jitter)
                 ry = y + random.randint(-jitter, jitter)
 
-                mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
                 ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
 
-                # 模擬模式和真實模式都使用配置的延遲
-                md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+                # 移動時間依距離計算，點擊延遲使用配置範圍
+                md = self._move_duration(rx, ry)
                 cd = random.randint(int(ck[0]), int(ck[1]))/1000.0
 
                 if self.dry:
@@ -214,17 +367,17 @@ class Actuator:
                     logger.info(log_msg)
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
-                    pyautogui.moveTo(rx, ry, duration=md)
-                    time.sleep(cd)
+                    self._move_to(rx, ry, md)
+                    self.input.sleep(cd)
                     return True
                 else:
                     log_msg = f"移動滑鼠到 確認按鈕 -> ({rx},{ry}) 並點擊"
                     logger.info(log_msg)
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
-                    pyautogui.moveTo(rx, ry, duration=md)
-                    pyautogui.click()
-                    time.sleep(cd)
+                    self._move_to(rx, ry, md)
+                    self.input.click()
+                    self.input.sleep(cd)
                     return True
             else:
                 logger.error("確認按鈕未校準")
@@ -249,11 +402,10 @@ class Actuator:
                 rx = x + random.randint(-jitter, jitter)
                 ry = y + random.randint(-jitter, jitter)
 
-                mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
                 ck = self.ui.get("click", {}).get("click_delay_ms", [200, 400])
 
-                # 模擬模式和真實模式都使用配置的延遲
-                md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+                # 移動時間依距離計算，點擊延遲使用配置範圍
+                md = self._move_duration(rx, ry)
                 cd = random.randint(int(ck[0]), int(ck[1]))/1000.0
 
                 if self.dry:
@@ -261,17 +413,17 @@ class Actuator:
                     logger.info(log_msg)
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
-                    pyautogui.moveTo(rx, ry, duration=md)
-                    time.sleep(cd)
+                    self._move_to(rx, ry, md)
+                    self.input.sleep(cd)
                     return True
                 else:
                     log_msg = f"移動滑鼠到 取消按鈕 -> ({rx},{ry}) 並點擊"
                     logger.info(log_msg)
                     if self.log_callback:
                         self.log_callback("INFO", "Actuator", log_msg)
-                    pyautogui.moveTo(rx, ry, duration=md)
-                    pyautogui.click()
-                    time.sleep(cd)
+                    self._move_to(rx, ry, md)
+                    self.input.click()
+                    self.input.sleep(cd)
                     return True
             else:
                 logger.error("取消按鈕未校準")
@@ -287,8 +439,7 @@ class Actuator:
         rx = x + random.randint(-jitter, jitter)
         ry = y + random.randint(-jitter, jitter)
 
-        mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
-        md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+        md = self._move_duration(rx, ry)
         cd = random.randint(200, 400)/1000.0
 
         label_text = f" ({label})" if label else ""
@@ -297,8 +448,8 @@ class Actuator:
         if self.log_callback:
             self.log_callback("INFO", "Actuator", log_msg)
 
-        pyautogui.moveTo(rx, ry, duration=md)
-        time.sleep(cd)  # 模擬點擊延遲
+        self._move_to(rx, ry, md)
+        self.input.sleep(cd)  # 模擬點擊延遲
         return True
 
     def dry_click_key(self, key_name: str) -> bool:
@@ -315,24 +466,23 @@ class Actuator:
         rx = x + random.randint(-jitter, jitter)
         ry = y + random.randint(-jitter, jitter)
 
-        mv = self.ui.get("click", {}).get("move_delay_ms", [300, 600])
-        md = random.randint(int(mv[0]), int(mv[1]))/1000.0
+        md = self._move_duration(rx, ry)
 
         if self.dry:
             log_msg = f"移動滑鼠到 ({rx},{ry})"
             logger.info(f"[僅移動] {log_msg}")
             if self.log_callback:
                 self.log_callback("INFO", "Actuator", log_msg)
-            time.sleep(md)
+            self.input.sleep(md)
             return True
         else:
             # 多種 fallback 方式
             moved = False
 
-            # 1) pyautogui
+            # 1) 輸入後端
             try:
-                pyautogui.FAILSAFE = False
-                pyautogui.moveTo(rx, ry, duration=0)
+                self.input.move_to(rx, ry, 0)
+                self._last_pos = (rx, ry)
                 moved = True
             except Exception:
                 pass
@@ -346,5 +496,5 @@ class Actuator:
                 except Exception as e:
                     logger.warning(f"move_to fallback failed: {e}")
 
-            time.sleep(md)
+            self.input.sleep(md)
             return moved
\ No newline at end of file
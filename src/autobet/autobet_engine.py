@@ -16,12 +16,14 @@ AutoBetEngine - 執行層協調器
 
 注意：本模組不應再擴展策略相關功能
 """
-import os, csv, json, time, logging, threading
+import os, json, time, logging, threading
 from typing import Dict, Optional, List, Tuple
 from .detectors import OverlayDetectorWrapper as OverlayDetector, ProductionOverlayDetector
 from .chip_planner import SmartChipPlanner, BettingPolicy
 from .chip_profile_manager import ChipProfile
 from .actuator import Actuator
+from .loop_timing import LoopTimer
+from .session_writer import RotationPolicy, get_session_writer
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,7 @@ class AutoBetEngine:
         self.smart_planner: Optional[SmartChipPlanner] = None
         self._tick_stop = threading.Event()
         self._tick_thread: Optional[threading.Thread] = None
+        self.tick_loop = LoopTimer("engine.tick", 0.12)  # tick 時序統計（HealthChecker 讀取）
         self.state = "idle"
         self.last_winner = None
         self.rounds = 0
@@ -47,14 +50,23 @@ class AutoBetEngine:
         self.current_plan = None
         self.session_ctx = {"last_result_ready": False}
         self._exec_lock = threading.Lock()  # 防止併發執行
+        self.overlay_callback = None  # overlay 開 / 關變化時調用 callback(is_open)
+        self._overlay_open: Optional[bool] = None
         self.dry_step_delay_ms = 2000  # 模擬模式步驟間隔（毫秒）- 2秒間隔
-        # session files
+        # session files（由背景 SessionWriter 寫入，表頭在開新分段時自動寫入）
         os.makedirs("data/sessions", exist_ok=True)
         ts = time.strftime("%Y%m%d-%H%M%S")
         self.csv_path = f"data/sessions/session-{ts}.csv"
         self.ndjson_path = "data/sessions/events.out.ndjson"
-        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow(["ts","state","round_id","winner","plan","amount"])
+        self._writer = get_session_writer()
+        self._writer.register(self.csv_path, RotationPolicy(
+            max_bytes=20 * 1024 * 1024,
+            header=["ts", "state", "round_id", "winner", "plan", "amount"],
+        ))
+        self._writer.register(self.ndjson_path, RotationPolicy(
+            max_bytes=20 * 1024 * 1024,
+            max_age_sec=24 * 3600,
+        ))
 
     def load_ui_config(self, ui: Dict):
         self.ui = ui or {}
@@ -77,6 +89,20 @@ class AutoBetEngine:
         if self.act:
             self.act.log_callback = callback
 
+    def set_overlay_callback(self, callback):
+        """設置 overlay 開 / 關變化回調（在引擎 tick 執行緒調用）"""
+        self.overlay_callback = callback
+
+    def _notify_overlay(self, is_open: bool):
+        if is_open == self._overlay_open:
+            return
+        self._overlay_open = is_open
+        if self.overlay_callback:
+            try:
+                self.overlay_callback(is_open)
+            except Exception as e:
+                logger.warning(f"overlay callback error: {e}")
+
     def initialize_components(self) -> bool:
         try:
             self.overlay = OverlayDetector(self.ui, self.pos)
@@ -96,7 +122,7 @@ class AutoBetEngine:
                 if calibrated_chips:
                     self.smart_planner = SmartChipPlanner(
                         available_chips=calibrated_chips,
-                        policy=BettingPolicy(priority=BettingPolicy.MIN_CLICKS, fallback=BettingPolicy.FLOOR)
+                        policy=BettingPolicy(priority=BettingPolicy.EXACT_MATCH, fallback=BettingPolicy.FLOOR)
                     )
                     logger.info(f"SmartChipPlanner 初始化成功，{len(calibrated_chips)} 顆已校準籌碼")
                 else:
@@ -141,15 +167,20 @@ class AutoBetEngine:
             logger.info("engine disabled")
 
     def _run_loop(self):
-        # 120ms 一次
-        while not self._tick_stop.is_set():
-            try:
-                self._tick()
-            except Exception as e:
-                logger.error(f"tick error: {e}", exc_info=True)
-                self.state = "error"
-                break
-            time.sleep(0.12)
+        # 120ms 一次（依排程時間推進，扣除 tick 本身耗時）
+        loop = self.tick_loop
+        try:
+            while not self._tick_stop.is_set():
+                start = loop.begin()
+                try:
+                    self._tick()
+                except Exception as e:
+                    logger.error(f"tick error: {e}", exc_info=True)
+                    self.state = "error"
+                    break
+                self._tick_stop.wait(loop.end(start))
+        finally:
+            loop.stop()
 
     def _tick(self):
         """主狀態機循環 - 完整狀態轉換邏輯"""
@@ -160,6 +191,7 @@ class AutoBetEngine:
         try:
             # 檢查是否可下注
             is_open = self.overlay.overlay_is_open() if self.overlay else False
+            self._notify_overlay(is_open)
             
             # 添加調試日誌
             if self.state == "idle" and is_open:
@@ -413,12 +445,10 @@ class AutoBetEngine:
                 self._emit_state_change()
                 self._apply_result_and_staking(evt)
 
-            # 寫會話記錄
+            # 寫會話記錄（非同步，不阻塞結果處理）
             row = [int(time.time()*1000), self.state, evt.get("round_id"), self.last_winner, "-", "-"]
-            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
-                csv.writer(f).writerow(row)
-            with open(self.ndjson_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(evt, ensure_ascii=False) + "\n")
+            self._writer.write_csv(self.csv_path, row)
+            self._writer.write_json(self.ndjson_path, dict(evt))
 
             logger.info(f"Result processed: Round {self.rounds}, Winner: {self.last_winner}")
 
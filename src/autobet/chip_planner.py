@@ -4,13 +4,17 @@
 根據目標金額和可用籌碼，計算最佳下注組合
 """
 
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Tuple
+from dataclasses import dataclass, field, replace
+from math import gcd
+from typing import Iterable, List, Optional, Dict, Tuple
 from collections import Counter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# DP 表上限（以籌碼最大公因數為單位），超過時退回貪婪法
+DP_MAX_UNITS = 200_000
+
 
 @dataclass
 class Chip:
@@ -79,6 +83,15 @@ class SmartChipPlanner:
         )
         self.policy = policy or BettingPolicy()
 
+        # 配方表：(金額, max_clicks) -> BetPlan，熱路徑上 plan_bet 只查表
+        self._recipe_table: Dict[Tuple[int, Optional[int]], BetPlan] = {}
+        # 最少點擊 DP 表（以 _unit 為單位，依需要延伸）
+        self._unit = 0
+        for chip in self.available_chips:
+            self._unit = gcd(self._unit, chip.value)
+        self._dp_clicks: List[int] = [0]  # 湊出 i 個單位的最少籌碼數（-1 表示無法湊出）
+        self._dp_chip: List[Optional[Chip]] = [None]  # 最後一顆籌碼（回溯用）
+
         logger.info(f"SmartChipPlanner 初始化: {len(self.available_chips)} 顆可用籌碼")
         for chip in self.available_chips:
             logger.info(f"  Chip {chip.slot}: {chip.label} ({chip.value}元)")
@@ -114,6 +127,34 @@ class SmartChipPlanner:
                 reason="沒有可用的籌碼（請先校準籌碼位置）"
             )
 
+        key = (target_amount, max_clicks)
+        plan = self._recipe_table.get(key)
+        if plan is None:
+            plan = self._compute_plan(target_amount, max_clicks)
+            self._recipe_table[key] = plan
+        # 返回副本，避免呼叫端修改到表內的計劃
+        return replace(plan, chips=list(plan.chips), warnings=list(plan.warnings))
+
+    def precompute(self, amounts: Iterable[int], max_clicks: Optional[int] = None) -> int:
+        """
+        預先計算配方表（載入 ChipProfile / 策略時調用）
+
+        Args:
+            amounts: 金額列表（例如所有策略的注碼序列，負數代表反向，取絕對值）
+            max_clicks: 最大點擊次數限制
+
+        Returns:
+            新增的配方數
+        """
+        added = 0
+        for amount in {abs(int(a)) for a in amounts}:
+            key = (amount, max_clicks)
+            if amount > 0 and self.available_chips and key not in self._recipe_table:
+                self._recipe_table[key] = self._compute_plan(amount, max_clicks)
+                added += 1
+        return added
+
+    def _compute_plan(self, target_amount: int, max_clicks: Optional[int]) -> BetPlan:
         # 根據策略選擇規劃方法
         if self.policy.priority == BettingPolicy.MIN_CLICKS:
             return self._plan_min_clicks(target_amount, max_clicks)
@@ -173,11 +214,86 @@ class SmartChipPlanner:
         max_clicks: Optional[int] = None
     ) -> BetPlan:
         """
-        精確匹配策略：使用動態規劃找到精確組合
-        （簡化版：先用貪婪法，未來可擴展為完整 DP）
+        精確匹配策略：動態規劃求最少點擊的精確組合
+
+        任意面額下貪婪法不一定最少（例如籌碼 100/300/400 湊 600，貪婪需 3 顆，最佳為 300+300），
+        也可能在貪婪湊不出時其實存在精確組合。
+
+        無法在 max_clicks 內精確湊出時：
+        - FLOOR: 改用點擊數內可湊出的最大金額
+        - SKIP / 其他: 返回失敗
         """
-        # 目前簡化為貪婪法，未來可實作完整的動態規劃
-        return self._plan_min_clicks(target_amount, max_clicks)
+        units = target_amount // self._unit
+        if units > DP_MAX_UNITS:
+            logger.warning(f"金額 {target_amount} 超過 DP 表上限，改用貪婪法")
+            return self._plan_min_clicks(target_amount, max_clicks)
+        self._extend_dp(units)
+
+        needed = self._dp_clicks[units] if target_amount % self._unit == 0 else -1
+        if needed >= 0 and (not max_clicks or needed <= max_clicks):
+            chips = self._trace_chips(units)
+            return BetPlan(
+                success=True,
+                target_amount=target_amount,
+                actual_amount=target_amount,
+                chips=chips,
+                clicks=len(chips),
+                recipe=self._format_recipe(chips)
+            )
+
+        if needed < 0:
+            problem = f"無法精確組合 {target_amount} 元"
+        else:
+            problem = f"需要 {needed} 次點擊，超過限制 {max_clicks} 次"
+
+        if self.policy.fallback == BettingPolicy.FLOOR:
+            # 向下找點擊數內可湊出的最大金額（目標不是 _unit 倍數時，units 本身就已低於目標）
+            start_units = units - 1 if target_amount % self._unit == 0 else units
+            for floor_units in range(start_units, 0, -1):
+                clicks = self._dp_clicks[floor_units]
+                if clicks >= 0 and (not max_clicks or clicks <= max_clicks):
+                    chips = self._trace_chips(floor_units)
+                    actual = floor_units * self._unit
+                    return BetPlan(
+                        success=True,
+                        target_amount=target_amount,
+                        actual_amount=actual,
+                        chips=chips,
+                        clicks=len(chips),
+                        recipe=self._format_recipe(chips),
+                        warnings=[problem, f"向下取整至 {actual} 元"]
+                    )
+
+        return BetPlan(
+            success=False,
+            target_amount=target_amount,
+            actual_amount=0,
+            reason=problem
+        )
+
+    def _extend_dp(self, units: int) -> None:
+        """延伸最少點擊 DP 表至 units（已計算的部分會保留）"""
+        clicks, last = self._dp_clicks, self._dp_chip
+        chip_units = [(chip.value // self._unit, chip) for chip in self.available_chips]
+        for i in range(len(clicks), units + 1):
+            best, best_chip = -1, None
+            for step, chip in chip_units:
+                if step <= i:
+                    prev = clicks[i - step]
+                    if prev >= 0 and (best < 0 or prev + 1 < best):
+                        best, best_chip = prev + 1, chip
+            clicks.append(best)
+            last.append(best_chip)
+
+    def _trace_chips(self, units: int) -> List[Chip]:
+        """由 DP 表回溯籌碼序列（由大到小）"""
+        chips: List[Chip] = []
+        while units > 0:
+            chip = self._dp_chip[units]
+            chips.append(chip)
+            units -= chip.value // self._unit
+        chips.sort(key=lambda c: c.value, reverse=True)
+        return chips
 
     def _plan_conservative_floor(
         self,
@@ -0,0 +1,292 @@
+# src/autobet/click_planner.py
+"""
+點擊序列規劃器
+
+解決問題：
+1. 原本每顆籌碼都是「點籌碼 → 點下注區」，5 顆籌碼就是 10 次移動
+2. 同一局多條策略的訂單各自執行、各自 confirm
+
+設計：
+- 同一局的訂單先按下注區合併金額，再由 SmartChipPlanner 規劃籌碼
+- 按籌碼分組：每種籌碼只選一次，接著對每個需要它的下注區連點 N 次
+  （遊戲介面選中的籌碼會保持選取，直到選擇另一顆籌碼）
+- 全部放完後只 confirm 一次
+- ClickPathOptimizer 依 ChipProfile 座標重排籌碼組與下注區的順序，
+  使游標總移動距離最短（籌碼必須在其下注點擊之前、confirm 最後）
+
+使用範例:
+    >>> planner = ClickSequencePlanner(smart_planner, max_clicks=8)
+    >>> seq = planner.plan([("banker", 1200), ("player", 1000)])  # 籌碼 1000 / 100
+    >>> seq.describe()
+    'chip:1000 → bet:banker → bet:player → chip:100 → bet:banker×2 → confirm'
+    >>> seq.moves, seq.naive_moves
+    (6, 9)
+    >>> actuator.execute_sequence(seq)
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, replace
+from itertools import permutations
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .chip_planner import BetPlan, SmartChipPlanner
+
+STEP_CHIP = "chip"
+STEP_BET = "bet"
+STEP_CONFIRM = "confirm"
+
+Point = Tuple[float, float]
+PositionResolver = Callable[["ClickStep"], Optional[Point]]
+
+# 超過此籌碼組數時不做窮舉（Held-Karp 為 O(2^n · n^2)），保持原順序
+MAX_OPTIMIZE_GROUPS = 8
+
+
+def distance(a: Optional[Point], b: Optional[Point]) -> Optional[float]:
+    if a is None or b is None:
+        return None
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def move_duration(
+    dist: Optional[float],
+    min_sec: float,
+    max_sec: float,
+    *,
+    per_bit_sec: float = 0.06,
+    target_px: float = 40.0,
+) -> float:
+    """
+    依移動距離估算游標移動時間（Fitts' law）
+
+        T = min_sec + per_bit_sec × log2(1 + dist / target_px)，上限 max_sec
+
+    距離未知（例如第一次移動）時返回 max_sec。
+    """
+    if dist is None:
+        return max_sec
+    t = min_sec + per_bit_sec * math.log2(1.0 + dist / max(1.0, target_px))
+    return max(min_sec, min(max_sec, t))
+
+
+@dataclass
+class ClickStep:
+    """一次游標移動（到達後點擊 repeat 次）"""
+    kind: str  # STEP_CHIP / STEP_BET / STEP_CONFIRM
+    key: str = ""  # 籌碼面額 / 下注區名稱
+    repeat: int = 1
+
+    def describe(self) -> str:
+        if self.kind == STEP_CHIP:
+            return f"chip:{self.key}"
+        if self.kind == STEP_BET:
+            return f"bet:{self.key}×{self.repeat}" if self.repeat > 1 else f"bet:{self.key}"
+        return self.kind
+
+
+@dataclass
+class ClickSequence:
+    """合併後的點擊序列"""
+    success: bool
+    steps: List[ClickStep] = field(default_factory=list)
+    amounts: Dict[str, int] = field(default_factory=dict)  # 下注區 -> 實際金額
+    plans: Dict[str, BetPlan] = field(default_factory=dict)  # 下注區 -> 籌碼規劃
+    warnings: List[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def moves(self) -> int:
+        """游標移動次數"""
+        return len(self.steps)
+
+    @property
+    def clicks(self) -> int:
+        """總點擊次數"""
+        return sum(step.repeat for step in self.steps)
+
+    @property
+    def naive_moves(self) -> int:
+        """逐顆籌碼「點籌碼 → 點下注區」的移動次數（含 confirm），用於比較"""
+        return sum(2 * plan.clicks for plan in self.plans.values()) + 1
+
+    def recipe(self, target: str) -> str:
+        plan = self.plans.get(target)
+        return plan.recipe if plan else ""
+
+    def describe(self) -> str:
+        return " → ".join(step.describe() for step in self.steps)
+
+
+class ClickSequencePlanner:
+    """將同一局的多筆訂單合併為最少移動的點擊序列"""
+
+    def __init__(self, chip_planner: SmartChipPlanner, max_clicks: Optional[int] = None):
+        """
+        Args:
+            chip_planner: 籌碼規劃器
+            max_clicks: 每個下注區的最大籌碼數（ChipProfile.constraints.max_clicks_per_hand）
+        """
+        self.chip_planner = chip_planner
+        self.max_clicks = max_clicks
+        # 籌碼在托盤上的順序（slot 由小到大），分組時依此順序掃過托盤
+        self._slot_order = {
+            chip.value: chip.slot for chip in chip_planner.available_chips
+        }
+
+    def plan(self, orders: Sequence[Tuple[str, int]], confirm: bool = True) -> ClickSequence:
+        """
+        規劃點擊序列
+
+        Args:
+            orders: [(下注區, 金額), ...]，同一下注區可出現多次（會合併）
+            confirm: 是否在最後加上 confirm
+
+        Returns:
+            ClickSequence（任一下注區規劃失敗則整體失敗，不會部分下注）
+        """
+        totals: Dict[str, int] = {}
+        for target, amount in orders:
+            totals[target] = totals.get(target, 0) + int(amount)
+
+        sequence = ClickSequence(success=True)
+        # {chip_value: {target: count}}，保持下注區首次出現的順序
+        chip_groups: Dict[int, Dict[str, int]] = {}
+
+        for target, amount in totals.items():
+            plan = self.chip_planner.plan_bet(target_amount=amount, max_clicks=self.max_clicks)
+            if not plan.success:
+                return ClickSequence(success=False, reason=f"{target}: {plan.reason}")
+            sequence.plans[target] = plan
+            sequence.amounts[target] = plan.actual_amount
+            sequence.warnings.extend(f"{target}: {w}" for w in plan.warnings)
+            for chip in plan.chips:
+                counts = chip_groups.setdefault(chip.value, {})
+                counts[target] = counts.get(target, 0) + 1
+
+        for value in sorted(chip_groups, key=lambda v: (self._slot_order.get(v, 0), v)):
+            sequence.steps.append(ClickStep(STEP_CHIP, str(value)))
+            for target, count in chip_groups[value].items():
+                sequence.steps.append(ClickStep(STEP_BET, target, repeat=count))
+
+        if confirm and sequence.steps:
+            sequence.steps.append(ClickStep(STEP_CONFIRM))
+
+        return sequence
+
+
+class ClickPathOptimizer:
+    """
+    重排點擊序列以最小化游標移動距離
+
+    約束：
+    - 每個籌碼組（選籌碼 → 其下注區點擊）保持完整，籌碼必須先於其下注點擊
+    - 組與組之間、組內下注區之間的順序可自由調整
+    - confirm 永遠在最後
+
+    以 Held-Karp 動態規劃求解：狀態為（已完成的組、最後一組、最後一組的結束下注區）。
+    組內下注區通常只有 1~3 個，直接窮舉排列。
+    """
+
+    def __init__(self, resolve: PositionResolver):
+        """
+        Args:
+            resolve: ClickStep -> 螢幕座標（未知時返回 None）
+        """
+        self.resolve = resolve
+
+    def path_length(self, steps: Sequence[ClickStep], start: Optional[Point] = None) -> float:
+        """序列的游標移動總距離（座標未知的段落不計）"""
+        total, current = 0.0, start
+        for step in steps:
+            point = self.resolve(step)
+            d = distance(current, point)
+            if d is not None:
+                total += d
+            if point is not None:
+                current = point
+        return total
+
+    def optimize(self, sequence: ClickSequence, start: Optional[Point] = None) -> ClickSequence:
+        """返回重排後的序列（無法最佳化時原樣返回）"""
+        groups, tail = self._split_groups(sequence.steps)
+        if not groups or len(groups) > MAX_OPTIMIZE_GROUPS:
+            return sequence
+        if [step.kind for step in tail] not in ([], [STEP_CONFIRM]):
+            return sequence
+        points = [self.resolve(step) for group in groups for step in group]
+        if any(point is None for point in points):
+            return sequence
+
+        # 每組：對每個可能的結束下注區，求組內最短路徑
+        options: List[List[Tuple[float, List[ClickStep]]]] = []
+        for chip, *bets in groups:
+            chip_point = self.resolve(chip)
+            by_exit: Dict[int, Tuple[float, List[ClickStep]]] = {}
+            for order in permutations(range(len(bets))):
+                cost, current = 0.0, chip_point
+                for index in order:
+                    point = self.resolve(bets[index])
+                    cost += distance(current, point)
+                    current = point
+                exit_index = order[-1] if order else -1
+                if exit_index not in by_exit or cost < by_exit[exit_index][0]:
+                    by_exit[exit_index] = (cost, [chip] + [bets[i] for i in order])
+            options.append(list(by_exit.values()))
+
+        def exit_point(steps: List[ClickStep]) -> Point:
+            return self.resolve(steps[-1])
+
+        # Held-Karp：best[(mask, group, option)] = (cost, prev_key)
+        best: Dict[Tuple[int, int, int], Tuple[float, Optional[Tuple[int, int, int]]]] = {}
+        layers: Dict[int, List[Tuple[int, int, int]]] = {}
+        for g, group_options in enumerate(options):
+            enter = distance(start, self.resolve(groups[g][0])) or 0.0
+            for o, (cost, _) in enumerate(group_options):
+                best[(1 << g, g, o)] = (enter + cost, None)
+                layers.setdefault(1 << g, []).append((1 << g, g, o))
+
+        full = (1 << len(groups)) - 1
+        for mask in range(1, full + 1):
+            for m, g, o in layers.get(mask, ()):
+                cost = best[(m, g, o)][0]
+                here = exit_point(options[g][o][1])
+                for nxt in range(len(groups)):
+                    if mask & (1 << nxt):
+                        continue
+                    hop = distance(here, self.resolve(groups[nxt][0]))
+                    for no, (inner, _) in enumerate(options[nxt]):
+                        key = (mask | (1 << nxt), nxt, no)
+                        total = cost + hop + inner
+                        if key not in best:
+                            layers.setdefault(key[0], []).append(key)
+                        if key not in best or total < best[key][0]:
+                            best[key] = (total, (m, g, o))
+
+        confirm_point = self.resolve(tail[0]) if tail else None
+        finals = [
+            (best[key][0] + (distance(exit_point(options[key[1]][key[2]][1]), confirm_point) or 0.0), key)
+            for key in layers[full]
+        ]
+        _, key = min(finals, key=lambda item: item[0])
+
+        ordered: List[List[ClickStep]] = []
+        while key is not None:
+            ordered.append(options[key[1]][key[2]][1])
+            key = best[key][1]
+        steps = [step for group in reversed(ordered) for step in group] + tail
+        return replace(sequence, steps=steps)
+
+    @staticmethod
+    def _split_groups(steps: Sequence[ClickStep]) -> Tuple[List[List[ClickStep]], List[ClickStep]]:
+        """拆成 [[chip, bet, ...], ...] 與結尾（confirm）"""
+        groups: List[List[ClickStep]] = []
+        tail: List[ClickStep] = []
+        for step in steps:
+            if step.kind == STEP_CHIP:
+                groups.append([step])
+            elif step.kind == STEP_BET and groups:
+                groups[-1].append(step)
+            else:
+                tail.append(step)
+        return groups, tail
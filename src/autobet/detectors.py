@@ -1,5 +1,5 @@
 # src/autobet/detectors.py
-import logging, pyautogui
+import logging, pyautogui, threading
 import numpy as np
 import cv2
 import time
@@ -855,11 +855,48 @@ class OverlayDetectorWrapper:
             self.detector.load_qing_template(qing_path)
 
         # 啟動檢測（模擬舊版行為）
-        from time import monotonic
         self._last_frame_time = 0.0
+        self._last_decision = False
+        self._last_result: Dict = {}
+        # 引擎 tick 與 Dashboard 檢測執行緒共用同一個檢測器（連續幀計數器），以鎖串行化
+        self._lock = threading.Lock()
         # 使用與EngineWorker相容的節拍，避免雙重節流
         frame_interval_ms = ui_overlay.get("timer_interval_ms", 150)  # 調整為150ms，減少檢測頻率
         self._frame_interval = frame_interval_ms / 1000.0
+        # 引擎最後一次調用 overlay_is_open 的時間：引擎在輪詢時只有引擎截圖，
+        # 其他執行緒只讀 recent_result，連續幀計數器才不會被兩邊同時推進
+        self._last_poll_time = 0.0
+
+    @property
+    def frame_interval(self) -> float:
+        """引擎截圖的最小間隔（秒）"""
+        return self._frame_interval
+
+    def engine_polling(self, max_idle_s: Optional[float] = None) -> bool:
+        """引擎是否仍在輪詢（max_idle_s 內調用過 overlay_is_open；預設 4 個截圖間隔）"""
+        if max_idle_s is None:
+            max_idle_s = 4 * self._frame_interval
+        return time.monotonic() - self._last_poll_time <= max_idle_s
+
+    @property
+    def open_th(self) -> float:
+        return getattr(self.detector, "open_th", 0.0)
+
+    def process_frame(self, frame_bgr: np.ndarray) -> Dict:
+        """處理一幀並記錄結果（執行緒安全）"""
+        with self._lock:
+            result = self.detector.process_frame(frame_bgr)
+            self._last_decision = result.get("is_open", False)
+            self._last_result = result
+            self._last_frame_time = time.monotonic()
+        return result
+
+    def recent_result(self, max_age_s: float) -> Optional[Dict]:
+        """最近一次檢測結果（超過 max_age_s 秒則返回 None，讓呼叫端自行截圖）"""
+        with self._lock:
+            if self._last_result and time.monotonic() - self._last_frame_time <= max_age_s:
+                return self._last_result
+        return None
 
     def _clamp_roi(self, roi):
         """夾住ROI到螢幕邊界內"""
@@ -896,6 +933,7 @@ class OverlayDetectorWrapper:
             t0 = perf_counter()
 
             current_time = monotonic()
+            self._last_poll_time = current_time
 
             # 控制檢測頻率（避免過度頻繁）
             if current_time - self._last_frame_time < self._frame_interval:
@@ -936,11 +974,9 @@ class OverlayDetectorWrapper:
             else:
                 full_frame = cv2.cvtColor(full_arr, cv2.COLOR_RGB2BGR)
 
-            # 處理幀並更新狀態
-            result = self.detector.process_frame(full_frame)
-
+            # 處理幀並更新狀態（同時儲存決策供下次快取使用）
+            result = self.process_frame(full_frame)
             is_open = result.get("is_open", False)
-            self._last_decision = is_open  # 儲存決策供下次快取使用
 
             # 釋放記憶體
             del full_frame, full_arr, shot, arr
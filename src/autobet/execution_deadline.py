@@ -0,0 +1,119 @@
+# src/autobet/execution_deadline.py
+"""
+下注執行期限
+
+問題：下注前只檢查一次 BETTABLE，接著盲目執行數秒的點擊序列，
+下注窗口在中途關閉時只能事後才發現。
+
+設計：
+- ExecutionDeadline：下注窗口的關閉時間（單調時鐘）+ 安全邊際，
+  可選擇加上即時 overlay 檢查（窗口提早關閉時立即中止）
+- Actuator.execute_sequence 在每一步之前預估剩餘步驟所需時間，
+  放不下就呼叫 Actuator.cancel() 乾淨地撤回已放的籌碼
+- DeadlineStats：統計完成 / 中止 / 錯過期限（完成時已超過期限）次數
+
+使用範例:
+    >>> deadline = ExecutionDeadline.from_window(opened_at, GameStateManager.BETTABLE_DURATION)
+    >>> ok, executed = actuator.execute_sequence(seq, deadline=deadline)
+    >>> actuator.last_execution["deadline"]["aborted"]
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# 預設安全邊際：預估誤差 + confirm 生效所需時間
+DEFAULT_SAFETY_MARGIN_SEC = 0.5
+
+ABORT_DEADLINE = "deadline"  # 預估剩餘步驟放不下
+ABORT_WINDOW_CLOSED = "window_closed"  # overlay 顯示窗口已關閉
+
+
+@dataclass
+class ExecutionDeadline:
+    """下注窗口期限"""
+    at: float  # 窗口關閉時間（clock 的時間基準）
+    safety_margin: float = DEFAULT_SAFETY_MARGIN_SEC
+    clock: Callable[[], float] = time.monotonic
+    window_open: Optional[Callable[[], bool]] = None  # 即時窗口狀態（例如 overlay），None 表示不檢查
+
+    @classmethod
+    def from_window(
+        cls,
+        opened_at: float,
+        duration: float,
+        *,
+        safety_margin: float = DEFAULT_SAFETY_MARGIN_SEC,
+        clock: Callable[[], float] = time.monotonic,
+        window_open: Optional[Callable[[], bool]] = None,
+    ) -> "ExecutionDeadline":
+        """由窗口開啟時間與長度建立（opened_at 與 clock 同一時間基準）"""
+        return cls(opened_at + duration, safety_margin, clock, window_open)
+
+    def remaining(self) -> float:
+        """距離窗口關閉的秒數（可能為負）"""
+        return self.at - self.clock()
+
+    def fits(self, seconds: float) -> bool:
+        """預估需要 seconds 秒的動作是否能在安全邊際內完成"""
+        return seconds + self.safety_margin <= self.remaining()
+
+    def check(self, needed: float) -> Optional[str]:
+        """返回中止原因，可以繼續時返回 None"""
+        if self.window_open is not None:
+            try:
+                if not self.window_open():
+                    return ABORT_WINDOW_CLOSED
+            except Exception:
+                pass  # 窗口狀態讀取失敗時只依時間判斷
+        if not self.fits(needed):
+            return ABORT_DEADLINE
+        return None
+
+
+@dataclass
+class DeadlineStats:
+    """期限相關統計"""
+    orders: int = 0
+    completed: int = 0
+    aborted: int = 0  # 執行前或中途中止（已撤回）
+    missed: int = 0  # 完成時已超過期限
+    abort_reasons: Dict[str, int] = field(default_factory=dict)
+    slack_ms: List[float] = field(default_factory=list)  # 完成時距離期限的餘裕
+    max_samples: int = 500
+
+    def record(self, execution: Dict[str, Any]) -> None:
+        """記錄一次 Actuator.last_execution"""
+        info = execution.get("deadline")
+        if not info:
+            return
+        self.orders += 1
+        reason = info.get("aborted")
+        if reason:
+            self.aborted += 1
+            self.abort_reasons[reason] = self.abort_reasons.get(reason, 0) + 1
+            return
+        self.completed += 1
+        if info.get("missed"):
+            self.missed += 1
+        self.slack_ms.append(info.get("slack_ms", 0.0))
+        if len(self.slack_ms) > self.max_samples:
+            del self.slack_ms[: len(self.slack_ms) - self.max_samples]
+
+    @property
+    def miss_rate(self) -> float:
+        return self.missed / self.completed if self.completed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        slack = sorted(self.slack_ms)
+        return {
+            "orders": self.orders,
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "missed": self.missed,
+            "miss_rate": round(self.miss_rate, 4),
+            "abort_reasons": dict(self.abort_reasons),
+            "slack_ms_min": round(slack[0], 1) if slack else None,
+            "slack_ms_p50": round(slack[len(slack) // 2], 1) if slack else None,
+        }
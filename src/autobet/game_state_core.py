@@ -0,0 +1,453 @@
+# src/autobet/game_state_core.py
+"""
+遊戲狀態管理核心（不依賴 Qt）
+
+GameStateManager 的階段邏輯：round_id 生成、SETTLING → BETTABLE → LOCKED → IDLE
+階段轉換、參與追蹤。計時使用 PhaseScheduler（time.monotonic + heap），
+單一執行緒即可驅動數百張桌。
+
+Qt 介面見 game_state_manager.GameStateManager（薄 adapter，發送原有信號）。
+
+無頭使用範例:
+    >>> core = GameStateCore()
+    >>> core.add_listener(on_phase_changed=lambda tid, rid, phase, ts: print(tid, phase))
+    >>> core.scheduler.start()          # 背景執行緒驅動
+    >>> core.on_result_detected("table1", "B", time.time())
+"""
+
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from .phase_estimator import PhaseDurationEstimator, PhaseDurations
+from .phase_scheduler import PhaseScheduler
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[str, str, str, float], None]
+
+
+class GamePhase(str, Enum):
+    """遊戲階段"""
+    IDLE = "idle"              # 空閒（等待結果）
+    SETTLING = "settling"      # 結算中（結果剛出現）
+    BETTABLE = "bettable"      # 可下注期
+    LOCKED = "locked"          # 鎖定期（不可下注）
+    RESULTING = "resulting"    # 開獎中
+
+
+@dataclass
+class Round:
+    """局信息"""
+    round_id: str              # 局號
+    table_id: str              # 桌號
+    phase: GamePhase           # 當前階段
+    created_at: float          # 創建時間
+    result_winner: Optional[str] = None  # 結果（B/P/T）
+    result_detected_at: Optional[float] = None  # 結果檢測時間
+    has_pending_bet: bool = False  # 是否有待處理的下注
+    is_participated: bool = False  # 是否參與了這一局（用於排除歷史）
+    bettable_at: Optional[float] = None  # 進入 BETTABLE 的時間（排程器時鐘，預設 time.monotonic）
+    bettable_until: Optional[float] = None  # 預計的下注窗口關閉時間（同上）
+
+
+class GameStateCore:
+    """
+    遊戲狀態管理核心（不依賴 Qt）
+
+    統一管理局的生命週期和階段轉換，解決以下問題：
+    1. round_id 不一致（PhaseDetector 的 _next vs ResultDetector 的 detect-xxx）
+    2. 參與局沒有排除在歷史外
+    3. 階段轉換邏輯分散在多個地方
+
+    階段計時由 PhaseScheduler（單調時鐘 heap）負責，每桌只有一個待執行事件；
+    可由背景執行緒（scheduler.start()）、呼叫端 poll() 或 Qt adapter 驅動。
+    階段變化 / 結果確認透過 add_listener 註冊的回調通知。
+
+    各階段時長由 PhaseDurationEstimator 依每桌觀測（結果間隔、overlay 開 / 關）
+    線上估計，樣本不足時使用下列預設值；on_overlay_changed 收到 overlay 開啟時
+    直接進入 BETTABLE，不必等 SETTLING 計時結束。
+
+    時間配置（預設值，可調整）：
+    - SETTLING 期：2 秒（結果顯示、籌碼結算）
+    - BETTABLE 期：10 秒（可下注）
+    - LOCKED 期：5 秒（發牌、開獎）
+    """
+
+    # 時間配置（秒）
+    SETTLING_DURATION = 2.0    # 結算期（結果後）
+    BETTABLE_DURATION = 10.0   # 下注期
+    LOCKED_DURATION = 5.0      # 鎖定期
+
+    def __init__(
+        self,
+        scheduler: Optional[PhaseScheduler] = None,
+        estimator: Optional[PhaseDurationEstimator] = None,
+    ):
+        # 階段排程器（key = table_id，tag = 目前計時中的階段）
+        self.scheduler = scheduler if scheduler is not None else PhaseScheduler()
+        # 每桌階段時長估計（時間基準為 scheduler.clock）
+        self.estimator = estimator if estimator is not None else PhaseDurationEstimator()
+        self._lock = threading.RLock()
+
+        # 回調：階段變化 (table_id, round_id, phase, timestamp) / 結果確認 (table_id, round_id, winner, timestamp)
+        self._phase_listeners: List[EventCallback] = []
+        self._result_listeners: List[EventCallback] = []
+
+        # 當前活躍的局（每個桌一個）
+        self.current_rounds: Dict[str, Round] = {}
+
+        # 歷史記錄（最近的局）
+        self.round_history: Dict[str, list] = {}  # {table_id: [Round, ...]}
+
+        logger.info("✅ GameStateManager 初始化完成")
+
+    def add_listener(
+        self,
+        on_phase_changed: Optional[EventCallback] = None,
+        on_result_confirmed: Optional[EventCallback] = None,
+    ) -> None:
+        """註冊階段變化 / 結果確認回調"""
+        if on_phase_changed:
+            self._phase_listeners.append(on_phase_changed)
+        if on_result_confirmed:
+            self._result_listeners.append(on_result_confirmed)
+
+    def poll(self, now: Optional[float] = None) -> int:
+        """執行已到期的階段轉換（未使用背景執行緒時由呼叫端定期調用）"""
+        return self.scheduler.run_due(now)
+
+    def _run_locked(self, handler: Callable[[str], None], table_id: str) -> None:
+        with self._lock:
+            handler(table_id)
+
+    def _emit_phase_changed(self, table_id: str, round_id: str, phase: str, timestamp: float) -> None:
+        for callback in self._phase_listeners:
+            callback(table_id, round_id, phase, timestamp)
+
+    def _emit_result_confirmed(self, table_id: str, round_id: str, winner: str, timestamp: float) -> None:
+        for callback in self._result_listeners:
+            callback(table_id, round_id, winner, timestamp)
+
+    def on_result_detected(self, table_id: str, winner: str, detected_at: float) -> str:
+        """
+        當檢測到結果時調用
+
+        Args:
+            table_id: 桌號
+            winner: 贏家（B/P/T）
+            detected_at: 檢測時間
+
+        Returns:
+            round_id: 這一局的 ID
+        """
+        with self._lock:
+            return self._start_round(table_id, winner, detected_at)
+
+    def on_overlay_changed(self, table_id: str, is_open: bool) -> None:
+        """
+        overlay（下注窗口）開 / 關時調用
+
+        - 記錄到時長估計器
+        - SETTLING 中收到開啟：立即進入 BETTABLE
+        - BETTABLE 中收到關閉：立即進入 LOCKED
+        """
+        with self._lock:
+            self.estimator.observe_overlay(table_id, is_open, self.scheduler.clock())
+            current = self.current_rounds.get(table_id)
+            if not current:
+                return
+            if is_open and current.phase == GamePhase.SETTLING:
+                self._on_settling_complete(table_id)
+            elif not is_open and current.phase == GamePhase.BETTABLE:
+                self._on_bettable_complete(table_id)
+
+    def phase_durations(self, table_id: str) -> PhaseDurations:
+        """該桌目前使用的階段時長（bettable 為從現在起算的剩餘秒數）"""
+        defaults = PhaseDurations(self.SETTLING_DURATION, self.BETTABLE_DURATION, self.LOCKED_DURATION)
+        return self.estimator.durations(table_id, defaults, self.scheduler.clock())
+
+    def _start_round(self, table_id: str, winner: str, detected_at: float) -> str:
+        # 停止該桌的計時
+        self._stop_table_timers(table_id)
+        self.estimator.observe_result(table_id, self.scheduler.clock())
+
+        # 生成新的 round_id
+        round_id = f"round-{table_id}-{int(detected_at * 1000)}"
+
+        # 創建新的局
+        new_round = Round(
+            round_id=round_id,
+            table_id=table_id,
+            phase=GamePhase.SETTLING,
+            created_at=detected_at,
+            result_winner=winner,
+            result_detected_at=detected_at
+        )
+
+        # 保存到當前局
+        old_round = self.current_rounds.get(table_id)
+        self.current_rounds[table_id] = new_round
+
+        # 如果有舊局，檢查是否有未結算的倉位
+        if old_round and old_round.has_pending_bet:
+            logger.warning(
+                f"⚠️ 檢測到新結果，但上一局 {old_round.round_id} 還有未結算的倉位！"
+                f"這可能是檢測器漏檢了一局。"
+            )
+
+        # 添加到歷史
+        if table_id not in self.round_history:
+            self.round_history[table_id] = []
+        self.round_history[table_id].append(new_round)
+
+        # 只保留最近 100 局
+        if len(self.round_history[table_id]) > 100:
+            self.round_history[table_id] = self.round_history[table_id][-100:]
+
+        logger.info(f"🎲 新局創建: {round_id} | 結果: {winner} | 階段: SETTLING")
+
+        # 發送結果確認
+        self._emit_result_confirmed(table_id, round_id, winner, detected_at)
+
+        # 啟動 SETTLING 計時器
+        self._start_settling_timer(table_id)
+
+        return round_id
+
+    def _start_settling_timer(self, table_id: str):
+        """啟動 SETTLING 計時"""
+        duration = self.phase_durations(table_id).settling
+        logger.debug(f"GameStateManager: 啟動 SETTLING 計時器 ({duration:.2f}秒) - {table_id}")
+        self.scheduler.schedule(
+            table_id, duration, lambda: self._run_locked(self._on_settling_complete, table_id), tag=GamePhase.SETTLING.value
+        )
+
+    def _on_settling_complete(self, table_id: str):
+        """SETTLING 階段完成，進入 BETTABLE 階段"""
+        current = self.current_rounds.get(table_id)
+        if not current:
+            logger.warning(f"GameStateManager: SETTLING 完成但桌 {table_id} 沒有當前局")
+            return
+
+        if current.phase != GamePhase.SETTLING:
+            logger.warning(
+                f"GameStateManager: SETTLING 完成但當前階段是 {current.phase}，不是 SETTLING"
+            )
+            return
+
+        # 更新階段
+        duration = self.phase_durations(table_id).bettable
+        current.phase = GamePhase.BETTABLE
+        current.bettable_at = self.scheduler.clock()
+        current.bettable_until = current.bettable_at + duration
+        timestamp = time.time()
+
+        logger.info(f"📢 局 {current.round_id} 進入 BETTABLE 階段 ({duration:.2f}秒)")
+
+        # 發送階段變化
+        self._emit_phase_changed(table_id, current.round_id, GamePhase.BETTABLE.value, timestamp)
+
+        # 啟動 BETTABLE 計時器
+        self._start_bettable_timer(table_id, duration)
+
+    def _start_bettable_timer(self, table_id: str, duration: float):
+        """啟動 BETTABLE 計時"""
+        self.scheduler.schedule(
+            table_id, duration, lambda: self._run_locked(self._on_bettable_complete, table_id), tag=GamePhase.BETTABLE.value
+        )
+
+    def _on_bettable_complete(self, table_id: str):
+        """BETTABLE 階段完成，進入 LOCKED 階段"""
+        current = self.current_rounds.get(table_id)
+        if not current:
+            logger.warning(f"GameStateManager: BETTABLE 完成但桌 {table_id} 沒有當前局")
+            return
+
+        if current.phase != GamePhase.BETTABLE:
+            logger.warning(
+                f"GameStateManager: BETTABLE 完成但當前階段是 {current.phase}，不是 BETTABLE"
+            )
+            return
+
+        # 更新階段
+        current.phase = GamePhase.LOCKED
+        timestamp = time.time()
+
+        logger.info(f"🔒 局 {current.round_id} 進入 LOCKED 階段")
+
+        # 發送階段變化
+        self._emit_phase_changed(table_id, current.round_id, GamePhase.LOCKED.value, timestamp)
+
+        # 啟動 LOCKED 計時器
+        self._start_locked_timer(table_id)
+
+    def _start_locked_timer(self, table_id: str):
+        """啟動 LOCKED 計時"""
+        self.scheduler.schedule(
+            table_id, self.phase_durations(table_id).locked, lambda: self._run_locked(self._on_locked_complete, table_id), tag=GamePhase.LOCKED.value
+        )
+
+    def _on_locked_complete(self, table_id: str):
+        """LOCKED 階段完成，進入 IDLE（等待下次結果）"""
+        current = self.current_rounds.get(table_id)
+        if not current:
+            logger.debug(f"GameStateManager: LOCKED 完成但桌 {table_id} 沒有當前局")
+            return
+
+        # 更新階段
+        current.phase = GamePhase.IDLE
+        logger.debug(f"GameStateManager: 局 {current.round_id} 進入 IDLE（等待下次結果）")
+        # 不發送 IDLE 信號，等待下次結果觸發
+
+    def mark_bet_placed(self, table_id: str, round_id: str):
+        """
+        標記某局已下注
+
+        Args:
+            table_id: 桌號
+            round_id: 局號
+        """
+        current = self.current_rounds.get(table_id)
+        if not current or current.round_id != round_id:
+            logger.warning(
+                f"⚠️ 無法標記下注：局 {round_id} 不是當前局（當前局: {current.round_id if current else 'None'}）"
+            )
+            return
+
+        current.has_pending_bet = True
+        current.is_participated = True
+
+        logger.info(f"💰 局 {round_id} 已標記為參與局（有下注）")
+
+    def mark_bet_settled(self, table_id: str, round_id: str):
+        """
+        標記某局的下注已結算
+
+        Args:
+            table_id: 桌號
+            round_id: 局號
+        """
+        # 在歷史中查找（因為結算時可能已經是下一局了）
+        if table_id not in self.round_history:
+            logger.warning(f"⚠️ 無法標記結算：桌 {table_id} 沒有歷史記錄")
+            return
+
+        for round_obj in reversed(self.round_history[table_id]):
+            if round_obj.round_id == round_id:
+                round_obj.has_pending_bet = False
+                logger.info(f"✅ 局 {round_id} 的下注已結算")
+                return
+
+        logger.warning(f"⚠️ 無法標記結算：找不到局 {round_id}")
+
+    def should_include_in_history(self, table_id: str, round_id: str) -> bool:
+        """
+        判斷某局是否應該計入策略歷史
+
+        規則：參與的局（is_participated=True）不計入歷史
+
+        Args:
+            table_id: 桌號
+            round_id: 局號
+
+        Returns:
+            是否應該計入歷史
+        """
+        # 檢查當前局
+        current = self.current_rounds.get(table_id)
+        if current and current.round_id == round_id:
+            return not current.is_participated
+
+        # 檢查歷史
+        if table_id in self.round_history:
+            for round_obj in reversed(self.round_history[table_id]):
+                if round_obj.round_id == round_id:
+                    return not round_obj.is_participated
+
+        # 找不到，默認計入歷史
+        return True
+
+    def bettable_deadline(self, table_id: str) -> Optional[float]:
+        """
+        當前下注窗口的關閉時間（排程器時鐘基準，預設 time.monotonic）
+
+        Returns:
+            不在 BETTABLE 階段時返回 None
+        """
+        current = self.current_rounds.get(table_id)
+        if not current or current.phase != GamePhase.BETTABLE or current.bettable_until is None:
+            return None
+        return current.bettable_until
+
+    def get_current_round(self, table_id: str) -> Optional[Round]:
+        """獲取當前局"""
+        return self.current_rounds.get(table_id)
+
+    def get_round(self, table_id: str, round_id: str) -> Optional[Round]:
+        """獲取指定局"""
+        # 先檢查當前局
+        current = self.current_rounds.get(table_id)
+        if current and current.round_id == round_id:
+            return current
+
+        # 再檢查歷史
+        if table_id in self.round_history:
+            for round_obj in reversed(self.round_history[table_id]):
+                if round_obj.round_id == round_id:
+                    return round_obj
+
+        return None
+
+    def get_status(self, table_id: str = None) -> Dict:
+        """
+        獲取狀態信息（用於調試）
+
+        Args:
+            table_id: 桌號，如果為 None 則返回所有桌的狀態
+        """
+        if table_id is None:
+            # 返回所有桌的狀態
+            return {
+                tid: self.get_status(tid)
+                for tid in self.current_rounds.keys()
+            }
+
+        current = self.current_rounds.get(table_id)
+        if not current:
+            return {"status": "no_current_round"}
+
+        pending = self.scheduler.pending(table_id)
+
+        return {
+            "round_id": current.round_id,
+            "phase": current.phase.value,
+            "result_winner": current.result_winner,
+            "has_pending_bet": current.has_pending_bet,
+            "is_participated": current.is_participated,
+            "created_at": current.created_at,
+            "timers": {
+                "settling_active": pending == GamePhase.SETTLING.value,
+                "bettable_active": pending == GamePhase.BETTABLE.value,
+                "locked_active": pending == GamePhase.LOCKED.value,
+            },
+            "phase_estimates": self.estimator.get_stats(table_id),
+        }
+
+    def _stop_table_timers(self, table_id: str):
+        """停止指定桌的計時"""
+        self.scheduler.cancel(table_id)
+
+    def _stop_all_timers(self):
+        """停止所有計時"""
+        self.scheduler.cancel_all()
+
+    def stop(self):
+        """停止管理器"""
+        logger.info("🛑 GameStateManager 停止")
+        self._stop_all_timers()
+        self.current_rounds.clear()
+        self.round_history.clear()
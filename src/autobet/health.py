@@ -76,6 +76,12 @@ class HealthChecker:
     檢查所有關鍵組件的健康狀態
     """
 
+    # 迴圈時序門檻（_check_performance）
+    LOOP_OVERRUN_DEGRADED = 0.05   # 超過 5% 的輪次超出預算 → DEGRADED
+    LOOP_OVERRUN_UNHEALTHY = 0.25  # 超過 25% → UNHEALTHY
+    LOOP_MIN_HZ_RATIO = 0.8        # 實際頻率低於目標 80% → DEGRADED
+    LOOP_MIN_ITERATIONS = 10       # 輪數太少時不評估
+
     def __init__(self, project_root: Optional[Path] = None):
         """
         初始化健康檢查器
@@ -337,15 +343,43 @@ class HealthChecker:
         ))
 
     def _check_performance(self) -> None:
-        """檢查性能指標（需要運行中的系統）"""
+        """檢查固定頻率迴圈的時序（overrun 比例、實際頻率、jitter）"""
+        from .loop_timing import loop_stats
+
         start_time = time.time()
 
-        # 這個檢查需要系統正在運行，暫時標記為 UNKNOWN
-        status = HealthStatus.UNKNOWN
-        message = "性能檢查需要運行中的系統"
-        details = {
-            "note": "使用 orchestrator.performance.get_summary() 獲取性能數據"
-        }
+        loops = loop_stats()
+        details: Dict[str, Any] = {"loops": loops}
+        problems: List[str] = []
+        status = HealthStatus.HEALTHY
+        evaluated = 0
+
+        for name, stats in loops.items():
+            if not stats["active"] or stats["iterations"] < self.LOOP_MIN_ITERATIONS:
+                continue
+            evaluated += 1
+
+            if stats["overrun_rate"] >= self.LOOP_OVERRUN_UNHEALTHY:
+                status = HealthStatus.UNHEALTHY
+                problems.append(f"{name} 超時比例 {stats['overrun_rate']:.0%}")
+            elif stats["overrun_rate"] >= self.LOOP_OVERRUN_DEGRADED:
+                if status == HealthStatus.HEALTHY:
+                    status = HealthStatus.DEGRADED
+                problems.append(f"{name} 超時比例 {stats['overrun_rate']:.0%}")
+
+            if stats["effective_hz"] < stats["target_hz"] * self.LOOP_MIN_HZ_RATIO:
+                if status == HealthStatus.HEALTHY:
+                    status = HealthStatus.DEGRADED
+                problems.append(f"{name} 頻率 {stats['effective_hz']:.1f}/{stats['target_hz']:.1f} Hz")
+
+        if not evaluated:
+            # 沒有運行中的迴圈（系統未啟動）
+            status = HealthStatus.UNKNOWN
+            message = "沒有運行中的檢測迴圈"
+        elif problems:
+            message = "迴圈時序異常: " + "; ".join(problems)
+        else:
+            message = f"{evaluated} 個迴圈時序正常"
 
         duration_ms = (time.time() - start_time) * 1000.0
 
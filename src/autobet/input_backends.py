@@ -0,0 +1,234 @@
+# src/autobet/input_backends.py
+"""
+滑鼠輸入後端
+
+Actuator 不直接呼叫 pyautogui，而是透過 InputBackend：
+- pyautogui: 預設，跨平台（移動有動畫）
+- xdotool:   Linux X11，常駐 xdotool 行程從 stdin 讀指令，省去每次 fork 的延遲
+- recording: 不移動滑鼠也不 sleep，只以虛擬時鐘記錄每個動作（測試 / 效能量測用）
+
+選擇方式（優先順序）：
+1. Actuator(backend=...) 直接傳入
+2. 環境變數 AUTOBET_INPUT_BACKEND
+3. ui_config.json 的 input.backend
+4. 乾跑模式（dry_run）為 recording，否則 pyautogui
+   （乾跑仍要看到滑鼠移動時，明確設定 input.backend = "pyautogui"）
+
+使用範例:
+    >>> backend = RecordingBackend()
+    >>> act = Actuator(chip_profile=profile, ui_cfg=ui, backend=backend)
+    >>> act.execute_sequence(seq)
+    >>> backend.elapsed(), [a.kind for a in backend.actions]
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_PYAUTOGUI = "pyautogui"
+BACKEND_XDOTOOL = "xdotool"
+BACKEND_RECORDING = "recording"
+
+
+class InputBackend:
+    """輸入後端介面"""
+
+    name = "base"
+
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        raise NotImplementedError
+
+    def click(self) -> None:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def now(self) -> float:
+        """單調時鐘（秒），用於量測執行時間"""
+        return time.perf_counter()
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    """pyautogui 後端（延遲載入，避免無顯示環境在 import 時失敗）"""
+
+    name = BACKEND_PYAUTOGUI
+
+    def __init__(self, failsafe: bool = True):
+        import pyautogui
+
+        self._gui = pyautogui
+        pyautogui.FAILSAFE = failsafe
+
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._gui.moveTo(x, y, duration=duration)
+
+    def click(self) -> None:
+        self._gui.click()
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        try:
+            pos = self._gui.position()
+            return int(pos[0]), int(pos[1])
+        except Exception:
+            return None
+
+
+class XdotoolBackend(InputBackend):
+    """
+    xdotool 後端（Linux X11）
+
+    啟動一個常駐的 `xdotool -` 行程，指令逐行寫入其 stdin，
+    移動是瞬間完成的；duration 以 sleep 補足，保持與其他後端相同的時序語意。
+    """
+
+    name = BACKEND_XDOTOOL
+
+    def __init__(self, executable: Optional[str] = None):
+        path = executable or shutil.which("xdotool")
+        if not path:
+            raise RuntimeError("找不到 xdotool，請安裝 xdotool 或改用其他輸入後端")
+        self._proc = subprocess.Popen(
+            [path, "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._lock = threading.Lock()
+        self._pos: Optional[Tuple[int, int]] = None
+
+    def _send(self, command: str) -> None:
+        with self._lock:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"xdotool 行程已結束 (code={self._proc.returncode})")
+            self._proc.stdin.write(command + "\n")
+            self._proc.stdin.flush()
+
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._send(f"mousemove {int(x)} {int(y)}")
+        self._pos = (int(x), int(y))
+        self.sleep(duration)
+
+    def click(self) -> None:
+        self._send("click 1")
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        return self._pos
+
+    def close(self) -> None:
+        try:
+            if self._proc.poll() is None:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=1.0)
+        except Exception:
+            self._proc.kill()
+
+
+@dataclass
+class InputAction:
+    """記錄的輸入動作"""
+    ts: float  # 虛擬時鐘（秒，從 0 起算）
+    kind: str  # move / click / sleep
+    x: int = 0
+    y: int = 0
+    duration: float = 0.0
+
+
+class RecordingBackend(InputBackend):
+    """
+    記錄後端：不碰滑鼠、不 sleep
+
+    每個動作以虛擬時鐘打上時間戳，移動 / sleep 只推進虛擬時鐘，
+    因此 Actuator 的預估 / 實際時間在無頭環境下也能全速量測。
+    """
+
+    name = BACKEND_RECORDING
+
+    def __init__(self, max_actions: int = 100_000):
+        self.actions: List[InputAction] = []
+        self.max_actions = max_actions
+        self._clock = 0.0
+        self._pos: Optional[Tuple[int, int]] = None
+
+    def _record(self, kind: str, x: int = 0, y: int = 0, duration: float = 0.0) -> None:
+        if len(self.actions) < self.max_actions:
+            self.actions.append(InputAction(self._clock, kind, x, y, duration))
+
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._record("move", int(x), int(y), duration)
+        self._clock += max(0.0, duration)
+        self._pos = (int(x), int(y))
+
+    def click(self) -> None:
+        x, y = self._pos or (0, 0)
+        self._record("click", x, y)
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._record("sleep", duration=seconds)
+            self._clock += seconds
+
+    def now(self) -> float:
+        return self._clock
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        return self._pos
+
+    def elapsed(self) -> float:
+        """虛擬時鐘累計秒數"""
+        return self._clock
+
+    def clicks(self) -> List[Tuple[int, int]]:
+        return [(a.x, a.y) for a in self.actions if a.kind == "click"]
+
+    def reset(self) -> None:
+        self.actions.clear()
+        self._clock = 0.0
+
+
+_BACKENDS = {
+    BACKEND_PYAUTOGUI: PyAutoGUIBackend,
+    BACKEND_XDOTOOL: XdotoolBackend,
+    BACKEND_RECORDING: RecordingBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, ui_cfg: Optional[Dict] = None, dry_run: bool = False) -> InputBackend:
+    """
+    依名稱建立輸入後端（見模組說明的選擇順序；沒有指定時乾跑用 recording）
+
+    指定的後端無法使用時（例如沒有 xdotool）退回 pyautogui。
+    """
+    name = (
+        name
+        or os.getenv("AUTOBET_INPUT_BACKEND")
+        or (ui_cfg or {}).get("input", {}).get("backend")
+        or (BACKEND_RECORDING if dry_run else BACKEND_PYAUTOGUI)
+    ).lower()
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"未知的輸入後端: {name} (可用: {', '.join(_BACKENDS)})")
+    try:
+        return factory()
+    except Exception as exc:
+        if factory is PyAutoGUIBackend:
+            raise
+        logger.warning(f"輸入後端 {name} 無法使用 ({exc})，改用 pyautogui")
+        return PyAutoGUIBackend()
@@ -1,14 +1,112 @@
 # src/autobet/io_events.py
 import json, time, threading, random, logging
-from typing import Callable, Optional, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .lines.performance import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
+# NDJSON 回放模式
+REPLAY_INTERVAL = "interval"  # 每行之間固定間隔（原有行為）
+REPLAY_REALTIME = "realtime"  # 依記錄的 received_at / ts 重現時間間隔（可加速）
+REPLAY_MAX = "max"            # 不等待、批次解析，用於壓測決策路徑
+REPLAY_MODES = (REPLAY_INTERVAL, REPLAY_REALTIME, REPLAY_MAX)
+
+
+def event_time(evt: Dict[str, Any]) -> Optional[float]:
+    """取事件記錄時間（秒）：received_at 優先，其次 ts；毫秒自動換算"""
+    for key in ("received_at", "ts"):
+        value = evt.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value / 1000.0 if value > 1e11 else float(value)
+    return None
+
+
+def parse_ndjson_batch(lines: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """一次解析多行 NDJSON；整批失敗時退回逐行解析（壞行為 None）"""
+    try:
+        return json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        pass
+    parsed: List[Optional[Dict[str, Any]]] = []
+    for line in lines:
+        try:
+            parsed.append(json.loads(line))
+        except ValueError as e:
+            logger.warning(f"NDJSON bad line: {line[:120]}... ({e})")
+            parsed.append(None)
+    return parsed
+
+
+class ReplayStats:
+    """回放統計：吞吐量與 callback（下游決策路徑）延遲
+
+    延遲記在對數分桶直方圖中，長時間回放的記憶體用量固定。
+    """
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.errors = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._latencies_ns = LatencyHistogram()
+        self._max_latency_ns = 0
+
+    def record(self, latency_ns: int) -> None:
+        self.events += 1
+        self._latencies_ns.add(latency_ns)
+        if latency_ns > self._max_latency_ns:
+            self._max_latency_ns = latency_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.perf_counter()
+        elapsed = end - self.started_at if self.started_at is not None else 0.0
+
+        def pct(q: float) -> float:
+            return (self._latencies_ns.quantile(q) or 0.0) / 1e6
+
+        return {
+            "events": self.events,
+            "errors": self.errors,
+            "elapsed_sec": round(elapsed, 4),
+            "events_per_sec": round(self.events / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms_p50": round(pct(0.50), 4),
+            "latency_ms_p99": round(pct(0.99), 4),
+            "latency_ms_max": round(self._max_latency_ns / 1e6, 4),
+        }
+
+
 class NDJSONPlayer:
-    def __init__(self, path: str, callback: Callable[[Dict], None], interval_sec: float = 1.2):
+    """
+    NDJSON 事件回放
+
+    模式:
+        interval: 每行之間等待 interval_sec（預設，與舊行為相同）
+        realtime: 依事件的 received_at / ts 重現原始間隔，speed=2.0 表示兩倍速
+        max: 不等待，每 batch_size 行批次解析；結束時記錄 events/sec 與 callback 延遲
+    """
+
+    def __init__(
+        self,
+        path: str,
+        callback: Callable[[Dict], None],
+        interval_sec: float = 1.2,
+        *,
+        mode: str = REPLAY_INTERVAL,
+        speed: float = 1.0,
+        batch_size: int = 512,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode: {mode} (expected one of {REPLAY_MODES})")
         self.path = path
         self.callback = callback
         self.interval = interval_sec
+        self.mode = mode
+        self.speed = max(1e-3, float(speed))
+        self.batch_size = max(1, int(batch_size))
+        self.on_complete = on_complete
+        self.replay_stats = ReplayStats()
         self._t: Optional[threading.Thread] = None
         self._stop = threading.Event()
         self._running = False
@@ -16,25 +114,97 @@ class NDJSONPlayer:
     def start(self):
         if self._running: return
         self._stop.clear()
+        self._running = True
         self._t = threading.Thread(target=self._run, daemon=True)
         self._t.start()
-        self._running = True
 
     def _run(self):
+        stats = self.replay_stats = ReplayStats()
+        stats.started_at = time.perf_counter()
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if self._stop.is_set(): break
-                    line = line.strip()
-                    if not line: continue
-                    try:
-                        evt = json.loads(line)
-                        self.callback(evt)
-                    except Exception as e:
-                        logger.warning(f"NDJSON bad line: {line[:120]}... ({e})")
-                    time.sleep(self.interval)
+            if self.mode == REPLAY_MAX:
+                self._run_max(stats)
+            else:
+                self._run_paced(stats)
+        except Exception as e:
+            logger.exception(f"NDJSONPlayer error: {e}")
         finally:
+            stats.finished_at = time.perf_counter()
             self._running = False
+            if self.mode == REPLAY_MAX:
+                logger.info(f"NDJSON max-speed replay: {stats.to_dict()}")
+            if self.on_complete:
+                try:
+                    self.on_complete(stats.to_dict())
+                except Exception:
+                    logger.exception("NDJSONPlayer on_complete callback failed")
+
+    def _iter_lines(self) -> Iterator[str]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    def _dispatch(self, evt: Dict, stats: ReplayStats) -> None:
+        started = time.perf_counter_ns()
+        try:
+            self.callback(evt)
+        except Exception as e:
+            stats.errors += 1
+            logger.exception(f"NDJSON callback error: {e}")
+        stats.record(time.perf_counter_ns() - started)
+
+    def _run_paced(self, stats: ReplayStats) -> None:
+        # realtime: 以第一筆事件時間為基準，對齊到牆上時鐘（不累積誤差）
+        origin_event: Optional[float] = None
+        origin_clock = 0.0
+        for line in self._iter_lines():
+            if self._stop.is_set(): break
+            try:
+                evt = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"NDJSON bad line: {line[:120]}... ({e})")
+                continue
+
+            if self.mode == REPLAY_REALTIME:
+                ts = event_time(evt) if isinstance(evt, dict) else None
+                if ts is not None:
+                    if origin_event is None:
+                        origin_event, origin_clock = ts, time.monotonic()
+                    delay = origin_clock + (ts - origin_event) / self.speed - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+
+            self._dispatch(evt, stats)
+
+            if self.mode == REPLAY_INTERVAL and self._stop.wait(self.interval):
+                break
+
+    def _run_max(self, stats: ReplayStats) -> None:
+        batch: List[str] = []
+        for line in self._iter_lines():
+            batch.append(line)
+            if len(batch) >= self.batch_size:
+                if not self._dispatch_batch(batch, stats):
+                    return
+                batch = []
+        if batch:
+            self._dispatch_batch(batch, stats)
+
+    def _dispatch_batch(self, lines: List[str], stats: ReplayStats) -> bool:
+        for evt in parse_ndjson_batch(lines):
+            if self._stop.is_set():
+                return False
+            if evt is None:
+                stats.errors += 1
+                continue
+            self._dispatch(evt, stats)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """回放統計（events/sec、callback 延遲 p50/p99/max）"""
+        return self.replay_stats.to_dict()
 
     def is_running(self) -> bool:
         return self._running
@@ -0,0 +1,297 @@
+# src/autobet/lines/capital.py
+"""
+跨桌資金分配模組
+
+ConflictResolver 只在同一手（table_id, round_id）內解決衝突，
+不限制多桌同時持有的總曝險。CapitalAllocator 在每個決策窗口
+（一次 BETTABLE 產生的所有候選，可跨桌）內：
+
+1. 先扣除尚未結算的預留資金（其他桌 / 其他局）
+2. 以「每手的候選子集」為選項，做多選一背包（multiple-choice knapsack）：
+   - 容量：bankroll − 已預留
+   - 每手總額 ≤ per_hand_cap
+   - 價值：ConflictResolver 算出的 priority_score（EV 權重為主）
+3. 選中者預留資金，局結算時釋放（LineOrchestrator 產生 CAPITAL_RESERVED / CAPITAL_RELEASED 事件）
+
+金額以最大公因數為單位，DP 表過大時退回依價值密度的貪婪選擇。
+bankroll / per_hand_cap 為 None 時不設限（仍追蹤預留）。
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from functools import reduce
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from .conflict import ConflictReason, PendingDecision
+
+# DP 表上限（手數 × 容量單位），超過時改用貪婪
+MAX_DP_CELLS = 2_000_000
+# 每手最多列舉的候選數（子集數為 2^n）
+MAX_HAND_CANDIDATES = 6
+
+HandKey = Tuple[str, str]
+ReservationKey = Tuple[str, str, str]  # (table_id, round_id, strategy_key)
+
+
+@dataclass
+class CapitalReservation:
+    """資金預留"""
+    table_id: str
+    round_id: str
+    strategy_key: str
+    amount: float
+    direction: str
+
+
+@dataclass
+class CapitalAllocation:
+    """分配結果"""
+    approved: List[PendingDecision] = field(default_factory=list)
+    rejected: List[Tuple[PendingDecision, ConflictReason, str]] = field(default_factory=list)
+    reservations: List[CapitalReservation] = field(default_factory=list)
+    method: str = "unbounded"  # unbounded / all_fit / knapsack / greedy
+
+
+class CapitalAllocator:
+    """跨桌資金分配器"""
+
+    def __init__(
+        self,
+        *,
+        bankroll: Optional[float] = None,
+        per_hand_cap: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            bankroll: 同時可預留的總資金上限（None 不限）
+            per_hand_cap: 單手（同桌同局）總下注上限（None 不限）
+        """
+        self.bankroll = bankroll
+        self.per_hand_cap = per_hand_cap
+        self.reservations: Dict[ReservationKey, CapitalReservation] = {}
+        self._reserved_total = 0.0
+
+    @property
+    def reserved(self) -> float:
+        return self._reserved_total
+
+    @property
+    def available(self) -> Optional[float]:
+        if self.bankroll is None:
+            return None
+        return max(0.0, self.bankroll - self._reserved_total)
+
+    # ------------------------------------------------------------------
+    def allocate(self, candidates: List[PendingDecision], *, reserve: bool = True) -> CapitalAllocation:
+        """
+        選擇要下注的候選並預留資金
+
+        Args:
+            candidates: 已通過衝突解決的候選（可跨桌）
+            reserve: 是否為核准者預留資金
+
+        Returns:
+            CapitalAllocation（拒絕原因為 ConflictReason.RESOURCE_LIMIT）
+        """
+        allocation = CapitalAllocation()
+        if not candidates:
+            return allocation
+
+        hands: Dict[HandKey, List[PendingDecision]] = {}
+        for decision in candidates:
+            hands.setdefault((decision.table_id, decision.round_id), []).append(decision)
+
+        # 單手上限：超過上限的候選直接排除；候選過多時只列舉價值最高的幾個
+        options_by_hand: Dict[HandKey, List[PendingDecision]] = {}
+        for hand, group in hands.items():
+            eligible = []
+            for decision in group:
+                if self.per_hand_cap is not None and decision.amount > self.per_hand_cap:
+                    allocation.rejected.append(self._reject(decision, f"exceeds per-hand cap {self.per_hand_cap:g}"))
+                else:
+                    eligible.append(decision)
+            if len(eligible) > MAX_HAND_CANDIDATES:
+                eligible.sort(key=self._value, reverse=True)
+                for decision in eligible[MAX_HAND_CANDIDATES:]:
+                    allocation.rejected.append(self._reject(decision, "too many candidates for one hand"))
+                eligible = eligible[:MAX_HAND_CANDIDATES]
+            if eligible:
+                options_by_hand[hand] = eligible
+
+        selected = self._select(options_by_hand, allocation)
+        chosen = {id(decision) for decision in selected}
+        for group in options_by_hand.values():
+            for decision in group:
+                if id(decision) not in chosen:
+                    allocation.rejected.append(self._reject(decision, self._budget_message()))
+
+        # 保持輸入順序
+        allocation.approved = [decision for decision in candidates if id(decision) in chosen]
+        if reserve:
+            allocation.reservations = [self.reserve(decision) for decision in allocation.approved]
+        return allocation
+
+    def reserve(self, decision: PendingDecision) -> CapitalReservation:
+        key = (decision.table_id, decision.round_id, decision.strategy_key)
+        previous = self.reservations.get(key)
+        if previous is not None:
+            self._reserved_total -= previous.amount
+        reservation = CapitalReservation(
+            table_id=decision.table_id,
+            round_id=decision.round_id,
+            strategy_key=decision.strategy_key,
+            amount=float(decision.amount),
+            direction=decision.direction.value,
+        )
+        self.reservations[key] = reservation
+        self._reserved_total += reservation.amount
+        return reservation
+
+    def release(self, table_id: str, round_id: str, strategy_key: str) -> Optional[CapitalReservation]:
+        reservation = self.reservations.pop((table_id, round_id, strategy_key), None)
+        if reservation is not None:
+            self._reserved_total = max(0.0, self._reserved_total - reservation.amount)
+        return reservation
+
+    def release_round(self, table_id: str, round_id: str) -> List[CapitalReservation]:
+        """釋放某一手的所有預留（結算時）"""
+        keys = [key for key in self.reservations if key[0] == table_id and key[1] == round_id]
+        return [self.release(*key) for key in keys]
+
+    def release_table(self, table_id: str) -> List[CapitalReservation]:
+        """釋放某桌所有預留（例如漏檢結果時，舊局的預留不會再被結算）"""
+        keys = [key for key in self.reservations if key[0] == table_id]
+        return [self.release(*key) for key in keys]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            "bankroll": self.bankroll,
+            "per_hand_cap": self.per_hand_cap,
+            "reserved": round(self._reserved_total, 2),
+            "available": None if self.available is None else round(self.available, 2),
+            "reservations": len(self.reservations),
+        }
+
+    # ------------------------------------------------------------------
+    def _select(
+        self,
+        options_by_hand: Dict[HandKey, List[PendingDecision]],
+        allocation: CapitalAllocation,
+    ) -> List[PendingDecision]:
+        everything = [decision for group in options_by_hand.values() for decision in group]
+        capacity = self.available
+
+        hands_fit = self.per_hand_cap is None or all(
+            sum(d.amount for d in group) <= self.per_hand_cap for group in options_by_hand.values()
+        )
+        if capacity is None and self.per_hand_cap is None:
+            allocation.method = "unbounded"
+            return everything
+        if hands_fit and (capacity is None or sum(d.amount for d in everything) <= capacity):
+            allocation.method = "all_fit"
+            return everything
+
+        # 每手的可行子集（含空集合）：(總額, 價值, 成員)
+        hand_options: List[List[Tuple[float, float, Tuple[PendingDecision, ...]]]] = []
+        for group in options_by_hand.values():
+            subsets = [(0.0, 0.0, ())]
+            for size in range(1, len(group) + 1):
+                for members in combinations(group, size):
+                    total = sum(d.amount for d in members)
+                    if self.per_hand_cap is not None and total > self.per_hand_cap:
+                        continue
+                    if capacity is not None and total > capacity:
+                        continue
+                    subsets.append((total, sum(self._value(d) for d in members), members))
+            hand_options.append(subsets)
+
+        if capacity is None:
+            # 只有單手上限：各手獨立取價值最高的子集
+            allocation.method = "knapsack"
+            return [d for subsets in hand_options for d in max(subsets, key=lambda o: o[1])[2]]
+
+        unit = self._unit(everything, capacity)
+        if unit is not None:
+            slots = int(capacity // unit)
+            if slots * len(hand_options) <= MAX_DP_CELLS:
+                allocation.method = "knapsack"
+                return self._knapsack(hand_options, unit, slots)
+
+        allocation.method = "greedy"
+        return self._greedy(hand_options, capacity)
+
+    @staticmethod
+    def _knapsack(
+        hand_options: List[List[Tuple[float, float, Tuple[PendingDecision, ...]]]],
+        unit: int,
+        slots: int,
+    ) -> List[PendingDecision]:
+        """多選一背包：每手恰選一個子集（可為空），總額 ≤ slots × unit"""
+        best = [0.0] * (slots + 1)
+        choices: List[List[int]] = []
+        for subsets in hand_options:
+            weights = [int(round(total / unit)) for total, _, _ in subsets]
+            new_best = best[:]
+            choice = [0] * (slots + 1)
+            for index in range(1, len(subsets)):
+                weight, value = weights[index], subsets[index][1]
+                for w in range(slots, weight - 1, -1):
+                    candidate = best[w - weight] + value
+                    if candidate > new_best[w]:
+                        new_best[w] = candidate
+                        choice[w] = index
+            best = new_best
+            choices.append(choice)
+
+        selected: List[PendingDecision] = []
+        w = max(range(slots + 1), key=lambda i: (best[i], -i))
+        for subsets, choice in zip(reversed(hand_options), reversed(choices)):
+            index = choice[w]
+            selected.extend(subsets[index][2])
+            w -= int(round(subsets[index][0] / unit))
+        return selected
+
+    @staticmethod
+    def _greedy(
+        hand_options: List[List[Tuple[float, float, Tuple[PendingDecision, ...]]]],
+        capacity: float,
+    ) -> List[PendingDecision]:
+        """依價值密度貪婪選擇（每手最多一個子集）"""
+        ranked = sorted(
+            ((value / total, total, members, hand) for hand, subsets in enumerate(hand_options)
+             for total, value, members in subsets if members),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        used_hands, selected, remaining = set(), [], capacity
+        for _, total, members, hand in ranked:
+            if hand in used_hands or total > remaining:
+                continue
+            used_hands.add(hand)
+            selected.extend(members)
+            remaining -= total
+        return selected
+
+    @staticmethod
+    def _unit(decisions: List[PendingDecision], capacity: float) -> Optional[int]:
+        """金額的最大公因數（非整數金額時返回 None）"""
+        amounts = [d.amount for d in decisions]
+        if any(float(a) != int(a) for a in amounts) or not amounts:
+            return None
+        unit = reduce(math.gcd, (int(a) for a in amounts))
+        return unit if unit > 0 else None
+
+    @staticmethod
+    def _value(decision: PendingDecision) -> float:
+        # priority_score 由 ConflictResolver 計算（EV × 1000 為主）；未計分時視為同等價值
+        return decision.priority_score if decision.priority_score > 0 else 1.0
+
+    def _budget_message(self) -> str:
+        available = self.available
+        return f"Capital budget exhausted (available={available:g})" if available is not None else "Per-hand cap"
+
+    @staticmethod
+    def _reject(decision: PendingDecision, message: str) -> Tuple[PendingDecision, ConflictReason, str]:
+        return decision, ConflictReason.RESOURCE_LIMIT, message
@@ -7,6 +7,12 @@
 2. EV（期望值）評估與優先級排序
 3. 先到先上機制
 4. 固定優先級表
+
+效能：
+- 每條策略的靜態分數（metadata 的 ev_weight、固定優先級）在註冊時預先計算，
+  resolve 時只做字典查詢與少量加法
+- 每次 resolve 只取一次時間快照，同一批候選的時間分數不會漂移
+- 每組每個候選只計分一次；取最高分以單次掃描完成，不排序整個列表
 """
 from __future__ import annotations
 
@@ -70,8 +76,26 @@ class ConflictResolver:
             fixed_priority: 固定優先級表 {strategy_key: priority}，數字越小優先級越高
             enable_ev_evaluation: 是否啟用 EV 評估
         """
-        self.fixed_priority = fixed_priority or {}
         self.enable_ev_evaluation = enable_ev_evaluation
+        # 預先計算的靜態分數
+        self._base_ev: Dict[str, Tuple[StrategyDefinition, float]] = {}  # {strategy_key: (定義, ev_weight)}
+        self._fixed_scores: Dict[str, float] = {}
+        self.set_fixed_priority(fixed_priority or {})
+
+    def register_strategy(self, definition: StrategyDefinition) -> None:
+        """策略註冊 / 更新時預先計算其靜態 EV"""
+        self._base_ev[definition.strategy_key] = (definition, self._parse_ev_weight(definition))
+
+    @staticmethod
+    def _parse_ev_weight(definition: StrategyDefinition) -> float:
+        ev = 0.5
+        custom_ev = definition.metadata.get("ev_weight")
+        if custom_ev is not None:
+            try:
+                ev = max(0.0, min(1.0, float(custom_ev)))  # 限制在 0-1
+            except (ValueError, TypeError):
+                pass
+        return ev
 
     def resolve(
         self,
@@ -96,6 +120,9 @@ class ConflictResolver:
         if not decisions:
             return ConflictResolution(approved=[], rejected=[])
 
+        # 整批共用同一個時間快照
+        now = time.time()
+
         # 按桌和局分組
         groups: Dict[Tuple[str, str], List[PendingDecision]] = {}
         for decision in decisions:
@@ -109,6 +136,10 @@ class ConflictResolver:
 
         # 逐組解決衝突
         for (table_id, round_id), group in groups.items():
+            # 每個候選只計分一次，方向衝突與同方向擇優共用（亦作為跨桌資金分配的價值）
+            for decision in group:
+                decision.priority_score = self._calculate_priority_score(decision, strategies, now)
+
             if len(group) == 1:
                 # 單一決策，直接通過
                 approved.append(group[0])
@@ -158,14 +189,11 @@ class ConflictResolver:
             return decisions, []
 
         # 有衝突：需要選擇一個方向
-        # 計算每個方向的優先級分數
+        # 計算每個方向的優先級分數（priority_score 已由 resolve 計算）
         direction_scores: Dict[BetDirection, float] = {}
         for direction, group in by_direction.items():
             # 該方向的最高優先級分數
-            max_score = max(
-                self._calculate_priority_score(d, strategies) for d in group
-            )
-            direction_scores[direction] = max_score
+            direction_scores[direction] = max(d.priority_score for d in group)
 
         # 選擇優先級最高的方向
         winning_direction = max(direction_scores.keys(), key=lambda d: direction_scores[d])
@@ -192,24 +220,23 @@ class ConflictResolver:
         """
         按優先級選擇最優決策
 
-        在同方向的情況下，選擇優先級最高的一個
+        在同方向的情況下，選擇優先級最高的一個（priority_score 已由 resolve 計算）
         """
-        # 計算優先級分數
-        for decision in decisions:
-            decision.priority_score = self._calculate_priority_score(decision, strategies)
+        # 單次掃描取最高分（平手取較早出現者，與穩定排序相同）
+        best_index = 0
+        for index in range(1, len(decisions)):
+            if decisions[index].priority_score > decisions[best_index].priority_score:
+                best_index = index
 
-        # 排序（分數高的在前）
-        sorted_decisions = sorted(decisions, key=lambda d: d.priority_score, reverse=True)
-
-        # 只保留最高分的
-        approved = [sorted_decisions[0]]
+        approved = [decisions[best_index]]
         rejected = [
             (
                 decision,
                 ConflictReason.LOWER_PRIORITY,
                 f"Lower priority (score={decision.priority_score:.4f})",
             )
-            for decision in sorted_decisions[1:]
+            for index, decision in enumerate(decisions)
+            if index != best_index
         ]
 
         return approved, rejected
@@ -218,6 +245,7 @@ class ConflictResolver:
         self,
         decision: PendingDecision,
         strategies: Dict[str, StrategyDefinition],
+        now: Optional[float] = None,
     ) -> float:
         """
         計算優先級分數
@@ -231,25 +259,25 @@ class ConflictResolver:
         - EV 分數：0-1000
         - 時間戳分數：0-100（越早越高）
         - 固定優先級：0-10
+
+        Args:
+            now: 時間快照（resolve 傳入，同一批共用）；None 時使用目前時間
         """
         score = 0.0
 
         # 1. EV 評估（最重要，權重 1000）
         if self.enable_ev_evaluation:
-            ev_score = self._evaluate_ev(decision, strategies)
-            score += ev_score * 1000
+            score += self._evaluate_ev(decision, strategies) * 1000
 
         # 2. 時間戳（先到先上，權重 100）
         # 使用負時間戳，越早的分數越高
         # 歸一化到 0-100 範圍
-        time_score = max(0, 100 - (time.time() - decision.timestamp) * 10)
-        score += time_score
+        if now is None:
+            now = time.time()
+        score += max(0, 100 - (now - decision.timestamp) * 10)
 
-        # 3. 固定優先級（權重 10）
-        fixed_priority = self.fixed_priority.get(decision.strategy_key, 999)
-        # 轉換為分數：優先級越小，分數越高
-        priority_score = max(0, 10 - fixed_priority * 0.1)
-        score += priority_score
+        # 3. 固定優先級（權重 10，已預先換算為分數）
+        score += self._fixed_scores.get(decision.strategy_key, 0.0)
 
         return score
 
@@ -271,17 +299,12 @@ class ConflictResolver:
         if not strategy:
             return 0.5  # 默認中等信心
 
-        # 基礎 EV
-        ev = 0.5
-
-        # 從 metadata 讀取自定義權重
-        custom_ev = strategy.metadata.get("ev_weight")
-        if custom_ev is not None:
-            try:
-                ev = float(custom_ev)
-                ev = max(0.0, min(1.0, ev))  # 限制在 0-1
-            except (ValueError, TypeError):
-                pass
+        # 基礎 EV（metadata 的 ev_weight，註冊時預先解析；定義被替換時重新解析）
+        cached = self._base_ev.get(decision.strategy_key)
+        if cached is None or cached[0] is not strategy:
+            self.register_strategy(strategy)
+            cached = self._base_ev[decision.strategy_key]
+        ev = cached[1]
 
         # 層級調整：層級越低，信心略高
         # 第一層：+0.1，第二層：+0.05，第三層：0，後續層：負調整
@@ -298,8 +321,12 @@ class ConflictResolver:
         return ev
 
     def set_fixed_priority(self, priority_map: Dict[str, int]) -> None:
-        """設置固定優先級表"""
+        """設置固定優先級表（同時預先換算為分數：優先級越小，分數越高）"""
         self.fixed_priority = priority_map.copy()
+        self._fixed_scores = {
+            key: max(0, 10 - priority * 0.1)
+            for key, priority in self.fixed_priority.items()
+        }
 
     def get_priority_explanation(
         self,
@@ -17,13 +17,14 @@ EntryEvaluator - 策略入場條件評估器
 """
 from __future__ import annotations
 
-import time
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import EntryConfig, StrategyDefinition, CrossTableMode
 from .conflict import PendingDecision, BetDirection as ConflictBetDirection
+from .events import EVENT_MESSAGE, EventRing, EventSpec
 from .signal import SignalTracker
-from .state import LineState, LinePhase, LayerProgression
+from .state import LineState, LinePhase, LayerOutcome, LayerProgression, LayerState
 
 
 class BetDirection:
@@ -44,19 +45,74 @@ class RiskCoordinatorProtocol:
         ...
 
 
+# 評估原因代碼 -> 模板（讀取 reason 時才格式化）
+REASON_NO_TRACKER = "no_tracker"
+REASON_WAITING = "waiting"
+REASON_FROZEN = "frozen"
+REASON_RISK_BLOCKED = "risk_blocked"
+REASON_NOT_TRIGGERED = "not_triggered"
+REASON_ARMED = "armed"
+REASON_TRIGGERED = "triggered"
+
+REASON_TEMPLATES: Dict[str, str] = {
+    REASON_NO_TRACKER: "SignalTracker not found",
+    REASON_WAITING: "Waiting for result (round={0})",
+    REASON_FROZEN: "Line frozen until {0}",
+    REASON_RISK_BLOCKED: "Blocked by risk coordinator",
+    REASON_NOT_TRIGGERED: "⏳ 模式 {0} | 歷史長度 {1}/{2} | ❌ 未觸發",
+    REASON_ARMED: "Armed (count={0}), waiting for first_trigger_layer",
+    REASON_TRIGGERED: "✅ Triggered | direction={0} | amount={1} | layer={2}",
+}
+
+# 事件代碼
+EVENT_STRATEGY_EVALUATED = "strategy_evaluated"
+EVENT_STRATEGY_TRIGGERED = "strategy_triggered"
+
+EVENT_SPECS: Dict[str, EventSpec] = {
+    # args: (strategy_key, EntryEvaluationResult, table_id, triggered)
+    EVENT_STRATEGY_EVALUATED: EventSpec(
+        "DEBUG", "策略 {0}: {1.reason}", (("table", 2), ("triggered", 3))
+    ),
+    # args: (strategy_key, pattern, recent_winners, table_id)
+    EVENT_STRATEGY_TRIGGERED: EventSpec(
+        "INFO", "✅ 策略 {0} 觸發！| 模式 {1} | 歷史 {2}", (("table", 3),)
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _required_length(pattern: str) -> int:
+    """模式需要的歷史長度（依模式字串快取）"""
+    return len(SignalTracker._pattern_sequence(pattern))
+
+
 class EntryEvaluationResult:
-    """策略評估結果"""
+    """策略評估結果（reason 以代碼 + 參數保存，讀取時才格式化）"""
+    __slots__ = ("strategy_key", "triggered", "candidate", "reason_code", "reason_args", "_reason")
+
     def __init__(
         self,
         strategy_key: str,
         triggered: bool,
-        reason: str = "",
+        reason: Optional[str] = None,
         candidate: Optional[PendingDecision] = None,
+        *,
+        reason_code: str = "",
+        reason_args: Tuple[Any, ...] = (),
     ):
         self.strategy_key = strategy_key
         self.triggered = triggered
-        self.reason = reason
         self.candidate = candidate
+        self.reason_code = reason_code
+        self.reason_args = reason_args
+        self._reason = reason
+
+    @property
+    def reason(self) -> str:
+        if self._reason is None:
+            template = REASON_TEMPLATES.get(self.reason_code, self.reason_code)
+            self._reason = template.format(*self.reason_args)
+        return self._reason
 
 
 class EntryEvaluator:
@@ -85,6 +141,7 @@ class EntryEvaluator:
         strategies: Dict[str, StrategyDefinition],
         signal_trackers: Dict[str, SignalTracker],
         risk_coordinator: Optional[RiskCoordinatorProtocol] = None,
+        record_events: bool = True,
     ):
         """初始化評估器
 
@@ -92,6 +149,8 @@ class EntryEvaluator:
             strategies: 策略定義字典 {strategy_key: StrategyDefinition}
             signal_trackers: 信號追蹤器字典 {strategy_key: SignalTracker}
             risk_coordinator: 風控協調器（可選）
+            record_events: 是否記錄評估事件；沒有讀取者時關閉，
+                逐策略的訊息字串與歷史轉換都不會建立
         """
         self.strategies = strategies
         self.signal_trackers = signal_trackers
@@ -105,8 +164,9 @@ class EntryEvaluator:
         self._shared_progressions: Dict[str, LayerProgression] = {}
 
         # 事件記錄（用於調試和 UI 顯示）
-        self._events: List[Dict] = []
+        self.record_events = record_events
         self._max_events = 1000
+        self._events = EventRing(EVENT_SPECS, capacity=self._max_events)
 
     # ===== 主要評估方法 =====
 
@@ -144,12 +204,11 @@ class EntryEvaluator:
                 timestamp=timestamp,
             )
 
-            # 記錄評估結果（調試用）
-            self._record_event(
-                "DEBUG",
-                f"策略 {strategy_key}: {result.reason}",
-                {"table": table_id, "triggered": result.triggered}
-            )
+            # 記錄評估結果（調試用，讀取時才格式化）
+            if self.record_events:
+                self._events.record(
+                    EVENT_STRATEGY_EVALUATED, (strategy_key, result, table_id, result.triggered)
+                )
 
             # 如果觸發，添加到候選列表
             if result.triggered and result.candidate:
@@ -172,58 +231,54 @@ class EntryEvaluator:
         """
         tracker = self.signal_trackers.get(strategy_key)
         if not tracker:
-            return EntryEvaluationResult(
-                strategy_key, False, "SignalTracker not found"
-            )
+            return EntryEvaluationResult(strategy_key, False, reason_code=REASON_NO_TRACKER)
 
         line_state = self._ensure_line_state(table_id, strategy_key)
 
         # 檢查 1: Line 是否在等待結果
         if line_state.phase == LinePhase.WAITING_RESULT:
             return EntryEvaluationResult(
-                strategy_key, False, f"Waiting for result (round={line_state.last_round_id})"
+                strategy_key, False, reason_code=REASON_WAITING, reason_args=(line_state.last_round_id,)
             )
 
         # 檢查 2: Line 是否被凍結
         if line_state.frozen:
             return EntryEvaluationResult(
-                strategy_key, False, f"Line frozen until {line_state.frozen_until}"
+                strategy_key, False, reason_code=REASON_FROZEN, reason_args=(line_state.frozen_until,)
             )
 
         # 檢查 3: 風控封鎖
         if self.risk_coordinator and self.risk_coordinator.is_blocked(
             strategy_key, table_id, definition.metadata
         ):
-            return EntryEvaluationResult(
-                strategy_key, False, "Blocked by risk coordinator"
-            )
+            return EntryEvaluationResult(strategy_key, False, reason_code=REASON_RISK_BLOCKED)
 
         # 檢查 4: 信號觸發
         should_trigger_result = tracker.should_trigger(table_id, round_id, timestamp)
 
         if not should_trigger_result:
-            # 獲取調試信息
-            required_length = len(tracker._pattern_sequence(definition.entry.pattern))
-            recent_winners = tracker._get_recent_winners(table_id, required_length)
-            history_list = list(tracker.history.get(table_id, []))
-
-            reason = (
-                f"⏳ 模式 {definition.entry.pattern} | "
-                f"歷史長度 {len(history_list)}/{required_length} | "
-                f"近期 {recent_winners} | ❌ 未觸發"
+            # 只保存數值，不複製歷史；未觸發是最常見的情況
+            history = tracker.history.get(table_id)
+            return EntryEvaluationResult(
+                strategy_key,
+                False,
+                reason_code=REASON_NOT_TRIGGERED,
+                reason_args=(
+                    definition.entry.pattern,
+                    len(history) if history else 0,
+                    _required_length(definition.entry.pattern),
+                ),
             )
-            return EntryEvaluationResult(strategy_key, False, reason)
 
-        # 信號觸發成功
-        recent_winners = tracker._get_recent_winners(
-            table_id,
-            len(tracker._pattern_sequence(definition.entry.pattern))
-        )
-        self._record_event(
-            "INFO",
-            f"✅ 策略 {strategy_key} 觸發！| 模式 {definition.entry.pattern} | 歷史 {recent_winners}",
-            {"table": table_id}
-        )
+        # 信號觸發成功（較少發生，保存當時的歷史以便除錯）
+        if self.record_events:
+            recent_winners = tracker._get_recent_winners(
+                table_id, _required_length(definition.entry.pattern)
+            )
+            self._events.record(
+                EVENT_STRATEGY_TRIGGERED,
+                (strategy_key, definition.entry.pattern, recent_winners, table_id),
+            )
 
         # 更新 Line 狀態為 ARMED
         line_state.phase = LinePhase.ARMED
@@ -232,8 +287,9 @@ class EntryEvaluator:
         # 檢查 5: 首次觸發層
         required_triggers = 1 if definition.entry.first_trigger_layer >= 1 else 2
         if line_state.armed_count < required_triggers:
-            reason = f"Armed (count={line_state.armed_count}), waiting for first_trigger_layer"
-            return EntryEvaluationResult(strategy_key, False, reason)
+            return EntryEvaluationResult(
+                strategy_key, False, reason_code=REASON_ARMED, reason_args=(line_state.armed_count,)
+            )
 
         # 計算下注方向和金額
         progression = self._get_progression(table_id, strategy_key)
@@ -256,7 +312,8 @@ class EntryEvaluator:
         return EntryEvaluationResult(
             strategy_key=strategy_key,
             triggered=True,
-            reason=f"✅ Triggered | direction={direction_str} | amount={amount} | layer={progression.index}",
+            reason_code=REASON_TRIGGERED,
+            reason_args=(direction_str, amount, progression.index),
             candidate=candidate,
         )
 
@@ -372,31 +429,104 @@ class EntryEvaluator:
             key = (table_id, strategy_key)
             return self._line_progressions.get(key)
 
+    # ===== 狀態持久化 =====
+
+    def export_state(self) -> Dict[str, Any]:
+        """匯出 Line 狀態與層數進度（用於會話恢復）
+
+        Returns:
+            緊湊格式字典，每筆記錄為固定欄位順序的陣列：
+            - lines: [table_id, strategy_key, phase, layer_index, armed_count, pnl,
+                      last_round_id, cool_down_until, frozen, stake, outcome]
+            - progressions: [table_id, strategy_key, index]
+            - shared: [strategy_key, index]
+        """
+        lines = []
+        for table_id, states in self.line_states.items():
+            for strategy_key, state in states.items():
+                layer = state.layer_state
+                lines.append([
+                    table_id,
+                    strategy_key,
+                    state.phase.value,
+                    state.current_layer_index,
+                    state.armed_count,
+                    state.pnl,
+                    state.last_round_id,
+                    state.cool_down_until,
+                    state.frozen,
+                    layer.stake,
+                    layer.outcome.value if layer.outcome else None,
+                ])
+
+        return {
+            "lines": lines,
+            "progressions": [
+                [table_id, strategy_key, progression.index]
+                for (table_id, strategy_key), progression in self._line_progressions.items()
+            ],
+            "shared": [
+                [strategy_key, progression.index]
+                for strategy_key, progression in self._shared_progressions.items()
+            ],
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """從 export_state() 的輸出恢復狀態
+
+        未註冊的策略會被略過；層數索引會限制在當前 staking.sequence 範圍內，
+        以防策略配置在重啟期間被修改。
+        """
+        for row in data.get("lines") or []:
+            (table_id, strategy_key, phase, layer_index, armed_count, pnl,
+             last_round_id, cool_down_until, frozen, stake, outcome) = row
+            if strategy_key not in self.strategies:
+                continue
+            state = self._ensure_line_state(table_id, strategy_key)
+            state.phase = LinePhase(phase)
+            state.current_layer_index = int(layer_index)
+            state.armed_count = int(armed_count)
+            state.pnl = float(pnl)
+            state.last_round_id = last_round_id
+            state.cool_down_until = cool_down_until
+            state.frozen = bool(frozen)
+            state.layer_state = LayerState(
+                index=int(layer_index),
+                stake=int(stake),
+                outcome=LayerOutcome(outcome) if outcome else None,
+            )
+
+        for table_id, strategy_key, index in data.get("progressions") or []:
+            if strategy_key not in self.strategies:
+                continue
+            progression = self._get_progression(table_id, strategy_key)
+            progression.index = min(int(index), len(progression.config.sequence) - 1)
+
+        for strategy_key, index in data.get("shared") or []:
+            definition = self.strategies.get(strategy_key)
+            if not definition:
+                continue
+            progression = self._shared_progressions.setdefault(
+                strategy_key, LayerProgression(definition.staking)
+            )
+            progression.index = min(int(index), len(progression.config.sequence) - 1)
+
     # ===== 事件記錄 =====
 
     def _record_event(self, level: str, message: str, metadata: Dict) -> None:
-        """記錄評估事件（用於調試和 UI 顯示）
+        """記錄自由格式事件（非熱路徑使用；熱路徑以事件代碼記錄）
 
         Args:
             level: 日誌級別 (DEBUG, INFO, WARNING, ERROR)
             message: 消息內容
             metadata: 附加元數據
         """
-        event = {
-            "timestamp": time.time(),
-            "level": level,
-            "message": message,
-            "metadata": metadata,
-        }
-
-        self._events.append(event)
-
-        # 限制事件數量，避免記憶體無限增長
-        if len(self._events) > self._max_events:
-            self._events = self._events[-self._max_events:]
+        if not self.record_events:
+            return
+        self._events.record(EVENT_MESSAGE, (level, message, metadata))
 
     def get_recent_events(self, limit: int = 100) -> List[Dict]:
-        """獲取最近的評估事件
+        """獲取最近的評估事件（此時才格式化）
 
         Args:
             limit: 返回的事件數量
@@ -404,7 +534,7 @@ class EntryEvaluator:
         Returns:
             事件列表（最新的在前）
         """
-        return list(reversed(self._events[-limit:]))
+        return [event.to_dict() for event in self._events.recent(limit)]
 
     def clear_events(self) -> None:
         """清空事件記錄"""
@@ -0,0 +1,122 @@
+# src/autobet/lines/events.py
+"""
+結構化事件記錄（固定容量環形緩衝）
+
+EntryEvaluator / LineOrchestrator 的事件在每次評估、每個策略都會產生，
+舊做法是在熱路徑上組 f-string 與 metadata dict。改為：
+
+- 記錄時只寫入「事件代碼 + 小型參數 tuple + 時間」到預先配置的陣列
+  （固定容量，覆寫最舊的項目，不會 append / 截斷 list）
+- 每個代碼對應一個 EventSpec（等級、str.format 模板、metadata 欄位對應），
+  只有在 UI 或日誌讀取（recent / drain）時才格式化成文字
+
+使用範例:
+    >>> SPECS = {"decision": EventSpec("INFO", "決策 {0} | {1}", (("table", 2),))}
+    >>> ring = EventRing(SPECS, capacity=1000)
+    >>> ring.record("decision", ("s1", "B", "T1"))
+    >>> ring.drain()[0].message
+    '決策 s1 | B'
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+# 自由格式事件：args = (level, message, metadata)
+EVENT_MESSAGE = "message"
+
+
+@dataclass(frozen=True)
+class EventSpec:
+    """事件代碼的格式定義"""
+    level: str
+    template: str  # 以位置參數 {0} {1} ... 填入 args
+    meta: Tuple[Tuple[str, int], ...] = ()  # (metadata key, args 索引)
+
+
+@dataclass
+class FormattedEvent:
+    """讀取時才建立的事件"""
+    timestamp: float
+    code: str
+    level: str
+    message: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "code": self.code,
+            "level": self.level,
+            "message": self.message,
+            "metadata": self.metadata,
+        }
+
+
+class EventRing:
+    """固定容量事件環（單一寫入者；讀取端以序號游標追蹤）"""
+
+    __slots__ = ("specs", "capacity", "clock", "_times", "_codes", "_args", "_next", "_start", "_cursor")
+
+    def __init__(
+        self,
+        specs: Mapping[str, EventSpec],
+        capacity: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.specs = specs
+        self.capacity = max(1, capacity)
+        self.clock = clock
+        self._times: List[float] = [0.0] * self.capacity
+        self._codes: List[str] = [""] * self.capacity
+        self._args: List[Tuple[Any, ...]] = [()] * self.capacity
+        self._next = 0  # 下一筆的序號
+        self._start = 0  # clear() 之後的第一筆序號
+        self._cursor = 0  # drain() 已讀到的序號
+
+    def record(self, code: str, args: Tuple[Any, ...] = ()) -> None:
+        index = self._next % self.capacity
+        self._times[index] = self.clock()
+        self._codes[index] = code
+        self._args[index] = args
+        self._next += 1
+
+    def __len__(self) -> int:
+        return min(self._next - self._start, self.capacity)
+
+    def clear(self) -> None:
+        self._start = self._next
+        self._cursor = self._next
+
+    # ------------------------------------------------------------------
+    def _oldest(self) -> int:
+        return max(self._start, self._next - self.capacity)
+
+    def _format(self, seq: int) -> FormattedEvent:
+        index = seq % self.capacity
+        code, args = self._codes[index], self._args[index]
+        if code == EVENT_MESSAGE:
+            level, message, metadata = args
+            return FormattedEvent(self._times[index], code, level, message, dict(metadata or {}))
+        spec = self.specs.get(code)
+        if spec is None:
+            return FormattedEvent(self._times[index], code, "INFO", f"{code} {args}")
+        return FormattedEvent(
+            self._times[index],
+            code,
+            spec.level,
+            spec.template.format(*args),
+            {key: args[position] for key, position in spec.meta},
+        )
+
+    def recent(self, limit: int = 100) -> List[FormattedEvent]:
+        """最近的事件（最新的在前）"""
+        oldest = max(self._oldest(), self._next - max(0, limit))
+        return [self._format(seq) for seq in range(self._next - 1, oldest - 1, -1)]
+
+    def drain(self) -> List[FormattedEvent]:
+        """上次 drain 之後的新事件（舊到新；已被覆寫的項目會遺失）"""
+        start = max(self._cursor, self._oldest())
+        self._cursor = self._next
+        return [self._format(seq) for seq in range(start, self._next)]
@@ -0,0 +1,224 @@
+# src/autobet/lines/loadgen.py
+"""
+LineOrchestrator 壓力測試產生器（無 Qt）
+
+用途：
+1. 在 N 條策略 × M 張桌上驅動合成的階段 / 開獎事件
+2. 量測 update_table_phase / handle_result 的吞吐量與延遲
+3. 收集 PerformanceTracker 各階段延遲
+4. 追蹤記憶體隨輪數的成長（tracemalloc）
+
+每一輪對每張桌依序執行：
+    BETTABLE（generate_decisions=True）→ LOCKED → handle_result
+
+使用範例:
+    >>> report = run_scenario(LoadScenario(strategies=20, tables=8, rounds=200))
+    >>> report["results_per_sec"]
+    >>> run_matrix([10, 50], [4, 16], rounds=100)
+"""
+from __future__ import annotations
+
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import DedupMode, EntryConfig, StakingConfig, StrategyDefinition
+from .orchestrator import LineOrchestrator, TablePhase
+
+# 開獎機率（約略百家樂分佈）
+WINNER_WEIGHTS = (("B", 0.4586), ("P", 0.4462), ("T", 0.0952))
+
+
+@dataclass
+class LoadScenario:
+    """單一壓測情境"""
+    strategies: int = 10
+    tables: int = 4
+    rounds: int = 200
+    seed: int = 42
+    track_memory: bool = True  # tracemalloc 會讓延遲變慢約 1.5~3 倍
+    memory_samples: int = 10  # 記憶體取樣次數
+    budget_ms: float = 50.0  # 單次呼叫 p99 預算，超過視為「撐不住」
+
+
+def build_strategies(count: int, seed: int = 42) -> List[StrategyDefinition]:
+    """產生 count 條合成策略（2~4 局的 B/P 型態，方向輪替）"""
+    rng = random.Random(seed)
+    definitions = []
+    for index in range(count):
+        length = 2 + index % 3
+        pattern = "".join(rng.choice("BP") for _ in range(length))
+        target = "P" if index % 2 == 0 else "B"
+        definitions.append(StrategyDefinition(
+            strategy_key=f"load_{index:04d}",
+            entry=EntryConfig(
+                pattern=f"{pattern} THEN BET {target}",
+                dedup=DedupMode.OVERLAP,
+                first_trigger_layer=1,
+            ),
+            staking=StakingConfig(sequence=[100, 200, 400, 800], reset_on_win=True),
+        ))
+    return definitions
+
+
+def _percentile(sorted_values: Sequence[int], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] / 1e6
+
+
+def _latency_summary(samples_ns: List[int]) -> Dict[str, float]:
+    ordered = sorted(samples_ns)
+    return {
+        "count": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered) / 1e6, 4) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 0.50), 4),
+        "p99_ms": round(_percentile(ordered, 0.99), 4),
+        "max_ms": round(ordered[-1] / 1e6, 4) if ordered else 0.0,
+    }
+
+
+def run_scenario(scenario: LoadScenario) -> Dict[str, Any]:
+    """執行單一情境並返回報告"""
+    rng = random.Random(scenario.seed)
+    winners = [w for w, _ in WINNER_WEIGHTS]
+    weights = [p for _, p in WINNER_WEIGHTS]
+    tables = [f"T{index:03d}" for index in range(scenario.tables)]
+
+    gc.collect()
+    if scenario.track_memory:
+        tracemalloc.start()
+
+    try:
+        orchestrator = LineOrchestrator()
+        for definition in build_strategies(scenario.strategies, scenario.seed):
+            orchestrator.register_strategy(definition, tables=tables)
+
+        phase_ns: List[int] = []
+        result_ns: List[int] = []
+        decisions = 0
+        memory: List[Dict[str, float]] = []
+        sample_every = max(1, scenario.rounds // max(1, scenario.memory_samples))
+        if scenario.track_memory:
+            memory.append({"round": 0, "current_mb": tracemalloc.get_traced_memory()[0] / 1e6})
+
+        clock = time.time()
+        started = time.perf_counter()
+        for round_index in range(1, scenario.rounds + 1):
+            for table_id in tables:
+                round_id = f"{table_id}-{round_index}"
+                clock += 0.001
+
+                t0 = time.perf_counter_ns()
+                decisions += len(orchestrator.update_table_phase(
+                    table_id, round_id, TablePhase.BETTABLE, clock, generate_decisions=True
+                ))
+                orchestrator.update_table_phase(table_id, round_id, TablePhase.LOCKED, clock)
+                t1 = time.perf_counter_ns()
+                orchestrator.handle_result(table_id, round_id, rng.choices(winners, weights)[0], clock)
+                t2 = time.perf_counter_ns()
+
+                phase_ns.append(t1 - t0)
+                result_ns.append(t2 - t1)
+
+            if scenario.track_memory and round_index % sample_every == 0:
+                memory.append({
+                    "round": round_index,
+                    "current_mb": tracemalloc.get_traced_memory()[0] / 1e6,
+                })
+        elapsed = time.perf_counter() - started
+
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6 if scenario.track_memory else None
+    finally:
+        if scenario.track_memory:
+            tracemalloc.stop()
+
+    rounds_total = scenario.rounds * scenario.tables
+    phase = _latency_summary(phase_ns)
+    result = _latency_summary(result_ns)
+
+    growth_per_1k = None
+    if len(memory) >= 2:
+        # 前 10% 的輪數視為暖機（歷史緩衝填滿），成長率以之後的取樣計算
+        base = memory[1] if len(memory) > 2 else memory[0]
+        span = memory[-1]["round"] - base["round"]
+        if span > 0:
+            growth_per_1k = round((memory[-1]["current_mb"] - base["current_mb"]) / span * 1000, 4)
+
+    perf_summary = orchestrator.performance.get_summary()["operations"]
+    return {
+        "scenario": asdict(scenario),
+        "elapsed_sec": round(elapsed, 4),
+        "table_rounds": rounds_total,
+        "decisions": decisions,
+        "table_rounds_per_sec": round(rounds_total / elapsed, 1) if elapsed else 0.0,
+        "phase_update": phase,
+        "handle_result": result,
+        "performance": {
+            op: {key: round(stats[key], 4) for key in ("avg_duration_ms", "p95_ms", "p99_ms", "max_duration_ms")}
+            for op, stats in perf_summary.items()
+        },
+        "memory": {
+            "samples": [{"round": m["round"], "current_mb": round(m["current_mb"], 3)} for m in memory],
+            "peak_mb": round(peak_mb, 3) if peak_mb is not None else None,
+            "growth_mb_per_1k_rounds": growth_per_1k,
+        },
+        "within_budget": max(phase["p99_ms"], result["p99_ms"]) <= scenario.budget_ms,
+    }
+
+
+def run_matrix(
+    strategy_counts: Sequence[int],
+    table_counts: Sequence[int],
+    *,
+    rounds: int = 200,
+    seed: int = 42,
+    track_memory: bool = True,
+    budget_ms: float = 50.0,
+) -> List[Dict[str, Any]]:
+    """執行 N × M 矩陣（依規模由小到大）"""
+    reports = []
+    for strategies, tables in sorted(product(strategy_counts, table_counts), key=lambda nm: nm[0] * nm[1]):
+        reports.append(run_scenario(LoadScenario(
+            strategies=strategies,
+            tables=tables,
+            rounds=rounds,
+            seed=seed,
+            track_memory=track_memory,
+            budget_ms=budget_ms,
+        )))
+    return reports
+
+
+def format_matrix(reports: List[Dict[str, Any]]) -> str:
+    """將矩陣結果格式化為文字表格"""
+    header = (
+        f"{'N':>5} {'M':>5} {'rounds/s':>10} {'decisions':>10} "
+        f"{'phase p50':>10} {'phase p99':>10} {'result p50':>10} {'result p99':>10} "
+        f"{'MB/1k rnd':>10} {'budget':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for report in reports:
+        scenario = report["scenario"]
+        growth = report["memory"]["growth_mb_per_1k_rounds"]
+        lines.append(
+            f"{scenario['strategies']:>5} {scenario['tables']:>5} "
+            f"{report['table_rounds_per_sec']:>10.1f} {report['decisions']:>10} "
+            f"{report['phase_update']['p50_ms']:>10.3f} {report['phase_update']['p99_ms']:>10.3f} "
+            f"{report['handle_result']['p50_ms']:>10.3f} {report['handle_result']['p99_ms']:>10.3f} "
+            f"{(f'{growth:.3f}' if growth is not None else '-'):>10} "
+            f"{('ok' if report['within_budget'] else 'OVER'):>7}"
+        )
+    return "\n".join(lines)
+
+
+def first_over_budget(reports: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """返回第一個超出預算的情境（矩陣依規模排序）"""
+    for report in reports:
+        if not report["within_budget"]:
+            return report["scenario"]
+    return None
@@ -11,9 +11,9 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class EventType(str, Enum):
@@ -212,6 +212,11 @@ class LineMetrics:
         }
 
 
+def _line_metric_fields() -> List[str]:
+    """LineMetrics 的純量欄位（layer_stats 另行序列化）"""
+    return [f.name for f in fields(LineMetrics) if f.name != "layer_stats"]
+
+
 @dataclass
 class EventRecord:
     """事件記錄"""
@@ -356,6 +361,49 @@ class MetricsTracker:
         """清空事件歷史"""
         self.event_history.clear()
 
+    def export_state(self) -> Dict[str, Any]:
+        """匯出 Line 度量（用於會話恢復，不含事件歷史）
+
+        Returns:
+            {"fields": [欄位名稱...], "lines": [[欄位值..., layer_rows], ...]}
+            layer_rows 為 [layer_index, stake, pnl, win, loss, skip, total_wagered]
+        """
+        names = _line_metric_fields()
+        return {
+            "fields": names,
+            "lines": [
+                [getattr(metrics, name) for name in names] + [[
+                    [layer.layer_index, layer.stake, layer.pnl, layer.win_count,
+                     layer.loss_count, layer.skip_count, layer.total_wagered]
+                    for layer in metrics.layer_stats.values()
+                ]]
+                for metrics in self.line_metrics.values()
+            ],
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """從 export_state() 的輸出恢復 Line 度量
+
+        以欄位名稱對應數值，未知欄位會被忽略，因此新增欄位不會破壞舊存檔。
+        """
+        known = set(_line_metric_fields())
+        names = data.get("fields") or []
+        self.line_metrics.clear()
+        for row in data.get("lines") or []:
+            values = {name: value for name, value in zip(names, row[:-1]) if name in known}
+            metrics = LineMetrics(**values)
+            for layer_index, stake, pnl, wins, losses, skips, wagered in row[-1]:
+                metrics.layer_stats[int(layer_index)] = LayerMetrics(
+                    layer_index=int(layer_index),
+                    stake=int(stake),
+                    pnl=float(pnl),
+                    win_count=int(wins),
+                    loss_count=int(losses),
+                    skip_count=int(skips),
+                    total_wagered=float(wagered),
+                )
+            self.line_metrics[(metrics.table_id, metrics.strategy_key)] = metrics
+
     def reset_session_metrics(self) -> None:
         """重置會話度量（保留歷史）"""
         for metrics in self.line_metrics.values():
@@ -25,17 +25,81 @@ from __future__ import annotations
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from .config import StrategyDefinition
 from .conflict import ConflictResolver, PendingDecision, ConflictReason
+from .capital import CapitalAllocator, CapitalReservation
 from .metrics import MetricsTracker, EventRecord, EventType
+from .events import EVENT_MESSAGE, EventRing, EventSpec, FormattedEvent
 from .performance import PerformanceTracker
+from .profiler import HotPathProfiler
 from .signal import SignalTracker
 from .state import LayerOutcome, LinePhase
 from .strategy_registry import StrategyRegistry
-from .entry_evaluator import EntryEvaluator, RiskCoordinatorProtocol
+from .entry_evaluator import EntryEvaluator
 from .position_manager import PositionManager
+from .risk import RiskCoordinator
+
+if TYPE_CHECKING:
+    from src.autobet.session_archive import SessionArchive
+
+
+# export_state() 格式版本：欄位順序或結構變更時遞增
+STATE_VERSION = 1
+
+# 事件代碼（記錄時只存參數 tuple，drain / get_recent_events 時才格式化）
+EVENT_DECISION_REJECTED = "decision_rejected"
+EVENT_DECISION_GENERATED = "decision_generated"
+EVENT_LINE_WAITING = "line_waiting"
+EVENT_DECISION_CANCELLED = "decision_cancelled"
+EVENT_RESULT_RECEIVED = "result_received"
+EVENT_ROUND_OBSERVED = "round_observed"
+EVENT_HISTORY_UPDATED = "history_updated"
+EVENT_POSITION_SETTLED = "position_settled"
+EVENT_RISK_TRIGGERED = "risk_triggered"
+
+EVENT_SPECS: Dict[str, EventSpec] = {
+    # (strategy_key, message, table, round, reason, direction)
+    EVENT_DECISION_REJECTED: EventSpec(
+        "INFO", "Line {0} rejected: {1}",
+        (("table", 2), ("round", 3), ("reason", 4), ("direction", 5)),
+    ),
+    # (strategy_key, direction, amount, layer, table, round)
+    EVENT_DECISION_GENERATED: EventSpec(
+        "INFO", "✅ 決策生成: {0} | {1} | {2} | layer={3}", (("table", 4), ("round", 5)),
+    ),
+    # (strategy_key, table, round)
+    EVENT_LINE_WAITING: EventSpec(
+        "DEBUG", "📝 策略標記為等待結果: {0} | table={1} | round={2}",
+        (("table", 1), ("round", 2), ("strategy", 0)),
+    ),
+    # (strategy_key, table, round)
+    EVENT_DECISION_CANCELLED: EventSpec(
+        "WARNING", "↩️ 下注已撤回，視為未下注: {0} | table={1} | round={2}",
+        (("table", 1), ("round", 2), ("strategy", 0)),
+    ),
+    # (table, round, winner)
+    EVENT_RESULT_RECEIVED: EventSpec(
+        "INFO", "🎯 handle_result: table={0} round={1} winner={2}", (("table", 0),),
+    ),
+    # (strategy_key, table)
+    EVENT_ROUND_OBSERVED: EventSpec(
+        "DEBUG", "📝 觀察局：記錄到歷史 | strategy={0}", (("table", 1),),
+    ),
+    # (strategy_key, table, winner, history)
+    EVENT_HISTORY_UPDATED: EventSpec(
+        "INFO", "📊 策略 {0} | 桌號 {1} | 開獎 {2} | 歷史記錄 {3}", (("table", 1),),
+    ),
+    # (strategy_key, outcome, pnl, table)
+    EVENT_POSITION_SETTLED: EventSpec(
+        "INFO", "💰 參與局：結算倉位 | strategy={0} | outcome={1} | pnl={2:.2f}", (("table", 3),),
+    ),
+    # (RiskEvent, strategy_key, table, scope)
+    EVENT_RISK_TRIGGERED: EventSpec(
+        "WARNING", "⚠️ 風控觸發: {0} | strategy={1}", (("table", 2), ("scope", 3)),
+    ),
+}
 
 
 class TablePhase(str, Enum):
@@ -95,46 +159,16 @@ class ConflictRecord:
 
 @dataclass
 class OrchestratorEvent:
-    """協調器事件"""
+    """協調器事件（讀取時由事件環格式化產生）"""
     level: str
     message: str
     metadata: Dict[str, str] = field(default_factory=dict)
+    code: str = EVENT_MESSAGE
+    timestamp: float = 0.0
 
-
-class RiskCoordinator(RiskCoordinatorProtocol):
-    """風控協調器（佔位符實現）
-
-    TODO: 這裡暫時使用簡單實現，實際應該使用完整的 RiskCoordinator
-    """
-    def __init__(self):
-        self._blocked = set()
-
-    def is_blocked(self, strategy_key: str, table_id: str, metadata: Dict) -> bool:
-        return f"{table_id}:{strategy_key}" in self._blocked
-
-    def refresh(self) -> None:
-        pass
-
-    def register_strategy(self, definition: StrategyDefinition) -> None:
-        pass
-
-    def record(self, strategy_key: str, table_id: str, pnl_delta: float,
-               outcome: LayerOutcome, metadata: Dict) -> List:
-        return []
-
-    def snapshot(self) -> Dict[str, Dict[str, Any]]:
-        """獲取風控狀態快照（用於 EngineWorker）
-
-        返回格式: Dict[scope_key, tracker_data]
-        - scope_key: 例如 "table:strategy"
-        - tracker_data: {"pnl": 0.0, "loss_streak": 0, "frozen": False, ...}
-
-        注意：這是佔位符實現，沒有實際追蹤 PnL
-        實際 PnL 應該從 PositionManager 獲取
-        """
-        # 返回空字典，因為這個簡化版本沒有追蹤任何狀態
-        # EngineWorker 會遍歷這個字典累加 pnl，空字典意味著 pnl = 0
-        return {}
+    @classmethod
+    def from_formatted(cls, event: FormattedEvent) -> "OrchestratorEvent":
+        return cls(event.level, event.message, event.metadata, event.code, event.timestamp)
 
 
 class LineOrchestrator:
@@ -169,12 +203,16 @@ class LineOrchestrator:
         *,
         fixed_priority: Optional[Dict[str, int]] = None,
         enable_ev_evaluation: bool = True,
+        capital_budget: Optional[float] = None,
+        per_hand_cap: Optional[float] = None,
     ):
         """初始化協調器
 
         Args:
             fixed_priority: 策略固定優先級（用於衝突解決）
             enable_ev_evaluation: 是否啟用 EV 評估（用於衝突解決）
+            capital_budget: 跨桌同時預留資金上限（None 不限）
+            per_hand_cap: 單手總下注上限（None 不限）
         """
         # ===== 核心組件 =====
         self.registry = StrategyRegistry()
@@ -193,6 +231,9 @@ class LineOrchestrator:
             enable_ev_evaluation=enable_ev_evaluation,
         )
 
+        # 跨桌資金分配（衝突解決之後，依 EV 在預算內選擇）
+        self.capital = CapitalAllocator(bankroll=capital_budget, per_hand_cap=per_hand_cap)
+
         # ===== 指標和性能追蹤 =====
         self.metrics = MetricsTracker()
         self.performance = PerformanceTracker()
@@ -206,8 +247,18 @@ class LineOrchestrator:
         self.max_conflict_history: int = 100
 
         # ===== 事件記錄 =====
-        self._events: List[OrchestratorEvent] = []
+        # record_events: UI / worker 會 drain 協調器事件；關閉時逐策略訊息不建立
+        # evaluator_events: EntryEvaluator 的逐策略評估事件，預設沒有讀取者
+        self.record_events = True
+        self.evaluator_events = False
         self._max_events = 1000
+        self._events = EventRing(EVENT_SPECS, capacity=self._max_events)
+
+        # ===== 熱路徑分析（預設關閉）=====
+        self.profiler: Optional[HotPathProfiler] = None
+
+        # ===== 歷史歸檔（可選）=====
+        self.archive: Optional["SessionArchive"] = None
 
     # ===== 策略註冊 =====
 
@@ -231,9 +282,16 @@ class LineOrchestrator:
         # 註冊到風控
         self.risk.register_strategy(definition)
 
+        # 預先計算衝突解決的靜態分數
+        self.conflict_resolver.register_strategy(definition)
+
         # 重新創建 entry evaluator（因為 strategies 變更）
         self._recreate_entry_evaluator()
 
+    def attach_archive(self, archive: Optional["SessionArchive"]) -> None:
+        """設置歷史歸檔（記錄每局結果、決策和結算；None 表示停用）"""
+        self.archive = archive
+
     def attach_strategy(self, table_id: str, strategy_key: str) -> None:
         """將策略綁定到桌號"""
         self.registry.attach_to_table(table_id, strategy_key)
@@ -244,8 +302,36 @@ class LineOrchestrator:
             strategies=self.registry.list_all_strategies(),
             signal_trackers=self.signal_trackers,
             risk_coordinator=self.risk,
+            record_events=self.evaluator_events,
         )
 
+    def set_event_recording(self, enabled: bool, *, evaluator: Optional[bool] = None) -> None:
+        """開關事件記錄（evaluator 為 None 時不變更 EntryEvaluator 的設定）"""
+        self.record_events = enabled
+        if evaluator is not None:
+            self.evaluator_events = evaluator
+            if self.entry_evaluator:
+                self.entry_evaluator.record_events = evaluator
+
+    # ===== 熱路徑分析 =====
+
+    def start_profiling(self, mode: str = "sample", interval_ms: float = 1.0) -> HotPathProfiler:
+        """開始收集 lines/* 的函數耗時（已在執行時返回現有的分析器）"""
+        if self.profiler and self.profiler.running:
+            return self.profiler
+        self.profiler = HotPathProfiler(mode=mode, interval_ms=interval_ms)
+        return self.profiler.start()
+
+    def stop_profiling(self, output: Optional[str] = None) -> Optional[HotPathProfiler]:
+        """停止分析；提供 output 時寫出 flamegraph folded stacks"""
+        profiler = self.profiler
+        if profiler is None:
+            return None
+        profiler.stop()
+        if output:
+            profiler.write_folded(output)
+        return profiler
+
     # ===== 階段轉換和決策生成 =====
 
     def update_table_phase(
@@ -274,8 +360,7 @@ class LineOrchestrator:
             - 只有在「檢測到可下注畫面」時才生成決策（generate_decisions=True）
         """
         # 開始追蹤階段轉換性能
-        phase_op_id = f"phase_{table_id}_{phase.value}_{time.time()}"
-        self.performance.start_operation(phase_op_id)
+        phase_token = self.performance.begin()
 
         self.table_phases[table_id] = phase
         if round_id:
@@ -289,16 +374,7 @@ class LineOrchestrator:
             decisions = self._evaluate_and_decide(table_id, round_id, timestamp)
 
         # 結束階段轉換追蹤
-        self.performance.end_operation(
-            phase_op_id,
-            PerformanceTracker.OP_PHASE_TRANSITION,
-            success=True,
-            metadata={
-                "table_id": table_id,
-                "phase": phase.value,
-                "decisions_generated": len(decisions)
-            }
-        )
+        self.performance.end(PerformanceTracker.OP_PHASE_TRANSITION, phase_token)
 
         return decisions
 
@@ -319,8 +395,7 @@ class LineOrchestrator:
             return []
 
         # 開始追蹤決策生成性能
-        decision_op_id = f"decision_{table_id}_{round_id}"
-        self.performance.start_operation(decision_op_id)
+        decision_token = self.performance.begin()
 
         # ===== 階段 1: 評估策略觸發條件 =====
         strategies_for_table = self.registry.get_strategies_for_table(table_id)
@@ -333,27 +408,23 @@ class LineOrchestrator:
         )
 
         # ===== 階段 2: 衝突解決 =====
-        conflict_op_id = f"conflict_{table_id}_{round_id}"
-        self.performance.start_operation(conflict_op_id)
+        conflict_token = self.performance.begin()
 
         resolution = self.conflict_resolver.resolve(
             candidates,
             self.registry.list_all_strategies()
         )
 
+        # 資金分配：扣除其他桌尚未結算的預留後，在預算 / 單手上限內選擇
+        allocation = self.capital.allocate(resolution.approved)
+        resolution.approved = allocation.approved
+        resolution.rejected.extend(allocation.rejected)
+
         # 結束衝突解決追蹤
-        self.performance.end_operation(
-            conflict_op_id,
-            PerformanceTracker.OP_CONFLICT_RESOLUTION,
-            success=True,
-            metadata={
-                "table_id": table_id,
-                "round_id": round_id,
-                "candidates_count": len(candidates),
-                "approved_count": len(resolution.approved),
-                "rejected_count": len(resolution.rejected)
-            }
-        )
+        self.performance.end(PerformanceTracker.OP_CONFLICT_RESOLUTION, conflict_token)
+
+        for reservation in allocation.reservations:
+            self._record_capital_event(EventType.CAPITAL_RESERVED, reservation, timestamp)
 
         # 記錄衝突解決過程（用於 UI 顯示）
         if len(candidates) > 1:
@@ -363,16 +434,10 @@ class LineOrchestrator:
 
         # 處理被拒絕的決策
         for rejected_decision, reason, message in resolution.rejected:
-            self._record_event(
-                "INFO",
-                f"Line {rejected_decision.strategy_key} rejected: {message}",
-                {
-                    "table": table_id,
-                    "round": round_id,
-                    "reason": reason.value,
-                    "direction": rejected_decision.direction.value,
-                },
-            )
+            self._emit(EVENT_DECISION_REJECTED, (
+                rejected_decision.strategy_key, message, table_id, round_id,
+                reason.value, rejected_decision.direction.value,
+            ))
             # 重置被拒絕的 Line 狀態
             self.entry_evaluator.reset_line_state(table_id, rejected_decision.strategy_key)
 
@@ -404,6 +469,12 @@ class LineOrchestrator:
             )
             final_decisions.append(decision)
 
+            if self.archive:
+                self.archive.record_decision(
+                    table_id, round_id, approved.strategy_key, approved.direction.value,
+                    approved.amount, approved.layer_index, timestamp,
+                )
+
             # 記錄信號觸發事件
             self.metrics.record_event(EventRecord(
                 event_type=EventType.SIGNAL_TRIGGERED,
@@ -413,23 +484,14 @@ class LineOrchestrator:
                 strategy_key=approved.strategy_key,
             ))
 
-            self._record_event(
-                "INFO",
-                f"✅ 決策生成: {approved.strategy_key} | {approved.direction.value} | {approved.amount} | layer={approved.layer_index}",
-                {"table": table_id, "round": round_id},
-            )
+            if self.record_events:
+                self._events.record(EVENT_DECISION_GENERATED, (
+                    approved.strategy_key, approved.direction.value, approved.amount,
+                    approved.layer_index, table_id, round_id,
+                ))
 
         # 結束決策生成追蹤
-        self.performance.end_operation(
-            decision_op_id,
-            PerformanceTracker.OP_DECISION_GENERATION,
-            success=True,
-            metadata={
-                "table_id": table_id,
-                "round_id": round_id,
-                "decisions_count": len(final_decisions)
-            }
-        )
+        self.performance.end(PerformanceTracker.OP_DECISION_GENERATION, decision_token)
 
         return final_decisions
 
@@ -471,11 +533,32 @@ class LineOrchestrator:
                 if strategy_key in layer_map:
                     line_state.current_layer_index = layer_map[strategy_key]
 
-                self._record_event(
-                    "DEBUG",
-                    f"📝 策略標記為等待結果: {strategy_key} | table={table_id} | round={round_id}",
-                    {"table": table_id, "round": round_id, "strategy": strategy_key},
-                )
+                if self.record_events:
+                    self._events.record(EVENT_LINE_WAITING, (strategy_key, table_id, round_id))
+
+    def cancel_decisions(self, decisions: List[BetDecision], timestamp: Optional[float] = None) -> None:
+        """
+        撤回未實際下注的決策（例如執行期限不足而中止）
+
+        移除倉位、釋放資金預留並重置 Line 狀態，下一個結果會被當作觀察局，
+        不會結算、推進層數或計入風控。
+
+        Args:
+            decisions: 已生成但被撤回的決策
+            timestamp: 時間戳（None 則使用當前時間）
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for decision in decisions:
+            self.position_manager.remove_position(decision.table_id, decision.round_id, decision.strategy_key)
+
+            reservation = self.capital.release(decision.table_id, decision.round_id, decision.strategy_key)
+            if reservation:
+                self._record_capital_event(EventType.CAPITAL_RELEASED, reservation, timestamp)
+
+            if self.entry_evaluator:
+                self.entry_evaluator.reset_line_state(decision.table_id, decision.strategy_key)
+
+            self._emit(EVENT_DECISION_CANCELLED, (decision.strategy_key, decision.table_id, decision.round_id))
 
     # ===== 結果處理 =====
 
@@ -494,14 +577,17 @@ class LineOrchestrator:
             winner: 贏家 ("B", "P", "T", None)
             timestamp: 時間戳
         """
-        self._record_event(
-            "INFO",
-            f"🎯 handle_result: table={table_id} round={round_id} winner={winner}",
-            {"table": table_id},
-        )
+        self._emit(EVENT_RESULT_RECEIVED, (table_id, round_id, winner))
 
         winner_code = winner.upper()[0] if winner else None
 
+        if self.archive:
+            self.archive.record_round(table_id, round_id, winner_code, timestamp)
+
+        # 開獎後該桌所有預留資金都已有結果（含漏檢時殘留的舊局預留），全部釋放
+        for reservation in self.capital.release_table(table_id):
+            self._record_capital_event(EventType.CAPITAL_RELEASED, reservation, timestamp)
+
         for strategy_key, definition in self.registry.get_strategies_for_table(table_id):
             tracker = self.signal_trackers[strategy_key]
 
@@ -515,29 +601,30 @@ class LineOrchestrator:
 
             if not settlement:
                 # ✅ 觀察局：沒有倉位，記錄到歷史
-                self._record_event(
-                    "DEBUG",
-                    f"📝 觀察局：記錄到歷史 | strategy={strategy_key}",
-                    {"table": table_id},
-                )
-
                 tracker.record(table_id, round_id, winner_code or "", timestamp)
 
-                # 記錄歷史狀態
-                history_after = tracker._get_recent_winners(table_id, 10)
-                self._record_event(
-                    "INFO",
-                    f"📊 策略 {strategy_key} | 桌號 {table_id} | 開獎 {winner_code} | 歷史記錄 {history_after}",
-                    {"table": table_id},
-                )
+                if self.record_events:
+                    self._events.record(EVENT_ROUND_OBSERVED, (strategy_key, table_id))
+                    # 記錄歷史狀態（當下的快照）
+                    history_after = tracker._get_recent_winners(table_id, 10)
+                    self._events.record(
+                        EVENT_HISTORY_UPDATED, (strategy_key, table_id, winner_code, history_after)
+                    )
                 continue
 
+            if self.archive:
+                position = settlement.position
+                self.archive.record_settlement(
+                    table_id, round_id, strategy_key, position.direction, winner_code,
+                    settlement.outcome.value, position.amount, position.layer_index,
+                    settlement.pnl_delta, timestamp,
+                )
+
             # ✅ 參與局：有倉位，結算（不記錄到歷史）
-            self._record_event(
-                "INFO",
-                f"💰 參與局：結算倉位 | strategy={strategy_key} | outcome={settlement.outcome.value} | pnl={settlement.pnl_delta:.2f}",
-                {"table": table_id},
-            )
+            if self.record_events:
+                self._events.record(EVENT_POSITION_SETTLED, (
+                    strategy_key, settlement.outcome.value, settlement.pnl_delta, table_id,
+                ))
 
             # 獲取 line_state 和 progression
             line_state = self.entry_evaluator.get_line_state(table_id, strategy_key)
@@ -606,15 +693,37 @@ class LineOrchestrator:
                 metadata=definition.metadata,
             )
 
+            # 凍結由 RiskCoordinator 記錄，EntryEvaluator 透過 is_blocked 生效
             for event in risk_events:
-                # TODO: 應用風控事件（凍結 line, 停止策略等）
                 self.metrics.record_event(EventRecord(
                     event_type=EventType.RISK_TRIGGERED,
                     timestamp=timestamp,
                     table_id=table_id,
-                    strategy_key=strategy_key,
+                    strategy_key=event.strategy_key,
                     reason=f"Risk event: {event}",
+                    metadata={"scope": ":".join(event.scope_key), "action": event.action.value},
                 ))
+                self._emit(EVENT_RISK_TRIGGERED, (
+                    event, event.strategy_key, table_id, ":".join(event.scope_key),
+                ))
+
+    def _record_capital_event(
+        self,
+        event_type: EventType,
+        reservation: CapitalReservation,
+        timestamp: float,
+    ) -> None:
+        """記錄資金預留 / 釋放事件"""
+        self.metrics.record_event(EventRecord(
+            event_type=event_type,
+            timestamp=timestamp,
+            table_id=reservation.table_id,
+            round_id=reservation.round_id,
+            strategy_key=reservation.strategy_key,
+            direction=reservation.direction,
+            amount=reservation.amount,
+            metadata={"reserved_total": round(self.capital.reserved, 2)},
+        ))
 
     # ===== 衝突記錄 =====
 
@@ -659,17 +768,19 @@ class LineOrchestrator:
 
     # ===== 事件記錄 =====
 
-    def _record_event(self, level: str, message: str, metadata: Dict[str, str]) -> None:
-        """記錄事件（調試和 UI 顯示用）"""
-        event = OrchestratorEvent(level=level, message=message, metadata=metadata)
-        self._events.append(event)
+    def _emit(self, code: str, args: Tuple[Any, ...]) -> None:
+        """記錄結構化事件（格式化延後到讀取時）"""
+        if self.record_events:
+            self._events.record(code, args)
 
-        if len(self._events) > self._max_events:
-            self._events = self._events[-self._max_events:]
+    def _record_event(self, level: str, message: str, metadata: Dict[str, str]) -> None:
+        """記錄自由格式事件（調試和 UI 顯示用）"""
+        if self.record_events:
+            self._events.record(EVENT_MESSAGE, (level, message, metadata))
 
     def get_recent_events(self, limit: int = 100) -> List[OrchestratorEvent]:
-        """獲取最近的事件"""
-        return list(reversed(self._events[-limit:]))
+        """獲取最近的事件（最新的在前）"""
+        return [OrchestratorEvent.from_formatted(event) for event in self._events.recent(limit)]
 
     # ===== 狀態查詢 =====
 
@@ -731,25 +842,9 @@ class LineOrchestrator:
                     })
 
         # ✅ 生成 UI 兼容的 "risk" 格式（PnL 顯示）
-        risk_data = {}
-        if self.position_manager:
-            # 獲取全局統計數據
-            stats = self.position_manager.get_statistics()
-            global_pnl = stats.get("total_pnl", 0.0)
-
-            pos_snapshot = self.position_manager.snapshot()
-            # 提取所有 table 的 PnL（從 settlement history 計算）
-            for table_id in pos_snapshot.get("by_table", {}).keys():
-                # 計算該桌的 PnL（從結算歷史中篩選）
-                table_pnl = sum(
-                    r.pnl_delta
-                    for r in self.position_manager._settlement_history
-                    if r.position.table_id == table_id
-                )
-                risk_data[f"table:{table_id}"] = {"pnl": round(table_pnl, 2)}
-
-            # 全局 PnL
-            risk_data["global_day"] = {"pnl": round(global_pnl, 2)}
+        # RiskCoordinator 以範圍增量累計（"global_day"、"table:T1"、...），不需掃描結算歷史
+        risk_data = self.risk.snapshot()
+        risk_data.setdefault("global_day", {"pnl": 0.0})
 
         # ✅ 生成 UI 兼容的 "performance" 格式（策略資訊卡片需要）
         performance_data = {}
@@ -779,6 +874,7 @@ class LineOrchestrator:
             "table_phases": {tid: phase.value for tid, phase in self.table_phases.items()},
             "recent_events_count": len(self._events),
             "conflict_history_count": len(self.conflict_history),
+            "capital": self.capital.snapshot(),
             "registry_snapshot": self.registry.snapshot(),
             "position_manager_snapshot": self.position_manager.snapshot(),
             "evaluator_snapshot": self.entry_evaluator.snapshot() if self.entry_evaluator else {},
@@ -797,24 +893,80 @@ class LineOrchestrator:
         }
 
     def drain_events(self) -> List[OrchestratorEvent]:
-        """清空並返回所有事件（用於 EngineWorker 消費）"""
-        events = self._events[:]
-        self._events.clear()
-        return events
+        """返回上次 drain 之後的新事件（用於 EngineWorker / EventPanel 消費）"""
+        return [OrchestratorEvent.from_formatted(event) for event in self._events.drain()]
+
+    def export_state(self) -> Dict[str, Any]:
+        """匯出完整的協調器狀態（用於會話恢復）
+
+        包含桌號階段、策略綁定、SignalTracker 歷史與去重時間戳、
+        Line 狀態與層數進度、待處理倉位和 Line 度量。
+        格式以陣列為主，配合緊湊 JSON 可在毫秒內載入。
+
+        Returns:
+            帶有 "version" 欄位的可 JSON 序列化字典
+        """
+        return {
+            "version": STATE_VERSION,
+            "saved_at": time.time(),
+            "table_phases": {tid: phase.value for tid, phase in self.table_phases.items()},
+            "table_rounds": dict(self.table_rounds),
+            "attachments": {
+                table_id: list(keys) for table_id, keys in self.registry._attachments.items()
+            },
+            "signals": {key: tracker.export_state() for key, tracker in self.signal_trackers.items()},
+            "evaluator": self.entry_evaluator.export_state() if self.entry_evaluator else {},
+            "positions": self.position_manager.export_state(),
+            "metrics": self.metrics.export_state(),
+            "risk": self.risk.export_state(),
+        }
 
     def restore_state(self, state: Dict[str, Any]) -> None:
         """從保存的狀態恢復（用於會話恢復）
 
-        注意：重構後的組件化設計使得狀態恢復更簡單
-        - 策略註冊狀態由 StrategyRegistry 管理
-        - 倉位狀態由 PositionManager 管理
-        - 評估器狀態由 EntryEvaluator 管理
+        必須在策略註冊完成後調用。支援兩種格式：
+        - export_state() 的版本化格式：完整恢復到中斷時的層數與去重狀態
+        - 舊版 snapshot() 格式（無 "version"）：只恢復策略附件關聯
 
-        此方法主要恢復桌號階段和附件關聯
+        Raises:
+            ValueError: 如果狀態版本比當前程式支援的更新
         """
         if not isinstance(state, dict):
             return
 
+        version = state.get("version")
+        if version is None:
+            self._restore_legacy_state(state)
+            return
+        if int(version) > STATE_VERSION:
+            raise ValueError(
+                f"Unsupported line state version {version} (max supported: {STATE_VERSION})"
+            )
+
+        self.table_phases = {
+            tid: TablePhase(phase) for tid, phase in (state.get("table_phases") or {}).items()
+        }
+        self.table_rounds = dict(state.get("table_rounds") or {})
+
+        for table_id, keys in (state.get("attachments") or {}).items():
+            for strategy_key in keys:
+                if self.registry.has_strategy(strategy_key):
+                    self.registry.attach_to_table(table_id, strategy_key)
+
+        for strategy_key, data in (state.get("signals") or {}).items():
+            tracker = self.signal_trackers.get(strategy_key)
+            if tracker:
+                tracker.restore_state(data)
+
+        if self.entry_evaluator:
+            self.entry_evaluator.restore_state(state.get("evaluator") or {})
+
+        self.position_manager.restore_state(state.get("positions") or {})
+        self.metrics.restore_state(state.get("metrics") or {})
+        self.risk.restore_state(state.get("risk") or {})
+
+    def _restore_legacy_state(self, state: Dict[str, Any]) -> None:
+        """恢復舊版 snapshot() 格式（只包含策略附件關聯）"""
         # 清空當前狀態
         self.table_phases.clear()
         self.table_rounds.clear()
@@ -839,11 +991,6 @@ class LineOrchestrator:
                     # 如果附件失敗，跳過此策略
                     continue
 
-        # 注意：由於組件化設計，大部分狀態恢復由各組件自行管理
-        # EntryEvaluator 會在首次評估時自動初始化 line_states
-        # PositionManager 會在首次創建倉位時自動初始化
-        # 這比舊的 God Class 設計更健壯
-
     @property
     def line_states(self) -> Dict[str, Dict[str, Any]]:
         """委託給 EntryEvaluator 的 line_states（用於 EngineWorker 兼容性）
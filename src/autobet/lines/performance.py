@@ -7,15 +7,40 @@
 2. 執行延遲（從決策產生到執行完成）
 3. 端到端延遲（從結果檢測到下注完成）
 4. 統計報告（平均延遲、最大延遲、性能瓶頸）
+
+統計方式（固定記憶體，不保存完整樣本）：
+- 每種操作一個 LatencyHistogram：以奈秒為單位的對數分桶
+  （每個 2 的冪次再切 32 格，相對誤差 ≤ ~3%），分位數在讀取時才計算
+- 平均 / 標準差以 Welford 線上演算法累計
+- 熱路徑 API：token = tracker.begin() / tracker.end(op_type, token)，
+  只用 perf_counter_ns，不建立 operation id 字串與 metadata dict
+- 完整樣本（PerformanceSample）只在 sample_rate > 0 時按比例保留；
+  最慢的前幾筆另外以小型 heap 保留，供 get_slowest_operations 使用
+
+使用範例:
+    >>> tracker = PerformanceTracker()
+    >>> token = tracker.begin()
+    >>> ...
+    >>> tracker.end(PerformanceTracker.OP_DECISION_GENERATION, token)
 """
 
 from __future__ import annotations
 
+import heapq
+import itertools
+import math
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
-from statistics import mean, median, stdev
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# 每個 2 的冪次切成 2^SUB_BUCKET_BITS 格
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+# 最大可表示約 2^63 ns；桶數上限固定
+MAX_BUCKETS = (64 - SUB_BUCKET_BITS + 1) * SUB_BUCKET_COUNT
+
+NS_PER_MS = 1_000_000
 
 
 @dataclass
@@ -25,75 +50,155 @@ class PerformanceSample:
     operation: str  # 操作名稱（例如 "decision_generation"）
     duration_ms: float  # 持續時間（毫秒）
     success: bool = True
-    metadata: Dict[str, any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class LatencyHistogram:
+    """
+    對數分桶直方圖（HDR 風格）
+
+    小於 SUB_BUCKET_COUNT 的值各佔一格；之後每個 2 的冪次區間平均切成
+    SUB_BUCKET_COUNT 格。桶陣列隨最大值增長，上限為 MAX_BUCKETS。
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = []
+        self.total = 0
+
+    @staticmethod
+    def bucket_index(value: int) -> int:
+        if value < SUB_BUCKET_COUNT:
+            return max(0, value)
+        shift = value.bit_length() - 1 - SUB_BUCKET_BITS
+        return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKET_COUNT
+
+    @staticmethod
+    def bucket_bounds(index: int) -> Tuple[int, int]:
+        """桶的 [下界, 上界]（含）"""
+        if index < SUB_BUCKET_COUNT:
+            return index, index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        mantissa = (index & (SUB_BUCKET_COUNT - 1)) + SUB_BUCKET_COUNT
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def add(self, value: int) -> None:
+        index = min(self.bucket_index(value), MAX_BUCKETS - 1)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位數（桶中點），沒有資料時返回 None"""
+        if self.total == 0:
+            return None
+        target = max(1, math.ceil(q * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            if seen >= target:
+                low, high = self.bucket_bounds(index)
+                return (low + high) / 2.0
+        low, high = self.bucket_bounds(len(self.counts) - 1)
+        return (low + high) / 2.0
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self.total = 0
 
 
 @dataclass
 class OperationStats:
-    """操作統計"""
+    """操作統計（內部以奈秒累計，對外屬性為毫秒）"""
     operation: str
     total_count: int = 0
     success_count: int = 0
     failure_count: int = 0
 
-    # 延遲統計（毫秒）
-    total_duration_ms: float = 0.0
-    min_duration_ms: float = float('inf')
-    max_duration_ms: float = 0.0
-    avg_duration_ms: float = 0.0
-    median_duration_ms: float = 0.0
-    std_duration_ms: float = 0.0
-
-    # 百分位數
-    p50_ms: float = 0.0  # 中位數
-    p95_ms: float = 0.0  # 95 百分位
-    p99_ms: float = 0.0  # 99 百分位
-
-    # 最近樣本（用於計算百分位數）
-    recent_samples: deque = field(default_factory=lambda: deque(maxlen=1000))
+    total_ns: int = 0
+    min_ns: Optional[int] = None
+    max_ns: int = 0
+    # Welford 線上平均 / 變異數（奈秒）
+    _mean_ns: float = field(default=0.0, repr=False)
+    _m2: float = field(default=0.0, repr=False)
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
 
     def update(self, duration_ms: float, success: bool = True) -> None:
-        """更新統計"""
+        """更新統計（毫秒）"""
+        self.update_ns(int(duration_ms * NS_PER_MS), success)
+
+    def update_ns(self, duration_ns: int, success: bool = True) -> None:
+        """更新統計（奈秒，熱路徑使用）"""
         self.total_count += 1
         if success:
             self.success_count += 1
         else:
             self.failure_count += 1
 
-        self.total_duration_ms += duration_ms
-        self.min_duration_ms = min(self.min_duration_ms, duration_ms)
-        self.max_duration_ms = max(self.max_duration_ms, duration_ms)
-        self.avg_duration_ms = self.total_duration_ms / self.total_count
+        self.total_ns += duration_ns
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
 
-        # 保存樣本用於計算百分位數
-        self.recent_samples.append(duration_ms)
+        delta = duration_ns - self._mean_ns
+        self._mean_ns += delta / self.total_count
+        self._m2 += delta * (duration_ns - self._mean_ns)
 
-        # 重新計算統計值
-        self._recalculate_stats()
+        self.histogram.add(duration_ns)
 
-    def _recalculate_stats(self) -> None:
-        """重新計算統計值"""
-        if len(self.recent_samples) < 2:
-            return
+    # ------------------------------------------------------------------
+    # 毫秒屬性（讀取時才計算）
+    @property
+    def total_duration_ms(self) -> float:
+        return self.total_ns / NS_PER_MS
 
-        samples = list(self.recent_samples)
-        samples.sort()
+    @property
+    def min_duration_ms(self) -> float:
+        return self.min_ns / NS_PER_MS if self.min_ns is not None else 0.0
 
-        # 中位數
-        self.median_duration_ms = median(samples)
-        self.p50_ms = self.median_duration_ms
+    @property
+    def max_duration_ms(self) -> float:
+        return self.max_ns / NS_PER_MS
 
-        # 95 百分位
-        p95_idx = int(len(samples) * 0.95)
-        self.p95_ms = samples[min(p95_idx, len(samples) - 1)]
+    @property
+    def avg_duration_ms(self) -> float:
+        return self._mean_ns / NS_PER_MS if self.total_count else 0.0
 
-        # 99 百分位
-        p99_idx = int(len(samples) * 0.99)
-        self.p99_ms = samples[min(p99_idx, len(samples) - 1)]
+    @property
+    def std_duration_ms(self) -> float:
+        if self.total_count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.total_count - 1)) / NS_PER_MS
+
+    def quantile_ms(self, q: float) -> float:
+        """分位數（毫秒），結果限制在 [min, max] 內"""
+        value = self.histogram.quantile(q)
+        if value is None:
+            return 0.0
+        value = min(max(value, self.min_ns or 0), self.max_ns)
+        return value / NS_PER_MS
+
+    @property
+    def median_duration_ms(self) -> float:
+        return self.quantile_ms(0.50)
 
-        # 標準差
-        if len(samples) >= 2:
-            self.std_duration_ms = stdev(samples)
+    @property
+    def p50_ms(self) -> float:
+        return self.quantile_ms(0.50)
+
+    @property
+    def p95_ms(self) -> float:
+        return self.quantile_ms(0.95)
+
+    @property
+    def p99_ms(self) -> float:
+        return self.quantile_ms(0.99)
 
     def get_success_rate(self) -> float:
         """獲取成功率"""
@@ -109,7 +214,7 @@ class OperationStats:
             "success_count": self.success_count,
             "failure_count": self.failure_count,
             "success_rate": self.get_success_rate(),
-            "min_duration_ms": self.min_duration_ms if self.min_duration_ms != float('inf') else 0,
+            "min_duration_ms": self.min_duration_ms,
             "max_duration_ms": self.max_duration_ms,
             "avg_duration_ms": self.avg_duration_ms,
             "median_duration_ms": self.median_duration_ms,
@@ -135,34 +240,130 @@ class PerformanceTracker:
     OP_CONFLICT_RESOLUTION = "conflict_resolution"  # 衝突解決
     OP_CAPITAL_ALLOCATION = "capital_allocation"  # 資金分配
 
-    def __init__(self, max_history: int = 10000) -> None:
+    def __init__(
+        self,
+        max_history: int = 10000,
+        *,
+        sample_rate: float = 0.0,
+        slowest_capacity: int = 20,
+    ) -> None:
         """
         初始化性能追蹤器
 
         Args:
-            max_history: 最大歷史樣本數量
+            max_history: 保留樣本的最大數量（僅 sample_rate > 0 時使用）
+            sample_rate: 保留完整樣本的比例（0 不保留，1 全部保留）
+            slowest_capacity: 另外保留的最慢樣本數
         """
         self.stats: Dict[str, OperationStats] = {}
-        self.samples: deque = deque(maxlen=max_history)
+        self.samples: Deque[PerformanceSample] = deque(maxlen=max_history)
+        self.sample_rate = 0.0
+        self._sample_every = 0
+        self._sample_counter = 0
+        self.set_sample_rate(sample_rate)
+
+        self.slowest_capacity = slowest_capacity
+        self._slowest: List[Tuple[int, int, PerformanceSample]] = []  # min-heap (duration_ns, seq, sample)
+        self._seq = itertools.count()
+
+        # 相容舊 API：operation_id -> perf_counter_ns
+        self.pending_operations: Dict[str, int] = {}
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        """設定完整樣本保留比例（以固定間隔取樣，不使用亂數）"""
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self._sample_every = round(1.0 / self.sample_rate) if self.sample_rate > 0 else 0
+        self._sample_counter = 0
+
+    # ------------------------------------------------------------------
+    # 熱路徑 API
+    @staticmethod
+    def begin() -> int:
+        """開始計時，返回 token（perf_counter_ns）"""
+        return time.perf_counter_ns()
+
+    def end(
+        self,
+        operation_type: str,
+        token: int,
+        success: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """
+        結束計時並記錄
+
+        Args:
+            operation_type: 操作類型（例如 OP_DECISION_GENERATION）
+            token: begin() 的返回值
+            success: 是否成功
+            metadata: 附加元數據（只有被保留為樣本時才使用）
 
-        # 當前進行中的操作（用於計算端到端延遲）
-        self.pending_operations: Dict[str, float] = {}  # operation_id -> start_time
+        Returns:
+            延遲時間（毫秒）
+        """
+        duration_ns = time.perf_counter_ns() - token
+        self._record_ns(operation_type, duration_ns, success, metadata)
+        return duration_ns / NS_PER_MS
+
+    def _record_ns(
+        self,
+        operation_type: str,
+        duration_ns: int,
+        success: bool,
+        metadata: Optional[Dict[str, Any]],
+    ) -> None:
+        stats = self.stats.get(operation_type)
+        if stats is None:
+            stats = self.stats[operation_type] = OperationStats(operation=operation_type)
+        stats.update_ns(duration_ns, success)
+
+        keep = False
+        if self._sample_every:
+            self._sample_counter += 1
+            if self._sample_counter >= self._sample_every:
+                self._sample_counter = 0
+                keep = True
+        slow = self.slowest_capacity > 0 and (
+            len(self._slowest) < self.slowest_capacity or duration_ns > self._slowest[0][0]
+        )
+        if not keep and not slow:
+            return
 
+        sample = PerformanceSample(
+            timestamp=time.time(),
+            operation=operation_type,
+            duration_ms=duration_ns / NS_PER_MS,
+            success=success,
+            metadata=metadata or {},
+        )
+        if keep:
+            self.samples.append(sample)
+        if slow:
+            entry = (duration_ns, next(self._seq), sample)
+            if len(self._slowest) < self.slowest_capacity:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heapreplace(self._slowest, entry)
+
+    # ------------------------------------------------------------------
+    # 相容 API（以字串 id 配對）
     def start_operation(self, operation_id: str) -> None:
         """
         開始一個操作（用於計算延遲）
 
+        熱路徑請改用 begin() / end()，避免建立 id 字串。
+
         Args:
             operation_id: 操作唯一標識（例如 "decision_main_001"）
         """
-        self.pending_operations[operation_id] = time.time()
+        self.pending_operations[operation_id] = time.perf_counter_ns()
 
     def end_operation(
         self,
         operation_id: str,
         operation_type: str,
         success: bool = True,
-        metadata: Optional[Dict[str, any]] = None
+        metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[float]:
         """
         結束一個操作並記錄延遲
@@ -176,36 +377,17 @@ class PerformanceTracker:
         Returns:
             延遲時間（毫秒），如果操作未開始則返回 None
         """
-        if operation_id not in self.pending_operations:
+        token = self.pending_operations.pop(operation_id, None)
+        if token is None:
             return None
-
-        start_time = self.pending_operations.pop(operation_id)
-        duration_ms = (time.time() - start_time) * 1000.0
-
-        # 記錄樣本
-        sample = PerformanceSample(
-            timestamp=time.time(),
-            operation=operation_type,
-            duration_ms=duration_ms,
-            success=success,
-            metadata=metadata or {}
-        )
-        self.samples.append(sample)
-
-        # 更新統計
-        if operation_type not in self.stats:
-            self.stats[operation_type] = OperationStats(operation=operation_type)
-
-        self.stats[operation_type].update(duration_ms, success)
-
-        return duration_ms
+        return self.end(operation_type, token, success, metadata)
 
     def record_instant(
         self,
         operation_type: str,
         duration_ms: float,
         success: bool = True,
-        metadata: Optional[Dict[str, any]] = None
+        metadata: Optional[Dict[str, Any]] = None
     ) -> None:
         """
         直接記錄一個瞬時操作（不需要 start/end）
@@ -216,22 +398,9 @@ class PerformanceTracker:
             success: 是否成功
             metadata: 附加元數據
         """
-        # 記錄樣本
-        sample = PerformanceSample(
-            timestamp=time.time(),
-            operation=operation_type,
-            duration_ms=duration_ms,
-            success=success,
-            metadata=metadata or {}
-        )
-        self.samples.append(sample)
-
-        # 更新統計
-        if operation_type not in self.stats:
-            self.stats[operation_type] = OperationStats(operation=operation_type)
-
-        self.stats[operation_type].update(duration_ms, success)
+        self._record_ns(operation_type, int(duration_ms * NS_PER_MS), success, metadata)
 
+    # ------------------------------------------------------------------
     def get_stats(self, operation_type: str) -> Optional[OperationStats]:
         """
         獲取操作統計
@@ -250,7 +419,7 @@ class PerformanceTracker:
 
     def get_recent_samples(self, operation_type: Optional[str] = None, limit: int = 100) -> List[PerformanceSample]:
         """
-        獲取最近的樣本
+        獲取最近保留的樣本（sample_rate 為 0 時為空）
 
         Args:
             operation_type: 操作類型（None 表示所有類型）
@@ -275,6 +444,7 @@ class PerformanceTracker:
         return {
             "total_operations": sum(s.total_count for s in self.stats.values()),
             "total_samples": len(self.samples),
+            "sample_rate": self.sample_rate,
             "operations": {
                 op_type: stats.to_dict()
                 for op_type, stats in self.stats.items()
@@ -304,7 +474,7 @@ class PerformanceTracker:
 
     def get_slowest_operations(self, limit: int = 10) -> List[PerformanceSample]:
         """
-        獲取最慢的操作樣本
+        獲取最慢的操作樣本（最多 slowest_capacity 筆，不受 sample_rate 影響）
 
         Args:
             limit: 最大返回數量
@@ -312,24 +482,19 @@ class PerformanceTracker:
         Returns:
             樣本列表，按持續時間降序排列
         """
-        sorted_samples = sorted(self.samples, key=lambda s: s.duration_ms, reverse=True)
-        return sorted_samples[:limit]
+        return [sample for _, _, sample in heapq.nlargest(limit, self._slowest)]
 
     def clear(self) -> None:
         """清空所有統計和樣本"""
         self.stats.clear()
         self.samples.clear()
+        self._slowest.clear()
         self.pending_operations.clear()
 
     def reset_stats(self) -> None:
-        """重置統計（保留最近的樣本）"""
+        """重置統計（保留已取樣的樣本；直方圖不保存原始資料，無法回算）"""
         self.stats.clear()
-
-        # 從樣本重新計算統計
-        for sample in self.samples:
-            if sample.operation not in self.stats:
-                self.stats[sample.operation] = OperationStats(operation=sample.operation)
-            self.stats[sample.operation].update(sample.duration_ms, sample.success)
+        self._slowest.clear()
 
     def print_report(self) -> None:
         """打印性能報告（用於調試）"""
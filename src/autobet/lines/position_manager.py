@@ -18,7 +18,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from .state import LayerOutcome
 from src.autobet.payout_manager import PayoutManager
@@ -47,6 +47,32 @@ class PendingPosition:
             "timestamp": self.timestamp,
         }
 
+    def to_row(self) -> List[Any]:
+        """轉換為緊湊陣列（狀態持久化用，欄位順序與建構子一致）"""
+        return [
+            self.table_id,
+            self.round_id,
+            self.strategy_key,
+            self.direction,
+            self.amount,
+            self.layer_index,
+            self.timestamp,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "PendingPosition":
+        """從 to_row() 的輸出重建倉位"""
+        table_id, round_id, strategy_key, direction, amount, layer_index, timestamp = row
+        return cls(
+            table_id=table_id,
+            round_id=round_id,
+            strategy_key=strategy_key,
+            direction=direction,
+            amount=float(amount),
+            layer_index=int(layer_index),
+            timestamp=float(timestamp),
+        )
+
 
 @dataclass
 class SettlementResult:
@@ -533,6 +559,40 @@ class PositionManager:
         self.tracker.active_positions.clear()
         return count
 
+    # ===== 狀態持久化 =====
+
+    def export_state(self) -> Dict[str, Any]:
+        """匯出待處理倉位和結算歷史（用於會話恢復）
+
+        Returns:
+            {"pending": [position_row, ...],
+             "history": [[outcome, pnl_delta, position_row], ...]}
+        """
+        return {
+            "pending": [pos.to_row() for pos in self._pending.values()],
+            "history": [
+                [result.outcome.value, result.pnl_delta, result.position.to_row()]
+                for result in self._settlement_history
+            ],
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """從 export_state() 的輸出恢復狀態（會覆蓋當前倉位）"""
+        self.clear_all_positions()
+        for row in data.get("pending") or []:
+            position = PendingPosition.from_row(row)
+            self._pending[(position.table_id, position.round_id, position.strategy_key)] = position
+            self.tracker.add_position(position.table_id, position.strategy_key, position.amount)
+
+        self._settlement_history = [
+            SettlementResult(
+                outcome=LayerOutcome(outcome),
+                pnl_delta=float(pnl_delta),
+                position=PendingPosition.from_row(row),
+            )
+            for outcome, pnl_delta, row in (data.get("history") or [])
+        ][-self._max_history:]
+
     # ===== 快照和統計 =====
 
     def snapshot(self) -> Dict:
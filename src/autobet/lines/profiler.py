@@ -0,0 +1,246 @@
+# src/autobet/lines/profiler.py
+"""
+決策熱路徑分析器（lines/* 專用）
+
+平時關閉，不影響決策路徑；開啟後收集 lines/* 內函數的耗時，
+輸出 flamegraph 相容的 folded stacks（每行 "a;b;c 數值"，
+可直接給 flamegraph.pl、speedscope、inferno 使用）。
+
+兩種模式：
+- sample（預設）：背景執行緒每 interval_ms 讀取 sys._current_frames()，
+  只記錄 lines/* 的堆疊；不插入任何 hook，可從任何執行緒開關，
+  數值為樣本數（× interval_ms ≈ 耗時）
+- trace：sys.setprofile / threading.setprofile 記錄每次呼叫的精確耗時，
+  只作用於呼叫 start() 的執行緒與之後建立的執行緒；
+  數值為 self time（微秒）。會讓所有 Python 呼叫變慢，只適合短時間量測
+
+使用範例:
+    >>> profiler = orchestrator.start_profiling(mode="sample")
+    >>> ...
+    >>> orchestrator.stop_profiling("data/profiles/lines.folded")
+    >>> profiler.function_stats()
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+MODE_SAMPLE = "sample"
+MODE_TRACE = "trace"
+
+LINES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Stack = Tuple[str, ...]
+
+
+class HotPathProfiler:
+    """lines/* 熱路徑分析器"""
+
+    def __init__(
+        self,
+        *,
+        mode: str = MODE_SAMPLE,
+        interval_ms: float = 1.0,
+        roots: Optional[Sequence[str]] = None,
+        max_depth: int = 64,
+    ) -> None:
+        """
+        Args:
+            mode: "sample" 或 "trace"
+            interval_ms: sample 模式的取樣間隔
+            roots: 要記錄的原始碼目錄（預設為 lines/ 本身）
+            max_depth: sample 模式往上追溯的最大堆疊深度
+        """
+        if mode not in (MODE_SAMPLE, MODE_TRACE):
+            raise ValueError(f"unknown profiling mode: {mode}")
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.roots = tuple(os.path.abspath(root) for root in (roots or (LINES_DIR,)))
+        self.max_depth = max_depth
+
+        # 堆疊 -> 數值（sample: 樣本數；trace: self time 奈秒）
+        self.stacks: Dict[Stack, int] = {}
+        # 函數 -> [呼叫數 / 樣本數, 總耗時 ns / 含子呼叫樣本數, self 耗時 ns / self 樣本數]
+        self.functions: Dict[str, List[int]] = {}
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+
+        self._labels: Dict[Any, Optional[str]] = {}  # code -> label（非目標為 None）
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._tls = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # ------------------------------------------------------------------
+    def start(self) -> "HotPathProfiler":
+        if self._running:
+            return self
+        self._running = True
+        self.started_at = time.perf_counter()
+        if self.mode == MODE_TRACE:
+            threading.setprofile(self._trace)
+            sys.setprofile(self._trace)
+        else:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="HotPathProfiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> "HotPathProfiler":
+        if not self._running:
+            return self
+        self._running = False
+        if self.mode == MODE_TRACE:
+            sys.setprofile(None)
+            threading.setprofile(None)
+        else:
+            self._stop_event.set()
+            if self._thread is not None and self._thread is not threading.current_thread():
+                self._thread.join(1.0)
+            self._thread = None
+        if self.started_at is not None:
+            self.elapsed += time.perf_counter() - self.started_at
+            self.started_at = None
+        return self
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+            self.functions.clear()
+            self.samples = 0
+            self.elapsed = 0.0
+
+    # ------------------------------------------------------------------
+    def _label(self, code: Any) -> Optional[str]:
+        label = self._labels.get(code, False)
+        if label is not False:
+            return label
+        filename = os.path.abspath(code.co_filename)
+        label = None
+        if filename.startswith(self.roots):
+            module = os.path.splitext(os.path.basename(filename))[0]
+            label = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+        self._labels[code] = label
+        return label
+
+    def _trace(self, frame: Any, event: str, arg: Any) -> None:
+        if event == "call":
+            label = self._label(frame.f_code)
+            if label is None:
+                return
+            stack = getattr(self._tls, "stack", None)
+            if stack is None:
+                stack = self._tls.stack = []
+            path = (stack[-1][1] + (label,)) if stack else (label,)
+            # [frame, 路徑, 開始時間, 子呼叫耗時]
+            stack.append([frame, path, time.perf_counter_ns(), 0])
+        elif event == "return":
+            stack = getattr(self._tls, "stack", None)
+            if not stack or stack[-1][0] is not frame:
+                return
+            _, path, started, children = stack.pop()
+            elapsed = time.perf_counter_ns() - started
+            own = elapsed - children
+            if stack:
+                stack[-1][3] += elapsed
+            with self._lock:
+                self.stacks[path] = self.stacks.get(path, 0) + own
+                entry = self.functions.get(path[-1])
+                if entry is None:
+                    entry = self.functions[path[-1]] = [0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += own
+
+    def _sample_loop(self) -> None:
+        interval = self.interval_ms / 1000.0
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(interval):
+            frames = sys._current_frames()
+            with self._lock:
+                self.samples += 1
+                for ident, frame in frames.items():
+                    if ident == own_ident:
+                        continue
+                    labels: List[str] = []
+                    depth = 0
+                    while frame is not None and depth < self.max_depth:
+                        label = self._label(frame.f_code)
+                        if label is not None:
+                            labels.append(label)
+                        frame = frame.f_back
+                        depth += 1
+                    if not labels:
+                        continue
+                    path = tuple(reversed(labels))
+                    self.stacks[path] = self.stacks.get(path, 0) + 1
+                    for label in set(labels):
+                        entry = self.functions.get(label)
+                        if entry is None:
+                            entry = self.functions[label] = [0, 0, 0]
+                        entry[0] += 1
+                        entry[1] += 1
+                    self.functions[labels[0]][2] += 1
+            del frames
+
+    # ------------------------------------------------------------------
+    def folded(self) -> List[str]:
+        """flamegraph folded stacks（trace 模式數值為微秒）"""
+        with self._lock:
+            items = list(self.stacks.items())
+        lines = []
+        for path, value in sorted(items):
+            if self.mode == MODE_TRACE:
+                value = value // 1000
+            if value > 0:
+                lines.append(f"{';'.join(path)} {value}")
+        return lines
+
+    def write_folded(self, path: Union[str, Path]) -> Path:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("\n".join(self.folded()) + "\n", encoding="utf-8")
+        return target
+
+    def function_stats(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """每個函數的耗時統計，依 self 耗時降序"""
+        with self._lock:
+            items = [(label, list(entry)) for label, entry in self.functions.items()]
+        rows = []
+        for label, (count, total, own) in items:
+            if self.mode == MODE_TRACE:
+                rows.append({
+                    "function": label,
+                    "calls": count,
+                    "total_ms": total / 1e6,
+                    "self_ms": own / 1e6,
+                })
+            else:
+                rows.append({
+                    "function": label,
+                    "samples": count,
+                    "total_ms": total * self.interval_ms,
+                    "self_ms": own * self.interval_ms,
+                })
+        rows.sort(key=lambda row: row["self_ms"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "running": self._running,
+            "elapsed_sec": round(self.elapsed, 3),
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "top": self.function_stats(limit=10),
+        }
@@ -0,0 +1,315 @@
+# src/autobet/lines/risk.py
+"""
+風控協調模組
+
+依 StrategyRiskConfig.levels 執行止盈 / 止損 / 連輸限制，範圍（RiskScope）：
+- GLOBAL_DAY:          全部下注
+- TABLE:               同一桌（所有策略）
+- TABLE_STRATEGY:      同一桌的同一策略
+- ALL_TABLES_STRATEGY: 同一策略跨桌
+- MULTI_STRATEGY:      metadata["risk_group"] 相同的策略群組（未設定時等同策略本身）
+
+資料結構：
+- 每個範圍一個 ScopeTracker（PnL、峰值、回撤、連輸），以 tuple 為 key 放在 dict
+- 每次結算只更新該筆結算涉及的範圍（固定 4~5 個），並只評估掛在這些範圍上的層級
+- (strategy, table) 對應的範圍 key 快取起來；凍結中的範圍放在 _frozen，
+  is_blocked 只做常數次 dict 查詢（沒有凍結時直接返回）
+- 冷卻到期以 heap 管理，refresh() 只彈出已到期的項目
+- GLOBAL_DAY 只累計當天（本地時間）：refresh() 跨過午夜時重置該範圍並解除其凍結，
+  restore_state 不恢復前一天的 GLOBAL_DAY 狀態
+"""
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import RiskLevelAction, RiskLevelConfig, RiskScope, StrategyDefinition
+from .state import LayerOutcome
+
+ScopeKey = Tuple[str, ...]
+
+GLOBAL_SCOPE: ScopeKey = (RiskScope.GLOBAL_DAY.value,)
+
+
+@dataclass
+class ScopeTracker:
+    """單一範圍的累計狀態"""
+    pnl: float = 0.0
+    peak_pnl: float = 0.0
+    loss_streak: int = 0
+    max_loss_streak: int = 0
+    wins: int = 0
+    losses: int = 0
+    frozen_until: Optional[float] = None
+    frozen_action: Optional[RiskLevelAction] = None
+
+    @property
+    def drawdown(self) -> float:
+        """從峰值回落的金額"""
+        return self.peak_pnl - self.pnl
+
+    def apply(self, pnl_delta: float, outcome: LayerOutcome) -> None:
+        self.pnl += pnl_delta
+        if self.pnl > self.peak_pnl:
+            self.peak_pnl = self.pnl
+        if outcome == LayerOutcome.LOSS:
+            self.losses += 1
+            self.loss_streak += 1
+            if self.loss_streak > self.max_loss_streak:
+                self.max_loss_streak = self.loss_streak
+        elif outcome == LayerOutcome.WIN:
+            self.wins += 1
+            self.loss_streak = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pnl": round(self.pnl, 2),
+            "peak_pnl": round(self.peak_pnl, 2),
+            "drawdown": round(self.drawdown, 2),
+            "loss_streak": self.loss_streak,
+            "max_loss_streak": self.max_loss_streak,
+            "wins": self.wins,
+            "losses": self.losses,
+            "frozen": bool(self.frozen_action),
+            "frozen_action": self.frozen_action.value if self.frozen_action else None,
+            "frozen_until": self.frozen_until,
+        }
+
+
+@dataclass
+class RiskEvent:
+    """風控層級觸發"""
+    scope_key: ScopeKey
+    level: RiskLevelConfig
+    action: RiskLevelAction
+    strategy_key: str
+
+    def __str__(self) -> str:
+        return f"{':'.join(self.scope_key)} {self.action.value}"
+
+
+def day_bounds(timestamp: float) -> Tuple[str, float]:
+    """本地日期字串與下一個午夜的時間戳"""
+    local = time.localtime(timestamp)
+    day = time.strftime("%Y-%m-%d", local)
+    next_midnight = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return day, next_midnight
+
+
+def scope_key(scope: RiskScope, strategy_key: str, table_id: str, metadata: Optional[Dict[str, Any]]) -> ScopeKey:
+    """範圍 key（snapshot 中以 ':' 連接，例如 "table:T1"）"""
+    if scope == RiskScope.GLOBAL_DAY:
+        return GLOBAL_SCOPE
+    if scope == RiskScope.TABLE:
+        return (scope.value, table_id)
+    if scope == RiskScope.TABLE_STRATEGY:
+        return (scope.value, table_id, strategy_key)
+    if scope == RiskScope.ALL_TABLES_STRATEGY:
+        return (scope.value, strategy_key)
+    group = (metadata or {}).get("risk_group") or strategy_key
+    return (RiskScope.MULTI_STRATEGY.value, str(group))
+
+
+class RiskCoordinator:
+    """風控協調器"""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self._levels: Dict[str, List[RiskLevelConfig]] = {}  # strategy_key -> 層級（依範圍排序）
+        self._trackers: Dict[ScopeKey, ScopeTracker] = {}
+        # (strategy_key, table_id) -> 該組合涉及的範圍 key
+        self._scope_cache: Dict[Tuple[str, str], Tuple[ScopeKey, ...]] = {}
+        # 範圍 key -> 掛在其上的 (strategy_key, level)
+        self._levels_by_scope: Dict[ScopeKey, List[Tuple[str, RiskLevelConfig]]] = {}
+        self._bound: Set[Tuple[str, str]] = set()
+        self._frozen: Dict[ScopeKey, ScopeTracker] = {}
+        self._expiry: List[Tuple[float, ScopeKey]] = []
+        self._notified: Set[Tuple[ScopeKey, int]] = set()
+        self.day, self._day_ends_at = day_bounds(self.clock())
+
+    def register_strategy(self, definition: StrategyDefinition) -> None:
+        key = definition.strategy_key
+        self._levels[key] = definition.risk.sorted_levels()
+        # 策略定義變更時重建該策略的範圍綁定
+        for cache_key in [k for k in self._scope_cache if k[0] == key]:
+            del self._scope_cache[cache_key]
+            self._bound.discard(cache_key)
+        for attached in self._levels_by_scope.values():
+            attached[:] = [(sk, level) for sk, level in attached if sk != key]
+
+    # ------------------------------------------------------------------
+    def _scopes(self, strategy_key: str, table_id: str, metadata: Optional[Dict[str, Any]]) -> Tuple[ScopeKey, ...]:
+        cache_key = (strategy_key, table_id)
+        scopes = self._scope_cache.get(cache_key)
+        if scopes is not None:
+            return scopes
+
+        keys = [scope_key(scope, strategy_key, table_id, metadata) for scope in RiskScope]
+        scopes = tuple(dict.fromkeys(keys))
+        self._scope_cache[cache_key] = scopes
+
+        if cache_key not in self._bound:
+            self._bound.add(cache_key)
+            for level in self._levels.get(strategy_key, ()):
+                target = scope_key(level.scope, strategy_key, table_id, metadata)
+                attached = self._levels_by_scope.setdefault(target, [])
+                if not any(sk == strategy_key and lvl is level for sk, lvl in attached):
+                    attached.append((strategy_key, level))
+        return scopes
+
+    def is_blocked(self, strategy_key: str, table_id: str, metadata: Optional[Dict[str, Any]]) -> bool:
+        """策略在該桌是否被任一凍結中的範圍封鎖"""
+        if not self._frozen:
+            return False
+        now = None
+        for key in self._scopes(strategy_key, table_id, metadata):
+            tracker = self._frozen.get(key)
+            if tracker is None:
+                continue
+            if tracker.frozen_until is not None:
+                now = self.clock() if now is None else now
+                if now >= tracker.frozen_until:
+                    self._unfreeze(key)
+                    continue
+            return True
+        return False
+
+    def refresh(self) -> None:
+        """解除冷卻已到期的凍結；跨日時重置 GLOBAL_DAY"""
+        now = self.clock()
+        if now >= self._day_ends_at:
+            self._roll_day(now)
+        while self._expiry and self._expiry[0][0] <= now:
+            until, key = heapq.heappop(self._expiry)
+            tracker = self._frozen.get(key)
+            if tracker is not None and tracker.frozen_until == until:
+                self._unfreeze(key)
+
+    def record(
+        self,
+        strategy_key: str,
+        table_id: str,
+        pnl_delta: float,
+        outcome: LayerOutcome,
+        metadata: Optional[Dict[str, Any]],
+    ) -> List[RiskEvent]:
+        """記錄一筆結算，返回觸發的風控事件"""
+        events: List[RiskEvent] = []
+        for key in self._scopes(strategy_key, table_id, metadata):
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = ScopeTracker()
+            tracker.apply(pnl_delta, outcome)
+            for owner, level in self._levels_by_scope.get(key, ()):
+                event = self._evaluate(key, tracker, owner, level)
+                if event:
+                    events.append(event)
+        return events
+
+    # ------------------------------------------------------------------
+    def _evaluate(self, key: ScopeKey, tracker: ScopeTracker, owner: str, level: RiskLevelConfig) -> Optional[RiskEvent]:
+        hit = (
+            (level.take_profit is not None and tracker.pnl >= level.take_profit)
+            or (level.stop_loss is not None and tracker.pnl <= level.stop_loss)
+            or (level.max_drawdown_losses is not None and tracker.loss_streak >= level.max_drawdown_losses)
+        )
+        if level.action == RiskLevelAction.NOTIFY:
+            # 只通知不凍結；條件成立時通知一次，條件解除後可再次通知
+            marker = (key, id(level))
+            if not hit:
+                self._notified.discard(marker)
+                return None
+            if marker in self._notified:
+                return None
+            self._notified.add(marker)
+            return RiskEvent(key, level, level.action, owner)
+
+        target = GLOBAL_SCOPE if level.action == RiskLevelAction.STOP_ALL else key
+        if not hit or target in self._frozen:
+            return None
+        self._freeze(target, level)
+        return RiskEvent(target, level, level.action, owner)
+
+    def _freeze(self, key: ScopeKey, level: RiskLevelConfig) -> None:
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = ScopeTracker()
+        tracker.frozen_action = level.action
+        tracker.frozen_until = self.clock() + level.cooldown_sec if level.cooldown_sec else None
+        self._frozen[key] = tracker
+        if tracker.frozen_until is not None:
+            heapq.heappush(self._expiry, (tracker.frozen_until, key))
+
+    def _unfreeze(self, key: ScopeKey) -> None:
+        tracker = self._frozen.pop(key, None)
+        if tracker is not None:
+            tracker.frozen_action = None
+            tracker.frozen_until = None
+
+    def _roll_day(self, now: float) -> None:
+        """換日：GLOBAL_DAY 重新累計並解除其凍結（含無冷卻的 STOP_ALL）"""
+        self.day, self._day_ends_at = day_bounds(now)
+        self._unfreeze(GLOBAL_SCOPE)
+        self._trackers.pop(GLOBAL_SCOPE, None)
+        self._notified = {marker for marker in self._notified if marker[0] != GLOBAL_SCOPE}
+
+    def unfreeze_all(self) -> None:
+        """手動解除所有凍結（換日由 refresh() 自動處理 GLOBAL_DAY）"""
+        for key in list(self._frozen):
+            self._unfreeze(key)
+        self._expiry.clear()
+
+    # ------------------------------------------------------------------
+    @property
+    def net_pnl(self) -> float:
+        """所有結算的累計 PnL（GLOBAL_DAY 範圍）"""
+        tracker = self._trackers.get(GLOBAL_SCOPE)
+        return tracker.pnl if tracker else 0.0
+
+    def get_tracker(self, key: ScopeKey) -> Optional[ScopeTracker]:
+        return self._trackers.get(key)
+
+    def frozen_scopes(self) -> List[str]:
+        return [":".join(key) for key in self._frozen]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """風控狀態快照：{"global_day": {...}, "table:T1": {...}, ...}"""
+        return {":".join(key): tracker.to_dict() for key, tracker in self._trackers.items()}
+
+    def export_state(self) -> Dict[str, Dict[str, Any]]:
+        state = self.snapshot()
+        global_key = ":".join(GLOBAL_SCOPE)
+        if global_key in state:
+            state[global_key]["day"] = self.day
+        return state
+
+    def restore_state(self, state: Dict[str, Dict[str, Any]]) -> None:
+        self._trackers.clear()
+        self._frozen.clear()
+        self._expiry.clear()
+        self._notified.clear()
+        self.day, self._day_ends_at = day_bounds(self.clock())
+        if not isinstance(state, dict):
+            return
+        for key_str, payload in state.items():
+            key = tuple(key_str.split(":"))
+            if key == GLOBAL_SCOPE and payload.get("day") != self.day:
+                continue  # 前一天（或未記錄日期）的 GLOBAL_DAY 累計與凍結不延續
+            tracker = ScopeTracker(
+                pnl=float(payload.get("pnl") or 0.0),
+                peak_pnl=float(payload.get("peak_pnl") or 0.0),
+                loss_streak=int(payload.get("loss_streak") or 0),
+                max_loss_streak=int(payload.get("max_loss_streak") or 0),
+                wins=int(payload.get("wins") or 0),
+                losses=int(payload.get("losses") or 0),
+            )
+            self._trackers[key] = tracker
+            action = payload.get("frozen_action")
+            if action:
+                tracker.frozen_action = RiskLevelAction(action)
+                tracker.frozen_until = payload.get("frozen_until")
+                self._frozen[key] = tracker
+                if tracker.frozen_until is not None:
+                    heapq.heappush(self._expiry, (tracker.frozen_until, key))
@@ -2,7 +2,7 @@
 import collections
 import time
 from dataclasses import dataclass
-from typing import Deque, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from .config import DedupMode, EntryConfig
 
@@ -33,6 +33,30 @@ class SignalTracker:
         while len(deque) > 20:
             deque.popleft()
 
+    def export_state(self) -> Dict[str, Any]:
+        """匯出歷史與去重狀態（用於會話恢復）"""
+        return {
+            "history": {
+                table_id: [[winner, ts] for winner, ts in dq]
+                for table_id, dq in self.history.items()
+                if dq
+            },
+            "last_trigger": dict(self.last_trigger),
+            "pattern_end": dict(self.last_trigger_pattern_end_time),
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """從 export_state() 的輸出恢復狀態"""
+        self.history.clear()
+        for table_id, rows in (data.get("history") or {}).items():
+            self.history[table_id] = collections.deque(
+                (str(winner), float(ts)) for winner, ts in rows[-20:]
+            )
+        self.last_trigger = dict(data.get("last_trigger") or {})
+        self.last_trigger_pattern_end_time = {
+            table_id: float(ts) for table_id, ts in (data.get("pattern_end") or {}).items()
+        }
+
     def should_trigger(self, table_id: str, current_round_id: str, state_timestamp: float) -> bool:
         pattern = self.config.pattern
         required_seq = self._pattern_sequence(pattern)
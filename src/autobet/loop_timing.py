@@ -0,0 +1,189 @@
+# src/autobet/loop_timing.py
+"""
+固定頻率迴圈計時
+
+問題：引擎 tick（120ms）、結果檢測（200ms）、Dashboard overlay 檢測（120ms）
+都是 time.sleep(固定值) 或 QTimer，睡眠時間不扣除工作時間，週期會漂移；
+截圖 + 檢測超過間隔時也沒有人知道。
+
+設計：
+- LoopTimer 以「排程時間」推進（next_deadline += interval），
+  每輪只睡到下一個排程點，工作時間不會累積成漂移
+- 工作超過預算（預設 = 間隔）計為 overrun；落後超過一整個週期時跳過
+  錯過的排程點（skipped），不連續補跑
+- 統計 jitter（實際開始 - 排程時間）、工作時間、實際頻率（effective Hz），
+  取最近 window 輪；停止後重新啟動時統計視窗重新開始（累計次數保留）
+- 建立的 LoopTimer 以名稱登記，HealthChecker._check_performance 透過
+  loop_stats() 讀取
+
+使用範例:
+    >>> loop = LoopTimer("engine.tick", 0.12)
+    >>> while not stop.is_set():
+    ...     start = loop.begin()
+    ...     tick()
+    ...     stop.wait(loop.end(start))
+    >>> loop.stats()["effective_hz"]
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+_registry: "weakref.WeakValueDictionary[str, LoopTimer]" = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopTimer:
+    """固定頻率迴圈的排程與統計（threading 迴圈或單次 QTimer 皆可使用）"""
+
+    def __init__(
+        self,
+        name: str,
+        interval_s: float,
+        *,
+        budget_s: Optional[float] = None,
+        window: int = 256,
+        clock: Callable[[], float] = time.perf_counter,
+        register: bool = True,
+    ) -> None:
+        """
+        Args:
+            name: 迴圈名稱（健康檢查以此區分）
+            interval_s: 目標週期（秒）
+            budget_s: 單輪工作時間預算，超過計為 overrun（預設等於週期）
+            window: jitter / 工作時間 / 頻率統計保留的輪數
+        """
+        self.name = name
+        self.interval_s = interval_s
+        self.budget_s = budget_s if budget_s is not None else interval_s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_deadline: Optional[float] = None
+
+        self.iterations = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_jitter_s = 0.0
+        self.max_work_s = 0.0
+        self.active = False
+        self._starts: Deque[float] = deque(maxlen=window)
+        self._jitter: Deque[float] = deque(maxlen=window)
+        self._work: Deque[float] = deque(maxlen=window)
+
+        if register:
+            with _registry_lock:
+                _registry[name] = self
+
+    # ------------------------------------------------------------------
+    def begin(self) -> float:
+        """一輪開始，返回開始時間（交給 end）"""
+        start = self.clock()
+        with self._lock:
+            if self._next_deadline is None:
+                # (重新)啟動的第一輪：清空統計視窗，頻率不跨停止期間計算
+                self._next_deadline = start
+                self._starts.clear()
+                self._jitter.clear()
+                self._work.clear()
+            jitter = abs(start - self._next_deadline)
+            self.active = True
+            self._starts.append(start)
+            self._jitter.append(jitter)
+            if jitter > self.max_jitter_s:
+                self.max_jitter_s = jitter
+        return start
+
+    def end(self, start: float) -> float:
+        """一輪結束，返回距離下一個排程點應等待的秒數"""
+        now = self.clock()
+        work = now - start
+        with self._lock:
+            self.iterations += 1
+            self._work.append(work)
+            if work > self.max_work_s:
+                self.max_work_s = work
+            if work > self.budget_s:
+                self.overruns += 1
+
+            self._next_deadline += self.interval_s
+            if now > self._next_deadline:
+                missed = int((now - self._next_deadline) / self.interval_s) + 1
+                self.skipped += missed
+                self._next_deadline += missed * self.interval_s
+            return max(0.0, self._next_deadline - now)
+
+    def run(self, step: Callable[[], Any], stop_event: threading.Event) -> None:
+        """以固定頻率執行 step 直到 stop_event 被設置（step 的例外會向外拋出）"""
+        self._next_deadline = None
+        try:
+            while not stop_event.is_set():
+                start = self.begin()
+                step()
+                stop_event.wait(self.end(start))
+        finally:
+            self.active = False
+
+    def stop(self) -> None:
+        """標記迴圈已停止（統計保留到下次啟動，健康檢查不再評估頻率）"""
+        self.active = False
+        self._next_deadline = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next_deadline = None
+            self.iterations = self.overruns = self.skipped = 0
+            self.max_jitter_s = self.max_work_s = 0.0
+            self._starts.clear()
+            self._jitter.clear()
+            self._work.clear()
+
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            starts = list(self._starts)
+            jitter = list(self._jitter)
+            work = list(self._work)
+            iterations, overruns, skipped = self.iterations, self.overruns, self.skipped
+            max_jitter, max_work, active = self.max_jitter_s, self.max_work_s, self.active
+
+        span = starts[-1] - starts[0] if len(starts) > 1 else 0.0
+        return {
+            "name": self.name,
+            "active": active,
+            "interval_ms": self.interval_s * 1000.0,
+            "budget_ms": self.budget_s * 1000.0,
+            "target_hz": 1.0 / self.interval_s if self.interval_s > 0 else 0.0,
+            "effective_hz": (len(starts) - 1) / span if span > 0 else 0.0,
+            "iterations": iterations,
+            "overruns": overruns,
+            "overrun_rate": overruns / iterations if iterations else 0.0,
+            "skipped": skipped,
+            "jitter_ms": {
+                "avg": sum(jitter) / len(jitter) * 1000.0 if jitter else 0.0,
+                "p95": _percentile(jitter, 0.95) * 1000.0,
+                "max": max_jitter * 1000.0,
+            },
+            "work_ms": {
+                "avg": sum(work) / len(work) * 1000.0 if work else 0.0,
+                "p95": _percentile(work, 0.95) * 1000.0,
+                "max": max_work * 1000.0,
+            },
+            "last_tick_age_s": self.clock() - starts[-1] if starts else None,
+        }
+
+
+def loop_stats() -> Dict[str, Dict[str, Any]]:
+    """所有登記中（仍被持有）的迴圈統計，以名稱為 key"""
+    with _registry_lock:
+        loops = list(_registry.values())
+    return {loop.name: loop.stats() for loop in loops}
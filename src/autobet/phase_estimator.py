@@ -0,0 +1,214 @@
+# src/autobet/phase_estimator.py
+"""
+階段時長線上估計
+
+問題：SETTLING / BETTABLE / LOCKED 的時長寫死為 2 / 10 / 5 秒，
+但每張桌的實際節奏不同；估太長浪費下注時間，估太短會在窗口關閉後才下注。
+
+做法（每張桌獨立）：
+- 觀測值（皆為排程器時鐘，相對於結果出現時間）：
+  - cycle:        結果 → 下一次結果
+  - open_offset:  結果 → overlay 開啟（可下注）
+  - close_offset: 結果 → overlay 關閉
+- RobustStat：EWMA + 最近 N 筆樣本的分位數（少量樣本時排序成本可忽略），
+  超出目前中位數 outlier_ratio 倍的 cycle 視為漏檢結果而丟棄
+- 樣本足夠（min_samples）後才取代預設值：
+  - SETTLING = open_offset 的高分位（q_high）：計時器備援時確保窗口已開
+  - BETTABLE 關閉時間 = close_offset 的低分位（q_low）：保守估計窗口何時關閉
+  - LOCKED   = 預計下一次結果（cycle 的 EWMA）前的剩餘時間
+
+overlay 事件本身是最早的可靠訊號：GameStateCore.on_overlay_changed 收到開啟時
+直接進入 BETTABLE，計時器只作為偵測失敗時的備援。
+
+使用範例:
+    >>> estimator = PhaseDurationEstimator()
+    >>> estimator.observe_result("table1", now)
+    >>> estimator.observe_overlay("table1", True, now + 1.4)
+    >>> estimator.durations("table1", PhaseDurations(2.0, 10.0, 5.0), now + 1.4)
+"""
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+
+@dataclass
+class PhaseDurations:
+    """各階段時長（秒）"""
+    settling: float
+    bettable: float
+    locked: float
+    adaptive: bool = False  # 是否來自觀測估計（否則為預設值）
+
+
+class RobustStat:
+    """EWMA + 滑動視窗分位數"""
+
+    def __init__(self, window: int = 64, alpha: float = 0.2):
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.count = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._sorted: List[float] = []
+
+    def add(self, value: float) -> None:
+        if len(self._recent) == self._recent.maxlen:
+            oldest = self._recent[0]
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._recent.append(value)
+        bisect.insort(self._sorted, value)
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._sorted:
+            return None
+        index = min(len(self._sorted) - 1, max(0, int(q * len(self._sorted))))
+        return self._sorted[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self._sorted:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "ewma": round(self.ewma, 3),
+            "p10": round(self.quantile(0.10), 3),
+            "p50": round(self.quantile(0.50), 3),
+            "p90": round(self.quantile(0.90), 3),
+        }
+
+
+@dataclass
+class TablePhaseModel:
+    """單桌的觀測狀態"""
+    cycle: RobustStat = field(default_factory=RobustStat)
+    open_offset: RobustStat = field(default_factory=RobustStat)
+    close_offset: RobustStat = field(default_factory=RobustStat)
+    result_at: Optional[float] = None  # 最近一次結果
+    opened_at: Optional[float] = None  # 本局 overlay 開啟（結果後第一次）
+    closed_at: Optional[float] = None  # 本局 overlay 關閉（開啟後第一次）
+
+
+class PhaseDurationEstimator:
+    """每桌階段時長估計器"""
+
+    def __init__(
+        self,
+        *,
+        min_samples: int = 5,
+        q_low: float = 0.10,
+        q_high: float = 0.90,
+        outlier_ratio: float = 1.8,
+        max_cycle: float = 120.0,
+        min_bettable: float = 0.5,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            min_samples: 取代預設值前需要的樣本數
+            q_low / q_high: 保守估計使用的分位數
+            outlier_ratio: cycle 超過中位數此倍數時視為漏檢而丟棄
+            max_cycle: 超過此秒數的間隔不列入（斷線、換桌）
+            min_bettable: BETTABLE 計時的下限（秒）
+            enabled: False 時永遠返回預設值（仍會收集觀測）
+        """
+        self.min_samples = min_samples
+        self.q_low = q_low
+        self.q_high = q_high
+        self.outlier_ratio = outlier_ratio
+        self.max_cycle = max_cycle
+        self.min_bettable = min_bettable
+        self.enabled = enabled
+        self.tables: Dict[str, TablePhaseModel] = {}
+
+    def _model(self, table_id: str) -> TablePhaseModel:
+        model = self.tables.get(table_id)
+        if model is None:
+            model = self.tables[table_id] = TablePhaseModel()
+        return model
+
+    # ------------------------------------------------------------------
+    def observe_result(self, table_id: str, now: float) -> None:
+        """記錄結果出現（新一局開始）"""
+        model = self._model(table_id)
+        if model.result_at is not None:
+            interval = now - model.result_at
+            if 0 < interval <= self.max_cycle and not self._is_outlier(model.cycle, interval):
+                model.cycle.add(interval)
+        model.result_at = now
+        model.opened_at = None
+        model.closed_at = None
+
+    def observe_overlay(self, table_id: str, is_open: bool, now: float) -> None:
+        """記錄 overlay 開啟 / 關閉（每局只取結果後的第一次開啟與其後第一次關閉）"""
+        model = self._model(table_id)
+        if model.result_at is None or now - model.result_at > self.max_cycle:
+            return
+        if is_open:
+            if model.opened_at is None:
+                model.opened_at = now
+                model.open_offset.add(now - model.result_at)
+        elif model.opened_at is not None and model.closed_at is None:
+            model.closed_at = now
+            model.close_offset.add(now - model.result_at)
+
+    def _is_outlier(self, stat: RobustStat, value: float) -> bool:
+        if len(stat) < self.min_samples:
+            return False
+        median = stat.quantile(0.5)
+        return median is not None and value > median * self.outlier_ratio
+
+    # ------------------------------------------------------------------
+    def durations(self, table_id: str, defaults: PhaseDurations, now: Optional[float] = None) -> PhaseDurations:
+        """
+        估計的階段時長
+
+        Args:
+            defaults: 樣本不足時使用的預設值
+            now: 目前時間；提供時 bettable / locked 為從 now 起算的剩餘秒數
+
+        Returns:
+            PhaseDurations（adaptive=True 表示至少一項來自觀測）
+        """
+        model = self.tables.get(table_id)
+        if not self.enabled or model is None:
+            return defaults
+
+        settling, bettable, locked = defaults.settling, defaults.bettable, defaults.locked
+        adaptive = False
+        ready = self.min_samples
+
+        if len(model.open_offset) >= ready:
+            settling = model.open_offset.quantile(self.q_high)
+            adaptive = True
+
+        closes = None
+        if len(model.close_offset) >= ready and model.result_at is not None:
+            closes = model.close_offset.quantile(self.q_low)
+            entered = (now - model.result_at) if now is not None else settling
+            bettable = max(self.min_bettable, closes - entered)
+            adaptive = True
+
+        if len(model.cycle) >= ready and model.result_at is not None:
+            elapsed = (now - model.result_at) if now is not None else (closes or settling + bettable)
+            locked = max(0.0, model.cycle.ewma - elapsed)
+            adaptive = True
+
+        return PhaseDurations(settling, bettable, locked, adaptive)
+
+    def get_stats(self, table_id: Optional[str] = None) -> Dict[str, Any]:
+        if table_id is None:
+            return {tid: self.get_stats(tid) for tid in self.tables}
+        model = self.tables.get(table_id)
+        if model is None:
+            return {}
+        return {
+            "cycle": model.cycle.to_dict(),
+            "open_offset": model.open_offset.to_dict(),
+            "close_offset": model.close_offset.to_dict(),
+        }
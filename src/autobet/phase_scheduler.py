@@ -0,0 +1,183 @@
+# src/autobet/phase_scheduler.py
+"""
+單調時鐘階段排程器
+
+取代 GameStateManager 每桌三個 QTimer 的做法：
+- 所有桌的到期事件放在同一個 heap（key 通常是 table_id，每個 key 最多一個待執行事件）
+- 使用 time.monotonic（可注入時鐘），不依賴 Qt 事件迴圈，可在無頭環境測試
+- 兩種驅動方式：
+  1. 呼叫端自行 run_due()（例如 Qt adapter 的單一 QTimer、或測試中手動推進時鐘）
+  2. start() 啟動背景執行緒，睡到下一個到期時間再執行
+
+重新排程同一個 key 時舊事件以「序號不符」的方式延遲刪除（lazy deletion），
+heap 中過期的項目過多時會重建。
+
+使用範例:
+    >>> scheduler = PhaseScheduler()
+    >>> scheduler.schedule("table1", 2.0, lambda: print("BETTABLE"), tag="settling")
+    >>> scheduler.run_due()   # 或 scheduler.start()
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], None]
+
+
+class PhaseScheduler:
+    """heap 排程器（每個 key 最多一個待執行事件）"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, Callback, str]] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition(threading.RLock())
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # 最早到期時間改變時調用（Qt adapter 用來重設單一 QTimer）
+        self.on_change: Optional[Callable[[], None]] = None
+
+        self.fired = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    def schedule(self, key: Hashable, delay: float, callback: Callback, tag: str = "") -> float:
+        """
+        排程（取代同 key 的舊事件）
+
+        Returns:
+            到期時間（clock 基準）
+        """
+        with self._cond:
+            due = self.clock() + max(0.0, delay)
+            seq = next(self._seq)
+            self._entries[key] = (due, seq, callback, tag)
+            heapq.heappush(self._heap, (due, seq, key))
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._compact()
+            self._cond.notify()
+        self._changed()
+        return due
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._cond:
+            removed = self._entries.pop(key, None) is not None
+        if removed:
+            self._changed()
+        return removed
+
+    def cancel_all(self) -> None:
+        with self._cond:
+            self._entries.clear()
+            self._heap.clear()
+            self._cond.notify()
+        self._changed()
+
+    def pending(self, key: Hashable) -> Optional[str]:
+        """key 的待執行事件 tag（沒有時返回 None）"""
+        entry = self._entries.get(key)
+        return entry[3] if entry else None
+
+    def due_at(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    def next_due(self) -> Optional[float]:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def next_delay(self) -> Optional[float]:
+        """距離下一個到期事件的秒數（沒有事件時返回 None）"""
+        due = self.next_due()
+        return None if due is None else max(0.0, due - self.clock())
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """
+        執行所有已到期的事件（回調在呼叫端執行緒執行，鎖外調用）
+
+        Returns:
+            執行的事件數
+        """
+        fired = 0
+        while True:
+            with self._cond:
+                current = self.clock() if now is None else now
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > current:
+                    break
+                _, seq, key = heapq.heappop(self._heap)
+                _, _, callback, tag = self._entries.pop(key)
+            try:
+                callback()
+            except Exception:
+                self.errors += 1
+                logger.exception(f"PhaseScheduler 回調失敗: key={key} tag={tag}")
+            fired += 1
+        self.fired += fired
+        if fired:
+            self._changed()
+        return fired
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """啟動背景執行緒（回調在該執行緒執行）"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="PhaseScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                delay = self.next_delay()
+                if delay is None or delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.run_due()
+
+    # ------------------------------------------------------------------
+    def _drop_stale(self) -> None:
+        heap, entries = self._heap, self._entries
+        while heap:
+            _, seq, key = heap[0]
+            entry = entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        self._heap = [(due, seq, key) for key, (due, seq, _, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:
+                logger.exception("PhaseScheduler on_change 失敗")
@@ -18,7 +18,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.autobet.autobet_engine import AutoBetEngine
-from src.autobet.io_events import NDJSONPlayer, DemoFeeder
+from src.autobet.io_events import NDJSONPlayer, DemoFeeder, REPLAY_INTERVAL, REPLAY_MODES
 
 
 def setup_logging(log_level: str = "INFO"):
@@ -46,6 +46,8 @@ def load_environment_config():
         'event_source_mode': os.getenv('EVENT_SOURCE_MODE', 'demo'),
         'reader_sse_url': os.getenv('READER_SSE_URL', 'http://127.0.0.1:8888/events'),
         'ndjson_replay_file': os.getenv('NDJSON_REPLAY_FILE', 'data/sessions/events.sample.ndjson'),
+        'ndjson_replay_mode': os.getenv('NDJSON_REPLAY_MODE', REPLAY_INTERVAL),
+        'ndjson_replay_speed': float(os.getenv('NDJSON_REPLAY_SPEED', '1.0')),
         'demo_round_interval': int(os.getenv('DEMO_ROUND_INTERVAL_SEC', '10')),
         'demo_random_seed': os.getenv('DEMO_RANDOM_SEED')
     }
@@ -63,6 +65,8 @@ def main():
     parser.add_argument('--positions', default='configs/positions.sample.json', help='位置配置檔案路徑')
     parser.add_argument('--event-source', choices=['ndjson', 'sse', 'demo'], default=None, help='事件來源模式')
     parser.add_argument('--ndjson-file', default='data/sessions/events.sample.ndjson', help='NDJSON事件檔案路徑')
+    parser.add_argument('--replay-mode', choices=REPLAY_MODES, default=None, help='NDJSON回放模式 (interval/realtime/max)')
+    parser.add_argument('--replay-speed', type=float, default=None, help='realtime 模式的倍速')
     parser.add_argument('--dry-run', type=int, choices=[0, 1], default=None, help='乾跑模式 (0=實戰, 1=乾跑)')
 
     args = parser.parse_args()
@@ -75,6 +79,10 @@ def main():
         env_config['event_source_mode'] = args.event_source
     if args.ndjson_file:
         env_config['ndjson_replay_file'] = args.ndjson_file
+    if args.replay_mode:
+        env_config['ndjson_replay_mode'] = args.replay_mode
+    if args.replay_speed:
+        env_config['ndjson_replay_speed'] = args.replay_speed
     if args.dry_run is not None:
         env_config['dry_run'] = bool(args.dry_run)
 
@@ -147,8 +155,10 @@ def run_console_mode(args, env_config):
         if not os.path.exists(ndjson_file):
             logger.error(f"NDJSON檔案不存在: {ndjson_file}")
             return 1
-        event_feeder = NDJSONPlayer(ndjson_file, engine.on_event)
-        logger.info(f"使用NDJSON回放: {ndjson_file}")
+        replay_mode = env_config['ndjson_replay_mode']
+        replay_speed = env_config['ndjson_replay_speed']
+        event_feeder = NDJSONPlayer(ndjson_file, engine.on_event, mode=replay_mode, speed=replay_speed)
+        logger.info(f"使用NDJSON回放: {ndjson_file} (mode={replay_mode}, speed={replay_speed})")
     elif mode == 'demo':
         interval = env_config['demo_round_interval']
         seed = env_config['demo_random_seed']
@@ -180,7 +190,7 @@ def run_console_mode(args, env_config):
 
             # 檢查NDJSON是否完成
             if mode == 'ndjson' and event_feeder and not event_feeder.is_running():
-                logger.info("NDJSON回放完成")
+                logger.info(f"NDJSON回放完成: {event_feeder.stats()}")
                 break
 
     except KeyboardInterrupt:
@@ -0,0 +1,354 @@
+# src/autobet/session_archive.py
+"""
+SessionArchive - 列式會話歸檔
+
+解決問題：
+1. 結果、下注、結算分散在 CSV / NDJSON / round_history（上限 100）/ 結算歷史（上限 100）
+2. 回測和分析需要逐行解析文字日誌
+
+設計：
+- 三種記錄：rounds（開獎）、decisions（下注決策）、settlements（結算）
+- 每種記錄使用固定寬度的 NumPy structured dtype，按日期分區：
+    <root>/v1/<kind>/<YYYYMMDD>.bin
+- 讀取時以 np.memmap 映射，不需解析，數月資料也能直接向量化篩選
+- table_id / strategy_key 以字典編碼（dictionary.json）存成 int32，篩選時比較整數
+- 記錄只進記憶體緩衝（決策熱路徑不做 I/O），由呼叫端定期 flush()
+  追加到檔案（EngineWorker 狀態迴圈每秒一次）；緩衝上限 max_buffered 筆，
+  超過時丟棄新記錄並計數，不在記錄路徑上同步寫檔
+
+使用範例:
+    >>> archive = SessionArchive("data/archive")
+    >>> archive.record_round("main", "round-1", "B", time.time())
+    >>> archive.flush()
+    >>> rows = archive.query("rounds", table_id="main", start=time.time() - 3600)
+    >>> df = archive.to_frame("rounds", rows)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+KIND_ROUNDS = "rounds"
+KIND_DECISIONS = "decisions"
+KIND_SETTLEMENTS = "settlements"
+
+# 結算結果編碼（與 LayerOutcome.value 對應）
+OUTCOME_CODES = {"win": 1, "loss": 2, "skipped": 3, "cancelled": 4}
+OUTCOME_NAMES = {code: name for name, code in OUTCOME_CODES.items()}
+
+DTYPES: Dict[str, np.dtype] = {
+    KIND_ROUNDS: np.dtype([
+        ("ts", "<f8"),
+        ("table", "<i4"),
+        ("round_id", "S48"),
+        ("winner", "S1"),
+    ]),
+    KIND_DECISIONS: np.dtype([
+        ("ts", "<f8"),
+        ("table", "<i4"),
+        ("strategy", "<i4"),
+        ("round_id", "S48"),
+        ("direction", "S1"),
+        ("layer", "<i2"),
+        ("amount", "<f8"),
+    ]),
+    KIND_SETTLEMENTS: np.dtype([
+        ("ts", "<f8"),
+        ("table", "<i4"),
+        ("strategy", "<i4"),
+        ("round_id", "S48"),
+        ("direction", "S1"),
+        ("winner", "S1"),
+        ("outcome", "<i1"),
+        ("layer", "<i2"),
+        ("amount", "<f8"),
+        ("pnl", "<f8"),
+    ]),
+}
+
+_DAY = 86400.0
+
+
+def _day_key(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.localtime(ts))
+
+
+def _encode(value: Optional[str]) -> bytes:
+    return (value or "").encode("utf-8")[:48]
+
+
+class SessionArchive:
+    """列式會話歸檔（按日期分區的 memory-mapped NumPy 檔案）"""
+
+    def __init__(self, root: Union[str, Path] = "data/archive", max_buffered: int = 100_000) -> None:
+        """
+        初始化歸檔
+
+        Args:
+            root: 歸檔根目錄
+            max_buffered: 未寫入記錄的上限（flush() 長時間未被呼叫時保護記憶體）
+        """
+        self.root = Path(root) / f"v{SCHEMA_VERSION}"
+        self.max_buffered = max(1, int(max_buffered))
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+
+        # 緩衝 {(kind, day_key): [row_tuple, ...]}
+        self._buffer: Dict[Tuple[str, str], List[tuple]] = {}
+        self._buffered = 0
+        self.dropped = 0
+
+        # 字典編碼 {"table": [...], "strategy": [...]}
+        self._dictionary_path = self.root / "dictionary.json"
+        self._values: Dict[str, List[str]] = {"table": [], "strategy": []}
+        self._codes: Dict[str, Dict[str, int]] = {"table": {}, "strategy": {}}
+        self._dictionary_dirty = False
+        self._load_dictionary()
+
+    # ===== 記錄 =====
+
+    def record_round(self, table_id: str, round_id: str, winner: Optional[str], timestamp: float) -> None:
+        """記錄一局開獎結果"""
+        self._append(KIND_ROUNDS, timestamp, (
+            timestamp,
+            self._code("table", table_id),
+            _encode(round_id),
+            _encode(winner)[:1],
+        ))
+
+    def record_decision(
+        self,
+        table_id: str,
+        round_id: str,
+        strategy_key: str,
+        direction: str,
+        amount: float,
+        layer_index: int,
+        timestamp: float,
+    ) -> None:
+        """記錄一筆下注決策"""
+        self._append(KIND_DECISIONS, timestamp, (
+            timestamp,
+            self._code("table", table_id),
+            self._code("strategy", strategy_key),
+            _encode(round_id),
+            _encode(direction)[:1],
+            layer_index,
+            amount,
+        ))
+
+    def record_settlement(
+        self,
+        table_id: str,
+        round_id: str,
+        strategy_key: str,
+        direction: str,
+        winner: Optional[str],
+        outcome: str,
+        amount: float,
+        layer_index: int,
+        pnl_delta: float,
+        timestamp: float,
+    ) -> None:
+        """記錄一筆結算（outcome 為 LayerOutcome.value）"""
+        self._append(KIND_SETTLEMENTS, timestamp, (
+            timestamp,
+            self._code("table", table_id),
+            self._code("strategy", strategy_key),
+            _encode(round_id),
+            _encode(direction)[:1],
+            _encode(winner)[:1],
+            OUTCOME_CODES.get(outcome, 0),
+            layer_index,
+            amount,
+            pnl_delta,
+        ))
+
+    def flush(self) -> int:
+        """將緩衝寫入分區檔案
+
+        Returns:
+            寫入的記錄數
+        """
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+            self._buffered = 0
+            dictionary_dirty, self._dictionary_dirty = self._dictionary_dirty, False
+            values = {name: list(items) for name, items in self._values.items()}
+
+        if dictionary_dirty:
+            # 先寫字典，確保分區檔中的編碼都能被解碼
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._dictionary_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(values, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self._dictionary_path)
+
+        written = 0
+        with self._io_lock:
+            for (kind, day), rows in buffer.items():
+                dtype = DTYPES[kind]
+                path = self._partition_path(kind, day)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                data = np.array(rows, dtype=dtype)
+                with path.open("ab") as fp:
+                    # 崩潰可能留下不完整的記錄，先截斷以保持對齊
+                    size = fp.tell()
+                    if size % dtype.itemsize:
+                        fp.truncate(size - size % dtype.itemsize)
+                    fp.write(data.tobytes())
+                written += len(rows)
+        return written
+
+    close = flush
+
+    # ===== 查詢 =====
+
+    def query(
+        self,
+        kind: str,
+        *,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        table_id: Optional[str] = None,
+        strategy_key: Optional[str] = None,
+    ) -> np.ndarray:
+        """範圍查詢
+
+        Args:
+            kind: KIND_ROUNDS / KIND_DECISIONS / KIND_SETTLEMENTS
+            start: 起始時間戳（含）
+            end: 結束時間戳（不含）
+            table_id: 桌號篩選
+            strategy_key: 策略篩選（rounds 不支援）
+
+        Returns:
+            structured array（table/strategy 為字典編碼，可用 to_frame() 解碼）
+        """
+        dtype = DTYPES[kind]
+        if strategy_key is not None and "strategy" not in dtype.names:
+            raise ValueError(f"'{kind}' records have no strategy column")
+
+        self.flush()
+
+        table_code = self._lookup("table", table_id)
+        strategy_code = self._lookup("strategy", strategy_key)
+        if table_code is None or strategy_code is None:
+            return np.empty(0, dtype=dtype)
+
+        parts = []
+        for path in self._partitions(kind, start, end):
+            count = path.stat().st_size // dtype.itemsize
+            if count == 0:
+                continue
+            data = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+            mask = np.ones(count, dtype=bool)
+            if start is not None:
+                mask &= data["ts"] >= start
+            if end is not None:
+                mask &= data["ts"] < end
+            if table_code >= 0:
+                mask &= data["table"] == table_code
+            if strategy_code >= 0:
+                mask &= data["strategy"] == strategy_code
+            parts.append(np.array(data[mask]))
+
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(parts)
+
+    def to_frame(self, kind: str, rows: np.ndarray):
+        """將 query() 結果轉為 pandas.DataFrame（解碼字串欄位）"""
+        import pandas as pd
+
+        frame = pd.DataFrame({name: rows[name] for name in DTYPES[kind].names})
+        with self._lock:
+            tables = list(self._values["table"])
+            strategies = list(self._values["strategy"])
+        frame["table"] = [tables[code] for code in rows["table"]]
+        if "strategy" in frame:
+            frame["strategy"] = [strategies[code] for code in rows["strategy"]]
+        for name in ("round_id", "winner", "direction"):
+            if name in frame:
+                frame[name] = frame[name].str.decode("utf-8")
+        if "outcome" in frame:
+            frame["outcome"] = frame["outcome"].map(OUTCOME_NAMES)
+        frame["ts"] = frame["ts"].astype(float)
+        return frame
+
+    def list_days(self, kind: str) -> List[str]:
+        """列出某類記錄的所有日期分區（YYYYMMDD）"""
+        directory = self.root / kind
+        if not directory.exists():
+            return []
+        return sorted(path.stem for path in directory.glob("*.bin"))
+
+    # ===== 內部實現 =====
+
+    def _append(self, kind: str, timestamp: float, row: tuple) -> None:
+        with self._lock:
+            if self._buffered >= self.max_buffered:
+                self.dropped += 1
+                dropped = self.dropped
+            else:
+                self._buffer.setdefault((kind, _day_key(timestamp)), []).append(row)
+                self._buffered += 1
+                return
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning(f"SessionArchive 緩衝已滿（未呼叫 flush），已丟棄 {dropped} 筆記錄")
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        key = value or ""
+        codes = self._codes[column]
+        code = codes.get(key)
+        if code is None:
+            with self._lock:
+                code = codes.get(key)
+                if code is None:
+                    code = len(self._values[column])
+                    self._values[column].append(key)
+                    codes[key] = code
+                    self._dictionary_dirty = True
+        return code
+
+    def _lookup(self, column: str, value: Optional[str]) -> Optional[int]:
+        """篩選用編碼：-1 表示不篩選，None 表示值不存在（結果必為空）"""
+        if value is None:
+            return -1
+        return self._codes[column].get(value)
+
+    def _load_dictionary(self) -> None:
+        if not self._dictionary_path.exists():
+            return
+        try:
+            data = json.loads(self._dictionary_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.error(f"SessionArchive 字典載入失敗: {e}")
+            raise
+        for column in ("table", "strategy"):
+            values = [str(v) for v in data.get(column, [])]
+            self._values[column] = values
+            self._codes[column] = {value: code for code, value in enumerate(values)}
+
+    def _partition_path(self, kind: str, day: str) -> Path:
+        return self.root / kind / f"{day}.bin"
+
+    def _partitions(self, kind: str, start: Optional[float], end: Optional[float]) -> List[Path]:
+        # 以本地日期分區；前後各放寬一天以涵蓋時區/夏令時間邊界，精確範圍由 ts 篩選
+        low = _day_key(start - _DAY) if start is not None else None
+        high = _day_key(end + _DAY) if end is not None else None
+        return [
+            self._partition_path(kind, day)
+            for day in self.list_days(kind)
+            if (low is None or day >= low) and (high is None or day <= high)
+        ]
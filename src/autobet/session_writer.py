@@ -0,0 +1,363 @@
+# src/autobet/session_writer.py
+"""
+SessionWriter - 背景會話檔案寫入器
+
+解決問題：
+1. 下注決策路徑上同步 open/append/close 檔案（line_orders.ndjson、session CSV）
+2. 檔案無限增長，沒有輪替
+3. 每行都可能觸發一次磁碟寫入
+
+設計：
+- 單一背景執行緒 + 有界佇列：呼叫端只做 put_nowait，佇列滿時丟棄並計數，絕不阻塞
+- 批次寫入：一次取出最多 batch_size 筆，按檔案分組後一次寫出
+- 序列化（json.dumps / csv）在背景執行緒進行
+- 定期 fsync（fsync_interval_sec）
+- 依大小或時間輪替檔案，已關閉的分段以 gzip 壓縮
+"""
+from __future__ import annotations
+
+import atexit
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+# 佇列項目類型
+_KIND_TEXT = "text"
+_KIND_JSON = "json"
+_KIND_CSV = "csv"
+_KIND_FLUSH = "flush"
+
+
+@dataclass
+class RotationPolicy:
+    """單一檔案的輪替策略"""
+    max_bytes: Optional[int] = None  # 超過此大小即輪替
+    max_age_sec: Optional[float] = None  # 開啟超過此時間即輪替
+    compress: bool = True  # 是否 gzip 壓縮已關閉的分段
+    header: Optional[Sequence[Any]] = None  # CSV 表頭（新分段開頭自動寫入）
+
+
+class _Stream:
+    """已開啟的輸出檔案"""
+
+    def __init__(self, path: Path, policy: RotationPolicy):
+        self.path = path
+        self.policy = policy
+        self.fp = None
+        self.opened_at = 0.0
+        self.dirty = False
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fp = self.path.open("a", newline="", encoding="utf-8")
+        self.opened_at = time.time()
+        if self.policy.header is not None and self.fp.tell() == 0:
+            self.fp.write(_format_csv(self.policy.header))
+            self.dirty = True
+
+    def close(self) -> None:
+        if self.fp:
+            self.fp.flush()
+            os.fsync(self.fp.fileno())
+            self.fp.close()
+            self.fp = None
+
+    def should_rotate(self, now: float) -> bool:
+        if not self.fp:
+            return False
+        policy = self.policy
+        if policy.max_bytes and self.fp.tell() >= policy.max_bytes:
+            return True
+        if policy.max_age_sec and now - self.opened_at >= policy.max_age_sec:
+            return True
+        return False
+
+
+def _format_csv(row: Sequence[Any]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(row)
+    return buf.getvalue()
+
+
+class SessionWriter:
+    """
+    背景會話檔案寫入器
+
+    使用範例:
+        >>> writer = SessionWriter()
+        >>> writer.register("data/sessions/session.csv", RotationPolicy(header=["ts", "winner"]))
+        >>> writer.write_csv("data/sessions/session.csv", [1700000000, "B"])
+        >>> writer.write_json("data/sessions/line_orders.ndjson", {"table": "main"})
+        >>> writer.close()
+
+    注意：提交給 write_json/write_csv 的物件在提交後不應再被修改，
+    因為序列化是在背景執行緒進行的。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval_sec: float = 0.5,
+        fsync_interval_sec: float = 5.0,
+        default_policy: Optional[RotationPolicy] = None,
+    ) -> None:
+        """
+        初始化寫入器（背景執行緒在首次寫入時自動啟動）
+
+        Args:
+            max_queue: 佇列上限，滿時新的寫入會被丟棄並計入 dropped
+            batch_size: 每批最多處理的項目數
+            flush_interval_sec: 無新資料時的最長等待時間（也是輪替檢查間隔）
+            fsync_interval_sec: fsync 間隔
+            default_policy: 未註冊檔案使用的輪替策略
+        """
+        self._queue: "queue.Queue[Tuple[str, Optional[Path], Any]]" = queue.Queue(maxsize=max_queue)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_sec = flush_interval_sec
+        self.fsync_interval_sec = fsync_interval_sec
+        self.default_policy = default_policy or RotationPolicy()
+
+        self._policies: Dict[Path, RotationPolicy] = {}
+        self._streams: Dict[Path, _Stream] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_fsync = time.monotonic()
+
+        # 統計
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    # ===== 公開接口 =====
+
+    def register(self, path: PathLike, policy: RotationPolicy) -> None:
+        """設定某檔案的輪替策略（應在首次寫入前調用）"""
+        self._policies[Path(path)] = policy
+
+    def write_text(self, path: PathLike, text: str) -> bool:
+        """寫入原始文字（呼叫端自行處理換行）"""
+        return self._submit(_KIND_TEXT, Path(path), text)
+
+    def write_json(self, path: PathLike, record: Dict[str, Any]) -> bool:
+        """寫入一行 NDJSON"""
+        return self._submit(_KIND_JSON, Path(path), record)
+
+    def write_csv(self, path: PathLike, row: Sequence[Any]) -> bool:
+        """寫入一行 CSV"""
+        return self._submit(_KIND_CSV, Path(path), row)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待目前已提交的資料全部寫出（測試和關閉時使用）
+
+        Returns:
+            是否在 timeout 內完成
+        """
+        if not self._thread or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_KIND_FLUSH, None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """寫出剩餘資料並停止背景執行緒"""
+        if self._thread and self._thread.is_alive():
+            self.flush(timeout)
+            self._stop.set()
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._stop.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """獲取寫入統計"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "errors": self.errors,
+            "open_files": len(self._streams),
+        }
+
+    # ===== 內部實現 =====
+
+    def _submit(self, kind: str, path: Path, payload: Any) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((kind, path, payload))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"SessionWriter 佇列已滿，已丟棄 {self.dropped} 筆寫入")
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="SessionWriter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set() or not self._queue.empty():
+                batch = self._take_batch()
+                if batch:
+                    self._write_batch(batch)
+                self._maintain()
+        finally:
+            for stream in list(self._streams.values()):
+                try:
+                    stream.close()
+                except Exception as e:
+                    logger.error(f"SessionWriter 關閉檔案失敗 {stream.path}: {e}")
+            self._streams.clear()
+
+    def _take_batch(self) -> List[Tuple[str, Optional[Path], Any]]:
+        try:
+            first = self._queue.get(timeout=self.flush_interval_sec)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[str, Optional[Path], Any]]) -> None:
+        # 按檔案分組，保持各檔案內的提交順序
+        chunks: Dict[Path, List[str]] = {}
+        waiters: List[threading.Event] = []
+        for kind, path, payload in batch:
+            if kind == _KIND_FLUSH:
+                waiters.append(payload)
+                continue
+            try:
+                if kind == _KIND_JSON:
+                    text = json.dumps(payload, ensure_ascii=False) + "\n"
+                elif kind == _KIND_CSV:
+                    text = _format_csv(payload)
+                else:
+                    text = payload
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"SessionWriter 序列化失敗 ({path}): {e}")
+                continue
+            chunks.setdefault(path, []).append(text)
+
+        for path, texts in chunks.items():
+            try:
+                stream = self._get_stream(path)
+                stream.fp.write("".join(texts))
+                stream.dirty = True
+                self.written += len(texts)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"SessionWriter 寫入失敗 {path}: {e}")
+
+        self.batches += 1
+        for stream in self._streams.values():
+            if stream.dirty and stream.fp:
+                stream.fp.flush()
+
+        if waiters:
+            self._fsync_all()
+            for done in waiters:
+                done.set()
+
+    def _get_stream(self, path: Path) -> _Stream:
+        stream = self._streams.get(path)
+        if stream is None:
+            stream = _Stream(path, self._policies.get(path, self.default_policy))
+            self._streams[path] = stream
+        if stream.fp is None:
+            stream.open()
+        return stream
+
+    def _maintain(self) -> None:
+        """定期 fsync 並檢查輪替"""
+        now_mono = time.monotonic()
+        if now_mono - self._last_fsync >= self.fsync_interval_sec:
+            self._fsync_all()
+
+        now = time.time()
+        for stream in list(self._streams.values()):
+            if stream.should_rotate(now):
+                self._rotate(stream)
+
+    def _fsync_all(self) -> None:
+        for stream in self._streams.values():
+            if stream.dirty and stream.fp:
+                try:
+                    stream.fp.flush()
+                    os.fsync(stream.fp.fileno())
+                    stream.dirty = False
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"SessionWriter fsync 失敗 {stream.path}: {e}")
+        self._last_fsync = time.monotonic()
+
+    def _rotate(self, stream: _Stream) -> None:
+        """關閉目前分段、改名並（可選）壓縮；下次寫入時開新檔"""
+        try:
+            stream.close()
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            segment = stream.path.with_name(f"{stream.path.stem}.{stamp}{stream.path.suffix}")
+            counter = 1
+            while segment.exists() or Path(f"{segment}.gz").exists():
+                segment = stream.path.with_name(f"{stream.path.stem}.{stamp}-{counter}{stream.path.suffix}")
+                counter += 1
+            os.replace(stream.path, segment)
+            if stream.policy.compress:
+                with segment.open("rb") as src, gzip.open(f"{segment}.gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                segment.unlink()
+            self.rotations += 1
+            logger.info(f"SessionWriter 已輪替 {stream.path.name} → {segment.name}")
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"SessionWriter 輪替失敗 {stream.path}: {e}")
+        finally:
+            stream.dirty = False
+
+
+_default_writer: Optional[SessionWriter] = None
+_default_lock = threading.Lock()
+
+
+def get_session_writer() -> SessionWriter:
+    """獲取行程共用的 SessionWriter（所有會話檔案共用一個背景執行緒）"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = SessionWriter()
+            atexit.register(_default_writer.close)
+        return _default_writer
@@ -0,0 +1,116 @@
+# tests/test_capital_allocator.py
+"""
+CapitalAllocator 測試
+
+測試範圍：
+- 無上限時全部核准
+- 背包選擇：預算內總價值最高（非貪婪）
+- 單手上限、跨桌預留扣除與釋放
+- LineOrchestrator 產生 CAPITAL_RESERVED / CAPITAL_RELEASED 事件
+"""
+import time
+
+from src.autobet.lines.capital import CapitalAllocator
+from src.autobet.lines.conflict import BetDirection, ConflictReason, PendingDecision
+from src.autobet.lines.loadgen import build_strategies
+from src.autobet.lines.metrics import EventType
+from src.autobet.lines.orchestrator import LineOrchestrator, TablePhase
+
+
+def candidate(table, amount, score, key=None, direction=BetDirection.BANKER, round_id="R1"):
+    return PendingDecision(
+        table, round_id, key or f"s_{table}_{amount}", direction, amount, 0, priority_score=score
+    )
+
+
+class TestCapitalAllocator:
+    """測試資金分配"""
+
+    def test_unbounded_approves_all_and_reserves(self):
+        """測試未設上限時全部核准並預留"""
+        allocator = CapitalAllocator()
+        allocation = allocator.allocate([candidate("T1", 100, 1), candidate("T2", 300, 1)])
+        assert allocation.method == "unbounded"
+        assert len(allocation.approved) == 2
+        assert allocator.reserved == 400
+
+    def test_knapsack_beats_greedy(self):
+        """測試預算內取總價值最高的組合"""
+        allocator = CapitalAllocator(bankroll=1000)
+        # 依價值密度貪婪會先選 600，之後放不下 500；最佳為 500 + 500
+        decisions = [
+            candidate("T1", 600, 720),
+            candidate("T2", 500, 550),
+            candidate("T3", 500, 550),
+        ]
+        allocation = allocator.allocate(decisions)
+        assert allocation.method == "knapsack"
+        assert {d.table_id for d in allocation.approved} == {"T2", "T3"}
+        assert [(d.table_id, r) for d, r, _ in allocation.rejected] == [("T1", ConflictReason.RESOURCE_LIMIT)]
+        assert allocator.available == 0
+
+    def test_per_hand_cap(self):
+        """測試單手上限：同一手只能放得下一部分"""
+        allocator = CapitalAllocator(per_hand_cap=500)
+        decisions = [
+            candidate("T1", 400, 900, key="a"),
+            candidate("T1", 200, 500, key="b", direction=BetDirection.TIE),
+            candidate("T2", 800, 900, key="c"),
+        ]
+        allocation = allocator.allocate(decisions)
+        assert [d.strategy_key for d in allocation.approved] == ["a"]
+        assert sorted(d.strategy_key for d, _, _ in allocation.rejected) == ["b", "c"]
+
+    def test_existing_reservations_reduce_budget(self):
+        """測試其他桌尚未結算的預留會扣除預算，釋放後恢復"""
+        allocator = CapitalAllocator(bankroll=1000)
+        allocator.allocate([candidate("T1", 800, 1)])
+        allocation = allocator.allocate([candidate("T2", 400, 1)])
+        assert allocation.approved == []
+
+        released = allocator.release_table("T1")
+        assert [r.amount for r in released] == [800]
+        assert len(allocator.allocate([candidate("T2", 400, 1)]).approved) == 1
+
+    def test_many_candidates_stay_fast(self):
+        """測試 50 桌 × 4 候選時仍在數十毫秒內完成"""
+        allocator = CapitalAllocator(bankroll=20_000, per_hand_cap=1_000)
+        decisions = [
+            candidate(f"T{t}", 100 * (1 + (t + i) % 8), 500 + (t * 7 + i * 13) % 500, key=f"s{t}_{i}",
+                      direction=[BetDirection.BANKER, BetDirection.PLAYER][i % 2])
+            for t in range(50) for i in range(4)
+        ]
+        started = time.perf_counter()
+        allocation = allocator.allocate(decisions)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert sum(d.amount for d in allocation.approved) <= 20_000
+        assert len(allocation.approved) + len(allocation.rejected) == len(decisions)
+        assert elapsed_ms < 500
+
+
+class TestOrchestratorCapital:
+    """測試 LineOrchestrator 整合"""
+
+    def test_capital_events(self):
+        """測試下注時預留、開獎時釋放"""
+        orchestrator = LineOrchestrator(capital_budget=10_000)
+        for definition in build_strategies(20):
+            orchestrator.register_strategy(definition, tables=["T1"])
+
+        now = time.time()
+        decisions = []
+        for index in range(30):
+            round_id = f"T1-{index}"
+            decisions = orchestrator.update_table_phase("T1", round_id, TablePhase.BETTABLE, now, generate_decisions=True)
+            if decisions:
+                break
+            orchestrator.handle_result("T1", round_id, "BP"[index % 2], now)
+        assert decisions
+
+        reserved = orchestrator.metrics.get_events_by_type(EventType.CAPITAL_RESERVED)
+        assert len(reserved) == len(decisions)
+        assert orchestrator.capital.reserved == sum(d.amount for d in decisions)
+
+        orchestrator.handle_result("T1", decisions[0].round_id, "B", now)
+        assert len(orchestrator.metrics.get_events_by_type(EventType.CAPITAL_RELEASED)) == len(decisions)
+        assert orchestrator.capital.reserved == 0
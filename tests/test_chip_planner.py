@@ -0,0 +1,71 @@
+# tests/test_chip_planner.py
+"""
+SmartChipPlanner 精確匹配（DP）測試
+
+測試範圍：
+- 任意面額下的最少點擊（貪婪法非最佳的情況）
+- 貪婪湊不出但存在精確組合
+- max_clicks 限制與 FLOOR / SKIP fallback
+- 預先計算的配方表
+"""
+import pytest
+
+from src.autobet.chip_planner import BettingPolicy, Chip, SmartChipPlanner
+
+
+def _planner(values, fallback=BettingPolicy.FLOOR):
+    chips = [Chip(slot=i + 1, value=v, label=str(v), calibrated=True) for i, v in enumerate(values)]
+    return SmartChipPlanner(chips, BettingPolicy(priority=BettingPolicy.EXACT_MATCH, fallback=fallback))
+
+
+class TestExactMatch:
+    """測試最少點擊精確組合"""
+
+    def test_beats_greedy_on_non_canonical_chips(self):
+        """測試 600 = 300+300（貪婪會用 400+100+100）"""
+        plan = _planner([100, 300, 400]).plan_bet(600)
+        assert plan.success and plan.actual_amount == 600
+        assert [c.value for c in plan.chips] == [300, 300]
+
+    def test_exact_when_greedy_gets_stuck(self):
+        """測試貪婪湊不出的金額（600 = 300+300，貪婪 500 後剩 100）"""
+        plan = _planner([300, 500], fallback=BettingPolicy.SKIP).plan_bet(600)
+        assert plan.success and plan.clicks == 2
+        assert not plan.warnings
+
+    def test_floor_respects_max_clicks(self):
+        """測試超過點擊上限時向下取可湊出的最大金額"""
+        plan = _planner([100, 1000]).plan_bet(1500, max_clicks=3)
+        assert plan.success
+        assert plan.actual_amount == 1200
+        assert plan.clicks == 3
+        assert plan.warnings
+
+    @pytest.mark.parametrize("target, expected", [(250, 200), (1250, 1200), (150, 100)])
+    def test_floor_non_multiple_target(self, target, expected):
+        """測試目標不是最小單位倍數時只捨去餘數（不多扣一整個單位）"""
+        plan = _planner([100, 1000]).plan_bet(target)
+        assert plan.success
+        assert plan.actual_amount == expected
+        assert sum(c.value for c in plan.chips) == expected
+
+    def test_skip_when_unreachable(self):
+        """測試無法精確組合且 fallback=SKIP"""
+        plan = _planner([500], fallback=BettingPolicy.SKIP).plan_bet(750)
+        assert not plan.success
+        assert "750" in plan.reason
+
+
+class TestRecipeTable:
+    """測試配方表"""
+
+    def test_precompute_and_lookup(self):
+        """測試預先計算後 plan_bet 直接查表，且返回副本"""
+        planner = _planner([100, 500, 1000])
+        assert planner.precompute([100, 200, -400, 400], max_clicks=8) == 3
+        assert planner.precompute([400], max_clicks=8) == 0
+
+        planner._compute_plan = pytest.fail  # 查表命中時不應重新計算
+        plan = planner.plan_bet(400, max_clicks=8)
+        plan.warnings.append("mutated")
+        assert planner.plan_bet(400, max_clicks=8).warnings == []
@@ -0,0 +1,168 @@
+# tests/test_click_planner.py
+"""
+ClickSequencePlanner 測試
+
+測試範圍：
+- 按籌碼分組後的移動次數少於逐顆執行
+- 同一下注區的訂單合併
+- EngineWorker 預先計算的配方涵蓋兩筆訂單合併後的金額
+- 籌碼依托盤順序、confirm 在最後
+- 任一下注區規劃失敗則整體失敗
+- ClickPathOptimizer 在順序約束下縮短移動距離
+- 依距離計算移動時間
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from src.autobet.chip_planner import BettingPolicy, Chip, SmartChipPlanner
+from src.autobet.click_planner import (
+    STEP_BET,
+    STEP_CHIP,
+    STEP_CONFIRM,
+    ClickPathOptimizer,
+    ClickSequencePlanner,
+    move_duration,
+)
+
+
+def _planner(max_clicks=8, policy=None):
+    chips = [
+        Chip(slot=1, value=100, label="100", calibrated=True),
+        Chip(slot=2, value=1000, label="1K", calibrated=True),
+    ]
+    return ClickSequencePlanner(SmartChipPlanner(chips, policy), max_clicks=max_clicks)
+
+
+class TestGrouping:
+    """測試籌碼分組"""
+
+    def test_each_chip_selected_once(self):
+        """測試每種籌碼只選一次，下注區連點"""
+        seq = _planner().plan([("banker", 1200), ("player", 1000)])
+        assert seq.success
+        assert [s.describe() for s in seq.steps] == [
+            "chip:100", "bet:banker×2", "chip:1000", "bet:banker", "bet:player", "confirm",
+        ]
+        assert seq.moves == 6
+        assert seq.naive_moves == 9
+        assert seq.clicks == 7
+        assert seq.amounts == {"banker": 1200, "player": 1000}
+
+    def test_same_target_merged(self):
+        """測試同一下注區的多筆訂單合併後規劃"""
+        seq = _planner().plan([("player", 500), ("player", 500)])
+        assert seq.amounts == {"player": 1000}
+        assert [s.describe() for s in seq.steps] == ["chip:1000", "bet:player", "confirm"]
+
+    def test_confirm_last_and_optional(self):
+        """測試 confirm 只在最後出現一次"""
+        seq = _planner().plan([("banker", 300), ("tie", 100)])
+        kinds = [s.kind for s in seq.steps]
+        assert kinds.count(STEP_CONFIRM) == 1 and kinds[-1] == STEP_CONFIRM
+        assert kinds[0] == STEP_CHIP and STEP_BET in kinds
+
+        no_confirm = _planner().plan([("banker", 300)], confirm=False)
+        assert STEP_CONFIRM not in [s.kind for s in no_confirm.steps]
+
+    def test_precomputed_recipes_cover_merged_pairs(self):
+        """測試 EngineWorker 預先計算任兩筆注碼的和，合併後仍直接查表"""
+        from ui.workers.engine_worker import EngineWorker
+
+        planner = _planner()
+        staking = SimpleNamespace(sequence=[100, -200, 400])
+        worker = SimpleNamespace(
+            engine=SimpleNamespace(smart_planner=planner.chip_planner, chip_profile=None),
+            _line_orchestrator=SimpleNamespace(strategies={"s1": SimpleNamespace(staking=staking)}),
+            _emit_log=lambda *args: None,
+        )
+        EngineWorker._precompute_chip_recipes(worker)
+
+        planner.chip_planner._compute_plan = pytest.fail  # 查表命中時不應重新計算
+        seq = planner.plan([("banker", 200), ("banker", 400), ("player", 100), ("player", 100)])
+        assert seq.amounts == {"banker": 600, "player": 200}
+
+
+class TestFailure:
+    """測試規劃失敗"""
+
+    def test_any_failure_fails_sequence(self):
+        """測試任一下注區超出點擊上限時不產生部分序列"""
+        policy = BettingPolicy(fallback=BettingPolicy.SKIP)
+        seq = _planner(max_clicks=3, policy=policy).plan([("banker", 100), ("player", 900)])
+        assert not seq.success
+        assert seq.steps == []
+        assert seq.reason.startswith("player")
+
+
+# 托盤在底部由左到右：100 在最右邊、1000 在最左邊；下注區在中間
+POSITIONS = {
+    "chip:100": (900, 800),
+    "chip:1000": (100, 800),
+    "bet:banker": (700, 400),
+    "bet:player": (300, 400),
+    "bet:tie": (500, 300),
+    "confirm": (500, 900),
+}
+
+
+def _resolve(step):
+    key = step.kind if step.kind == STEP_CONFIRM else f"{step.kind}:{step.key}"
+    return POSITIONS.get(key)
+
+
+class TestPathOptimizer:
+    """測試點擊路徑最佳化"""
+
+    def test_reorders_to_shorter_path(self):
+        """測試重排後距離更短且保持約束"""
+        seq = _planner().plan([("banker", 1200), ("player", 1000)])
+        optimizer = ClickPathOptimizer(_resolve)
+        start = (150, 820)  # 游標停在 1000 籌碼附近
+
+        optimized = optimizer.optimize(seq, start)
+        assert optimizer.path_length(optimized.steps, start) < optimizer.path_length(seq.steps, start)
+        assert optimized.steps[0].describe() == "chip:1000"
+        assert optimized.steps[-1].kind == STEP_CONFIRM
+        assert sorted(s.describe() for s in optimized.steps) == sorted(s.describe() for s in seq.steps)
+
+    def test_bets_stay_behind_their_chip(self):
+        """測試每個下注點擊都跟在正確的籌碼之後"""
+        seq = _planner().plan([("banker", 1100), ("player", 1100), ("tie", 100)])
+        optimized = ClickPathOptimizer(_resolve).optimize(seq, (0, 0))
+
+        selected, placed = None, {}
+        for step in optimized.steps:
+            if step.kind == STEP_CHIP:
+                selected = step.key
+            elif step.kind == STEP_BET:
+                placed[(selected, step.key)] = step.repeat
+        expected = {(s.key, b.key): b.repeat for s, b in _pairs(seq.steps)}
+        assert placed == expected
+
+    def test_unknown_position_keeps_order(self):
+        """測試缺少座標時不重排"""
+        seq = _planner().plan([("banker", 1200)])
+        assert ClickPathOptimizer(lambda step: None).optimize(seq).steps == seq.steps
+
+
+def _pairs(steps):
+    chip = None
+    for step in steps:
+        if step.kind == STEP_CHIP:
+            chip = step
+        elif step.kind == STEP_BET:
+            yield chip, step
+
+
+class TestMoveDuration:
+    """測試移動時間模型"""
+
+    def test_scales_with_distance_and_clamps(self):
+        """測試距離越遠時間越長，並限制在範圍內"""
+        short = move_duration(50, 0.1, 0.6)
+        long = move_duration(1500, 0.1, 0.6)
+        assert 0.1 <= short < long <= 0.6
+        assert move_duration(0, 0.1, 0.6) == 0.1
+        assert move_duration(None, 0.1, 0.6) == 0.6
+        assert move_duration(10 ** 9, 0.1, 0.6) == 0.6
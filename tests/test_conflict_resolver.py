@@ -0,0 +1,113 @@
+# tests/test_conflict_resolver.py
+"""
+ConflictResolver 測試
+
+測試範圍：
+- 相反方向衝突與同方向擇優
+- 靜態分數（ev_weight、固定優先級）預先計算，定義替換時重新解析
+- 同一次 resolve 共用時間快照
+- 數百個候選時的解決時間
+"""
+import dataclasses
+import time
+
+from src.autobet.lines import conflict as conflict_module
+from src.autobet.lines.conflict import BetDirection, ConflictReason, ConflictResolver, PendingDecision
+from src.autobet.lines.loadgen import build_strategies
+
+
+def make_strategies(count, ev_weights=None):
+    strategies = {}
+    for index, definition in enumerate(build_strategies(count)):
+        if ev_weights and index in ev_weights:
+            definition = dataclasses.replace(definition, metadata={"ev_weight": ev_weights[index]})
+        strategies[definition.strategy_key] = definition
+    return strategies
+
+
+def decision(key, direction, ts=1000.0, layer=0, table="T1", round_id="R1"):
+    return PendingDecision(table, round_id, key, direction, 100.0, layer, timestamp=ts)
+
+
+class TestConflictResolver:
+    """測試衝突解決"""
+
+    def test_highest_ev_wins_opposite_direction(self):
+        """測試相反方向時 EV 較高的方向勝出"""
+        strategies = make_strategies(3, ev_weights={0: "0.9", 1: 0.2, 2: 0.3})
+        keys = list(strategies)
+        resolver = ConflictResolver()
+        for definition in strategies.values():
+            resolver.register_strategy(definition)
+
+        resolution = resolver.resolve([
+            decision(keys[1], BetDirection.BANKER),
+            decision(keys[0], BetDirection.PLAYER),
+            decision(keys[2], BetDirection.BANKER),
+        ], strategies)
+
+        assert [d.strategy_key for d in resolution.approved] == [keys[0]]
+        reasons = {d.strategy_key: reason for d, reason, _ in resolution.rejected}
+        assert reasons == {keys[1]: ConflictReason.OPPOSITE_DIRECTION, keys[2]: ConflictReason.OPPOSITE_DIRECTION}
+
+    def test_tie_keeps_first_and_fixed_priority_breaks_ties(self):
+        """測試平手取先出現者，固定優先級可打破平手"""
+        strategies = make_strategies(3)
+        keys = list(strategies)
+        group = [decision(key, BetDirection.BANKER) for key in keys]
+
+        resolution = ConflictResolver().resolve(group, strategies)
+        assert resolution.approved[0].strategy_key == keys[0]
+        assert len(resolution.rejected) == 2
+
+        resolver = ConflictResolver(fixed_priority={keys[2]: 1})
+        resolution = resolver.resolve([decision(key, BetDirection.BANKER) for key in keys], strategies)
+        assert resolution.approved[0].strategy_key == keys[2]
+
+    def test_replaced_definition_is_reparsed(self):
+        """測試策略定義被替換時重新解析 ev_weight"""
+        strategies = make_strategies(2, ev_weights={0: 0.5, 1: 0.1})
+        keys = list(strategies)
+        resolver = ConflictResolver()
+        for definition in strategies.values():
+            resolver.register_strategy(definition)
+
+        strategies[keys[1]] = dataclasses.replace(strategies[keys[1]], metadata={"ev_weight": 0.8})
+        resolution = resolver.resolve(
+            [decision(keys[0], BetDirection.BANKER), decision(keys[1], BetDirection.BANKER)], strategies
+        )
+        assert resolution.approved[0].strategy_key == keys[1]
+
+    def test_single_time_snapshot(self, monkeypatch):
+        """測試每次 resolve 只讀取一次時間"""
+        calls = []
+
+        def fake_time():
+            calls.append(1)
+            return 1000.0 + len(calls)
+
+        strategies = make_strategies(50)
+        monkeypatch.setattr(conflict_module.time, "time", fake_time)
+        resolver = ConflictResolver()
+        resolver.resolve([decision(key, BetDirection.BANKER) for key in strategies], strategies)
+        assert len(calls) == 1
+
+    def test_hundreds_of_candidates(self):
+        """測試 500 個候選（多桌）仍在數毫秒內完成"""
+        strategies = make_strategies(500)
+        resolver = ConflictResolver()
+        for definition in strategies.values():
+            resolver.register_strategy(definition)
+        directions = [BetDirection.BANKER, BetDirection.PLAYER]
+        candidates = [
+            decision(key, directions[index % 2], layer=index % 5, table=f"T{index % 4}")
+            for index, key in enumerate(strategies)
+        ]
+
+        started = time.perf_counter()
+        resolution = resolver.resolve(candidates, strategies)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        assert len(resolution.approved) == 4  # 每桌一個
+        assert len(resolution.approved) + len(resolution.rejected) == len(candidates)
+        assert elapsed_ms < 50
@@ -0,0 +1,119 @@
+# tests/test_event_log_model.py
+"""
+EventLogModel 測試
+
+測試範圍：
+- 超過容量時淘汰最舊項目（view 收到 rowsRemoved）
+- 新事件的增量篩選與變更篩選時重新掃描（等級 / 模組 / 桌號 / 文字）
+- newest_first 排列
+- 批次加入只發一次插入訊號；100k 筆在合理時間內完成
+"""
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtTest import QAbstractItemModelTester
+
+from ui.components.event_log_view import ROLE_ENTRY, EventLogModel
+
+
+@pytest.fixture(autouse=True)
+def app():
+    if QCoreApplication.instance() is None:
+        QCoreApplication([])
+
+
+def entry(i, level="INFO", module="Engine", table="T1"):
+    return (1000.0 + i, level, module, table, f"msg {i}", None)
+
+
+def messages(model):
+    return [model.index(row).data(ROLE_ENTRY)[4] for row in range(model.rowCount())]
+
+
+class TestEventLogModel:
+    """測試虛擬化日誌 model"""
+
+    def test_ring_evicts_oldest(self):
+        """測試超過容量時覆寫最舊事件並通知 view"""
+        model = EventLogModel(capacity=5)
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        removed = []
+        model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+        for i in range(8):
+            model.append_many([entry(i)])
+        assert model.rowCount() == 5
+        assert model.total == 5
+        assert messages(model) == [f"msg {i}" for i in range(3, 8)]
+        assert removed == [(0, 0)] * 3
+
+        model.append_many(entry(i) for i in range(100, 120))
+        assert messages(model) == [f"msg {i}" for i in range(115, 120)]
+
+        model.clear()
+        assert model.rowCount() == 0
+        assert model.total == 0
+
+    def test_incremental_and_retroactive_filter(self):
+        """測試篩選套用到既有與新進事件"""
+        model = EventLogModel(capacity=100)
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        model.append_many([
+            entry(0, "INFO", "Engine", "T1"),
+            entry(1, "ERROR", "Engine", "T2"),
+            entry(2, "ERROR", "Line", "T1"),
+        ])
+
+        model.set_filter(levels={"ERROR"})
+        assert messages(model) == ["msg 1", "msg 2"]
+
+        model.append_many([entry(3, "INFO"), entry(4, "ERROR", "Line", "T2")])
+        assert messages(model) == ["msg 1", "msg 2", "msg 4"]
+
+        model.set_filter(levels={"ERROR"}, modules={"Line"}, tables={"T2"})
+        assert messages(model) == ["msg 4"]
+
+        model.set_filter(text="MSG 3")
+        assert messages(model) == ["msg 3"]
+
+        model.set_filter()
+        assert model.rowCount() == 5
+
+    def test_filtered_rows_evicted_with_ring(self):
+        """測試被篩選的列隨環形緩衝淘汰"""
+        model = EventLogModel(capacity=4)
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        model.set_filter(levels={"ERROR"})
+        model.append_many([entry(0, "ERROR"), entry(1), entry(2, "ERROR"), entry(3)])
+        assert messages(model) == ["msg 0", "msg 2"]
+
+        model.append_many([entry(4), entry(5)])
+        assert messages(model) == ["msg 2"]
+
+    def test_newest_first(self):
+        """測試 newest_first 時最新事件在第 0 列"""
+        model = EventLogModel(capacity=3, newest_first=True)
+        QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        for i in range(5):
+            model.append_many([entry(i)])
+        assert messages(model) == ["msg 4", "msg 3", "msg 2"]
+
+    def test_bulk_append_single_insert(self):
+        """測試 100k 筆批次加入只觸發一次插入並維持容量"""
+        model = EventLogModel(capacity=100_000)
+        inserts = []
+        model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+
+        start = time.perf_counter()
+        for chunk in range(10):
+            model.append_many(entry(chunk * 15_000 + i, "ERROR" if i % 10 == 0 else "INFO") for i in range(15_000))
+        elapsed = time.perf_counter() - start
+
+        assert len(inserts) == 10
+        assert model.rowCount() == 100_000
+        assert model.index(0).data(ROLE_ENTRY)[4] == "msg 50000"
+        assert elapsed < 5.0
+
+        model.set_filter(levels={"ERROR"})
+        assert model.rowCount() == 10_000
@@ -0,0 +1,101 @@
+# tests/test_event_ring.py
+"""
+EventRing 測試
+
+測試範圍：
+- 固定容量覆寫最舊項目
+- recent / drain 讀取時才格式化（含 metadata 對應）
+- EntryEvaluator 評估原因延遲格式化
+- LineOrchestrator drain_events 只返回新事件
+"""
+import time
+
+from src.autobet.lines.entry_evaluator import (
+    REASON_NOT_TRIGGERED,
+    EntryEvaluationResult,
+)
+from src.autobet.lines.events import EVENT_MESSAGE, EventRing, EventSpec
+from src.autobet.lines.loadgen import build_strategies
+from src.autobet.lines.orchestrator import EVENT_RESULT_RECEIVED, LineOrchestrator
+
+SPECS = {
+    "bet": EventSpec("INFO", "下注 {0} | {1}", (("table", 2),)),
+}
+
+
+class Formatted:
+    """記錄格式化次數的參數"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __format__(self, spec):
+        self.calls += 1
+        return "lazy"
+
+
+class TestEventRing:
+    """測試事件環"""
+
+    def test_overwrites_oldest(self):
+        """測試超過容量時覆寫最舊事件"""
+        ring = EventRing(SPECS, capacity=4)
+        for i in range(10):
+            ring.record("bet", (f"s{i}", "B", "T1"))
+        assert len(ring) == 4
+        recent = ring.recent(10)
+        assert [e.message for e in recent] == [f"下注 s{i} | B" for i in (9, 8, 7, 6)]
+        assert recent[0].metadata == {"table": "T1"}
+        assert recent[0].level == "INFO"
+
+    def test_formats_only_on_read(self):
+        """測試記錄時不格式化，讀取時才格式化"""
+        ring = EventRing(SPECS, capacity=8)
+        arg = Formatted()
+        ring.record("bet", (arg, "P", "T2"))
+        assert arg.calls == 0
+        assert ring.drain()[0].message == "下注 lazy | P"
+        assert arg.calls == 1
+
+    def test_drain_cursor_and_clear(self):
+        """測試 drain 只返回新事件、clear 後長度歸零"""
+        ring = EventRing(SPECS, capacity=3)
+        ring.record(EVENT_MESSAGE, ("WARNING", "自由訊息", {"k": 1}))
+        first = ring.drain()
+        assert [(e.level, e.message, e.metadata) for e in first] == [("WARNING", "自由訊息", {"k": 1})]
+        assert ring.drain() == []
+
+        for i in range(5):
+            ring.record("bet", (i, "B", "T1"))
+        # 只剩最後 3 筆（被覆寫的遺失）
+        assert [e.message for e in ring.drain()] == ["下注 2 | B", "下注 3 | B", "下注 4 | B"]
+
+        ring.clear()
+        assert len(ring) == 0
+        assert ring.recent() == []
+
+
+class TestLazyRecords:
+    """測試評估器與協調器的結構化事件"""
+
+    def test_evaluation_reason_is_lazy(self):
+        """測試評估原因以代碼保存，讀取時才產生文字"""
+        result = EntryEvaluationResult(
+            "s1", False, reason_code=REASON_NOT_TRIGGERED, reason_args=("BB then P", 3, 2)
+        )
+        assert result._reason is None
+        assert result.reason == "⏳ 模式 BB then P | 歷史長度 3/2 | ❌ 未觸發"
+        assert EntryEvaluationResult("s1", True, "固定原因").reason == "固定原因"
+
+    def test_orchestrator_drain_events(self):
+        """測試協調器事件以代碼記錄並在 drain 時格式化"""
+        orchestrator = LineOrchestrator()
+        orchestrator.register_strategy(build_strategies(1)[0], tables=["T1"])
+        orchestrator.handle_result("T1", "R1", "B", time.time())
+
+        events = orchestrator.drain_events()
+        received = [e for e in events if e.code == EVENT_RESULT_RECEIVED]
+        assert received[0].message == "🎯 handle_result: table=T1 round=R1 winner=B"
+        assert received[0].metadata == {"table": "T1"}
+        assert orchestrator.drain_events() == []
+        assert orchestrator.get_recent_events(limit=1)
@@ -0,0 +1,187 @@
+# tests/test_execution_deadline.py
+"""
+下注執行期限測試
+
+測試範圍：
+- 期限充足時完整執行並記錄餘裕
+- 預估剩餘步驟放不下時中途中止並 cancel()
+- overlay 顯示窗口關閉時立即中止（未放籌碼不需 cancel）
+- DeadlineStats 統計
+- 中止後撤回決策：下一個結果不結算、不推進層數
+- EngineWorker 任何未完成下注的出口都撤回決策
+"""
+import time
+from types import SimpleNamespace
+
+from src.autobet.actuator import Actuator
+from src.autobet.chip_planner import Chip, SmartChipPlanner
+from src.autobet.chip_profile_manager import ChipProfile
+from src.autobet.click_planner import ClickSequencePlanner
+from src.autobet.execution_deadline import (
+    ABORT_DEADLINE,
+    ABORT_WINDOW_CLOSED,
+    DeadlineStats,
+    ExecutionDeadline,
+)
+from src.autobet.input_backends import RecordingBackend
+from src.autobet.lines.loadgen import build_strategies
+from src.autobet.lines.orchestrator import LineOrchestrator, TablePhase
+from src.autobet.lines.state import LinePhase
+
+UI = {
+    "click": {"move_delay_ms": [300, 300], "click_delay_ms": [200, 200], "jitter_px": 0},
+    "safety": {"pre_confirm_guard_ms": 100},
+}
+CANCEL = (600, 900)
+
+
+def _setup():
+    chips = [
+        Chip(slot=1, value=100, label="100", x=900, y=800, calibrated=True),
+        Chip(slot=2, value=1000, label="1K", x=100, y=800, calibrated=True),
+    ]
+    positions = {"banker": (700, 400), "player": (300, 400), "confirm": (500, 900), "cancel": CANCEL}
+    profile = ChipProfile(
+        profile_name="test",
+        chips=chips,
+        bet_positions={name: {"x": x, "y": y, "calibrated": True} for name, (x, y) in positions.items()},
+    )
+    backend = RecordingBackend()
+    act = Actuator(chip_profile=profile, ui_cfg=UI, dry_run=False, backend=backend)
+    seq = ClickSequencePlanner(SmartChipPlanner(chips), 8).plan([("banker", 1200), ("player", 1000)])
+    return act, backend, seq
+
+
+class TestDeadlineExecution:
+    """測試依期限執行"""
+
+    def test_completes_with_slack(self):
+        """測試期限充足"""
+        act, backend, seq = _setup()
+        deadline = ExecutionDeadline(at=10.0, safety_margin=0.5, clock=backend.now)
+
+        ok, executed = act.execute_sequence(seq, deadline=deadline)
+        info = act.last_execution["deadline"]
+        assert ok and len(executed) == seq.moves
+        assert info["aborted"] is None and not info["missed"]
+        assert info["slack_ms"] > 0
+        assert CANCEL not in backend.clicks()
+
+    def test_rejects_upfront_when_sequence_does_not_fit(self):
+        """測試整個序列放不下時不開始執行"""
+        act, backend, seq = _setup()
+        full = act.estimate_steps(seq.steps)
+        deadline = ExecutionDeadline(at=full * 0.9, safety_margin=0.0, clock=backend.now)
+
+        ok, executed = act.execute_sequence(seq, deadline=deadline)
+        assert not ok and executed == []
+        assert act.last_execution["deadline"]["aborted"] == ABORT_DEADLINE
+        assert backend.clicks() == []
+
+    def test_aborts_and_cancels_when_remaining_does_not_fit(self):
+        """測試執行比預估慢、剩餘步驟放不下時中途中止並撤回已放的籌碼"""
+        act, backend, seq = _setup()
+        full = act.estimate_steps(seq.steps)
+        # 實際時間流逝是預估的兩倍（例如系統卡頓）
+        deadline = ExecutionDeadline(at=full * 1.5, safety_margin=0.0, clock=lambda: backend.now() * 2)
+
+        ok, executed = act.execute_sequence(seq, optimize=False, deadline=deadline)
+        assert not ok
+        assert 0 < len(executed) < seq.moves
+        assert "confirm" not in executed
+        assert act.last_execution["deadline"]["aborted"] == ABORT_DEADLINE
+        assert backend.clicks()[-1] == CANCEL
+
+    def test_closed_window_aborts_before_any_click(self):
+        """測試 overlay 顯示窗口已關閉"""
+        act, backend, seq = _setup()
+        deadline = ExecutionDeadline(at=10.0, clock=backend.now, window_open=lambda: False)
+
+        ok, executed = act.execute_sequence(seq, deadline=deadline)
+        assert not ok and executed == []
+        assert act.last_execution["deadline"]["aborted"] == ABORT_WINDOW_CLOSED
+        assert backend.clicks() == []
+
+
+class TestDeadlineStats:
+    """測試期限統計"""
+
+    def test_record(self):
+        stats = DeadlineStats()
+        stats.record({"deadline": {"aborted": None, "missed": False, "slack_ms": 800.0}})
+        stats.record({"deadline": {"aborted": None, "missed": True, "slack_ms": -120.0}})
+        stats.record({"deadline": {"aborted": ABORT_DEADLINE, "missed": False, "slack_ms": 300.0}})
+        stats.record({})  # 沒有期限的執行不計入
+
+        summary = stats.to_dict()
+        assert summary["orders"] == 3
+        assert summary["completed"] == 2 and summary["missed"] == 1 and summary["aborted"] == 1
+        assert summary["miss_rate"] == 0.5
+        assert summary["abort_reasons"] == {ABORT_DEADLINE: 1}
+        assert summary["slack_ms_min"] == -120.0
+
+
+class TestAbortedDecisions:
+    """測試期限中止後撤回決策"""
+
+    @staticmethod
+    def _waiting_decisions(now):
+        """跑到有策略觸發，返回 (orchestrator, 已標記等待結果的決策)"""
+        orchestrator = LineOrchestrator(capital_budget=10_000)
+        for definition in build_strategies(20):
+            orchestrator.register_strategy(definition, tables=["T1"])
+
+        decisions = []
+        for index in range(30):
+            round_id = f"T1-{index}"
+            decisions = orchestrator.update_table_phase("T1", round_id, TablePhase.BETTABLE, now, generate_decisions=True)
+            if decisions:
+                break
+            orchestrator.handle_result("T1", round_id, "BP"[index % 2], now)
+        assert decisions
+
+        keys = [d.strategy_key for d in decisions]
+        orchestrator.mark_strategies_waiting("T1", decisions[0].round_id, keys, decisions=decisions)
+        return orchestrator, decisions
+
+    def test_cancelled_decisions_not_settled(self):
+        """測試中止的決策撤回後，開獎不結算、不推進層數、不殘留資金預留"""
+        now = time.time()
+        orchestrator, decisions = self._waiting_decisions(now)
+        round_id = decisions[0].round_id
+        keys = [d.strategy_key for d in decisions]
+        layers = {key: orchestrator.entry_evaluator.get_progression("T1", key).index for key in keys}
+        settled_before = len(orchestrator.position_manager.get_settlement_history())
+
+        # 執行期限不足 → 中止 → 撤回
+        orchestrator.cancel_decisions(decisions)
+        assert orchestrator.capital.reserved == 0
+        for key in keys:
+            assert not orchestrator.position_manager.has_position("T1", round_id, key)
+            assert orchestrator.entry_evaluator.get_line_state("T1", key).phase != LinePhase.WAITING_RESULT
+
+        orchestrator.handle_result("T1", round_id, "B", now)
+        assert len(orchestrator.position_manager.get_settlement_history()) == settled_before
+        for key in keys:
+            assert orchestrator.entry_evaluator.get_progression("T1", key).index == layers[key]
+
+    def test_dispatch_cancels_on_every_unplaced_exit(self):
+        """測試 EngineWorker 在下注期未開放或執行失敗時都撤回決策"""
+        from ui.workers.engine_worker import EngineWorker
+
+        def worker(orchestrator, engine):
+            stub = SimpleNamespace(engine=engine, _line_orchestrator=orchestrator, _emit_log=lambda *args: None)
+            stub._place_line_orders = lambda decisions: EngineWorker._place_line_orders(stub, decisions)
+            return stub
+
+        # 下注期已關閉：沒有點擊，直接返回
+        orchestrator, decisions = self._waiting_decisions(time.time())
+        orchestrator.table_phases["T1"] = TablePhase.LOCKED
+        EngineWorker._dispatch_line_orders(worker(orchestrator, SimpleNamespace()), decisions)
+        assert orchestrator.capital.reserved == 0
+        assert not orchestrator.position_manager.has_position("T1", decisions[0].round_id, decisions[0].strategy_key)
+
+        # 規劃過程拋出例外（引擎缺少 smart_planner）
+        orchestrator, decisions = self._waiting_decisions(time.time())
+        EngineWorker._dispatch_line_orders(worker(orchestrator, SimpleNamespace()), decisions)
+        assert orchestrator.capital.reserved == 0
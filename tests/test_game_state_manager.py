@@ -43,6 +43,21 @@ def process_events(qapp, timeout_ms=100):
     qapp.exec()
 
 
+class TestBettableDeadline:
+    """測試下注窗口期限"""
+
+    def test_deadline_only_in_bettable(self, manager):
+        """測試只有 BETTABLE 階段才有期限，且為進入時間 + BETTABLE_DURATION"""
+        manager.on_result_detected("table1", "B", time.time())
+        assert manager.bettable_deadline("table1") is None
+
+        before = time.monotonic()
+        manager._on_settling_complete("table1")
+        deadline = manager.bettable_deadline("table1")
+        assert before + manager.BETTABLE_DURATION <= deadline <= time.monotonic() + manager.BETTABLE_DURATION
+        assert manager.bettable_deadline("unknown") is None
+
+
 class TestBasicFunctionality:
     """測試基礎功能"""
 
@@ -0,0 +1,99 @@
+# tests/test_hot_path_profiler.py
+"""
+HotPathProfiler 測試
+
+測試範圍：
+- trace 模式：只記錄 lines/* 的函數，輸出 folded stacks
+- sample 模式：背景取樣到執行中的 lines/* 堆疊
+- 關閉事件記錄時決策結果不變、且不產生逐策略事件
+"""
+import time
+from dataclasses import replace
+
+from src.autobet.lines.loadgen import build_strategies
+from src.autobet.lines.orchestrator import LineOrchestrator, TablePhase
+from src.autobet.lines.profiler import HotPathProfiler
+
+
+def build_orchestrator(count=20):
+    orchestrator = LineOrchestrator()
+    for definition in build_strategies(count):
+        orchestrator.register_strategy(definition, tables=["T1"])
+    return orchestrator
+
+
+def run_rounds(orchestrator, rounds=30):
+    decisions = []
+    now = time.time()
+    for i in range(rounds):
+        round_id = f"R{i}"
+        decisions.extend(orchestrator.update_table_phase(
+            "T1", round_id, TablePhase.BETTABLE, now + i, generate_decisions=True
+        ))
+        orchestrator.handle_result("T1", round_id, "B" if i % 3 else "P", now + i + 0.5)
+    return decisions
+
+
+class TestHotPathProfiler:
+    """測試熱路徑分析器"""
+
+    def test_trace_mode_folded_output(self, tmp_path):
+        """測試 trace 模式只記錄 lines/* 並寫出 folded stacks"""
+        orchestrator = build_orchestrator()
+        profiler = orchestrator.start_profiling(mode="trace")
+        run_rounds(orchestrator)
+        orchestrator.stop_profiling(str(tmp_path / "lines.folded"))
+
+        assert not profiler.running
+        lines = (tmp_path / "lines.folded").read_text(encoding="utf-8").strip().splitlines()
+        assert lines
+        for line in lines:
+            stack, value = line.rsplit(" ", 1)
+            assert int(value) > 0
+            assert all(":" in frame for frame in stack.split(";"))
+        assert any("orchestrator:LineOrchestrator.update_table_phase" in line for line in lines)
+        assert not any("test_hot_path_profiler" in line for line in lines)
+
+        stats = {row["function"]: row for row in profiler.function_stats()}
+        row = stats["entry_evaluator:EntryEvaluator.evaluate_table"]
+        assert row["calls"] == 30
+        assert row["total_ms"] >= row["self_ms"] >= 0
+
+    def test_sample_mode_collects_stacks(self):
+        """測試 sample 模式從其他執行緒取樣"""
+        orchestrator = build_orchestrator(50)
+        profiler = HotPathProfiler(mode="sample", interval_ms=0.5).start()
+        deadline = time.time() + 0.3
+        while time.time() < deadline:
+            run_rounds(orchestrator, rounds=5)
+        profiler.stop()
+
+        assert profiler.samples > 0
+        assert profiler.stacks
+        assert profiler.summary()["top"]
+
+
+class TestLazyEventRecords:
+    """測試沒有讀取者時不建立事件"""
+
+    def test_disabled_events_same_decisions(self):
+        """測試關閉事件記錄後決策相同且沒有事件"""
+        enabled = build_orchestrator()
+        enabled.set_event_recording(True, evaluator=True)
+        disabled = build_orchestrator()
+        disabled.set_event_recording(False, evaluator=False)
+
+        expected = [(d.strategy_key, d.direction, d.amount) for d in run_rounds(enabled)]
+        actual = [(d.strategy_key, d.direction, d.amount) for d in run_rounds(disabled)]
+
+        assert actual == expected
+        assert enabled.entry_evaluator.get_recent_events()
+        assert not disabled.entry_evaluator.get_recent_events()
+        assert not disabled.drain_events()
+
+    def test_evaluator_events_default_off_in_orchestrator(self):
+        """測試協調器建立的 EntryEvaluator 預設不記錄逐策略事件"""
+        orchestrator = build_orchestrator()
+        definition = replace(build_strategies(1)[0], strategy_key="extra")
+        orchestrator.register_strategy(definition, tables=["T1"])
+        assert orchestrator.entry_evaluator.record_events is False
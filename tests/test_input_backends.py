@@ -0,0 +1,99 @@
+# tests/test_input_backends.py
+"""
+輸入後端測試
+
+測試範圍：
+- RecordingBackend 記錄動作並以虛擬時鐘計時（不 sleep）
+- Actuator 透過後端執行點擊序列
+- create_backend 的選擇順序（乾跑預設 recording）
+"""
+import time
+
+import pytest
+
+from src.autobet.actuator import Actuator
+from src.autobet.chip_planner import Chip, SmartChipPlanner
+from src.autobet.chip_profile_manager import ChipProfile
+from src.autobet.click_planner import ClickSequencePlanner
+from src.autobet.input_backends import RecordingBackend, create_backend
+
+UI = {
+    "click": {"move_delay_ms": [300, 600], "click_delay_ms": [200, 200], "jitter_px": 0},
+    "safety": {"pre_confirm_guard_ms": 120},
+}
+
+
+def _profile():
+    chips = [
+        Chip(slot=1, value=100, label="100", x=900, y=800, calibrated=True),
+        Chip(slot=2, value=1000, label="1K", x=100, y=800, calibrated=True),
+    ]
+    positions = {
+        "banker": (700, 400),
+        "player": (300, 400),
+        "confirm": (500, 900),
+        "cancel": (600, 900),
+    }
+    return ChipProfile(
+        profile_name="test",
+        chips=chips,
+        bet_positions={name: {"x": x, "y": y, "calibrated": True} for name, (x, y) in positions.items()},
+    )
+
+
+class TestRecordingBackend:
+    """測試記錄後端"""
+
+    def test_execute_sequence_without_sleeping(self):
+        """測試實戰模式下所有點擊都被記錄，且不實際等待"""
+        profile = _profile()
+        backend = RecordingBackend()
+        act = Actuator(chip_profile=profile, ui_cfg=UI, dry_run=False, backend=backend)
+        seq = ClickSequencePlanner(SmartChipPlanner(profile.chips), 8).plan([("banker", 1200), ("player", 1000)])
+
+        started = time.perf_counter()
+        ok, executed = act.execute_sequence(seq)
+        assert time.perf_counter() - started < 0.5
+
+        assert ok and len(executed) == seq.moves
+        clicks = backend.clicks()
+        assert len(clicks) == seq.clicks
+        assert clicks.count((700, 400)) == 3  # banker: 1K + 2×100
+        assert clicks[-1] == (500, 900)  # confirm 最後
+
+        # 虛擬時鐘：至少包含每次點擊延遲與 confirm 前的保護時間
+        assert backend.elapsed() >= seq.clicks * 0.2 + 0.12
+        assert act.last_execution["actual_ms"] == pytest.approx(backend.elapsed() * 1000, abs=0.1)
+
+    def test_timestamps_are_monotonic(self):
+        """測試動作時間戳遞增"""
+        backend = RecordingBackend()
+        act = Actuator(chip_profile=_profile(), ui_cfg=UI, dry_run=False, backend=backend)
+        act.click_bet("banker", repeat=2)
+        act.cancel()
+        stamps = [a.ts for a in backend.actions]
+        assert stamps == sorted(stamps)
+        assert [a.kind for a in backend.actions].count("click") == 3
+
+
+class TestCreateBackend:
+    """測試後端選擇"""
+
+    def test_env_overrides_config(self, monkeypatch):
+        """測試環境變數優先於 ui_config"""
+        monkeypatch.setenv("AUTOBET_INPUT_BACKEND", "recording")
+        assert isinstance(create_backend(ui_cfg={"input": {"backend": "pyautogui"}}), RecordingBackend)
+
+    def test_config_and_unknown(self, monkeypatch):
+        """測試 ui_config 選擇與未知名稱"""
+        monkeypatch.delenv("AUTOBET_INPUT_BACKEND", raising=False)
+        assert isinstance(create_backend(ui_cfg={"input": {"backend": "recording"}}), RecordingBackend)
+        with pytest.raises(ValueError):
+            create_backend("telepathy")
+
+    def test_dry_run_defaults_to_recording(self, monkeypatch):
+        """測試沒有指定後端時，乾跑不經過 pyautogui"""
+        monkeypatch.delenv("AUTOBET_INPUT_BACKEND", raising=False)
+        assert isinstance(create_backend(ui_cfg={}, dry_run=True), RecordingBackend)
+        assert isinstance(Actuator(ui_cfg={}, dry_run=True).input, RecordingBackend)
+        assert create_backend(ui_cfg={"input": {"backend": "pyautogui"}}, dry_run=True).name == "pyautogui"
@@ -0,0 +1,114 @@
+# tests/test_io_events.py
+"""
+NDJSONPlayer 回放模式測試
+
+測試範圍：
+- realtime：依 received_at 重現間隔並套用倍速
+- max：不等待、批次解析、統計 events/sec 與延遲
+- ReplayStats：延遲以直方圖統計，記憶體不隨事件數增長
+- 壞行處理
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from src.autobet.io_events import (
+    REPLAY_MAX,
+    REPLAY_REALTIME,
+    NDJSONPlayer,
+    ReplayStats,
+    event_time,
+    parse_ndjson_batch,
+)
+
+
+def _write(path, events):
+    path.write_text("\n".join(json.dumps(e) for e in events) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _play(player, timeout=5.0):
+    done = threading.Event()
+    result = {}
+
+    def on_complete(stats):
+        result.update(stats)
+        done.set()
+
+    player.on_complete = on_complete
+    player.start()
+    assert done.wait(timeout)
+    return result
+
+
+class TestHelpers:
+    """測試輔助函式"""
+
+    def test_event_time_units(self):
+        """測試毫秒 / 秒自動換算"""
+        assert event_time({"received_at": 1_700_000_000_500}) == pytest.approx(1_700_000_000.5)
+        assert event_time({"ts": 1_700_000_000.25}) == pytest.approx(1_700_000_000.25)
+        assert event_time({}) is None
+
+    def test_batch_falls_back_on_bad_line(self):
+        """測試批次解析遇到壞行時逐行處理"""
+        assert parse_ndjson_batch(['{"a": 1}', "oops", '{"b": 2}']) == [{"a": 1}, None, {"b": 2}]
+
+
+class TestReplayModes:
+    """測試回放模式"""
+
+    def test_realtime_honours_timestamps_with_speed(self, tmp_path):
+        """測試 realtime 依記錄時間重現間隔（10 倍速）"""
+        base = 1_700_000_000_000
+        path = _write(tmp_path / "e.ndjson", [
+            {"type": "RESULT", "received_at": base + offset} for offset in (0, 1000, 2000)
+        ])
+        arrivals = []
+        player = NDJSONPlayer(path, lambda evt: arrivals.append(time.monotonic()), mode=REPLAY_REALTIME, speed=10.0)
+
+        stats = _play(player)
+        assert stats["events"] == 3
+        gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+        assert all(0.08 <= gap <= 0.3 for gap in gaps)
+
+    def test_max_mode_reports_throughput_and_latency(self, tmp_path):
+        """測試 max 模式不等待並回報統計"""
+        events = [{"type": "RESULT", "n": i} for i in range(2000)]
+        path = _write(tmp_path / "e.ndjson", events)
+        received = []
+        player = NDJSONPlayer(path, received.append, mode=REPLAY_MAX, batch_size=128)
+
+        stats = _play(player)
+        assert [e["n"] for e in received] == list(range(2000))
+        assert stats["events"] == 2000
+        assert stats["events_per_sec"] > 1000
+        assert stats["latency_ms_p99"] >= stats["latency_ms_p50"] >= 0
+        assert not player.is_running()
+
+    def test_unknown_mode_rejected(self, tmp_path):
+        """測試未知模式"""
+        with pytest.raises(ValueError):
+            NDJSONPlayer(str(tmp_path / "e.ndjson"), print, mode="warp")
+
+
+class TestReplayStats:
+    """測試回放延遲統計"""
+
+    def test_latencies_bounded(self):
+        """測試大量事件後直方圖大小固定，分位數與最大值正確"""
+        stats = ReplayStats()
+        for i in range(200_000):
+            stats.record(1_000_000 if i % 100 else 5_000_000)  # 1ms，每 100 筆一筆 5ms
+        buckets = len(stats._latencies_ns.counts)
+        stats.record(1_000_000)
+
+        result = stats.to_dict()
+        assert len(stats._latencies_ns.counts) == buckets
+        assert result["events"] == 200_001
+        assert result["latency_ms_p50"] == pytest.approx(1.0, rel=0.02)
+        assert result["latency_ms_p99"] == pytest.approx(1.0, rel=0.02)
+        assert result["latency_ms_max"] == 5.0
+        assert ReplayStats().to_dict()["latency_ms_p99"] == 0.0
@@ -0,0 +1,47 @@
+# tests/test_loadgen.py
+"""
+LineOrchestrator 壓測產生器測試
+
+測試範圍：
+- 合成策略可被解析
+- 單一情境報告欄位
+- 矩陣依規模排序
+"""
+from src.autobet.lines.loadgen import (
+    LoadScenario,
+    build_strategies,
+    format_matrix,
+    run_matrix,
+    run_scenario,
+)
+
+
+class TestLoadGenerator:
+    """測試壓測產生器"""
+
+    def test_build_strategies(self):
+        """測試產生指定數量且唯一的策略"""
+        definitions = build_strategies(12)
+        assert len({d.strategy_key for d in definitions}) == 12
+        assert all("THEN BET" in d.entry.pattern for d in definitions)
+
+    def test_run_scenario_report(self):
+        """測試情境報告包含吞吐量、延遲、記憶體"""
+        report = run_scenario(LoadScenario(strategies=3, tables=2, rounds=20, memory_samples=4))
+
+        assert report["table_rounds"] == 40
+        assert report["decisions"] > 0
+        assert report["table_rounds_per_sec"] > 0
+        assert report["phase_update"]["count"] == 40
+        assert report["handle_result"]["p99_ms"] >= report["handle_result"]["p50_ms"]
+        assert "phase_transition" in report["performance"]
+        assert len(report["memory"]["samples"]) == 5
+        assert report["memory"]["peak_mb"] > 0
+
+    def test_matrix_sorted_by_size(self):
+        """測試矩陣由小到大執行並可格式化"""
+        reports = run_matrix([4, 1], [2, 1], rounds=5, track_memory=False)
+        sizes = [r["scenario"]["strategies"] * r["scenario"]["tables"] for r in reports]
+        assert sizes == sorted(sizes)
+        assert reports[0]["memory"]["growth_mb_per_1k_rounds"] is None
+        assert len(format_matrix(reports).splitlines()) == 2 + len(reports)
@@ -0,0 +1,147 @@
+# tests/test_loop_timing.py
+"""
+LoopTimer 測試
+
+測試範圍：
+- 等待時間扣除工作耗時（不漂移）
+- 超出預算計為 overrun，落後整個週期時跳過排程點
+- jitter / 實際頻率統計，停止後重新啟動時視窗重新開始
+- run() 以真實時鐘執行並可停止
+- HealthChecker._check_performance 依迴圈時序判斷狀態
+"""
+import threading
+
+from src.autobet.health import HealthChecker, HealthStatus
+from src.autobet.loop_timing import LoopTimer, loop_stats
+
+
+class FakeClock:
+    """手動推進的時鐘"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_ticks(loop, clock, work_times):
+    """模擬每輪工作耗時並依返回的延遲等待"""
+    for work in work_times:
+        start = loop.begin()
+        clock.now += work
+        clock.now += loop.end(start)
+
+
+class TestLoopTimer:
+    """測試固定頻率迴圈計時"""
+
+    def test_compensates_work_time(self):
+        """測試等待時間 = 週期 - 工作時間，週期不漂移"""
+        clock = FakeClock()
+        loop = LoopTimer("test.compensate", 0.1, clock=clock, register=False)
+        start = loop.begin()
+        clock.now += 0.03
+        delay = loop.end(start)
+        assert abs(delay - 0.07) < 1e-9
+        clock.now += delay
+
+        run_ticks(loop, clock, [0.02] * 9)
+        stats = loop.stats()
+        assert abs(clock.now - 101.0) < 1e-9
+        assert abs(stats["effective_hz"] - 10.0) < 1e-6
+        assert stats["overruns"] == 0
+        assert stats["jitter_ms"]["max"] < 1e-6
+
+    def test_overrun_and_skip(self):
+        """測試超出預算計數與跳過錯過的排程點"""
+        clock = FakeClock()
+        loop = LoopTimer("test.overrun", 0.1, budget_s=0.05, clock=clock, register=False)
+        run_ticks(loop, clock, [0.06, 0.01, 0.25, 0.01])
+
+        stats = loop.stats()
+        assert stats["iterations"] == 4
+        assert stats["overruns"] == 2
+        assert stats["overrun_rate"] == 0.5
+        assert stats["skipped"] == 2  # 0.25 秒的那輪錯過兩個排程點
+        assert abs(stats["work_ms"]["max"] - 250.0) < 1e-6
+        assert abs(clock.now - 100.6) < 1e-9  # 下一輪對齊排程格點
+
+    def test_jitter_when_started_late(self):
+        """測試實際開始晚於排程時記錄 jitter"""
+        clock = FakeClock()
+        loop = LoopTimer("test.jitter", 0.1, clock=clock, register=False)
+        start = loop.begin()
+        clock.now += loop.end(start) + 0.015  # 排程器晚 15ms 喚醒
+        loop.end(loop.begin())
+        assert abs(loop.stats()["jitter_ms"]["max"] - 15.0) < 1e-6
+
+    def test_restart_clears_window(self):
+        """測試停止後重新啟動，頻率不跨閒置期間計算"""
+        clock = FakeClock()
+        loop = LoopTimer("test.restart", 0.2, clock=clock, register=False)
+        run_ticks(loop, clock, [0.01] * 20)
+        loop.stop()
+        clock.now += 600.0
+        run_ticks(loop, clock, [0.01] * 20)
+
+        stats = loop.stats()
+        assert stats["active"] is True
+        assert abs(stats["effective_hz"] - 5.0) < 1e-6
+        assert stats["iterations"] == 40
+        assert stats["jitter_ms"]["avg"] < 1e-6
+
+    def test_run_with_real_clock(self):
+        """測試 run() 以固定頻率執行並可停止"""
+        stop = threading.Event()
+        loop = LoopTimer("test.run", 0.005)
+        calls = []
+
+        def step():
+            calls.append(1)
+            if len(calls) >= 20:
+                stop.set()
+
+        loop.run(step, stop)
+        stats = loop_stats()["test.run"]
+        assert stats["iterations"] == 20
+        assert stats["active"] is False
+        assert stats["effective_hz"] > 0
+
+
+class TestPerformanceHealthCheck:
+    """測試健康檢查讀取迴圈時序"""
+
+    def check(self, tmp_path):
+        checker = HealthChecker(project_root=tmp_path)
+        checker._check_performance()
+        return checker.results[-1]
+
+    def test_stopped_loop_not_evaluated(self, tmp_path):
+        """測試已停止的迴圈只列在 details，不參與評估"""
+        clock = FakeClock()
+        loop = LoopTimer("test.health_idle", 0.1, clock=clock)
+        run_ticks(loop, clock, [0.01] * 20)
+        loop.stop()
+        result = self.check(tmp_path)
+        assert result.component == "performance"
+        assert "test.health_idle" in result.details["loops"]
+        assert "test.health_idle" not in result.message
+        if result.status == HealthStatus.UNKNOWN:
+            assert result.message == "沒有運行中的檢測迴圈"
+
+    def test_overrun_degrades(self, tmp_path):
+        """測試超時比例過高時為 UNHEALTHY，正常時不列出"""
+        clock = FakeClock()
+        healthy = LoopTimer("test.health_ok", 0.1, clock=clock)
+        run_ticks(healthy, clock, [0.01] * 20)
+        result = self.check(tmp_path)
+        assert "test.health_ok" not in result.message
+        assert result.status != HealthStatus.UNKNOWN
+
+        slow = LoopTimer("test.health_slow", 0.1, clock=clock)
+        run_ticks(slow, clock, [0.15] * 20)
+        result = self.check(tmp_path)
+        assert result.status == HealthStatus.UNHEALTHY
+        assert "test.health_slow" in result.message
+        assert result.details["loops"]["test.health_slow"]["overrun_rate"] == 1.0
@@ -495,3 +495,106 @@ class TestSnapshot:
 
         assert stats["strategies"] == 1
         assert stats["pending_positions"] == 0
+
+
+class TestStateRestore:
+    """測試狀態匯出與恢復"""
+
+    def _restart(self, orchestrator, *definitions):
+        """模擬重啟：經過 JSON 往返後恢復到新的協調器"""
+        import json
+
+        payload = json.loads(json.dumps(orchestrator.export_state()))
+        restored = LineOrchestrator()
+        for definition in definitions:
+            restored.register_strategy(definition, tables=["table1"])
+        restored.restore_state(payload)
+        return restored
+
+    def test_restore_resumes_at_exact_layer(self, orchestrator, sample_strategy):
+        """測試重啟後層數、歷史和度量都被恢復"""
+        orchestrator.register_strategy(sample_strategy, tables=["table1"])
+        timestamp = time.time()
+        tracker = orchestrator.signal_trackers["PB_BET_P"]
+
+        tracker.record("table1", "round0", "P", timestamp)
+        tracker.record("table1", "round1", "B", timestamp + 1)
+        orchestrator.update_table_phase(
+            "table1", "round2", TablePhase.BETTABLE, timestamp + 2, generate_decisions=True
+        )
+        orchestrator.handle_result("table1", "round2", "B", timestamp + 3)  # LOSS → 第二層
+
+        restored = self._restart(orchestrator, sample_strategy)
+
+        progression = restored.entry_evaluator.get_progression("table1", "PB_BET_P")
+        assert progression.index == 1
+        assert restored.signal_trackers["PB_BET_P"]._get_recent_winners("table1", 10) == ["P", "B"]
+        assert restored.table_phases["table1"] == TablePhase.BETTABLE
+        assert restored.position_manager.get_statistics()["loss_count"] == 1
+
+        metrics = restored.metrics.get_line_metrics("table1", "PB_BET_P")
+        assert metrics.total_losses == 1
+        assert metrics.layer_stats[0].loss_count == 1
+
+        # STRICT 去重記錄也被恢復：同一局不會重複觸發
+        assert restored.signal_trackers["PB_BET_P"].last_trigger == tracker.last_trigger
+
+        # 新的模式觸發後直接使用第二層金額
+        restored_tracker = restored.signal_trackers["PB_BET_P"]
+        restored_tracker.record("table1", "round3", "P", timestamp + 4)
+        restored_tracker.record("table1", "round4", "B", timestamp + 5)
+        decisions = restored.update_table_phase(
+            "table1", "round5", TablePhase.BETTABLE, timestamp + 6, generate_decisions=True
+        )
+        assert decisions[0].amount == 200.0
+        assert decisions[0].layer_index == 1
+
+    def test_restore_pending_position_and_waiting_line(self, orchestrator, sample_strategy):
+        """測試未結算倉位在重啟後仍可結算"""
+        orchestrator.register_strategy(sample_strategy, tables=["table1"])
+        timestamp = time.time()
+        tracker = orchestrator.signal_trackers["PB_BET_P"]
+        tracker.record("table1", "round0", "P", timestamp)
+        tracker.record("table1", "round1", "B", timestamp + 1)
+        decisions = orchestrator.update_table_phase(
+            "table1", "round2", TablePhase.BETTABLE, timestamp + 2, generate_decisions=True
+        )
+        orchestrator.mark_strategies_waiting("table1", "round2", ["PB_BET_P"], decisions)
+
+        restored = self._restart(orchestrator, sample_strategy)
+
+        assert restored.position_manager.has_position("table1", "round2", "PB_BET_P")
+        assert restored.position_manager.tracker.get_total_exposure() == 100.0
+        line_state = restored.entry_evaluator.get_line_state("table1", "PB_BET_P")
+        assert line_state.phase.value == "waiting_result"
+
+        restored.handle_result("table1", "round2", "P", timestamp + 3)
+        assert restored.position_manager.get_statistics()["total_pnl"] == 100.0
+
+    def test_restore_skips_unknown_strategies(self, orchestrator, sample_strategy, another_strategy):
+        """測試存檔中已移除的策略會被略過"""
+        orchestrator.register_strategy(sample_strategy, tables=["table1"])
+        orchestrator.register_strategy(another_strategy, tables=["table1"])
+        orchestrator.handle_result("table1", "round0", "B", time.time())
+
+        restored = self._restart(orchestrator, sample_strategy)
+
+        assert restored.registry.count() == 1
+        assert "BB_BET_P" not in restored.signal_trackers
+        assert restored.entry_evaluator.get_line_state("table1", "BB_BET_P") is None
+
+    def test_restore_legacy_snapshot(self, orchestrator, sample_strategy):
+        """測試舊版 snapshot 格式仍可恢復附件關聯"""
+        orchestrator.register_strategy(sample_strategy)
+        orchestrator.restore_state({"lines": [{"table": "table9", "strategy": "PB_BET_P"}]})
+
+        assert orchestrator.registry.is_attached("table9", "PB_BET_P")
+
+    def test_restore_rejects_newer_version(self, orchestrator, sample_strategy):
+        """測試拒絕較新版本的存檔"""
+        orchestrator.register_strategy(sample_strategy)
+        state = orchestrator.export_state()
+        state["version"] += 1
+
+        with pytest.raises(ValueError):
+            orchestrator.restore_state(state)
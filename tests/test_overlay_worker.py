@@ -0,0 +1,158 @@
+# tests/test_overlay_worker.py
+"""
+OverlayDetectionWorker 測試
+
+測試範圍：
+- 只送出精簡決策字典（不含影像等檢測細節）
+- 引擎輪詢時只讀共用檢測器的結果，不截圖；引擎停止時才自行截圖
+- 背景執行緒固定間隔送出並可停止
+- OverlayDetectorWrapper.process_frame / recent_result / engine_polling
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+from PySide6.QtCore import QCoreApplication, Qt
+
+from src.autobet.detectors import OverlayDetectorWrapper
+from ui.workers.overlay_worker import DECISION_KEYS, OverlayDetectionWorker
+
+
+@pytest.fixture(autouse=True)
+def app():
+    if QCoreApplication.instance() is None:
+        QCoreApplication([])
+
+
+class CountingDetector:
+    """記錄 process_frame 次數的檢測器"""
+
+    open_th = 0.6
+
+    def __init__(self):
+        self.calls = 0
+
+    def process_frame(self, frame):
+        self.calls += 1
+        return {
+            "decision": "OPEN",
+            "is_open": True,
+            "ncc_qing": 0.8,
+            "in_green_gate": True,
+            "open_counter": "2/2",
+            "close_counter": "0/2",
+            "frame": frame,
+        }
+
+
+class SharedDetector(CountingDetector):
+    """模擬與引擎共用的檢測器"""
+
+    frame_interval = 0.15
+
+    def __init__(self, recent, polling=True):
+        super().__init__()
+        self.recent = recent
+        self.polling = polling
+        self.max_ages = []
+
+    def engine_polling(self):
+        return self.polling
+
+    def recent_result(self, max_age_s):
+        self.max_ages.append(max_age_s)
+        return self.recent
+
+
+def blank_frame():
+    return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+class TestOverlayDetectionWorker:
+    """測試背景檢測執行緒"""
+
+    def test_publishes_decision_only(self):
+        """測試決策字典只包含精簡欄位"""
+        detector = CountingDetector()
+        worker = OverlayDetectionWorker(detector, grab=blank_frame)
+        decision = worker.detect_once()
+
+        assert detector.calls == 1
+        assert decision["decision"] == "OPEN"
+        assert decision["open_th"] == 0.6
+        assert "frame" not in decision
+        assert set(decision) <= set(DECISION_KEYS) | {"open_th", "timestamp"}
+        assert OverlayDetectionWorker(grab=blank_frame).detect_once() is None
+
+    def test_reuses_shared_result(self):
+        """測試引擎輪詢時只讀共用結果，沒有新結果也不自行截圖"""
+        grabs = []
+        detector = SharedDetector({"decision": "CLOSED", "is_open": False})
+        worker = OverlayDetectionWorker(detector, grab=lambda: grabs.append(1) or blank_frame())
+
+        assert worker.detect_once()["decision"] == "CLOSED"
+        assert (worker.reused, worker.frames, grabs) == (1, 0, [])
+        assert detector.max_ages[-1] >= detector.frame_interval
+
+        detector.recent = None
+        assert worker.detect_once() is None
+        assert (worker.reused, worker.frames, worker.waiting, grabs) == (1, 0, 1, [])
+        assert detector.calls == 0
+
+    def test_grabs_when_engine_stopped(self):
+        """測試引擎沒有輪詢時才自行截圖檢測"""
+        grabs = []
+        detector = SharedDetector({"decision": "CLOSED", "is_open": False}, polling=False)
+        worker = OverlayDetectionWorker(detector, grab=lambda: grabs.append(1) or blank_frame())
+
+        assert worker.detect_once()["decision"] == "OPEN"
+        assert (worker.reused, worker.frames, len(grabs)) == (0, 1, 1)
+        assert detector.max_ages == []
+
+    def test_thread_emits_and_stops(self):
+        """測試背景執行緒送出決策並可停止"""
+        received = []
+        worker = OverlayDetectionWorker(CountingDetector(), interval_ms=10, grab=blank_frame)
+        worker.decision_ready.connect(received.append, Qt.DirectConnection)
+        worker.start()
+        deadline = time.time() + 2.0
+        while len(received) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        worker.stop()
+
+        assert len(received) >= 3
+        assert not worker.isRunning()
+        assert received[0]["is_open"] is True
+
+
+class TestOverlayDetectorWrapper:
+    """測試引擎檢測器的共用介面"""
+
+    def test_process_frame_records_recent_result(self):
+        """測試處理後的結果可被其他執行緒沿用，過期則返回 None"""
+        wrapper = OverlayDetectorWrapper({}, {})
+        wrapper.detector = CountingDetector()
+        assert wrapper.recent_result(1.0) is None
+
+        threads = [threading.Thread(target=wrapper.process_frame, args=(blank_frame(),)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert wrapper.detector.calls == 4
+        assert wrapper.recent_result(1.0)["decision"] == "OPEN"
+        assert wrapper._last_decision is True
+        assert wrapper.open_th == 0.6
+        wrapper._last_frame_time -= 5.0
+        assert wrapper.recent_result(1.0) is None
+
+    def test_engine_polling(self):
+        """測試引擎最近調用過 overlay_is_open 才視為輪詢中"""
+        wrapper = OverlayDetectorWrapper({}, {})
+        assert not wrapper.engine_polling()
+        wrapper.overlay_is_open()  # 沒有 overlay ROI 時直接返回 False，但仍記錄輪詢
+        assert wrapper.engine_polling()
+        wrapper._last_poll_time -= 4 * wrapper.frame_interval + 0.1
+        assert not wrapper.engine_polling()
@@ -0,0 +1,87 @@
+# tests/test_performance_tracker.py
+"""
+PerformanceTracker 測試
+
+測試範圍：
+- 對數分桶直方圖的分位數誤差（相對排序後的精確值）
+- 固定記憶體：大量記錄後桶數不增長、不保留樣本
+- 取樣比例與最慢樣本保留
+- begin() / end() 與相容的 start_operation / end_operation
+"""
+import random
+
+from src.autobet.lines.performance import (
+    MAX_BUCKETS,
+    LatencyHistogram,
+    OperationStats,
+    PerformanceTracker,
+)
+
+
+class TestLatencyHistogram:
+    """測試對數分桶"""
+
+    def test_bucket_bounds_contain_value(self):
+        """測試每個值都落在其桶的上下界內"""
+        for value in [0, 1, 31, 32, 33, 1000, 123_456, 98_765_432, 2**40 + 7]:
+            low, high = LatencyHistogram.bucket_bounds(LatencyHistogram.bucket_index(value))
+            assert low <= value <= high
+
+    def test_quantiles_within_relative_error(self):
+        """測試分位數與精確值的相對誤差在 4% 內"""
+        rng = random.Random(7)
+        values = [int(rng.lognormvariate(14, 1.0)) for _ in range(20000)]
+        stats = OperationStats("op")
+        for value in values:
+            stats.update_ns(value)
+
+        ordered = sorted(values)
+        for q, got in [(0.5, stats.p50_ms), (0.95, stats.p95_ms), (0.99, stats.p99_ms)]:
+            exact = ordered[int(q * len(ordered)) - 1] / 1e6
+            assert abs(got - exact) / exact < 0.04
+
+        mean = sum(values) / len(values) / 1e6
+        assert abs(stats.avg_duration_ms - mean) < 1e-6
+        assert stats.max_duration_ms == ordered[-1] / 1e6
+
+
+class TestPerformanceTracker:
+    """測試追蹤器"""
+
+    def test_fixed_memory_without_sampling(self):
+        """測試預設不保留樣本，桶數有上限"""
+        tracker = PerformanceTracker(slowest_capacity=5)
+        for i in range(5000):
+            tracker.record_instant("op", (i % 300) * 0.37)
+        stats = tracker.get_stats("op")
+        assert stats.total_count == 5000
+        assert len(stats.histogram.counts) <= MAX_BUCKETS
+        assert tracker.samples.maxlen and len(tracker.samples) == 0
+        assert tracker.get_summary()["total_samples"] == 0
+
+        slowest = tracker.get_slowest_operations(10)
+        assert len(slowest) == 5
+        assert slowest[0].duration_ms == max(s.duration_ms for s in slowest)
+        assert abs(slowest[0].duration_ms - 299 * 0.37) < 1e-6
+
+    def test_sample_rate_keeps_fraction(self):
+        """測試取樣比例只保留部分完整樣本"""
+        tracker = PerformanceTracker(sample_rate=0.1)
+        for _ in range(1000):
+            tracker.record_instant("op", 1.0, metadata={"k": 1})
+        assert len(tracker.samples) == 100
+        assert tracker.get_recent_samples("op", limit=3)[0].metadata == {"k": 1}
+
+    def test_begin_end_and_compat_api(self):
+        """測試 begin/end 與字串 id 相容 API 都寫入同一統計"""
+        tracker = PerformanceTracker()
+        token = tracker.begin()
+        assert tracker.end(PerformanceTracker.OP_DECISION_GENERATION, token) >= 0.0
+
+        tracker.start_operation("decision_main_1")
+        assert tracker.end_operation("decision_main_1", PerformanceTracker.OP_DECISION_GENERATION) >= 0.0
+        assert tracker.end_operation("missing", PerformanceTracker.OP_DECISION_GENERATION) is None
+
+        summary = tracker.get_summary()["operations"][PerformanceTracker.OP_DECISION_GENERATION]
+        assert summary["total_count"] == 2
+        assert {"p50_ms", "p95_ms", "p99_ms", "std_duration_ms"} <= summary.keys()
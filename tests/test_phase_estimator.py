@@ -0,0 +1,120 @@
+# tests/test_phase_estimator.py
+"""
+PhaseDurationEstimator 測試
+
+測試範圍：
+- 樣本不足時使用預設值
+- 由結果間隔與 overlay 開 / 關學習各階段時長
+- 漏檢結果（間隔過長）的 outlier 丟棄
+- GameStateCore 依 overlay 提早進入 BETTABLE，並使用學到的窗口關閉時間
+"""
+import time
+
+from src.autobet.game_state_core import GamePhase, GameStateCore
+from src.autobet.phase_estimator import PhaseDurationEstimator, PhaseDurations
+from src.autobet.phase_scheduler import PhaseScheduler
+
+DEFAULTS = PhaseDurations(2.0, 10.0, 5.0)
+
+
+def feed_rounds(estimator, table_id, rounds, *, start=0.0, cycle=20.0, open_at=1.2, close_at=13.0):
+    """餵入等間隔的局：結果 → overlay 開 → overlay 關"""
+    now = start
+    for _ in range(rounds):
+        estimator.observe_result(table_id, now)
+        estimator.observe_overlay(table_id, True, now + open_at)
+        estimator.observe_overlay(table_id, False, now + close_at)
+        now += cycle
+    return now
+
+
+class TestEstimator:
+    """測試時長估計"""
+
+    def test_defaults_until_enough_samples(self):
+        """測試樣本不足時返回預設值"""
+        estimator = PhaseDurationEstimator(min_samples=5)
+        feed_rounds(estimator, "t1", 3)
+        assert estimator.durations("t1", DEFAULTS) == DEFAULTS
+        assert estimator.durations("unknown", DEFAULTS) == DEFAULTS
+
+    def test_learns_table_rhythm(self):
+        """測試學習結算、下注窗口關閉與整局長度"""
+        estimator = PhaseDurationEstimator(min_samples=5)
+        now = feed_rounds(estimator, "t1", 10)
+        estimator.observe_result("t1", now)
+
+        durations = estimator.durations("t1", DEFAULTS, now + 1.2)
+        assert durations.adaptive
+        assert abs(durations.settling - 1.2) < 1e-9
+        # 從開啟（結果後 1.2 秒）到關閉（結果後 13 秒）
+        assert abs(durations.bettable - 11.8) < 1e-9
+        # 在關閉時進入 LOCKED：距離下一次結果 20 - 13 秒
+        assert abs(estimator.durations("t1", DEFAULTS, now + 13.0).locked - 7.0) < 1e-9
+
+    def test_tables_are_independent(self):
+        """測試每桌獨立估計"""
+        estimator = PhaseDurationEstimator(min_samples=5)
+        feed_rounds(estimator, "fast", 8, open_at=0.8)
+        feed_rounds(estimator, "slow", 8, open_at=3.0)
+        assert estimator.durations("fast", DEFAULTS).settling < estimator.durations("slow", DEFAULTS).settling
+
+    def test_missed_result_interval_is_rejected(self):
+        """測試漏檢一局造成的兩倍間隔不列入 cycle"""
+        estimator = PhaseDurationEstimator(min_samples=5)
+        now = feed_rounds(estimator, "t1", 8)
+        estimator.observe_result("t1", now + 20.0)  # 漏檢 now 那一局
+        stats = estimator.get_stats("t1")["cycle"]
+        assert stats["count"] == 7
+        assert stats["p90"] == 20.0
+
+    def test_disabled_returns_defaults(self):
+        """測試停用時仍返回預設值"""
+        estimator = PhaseDurationEstimator(min_samples=2, enabled=False)
+        feed_rounds(estimator, "t1", 5)
+        assert estimator.durations("t1", DEFAULTS) == DEFAULTS
+
+
+class TestCoreIntegration:
+    """測試與 GameStateCore 整合"""
+
+    def _core(self):
+        clock = type("Clock", (), {"now": 0.0, "__call__": lambda self: self.now})()
+        core = GameStateCore(PhaseScheduler(clock), PhaseDurationEstimator(min_samples=3))
+        return core, clock
+
+    def test_overlay_open_enters_bettable_early(self):
+        """測試 overlay 開啟時不必等 SETTLING 計時"""
+        core, clock = self._core()
+        phases = []
+        core.add_listener(on_phase_changed=lambda tid, rid, phase, ts: phases.append(phase))
+        core.on_result_detected("t1", "B", time.time())
+
+        clock.now = 0.6
+        core.on_overlay_changed("t1", True)
+        assert core.get_current_round("t1").phase == GamePhase.BETTABLE
+        assert phases == ["bettable"]
+
+        clock.now = 9.0
+        core.on_overlay_changed("t1", False)
+        assert core.get_current_round("t1").phase == GamePhase.LOCKED
+        assert phases == ["bettable", "locked"]
+
+    def test_learned_deadline(self):
+        """測試學習後 BETTABLE 期限為觀測到的窗口關閉時間"""
+        core, clock = self._core()
+        for index in range(4):
+            clock.now = index * 15.0
+            core.on_result_detected("t1", "B", time.time() + index)
+            clock.now += 1.0
+            core.on_overlay_changed("t1", True)
+            clock.now += 7.0
+            core.on_overlay_changed("t1", False)
+
+        start = clock.now = 60.0
+        core.on_result_detected("t1", "P", time.time() + 10)
+        assert core.phase_durations("t1").settling == 1.0
+        clock.now = start + 1.0
+        core.poll()
+        assert core.get_current_round("t1").phase == GamePhase.BETTABLE
+        assert core.bettable_deadline("t1") == start + 8.0
@@ -0,0 +1,125 @@
+# tests/test_phase_scheduler.py
+"""
+PhaseScheduler / GameStateCore 無頭測試
+
+測試範圍：
+- 依到期時間執行、同 key 重新排程取代舊事件、取消
+- 背景執行緒模式
+- GameStateCore 在無 Qt 的情況下完成 SETTLING → BETTABLE → LOCKED → IDLE
+- 單一排程器驅動數百張桌
+"""
+import threading
+import time
+
+from src.autobet.game_state_core import GamePhase, GameStateCore
+from src.autobet.phase_scheduler import PhaseScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler:
+    """測試排程器"""
+
+    def test_runs_in_due_order_and_replaces_same_key(self):
+        """測試到期順序與同 key 取代"""
+        clock = FakeClock()
+        scheduler = PhaseScheduler(clock)
+        fired = []
+        scheduler.schedule("a", 2.0, lambda: fired.append("a-old"))
+        scheduler.schedule("b", 1.0, lambda: fired.append("b"))
+        scheduler.schedule("a", 3.0, lambda: fired.append("a"), tag="bettable")
+
+        assert scheduler.pending("a") == "bettable"
+        assert scheduler.next_delay() == 1.0
+        clock.now = 2.5
+        assert scheduler.run_due() == 1
+        clock.now = 3.0
+        assert scheduler.run_due() == 1
+        assert fired == ["b", "a"]
+        assert len(scheduler) == 0 and scheduler.next_due() is None
+
+    def test_cancel(self):
+        """測試取消"""
+        clock = FakeClock()
+        scheduler = PhaseScheduler(clock)
+        fired = []
+        scheduler.schedule("a", 1.0, lambda: fired.append("a"))
+        assert scheduler.cancel("a")
+        assert not scheduler.cancel("a")
+        clock.now = 5.0
+        assert scheduler.run_due() == 0 and fired == []
+
+    def test_background_thread(self):
+        """測試背景執行緒在到期時執行"""
+        scheduler = PhaseScheduler()
+        done = threading.Event()
+        scheduler.start()
+        try:
+            started = time.monotonic()
+            scheduler.schedule("a", 0.05, done.set)
+            assert done.wait(1.0)
+            assert time.monotonic() - started >= 0.05
+        finally:
+            scheduler.stop()
+
+
+class TestGameStateCore:
+    """測試無 Qt 的階段狀態機"""
+
+    def test_full_cycle_with_fake_clock(self):
+        """測試完整階段循環與事件回調"""
+        clock = FakeClock()
+        core = GameStateCore(PhaseScheduler(clock))
+        phases, results = [], []
+        core.add_listener(
+            on_phase_changed=lambda tid, rid, phase, ts: phases.append(phase),
+            on_result_confirmed=lambda tid, rid, winner, ts: results.append(winner),
+        )
+
+        core.on_result_detected("t1", "B", time.time())
+        assert results == ["B"]
+        assert core.get_status("t1")["timers"]["settling_active"]
+
+        clock.now = core.SETTLING_DURATION
+        core.poll()
+        assert core.get_current_round("t1").phase == GamePhase.BETTABLE
+        assert core.bettable_deadline("t1") == clock.now + core.BETTABLE_DURATION
+
+        clock.now += core.BETTABLE_DURATION
+        core.poll()
+        clock.now += core.LOCKED_DURATION
+        core.poll()
+        assert phases == ["bettable", "locked"]
+        assert core.get_current_round("t1").phase == GamePhase.IDLE
+        assert len(core.scheduler) == 0
+
+    def test_new_result_resets_table_timer(self):
+        """測試新結果取消該桌原本的計時"""
+        clock = FakeClock()
+        core = GameStateCore(PhaseScheduler(clock))
+        core.on_result_detected("t1", "B", time.time())
+        clock.now = 1.0
+        core.on_result_detected("t1", "P", time.time())
+        clock.now = core.SETTLING_DURATION  # 第一局原本的到期時間
+        core.poll()
+        assert core.get_current_round("t1").phase == GamePhase.SETTLING
+
+    def test_hundreds_of_tables_one_scheduler(self):
+        """測試單一排程器驅動 500 張桌"""
+        clock = FakeClock()
+        core = GameStateCore(PhaseScheduler(clock))
+        tables = [f"T{i:03d}" for i in range(500)]
+        for index, table_id in enumerate(tables):
+            clock.now = index * 0.001
+            core.on_result_detected(table_id, "B", time.time())
+
+        clock.now += core.SETTLING_DURATION
+        assert core.poll() == len(tables)
+        assert all(core.get_current_round(t).phase == GamePhase.BETTABLE for t in tables)
+        assert len(core.scheduler) == len(tables)
@@ -0,0 +1,151 @@
+# tests/test_reader_events.py
+"""
+ReaderEventBroadcaster 測試
+
+測試範圍：
+- 多個訂閱者都收到每一筆事件（fan-out）
+- ?replay=N 與 Last-Event-ID 續傳
+- 沒有訂閱者時只保留 replay 緩衝
+- 訂閱者連線 / 斷線時從其他執行緒讀取 stats()
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ipc.reader_events import ReaderEventBroadcaster
+from ipc.t9_async_stream import SSEDecoder
+
+
+@pytest.fixture
+def hub():
+    broadcaster = ReaderEventBroadcaster(port=0, replay_size=100, subscriber_queue_size=10000)
+    broadcaster.start_server()
+    yield broadcaster
+    broadcaster.stop_server()
+
+
+async def _collect(port, count, *, path="/events", last_event_id=None, timeout=5.0):
+    """讀取 count 筆事件，返回 [(id, data), ...]"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+    if last_event_id:
+        head += f"Last-Event-ID: {last_event_id}\r\n"
+    writer.write((head + "\r\n").encode())
+    await writer.drain()
+
+    decoder = SSEDecoder()
+    events = []
+    body = b""
+    async def _read():
+        nonlocal body
+        while len(events) < count:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            if not body:
+                body = chunk
+                chunk = chunk.split(b"\r\n\r\n", 1)[1]
+            events.extend((int(e.id), e.json()) for e in decoder.feed(chunk))
+    try:
+        await asyncio.wait_for(_read(), timeout)
+    finally:
+        writer.close()
+    return events
+
+
+def _wait_subscribers(hub, count):
+    deadline = time.time() + 2
+    while hub.stats()["subscribers"] < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestFanOut:
+    """測試多訂閱者"""
+
+    def test_every_subscriber_gets_every_event(self, hub):
+        """測試兩個訂閱者都收到全部事件且順序一致"""
+        async def scenario():
+            tasks = [asyncio.ensure_future(_collect(hub.port, 2000)) for _ in range(2)]
+            await asyncio.get_running_loop().run_in_executor(None, _wait_subscribers, hub, 2)
+            for i in range(2000):
+                hub.broadcast_event({"n": i})
+            return await asyncio.gather(*tasks)
+
+        first, second = asyncio.run(scenario())
+        assert [data["n"] for _, data in first] == list(range(2000))
+        assert first == second
+        assert hub.stats()["dropped"] == 0
+
+    def test_health(self, hub):
+        """測試健康檢查"""
+        async def scenario():
+            reader, writer = await asyncio.open_connection("127.0.0.1", hub.port)
+            writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            data = await reader.read()
+            writer.close()
+            return data
+
+        assert asyncio.run(scenario()).endswith(b"ok")
+
+    def test_stats_from_other_thread_during_churn(self, hub):
+        """測試訂閱者反覆連線斷線時，其他執行緒讀取 stats() 不會出錯"""
+        errors = []
+        done = threading.Event()
+
+        def poll():
+            while not done.is_set():
+                try:
+                    hub.stats()
+                except Exception as e:  # pragma: no cover - 失敗時才會執行
+                    errors.append(e)
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+
+        hub.broadcast_event({"n": 0})
+
+        async def scenario():
+            for i in range(20):
+                # replay 取得一筆即斷線；下一次發布時伺服器寫入失敗並移除舊訂閱者
+                await asyncio.gather(*(_collect(hub.port, 1, path="/events?replay=1") for _ in range(10)))
+                hub.broadcast_event({"n": i})
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            done.set()
+            poller.join()
+        assert errors == []
+        assert hub.stats()["published"] == 21
+
+
+class TestReplay:
+    """測試晚加入與續傳"""
+
+    def test_replay_window_for_late_joiner(self, hub):
+        """測試 ?replay=N 取回最近 N 筆"""
+        for i in range(10):
+            hub.broadcast_event({"n": i})
+        events = asyncio.run(_collect(hub.port, 3, path="/events?replay=3"))
+        assert [data["n"] for _, data in events] == [7, 8, 9]
+
+    def test_resume_with_last_event_id(self, hub):
+        """測試 Last-Event-ID 只補發之後的事件"""
+        ids = [hub.broadcast_event({"n": i}) for i in range(5)]
+        events = asyncio.run(_collect(hub.port, 2, last_event_id=str(ids[2])))
+        assert [event_id for event_id, _ in events] == ids[3:]
+
+
+class TestBackpressure:
+    """測試事件累積上限"""
+
+    def test_no_subscribers_only_replay_buffer(self):
+        """測試沒有訂閱者時事件不會無限累積"""
+        broadcaster = ReaderEventBroadcaster(port=0, replay_size=50)
+        for i in range(1000):
+            broadcaster.broadcast_event({"n": i})
+        stats = broadcaster.stats()
+        assert stats["replay_buffered"] == 50
+        assert stats["published"] == 1000
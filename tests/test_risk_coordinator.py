@@ -0,0 +1,177 @@
+# tests/test_risk_coordinator.py
+"""
+RiskCoordinator 測試
+
+測試範圍：
+- 每筆結算更新涉及的範圍（global / table / table_strategy / all_tables_strategy / multi_strategy）
+- 止損、止盈、連輸上限觸發凍結，is_blocked 生效
+- 冷卻到期解除、STOP_ALL 凍結全域、NOTIFY 只通知不凍結
+- 狀態匯出 / 恢復
+- 換日重置 GLOBAL_DAY（含 STOP_ALL 凍結），不恢復前一天的 GLOBAL_DAY
+"""
+import dataclasses
+
+from src.autobet.lines.config import RiskLevelAction, RiskLevelConfig, RiskScope, StrategyRiskConfig
+from src.autobet.lines.loadgen import build_strategies
+from src.autobet.lines.risk import RiskCoordinator
+from src.autobet.lines.state import LayerOutcome
+
+WIN, LOSS = LayerOutcome.WIN, LayerOutcome.LOSS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_coordinator(*levels, count=2, metadata=None):
+    clock = FakeClock()
+    coordinator = RiskCoordinator(clock=clock)
+    definitions = []
+    for definition in build_strategies(count):
+        definition = dataclasses.replace(
+            definition, risk=StrategyRiskConfig(levels=list(levels)), metadata=dict(metadata or {})
+        )
+        coordinator.register_strategy(definition)
+        definitions.append(definition)
+    return coordinator, clock, [d.strategy_key for d in definitions]
+
+
+class TestScopeTracking:
+    """測試範圍累計"""
+
+    def test_settlement_updates_touched_scopes(self):
+        """測試一筆結算只更新它涉及的範圍"""
+        coordinator, _, (a, b) = make_coordinator()
+        coordinator.record(a, "T1", -100, LOSS, {})
+        coordinator.record(b, "T2", 300, WIN, {})
+
+        snapshot = coordinator.snapshot()
+        assert snapshot["global_day"]["pnl"] == 200
+        assert snapshot["table:T1"]["pnl"] == -100
+        assert snapshot["table:T2"]["pnl"] == 300
+        assert snapshot[f"table_strategy:T1:{a}"]["loss_streak"] == 1
+        assert f"table_strategy:T2:{a}" not in snapshot
+        assert coordinator.net_pnl == 200
+
+    def test_drawdown_and_streaks(self):
+        """測試峰值回撤與最長連輸"""
+        coordinator, _, (a, _) = make_coordinator()
+        for delta, outcome in [(100, WIN), (-50, LOSS), (-50, LOSS), (30, WIN)]:
+            coordinator.record(a, "T1", delta, outcome, {})
+        tracker = coordinator.snapshot()["global_day"]
+        assert tracker["peak_pnl"] == 100 and tracker["drawdown"] == 70
+        assert tracker["max_loss_streak"] == 2 and tracker["loss_streak"] == 0
+
+
+class TestRiskLevels:
+    """測試風控層級"""
+
+    def test_stop_loss_freezes_table_for_all_strategies(self):
+        """測試 TABLE 止損凍結該桌所有策略，其他桌不受影響"""
+        level = RiskLevelConfig(scope=RiskScope.TABLE, stop_loss=-200)
+        coordinator, _, (a, b) = make_coordinator(level)
+        assert not coordinator.is_blocked(a, "T1", {})
+
+        assert coordinator.record(a, "T1", -100, LOSS, {}) == []
+        events = coordinator.record(b, "T1", -150, LOSS, {})
+        assert [(e.scope_key, e.action) for e in events] == [(("table", "T1"), RiskLevelAction.PAUSE)]
+
+        assert coordinator.is_blocked(a, "T1", {})
+        assert coordinator.is_blocked(b, "T1", {})
+        assert not coordinator.is_blocked(a, "T2", {})
+
+    def test_cooldown_expires(self):
+        """測試冷卻到期後解除凍結"""
+        level = RiskLevelConfig(scope=RiskScope.TABLE_STRATEGY, max_drawdown_losses=2, cooldown_sec=60)
+        coordinator, clock, (a, _) = make_coordinator(level)
+        coordinator.record(a, "T1", -100, LOSS, {})
+        coordinator.record(a, "T1", -100, LOSS, {})
+        assert coordinator.is_blocked(a, "T1", {})
+
+        clock.now += 61
+        coordinator.refresh()
+        assert not coordinator.is_blocked(a, "T1", {})
+        assert coordinator.frozen_scopes() == []
+
+    def test_stop_all_freezes_everything(self):
+        """測試 STOP_ALL 凍結全域"""
+        level = RiskLevelConfig(scope=RiskScope.ALL_TABLES_STRATEGY, take_profit=500, action=RiskLevelAction.STOP_ALL)
+        coordinator, _, (a, b) = make_coordinator(level)
+        coordinator.record(a, "T1", 300, WIN, {})
+        coordinator.record(a, "T2", 300, WIN, {})
+        assert coordinator.frozen_scopes() == ["global_day"]
+        assert coordinator.is_blocked(b, "T9", {})
+
+    def test_notify_does_not_block(self):
+        """測試 NOTIFY 只在條件成立時通知一次"""
+        level = RiskLevelConfig(scope=RiskScope.GLOBAL_DAY, stop_loss=-100, action=RiskLevelAction.NOTIFY)
+        coordinator, _, (a, _) = make_coordinator(level)
+        assert len(coordinator.record(a, "T1", -150, LOSS, {})) == 1
+        assert coordinator.record(a, "T1", -10, LOSS, {}) == []
+        assert not coordinator.is_blocked(a, "T1", {})
+
+    def test_multi_strategy_group(self):
+        """測試 risk_group 相同的策略共用範圍"""
+        level = RiskLevelConfig(scope=RiskScope.MULTI_STRATEGY, stop_loss=-300)
+        coordinator, _, (a, b) = make_coordinator(level, metadata={"risk_group": "g1"})
+        coordinator.record(a, "T1", -200, LOSS, {"risk_group": "g1"})
+        coordinator.record(b, "T2", -200, LOSS, {"risk_group": "g1"})
+        assert coordinator.is_blocked(a, "T3", {"risk_group": "g1"})
+
+    def test_export_restore(self):
+        """測試匯出 / 恢復凍結與累計"""
+        level = RiskLevelConfig(scope=RiskScope.TABLE, stop_loss=-100, cooldown_sec=600)
+        coordinator, clock, (a, _) = make_coordinator(level)
+        coordinator.record(a, "T1", -150, LOSS, {})
+
+        restored, _, _ = make_coordinator(level)
+        restored.clock = clock
+        restored.restore_state(coordinator.export_state())
+        assert restored.net_pnl == -150
+        assert restored.is_blocked(a, "T1", {})
+
+
+class TestDayBoundary:
+    """測試 GLOBAL_DAY 換日"""
+
+    def stopped_all(self):
+        level = RiskLevelConfig(scope=RiskScope.GLOBAL_DAY, stop_loss=-100, action=RiskLevelAction.STOP_ALL)
+        coordinator, clock, (a, b) = make_coordinator(level)
+        coordinator.record(a, "T1", -150, LOSS, {})
+        assert coordinator.is_blocked(b, "T2", {})
+        return coordinator, clock, (a, b)
+
+    def test_refresh_resets_global_day_at_midnight(self):
+        """測試跨日後 GLOBAL_DAY 重新累計、STOP_ALL 解除，其他範圍保留"""
+        coordinator, clock, (a, b) = self.stopped_all()
+        coordinator.refresh()
+        assert coordinator.is_blocked(b, "T2", {})  # 同一天仍凍結
+
+        clock.now += 86400
+        coordinator.refresh()
+        assert not coordinator.is_blocked(b, "T2", {})
+        assert coordinator.net_pnl == 0
+        assert coordinator.snapshot()["table:T1"]["pnl"] == -150
+
+    def test_restore_skips_previous_day(self):
+        """測試恢復時不延續前一天的 GLOBAL_DAY 累計與凍結"""
+        coordinator, clock, (a, b) = self.stopped_all()
+        state = coordinator.export_state()
+
+        same_day, _, _ = make_coordinator()
+        same_day.clock = clock
+        same_day.restore_state(state)
+        assert same_day.is_blocked(b, "T2", {})
+        assert same_day.net_pnl == -150
+
+        clock.now += 86400
+        next_day, _, _ = make_coordinator()
+        next_day.clock = clock
+        next_day.restore_state(state)
+        assert not next_day.is_blocked(b, "T2", {})
+        assert next_day.net_pnl == 0
+        assert next_day.snapshot()["table:T1"]["pnl"] == -150
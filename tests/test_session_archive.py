@@ -0,0 +1,160 @@
+# tests/test_session_archive.py
+"""
+SessionArchive 單元測試
+
+測試範圍：
+- 記錄、寫入與範圍查詢（桌號 / 策略 / 時間）
+- DataFrame 解碼
+- 字典編碼跨實例保存
+- 不完整記錄的截斷
+- 記錄路徑不寫檔，緩衝滿時丟棄並計數
+- LineOrchestrator 整合
+"""
+import time
+
+import pytest
+
+from src.autobet.session_archive import (
+    DTYPES,
+    KIND_DECISIONS,
+    KIND_ROUNDS,
+    KIND_SETTLEMENTS,
+    SessionArchive,
+)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return SessionArchive(tmp_path)
+
+
+class TestRecordAndQuery:
+    """測試記錄與查詢"""
+
+    def test_query_by_table_and_time(self, archive):
+        """測試按桌號和時間範圍篩選"""
+        base = time.time()
+        for i in range(10):
+            archive.record_round("T1" if i % 2 == 0 else "T2", f"r{i}", "B", base + i)
+
+        rows = archive.query(KIND_ROUNDS, table_id="T1")
+        assert [r.decode() for r in rows["round_id"]] == ["r0", "r2", "r4", "r6", "r8"]
+
+        rows = archive.query(KIND_ROUNDS, start=base + 3, end=base + 6)
+        assert [r.decode() for r in rows["round_id"]] == ["r3", "r4", "r5"]
+
+    def test_query_by_strategy(self, archive):
+        """測試按策略篩選決策"""
+        ts = time.time()
+        archive.record_decision("T1", "r1", "s1", "B", 100.0, 0, ts)
+        archive.record_decision("T1", "r1", "s2", "P", 200.0, 1, ts)
+
+        rows = archive.query(KIND_DECISIONS, strategy_key="s2")
+        assert len(rows) == 1
+        assert rows[0]["amount"] == 200.0
+        assert rows[0]["layer"] == 1
+
+    def test_unknown_value_returns_empty(self, archive):
+        """測試篩選不存在的桌號"""
+        archive.record_round("T1", "r1", "B", time.time())
+        assert len(archive.query(KIND_ROUNDS, table_id="nope")) == 0
+
+    def test_rounds_reject_strategy_filter(self, archive):
+        """測試 rounds 不支援策略篩選"""
+        with pytest.raises(ValueError):
+            archive.query(KIND_ROUNDS, strategy_key="s1")
+
+    def test_to_frame_decodes_columns(self, archive):
+        """測試 DataFrame 解碼字典和字串欄位"""
+        pytest.importorskip("pandas")
+        archive.record_settlement("T1", "r1", "s1", "B", "P", "loss", 100.0, 0, -100.0, time.time())
+
+        frame = archive.to_frame(KIND_SETTLEMENTS, archive.query(KIND_SETTLEMENTS))
+        row = frame.iloc[0]
+        assert row["table"] == "T1"
+        assert row["strategy"] == "s1"
+        assert row["winner"] == "P"
+        assert row["outcome"] == "loss"
+        assert row["pnl"] == -100.0
+
+
+class TestPersistence:
+    """測試持久化"""
+
+    def test_dictionary_survives_restart(self, tmp_path):
+        """測試新實例可解碼舊資料並沿用編碼"""
+        ts = time.time()
+        first = SessionArchive(tmp_path)
+        first.record_decision("T1", "r1", "s1", "B", 100.0, 0, ts)
+        first.close()
+
+        second = SessionArchive(tmp_path)
+        second.record_decision("T1", "r2", "s1", "B", 200.0, 1, ts + 1)
+        rows = second.query(KIND_DECISIONS, table_id="T1", strategy_key="s1")
+        assert list(rows["amount"]) == [100.0, 200.0]
+
+    def test_partial_record_truncated(self, archive):
+        """測試崩潰留下的不完整記錄在下次寫入時被截斷"""
+        ts = time.time()
+        archive.record_round("T1", "r1", "B", ts)
+        archive.flush()
+
+        path = archive._partition_path(KIND_ROUNDS, archive.list_days(KIND_ROUNDS)[0])
+        with path.open("ab") as fp:
+            fp.write(b"\x00" * 5)
+
+        archive.record_round("T1", "r2", "P", ts + 1)
+        rows = archive.query(KIND_ROUNDS)
+        assert path.stat().st_size == 2 * DTYPES[KIND_ROUNDS].itemsize
+        assert [r.decode() for r in rows["round_id"]] == ["r1", "r2"]
+
+
+    def test_record_never_writes_and_bounds_buffer(self, tmp_path):
+        """測試記錄只進緩衝，超過上限丟棄並計數，flush() 才寫檔"""
+        ts = time.time()
+        archive = SessionArchive(tmp_path, max_buffered=3)
+        for index in range(5):
+            archive.record_round("T1", f"r{index}", "B", ts + index)
+        assert archive.list_days(KIND_ROUNDS) == []
+        assert archive.dropped == 2
+
+        assert archive.flush() == 3
+        archive.record_round("T1", "r5", "P", ts + 5)
+        assert [r.decode() for r in archive.query(KIND_ROUNDS)["round_id"]] == ["r0", "r1", "r2", "r5"]
+
+
+class TestOrchestratorIntegration:
+    """測試 LineOrchestrator 寫入歸檔"""
+
+    def test_orchestrator_records_rounds_decisions_and_settlements(self, archive):
+        """測試開獎、決策與結算都寫入歸檔"""
+        from src.autobet.lines.config import DedupMode, EntryConfig, StakingConfig, StrategyDefinition
+        from src.autobet.lines.orchestrator import LineOrchestrator, TablePhase
+
+        definition = StrategyDefinition(
+            strategy_key="PB_BET_P",
+            entry=EntryConfig(pattern="PB THEN BET P", dedup=DedupMode.STRICT, first_trigger_layer=1),
+            staking=StakingConfig(sequence=[100, 200, 400], reset_on_win=True),
+        )
+        orchestrator = LineOrchestrator()
+        orchestrator.register_strategy(definition, tables=["table1"])
+        orchestrator.attach_archive(archive)
+
+        timestamp = time.time()
+        orchestrator.handle_result("table1", "round0", "P", timestamp)
+        orchestrator.handle_result("table1", "round1", "B", timestamp + 1)
+        decisions = orchestrator.update_table_phase(
+            "table1", "round2", TablePhase.BETTABLE, timestamp + 2, generate_decisions=True
+        )
+        assert decisions
+        orchestrator.handle_result("table1", "round2", "P", timestamp + 3)
+
+        assert len(archive.query(KIND_ROUNDS, table_id="table1")) == 3
+        decision_rows = archive.query(KIND_DECISIONS, strategy_key="PB_BET_P")
+        assert decision_rows["round_id"][0] == b"round2"
+        assert decision_rows["amount"][0] == 100.0
+        settlement_rows = archive.query(KIND_SETTLEMENTS, table_id="table1")
+        assert len(settlement_rows) == 1
+        assert settlement_rows["direction"][0] == b"P"
+        assert settlement_rows["outcome"][0] == 1
+        assert settlement_rows["pnl"][0] > 0
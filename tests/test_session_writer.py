@@ -0,0 +1,103 @@
+# tests/test_session_writer.py
+"""
+SessionWriter 單元測試
+
+測試範圍：
+- NDJSON / CSV 寫入與批次
+- CSV 表頭
+- 佇列滿時丟棄而非阻塞
+- 依大小輪替與 gzip 壓縮
+"""
+import gzip
+import json
+import time
+
+import pytest
+
+from src.autobet.session_writer import RotationPolicy, SessionWriter
+
+
+@pytest.fixture
+def writer():
+    w = SessionWriter(flush_interval_sec=0.05, fsync_interval_sec=0.1)
+    yield w
+    w.close()
+
+
+class TestWrite:
+    """測試基本寫入"""
+
+    def test_write_json_lines(self, writer, tmp_path):
+        """測試 NDJSON 依序寫入"""
+        path = tmp_path / "orders.ndjson"
+        for i in range(50):
+            assert writer.write_json(path, {"seq": i})
+
+        assert writer.flush()
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == list(range(50))
+        assert writer.stats()["written"] == 50
+
+    def test_csv_header_written_once(self, writer, tmp_path):
+        """測試 CSV 表頭只在新檔開頭寫入"""
+        path = tmp_path / "session.csv"
+        writer.register(path, RotationPolicy(header=["ts", "winner"]))
+        writer.write_csv(path, [1, "B"])
+        writer.write_csv(path, [2, "P"])
+
+        assert writer.flush()
+        assert path.read_text(encoding="utf-8").splitlines() == ["ts,winner", "1,B", "2,P"]
+
+    def test_multiple_files_share_one_thread(self, writer, tmp_path):
+        """測試多個檔案由同一背景執行緒寫入"""
+        a, b = tmp_path / "a.ndjson", tmp_path / "b.ndjson"
+        writer.write_json(a, {"f": "a"})
+        writer.write_json(b, {"f": "b"})
+
+        assert writer.flush()
+        assert json.loads(a.read_text(encoding="utf-8"))["f"] == "a"
+        assert json.loads(b.read_text(encoding="utf-8"))["f"] == "b"
+        assert writer.stats()["open_files"] == 2
+
+
+class TestBackpressure:
+    """測試佇列上限"""
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        """測試佇列滿時立即返回 False"""
+        w = SessionWriter(max_queue=1)
+        w._ensure_started = lambda: None  # 不啟動背景執行緒，讓佇列保持滿
+        path = tmp_path / "x.ndjson"
+
+        assert w.write_json(path, {"n": 1})
+        assert not w.write_json(path, {"n": 2})
+        assert w.stats()["dropped"] == 1
+
+
+class TestRotation:
+    """測試檔案輪替"""
+
+    def test_rotate_by_size_and_compress(self, writer, tmp_path):
+        """測試超過大小後輪替並壓縮舊分段"""
+        path = tmp_path / "session.csv"
+        writer.register(path, RotationPolicy(max_bytes=64, header=["seq", "pad"]))
+
+        for i in range(20):
+            writer.write_csv(path, [i, "x" * 10])
+            assert writer.flush()
+        time.sleep(0.2)  # 等待背景執行緒完成最後一次輪替檢查
+
+        segments = sorted(tmp_path.glob("session.*.csv.gz"))
+        assert segments
+        assert writer.stats()["rotations"] == len(segments)
+
+        rows = []
+        for segment in segments:
+            with gzip.open(segment, "rt", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            assert lines[0] == "seq,pad"
+            rows.extend(lines[1:])
+        if path.exists():
+            rows.extend(path.read_text(encoding="utf-8").splitlines()[1:])
+
+        assert sorted(int(r.split(",")[0]) for r in rows) == list(range(20))
@@ -0,0 +1,173 @@
+# tests/test_t9_async_stream.py
+"""
+AsyncT9StreamClient 單元測試
+
+測試範圍：
+- SSEDecoder 增量解析（任意切分、CRLF、多行 data、註解、id / retry）
+- 本地 SSE 伺服器：多串流共用 event loop、chunked 編碼
+- 重連時帶上 Last-Event-ID
+"""
+import asyncio
+import json
+
+import pytest
+
+from ipc.t9_async_stream import AsyncT9StreamClient, SSEDecoder
+
+
+class TestSSEDecoder:
+    """測試 SSE 解析"""
+
+    def test_split_at_every_byte(self):
+        """測試逐位元組餵入與整塊餵入結果相同"""
+        payload = (
+            b"retry: 1500\r\n"
+            b": heartbeat\r\n"
+            b"id: 7\r\nevent: result\r\ndata: {\"winner\":\r\ndata: \"B\"}\r\n\r\n"
+            b"data: {\"winner\": \"P\"}\n\n"
+        )
+        decoder = SSEDecoder()
+        events = []
+        for i in range(len(payload)):
+            events.extend(decoder.feed(payload[i:i + 1]))
+
+        assert [(e.event, e.json(), e.id) for e in events] == [
+            ("result", {"winner": "B"}, "7"),
+            ("message", {"winner": "P"}, "7"),
+        ]
+        assert decoder.retry == 1500
+        assert decoder.last_event_id == "7"
+
+    def test_reset_drops_partial_event(self):
+        """測試斷線後丟棄未完成事件但保留 last_event_id"""
+        decoder = SSEDecoder()
+        decoder.feed(b"id: 3\ndata: {}\n\ndata: {\"partial\"")
+        decoder.reset()
+        assert decoder.feed(b"data: {\"n\": 1}\n\n")[0].json() == {"n": 1}
+        assert decoder.last_event_id == "3"
+
+
+class _SSEServer:
+    """本地 SSE 測試伺服器：每次連線送出 events 後關閉"""
+
+    def __init__(self, events_per_connection=3, chunked=False):
+        self.events_per_connection = events_per_connection
+        self.chunked = chunked
+        self.requests = []  # [(path, headers)]
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    async def _handle(self, reader, writer):
+        request_line = (await reader.readline()).decode()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        path = request_line.split(" ")[1]
+        self.requests.append((path, headers))
+
+        start = int(headers.get("last-event-id", "0"))
+        head = "HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+        head += "Transfer-Encoding: chunked\r\n\r\n" if self.chunked else "\r\n"
+        writer.write(head.encode())
+        for seq in range(start + 1, start + 1 + self.events_per_connection):
+            body = f"id: {seq}\nevent: result\ndata: {json.dumps({'seq': seq, 'path': path})}\n\n".encode()
+            if self.chunked:
+                body = f"{len(body):x}\r\n".encode() + body + b"\r\n"
+            writer.write(body)
+            await writer.drain()
+        if self.chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+
+async def _run_until(client, predicate, timeout=5.0):
+    runner = asyncio.ensure_future(client.run())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    client.stop()
+    await asyncio.wait_for(runner, 2.0)
+
+
+class TestAsyncClient:
+    """測試本地伺服器上的多串流客戶端"""
+
+    @pytest.mark.parametrize("chunked", [False, True])
+    def test_multiplexed_streams_resume_with_last_event_id(self, chunked):
+        """測試多桌共用一個 loop，重連後從上次的 id 續傳"""
+        received = []
+
+        async def scenario():
+            server = _SSEServer(events_per_connection=3, chunked=chunked)
+            await server.start()
+            client = AsyncT9StreamClient(
+                retry_delay=0.05,
+                on_event=lambda stream, name, data: received.append((stream, name, data["seq"])),
+            )
+            client.add_stream("WG7", server.url("/stream/WG7"))
+            client.add_stream("WG8", server.url("/stream/WG8"))
+
+            def enough():
+                return all(
+                    sum(1 for r in received if r[0] == name) >= 6 for name in ("WG7", "WG8")
+                )
+
+            await _run_until(client, enough)
+            await server.close()
+            return client, server
+
+        client, server = asyncio.run(scenario())
+
+        for name in ("WG7", "WG8"):
+            seqs = [seq for stream, event, seq in received if stream == name]
+            assert seqs[:6] == [1, 2, 3, 4, 5, 6]  # 沒有重複也沒有遺漏
+            assert all(event == "result" for stream, event, seq in received)
+
+        resumed = [headers.get("last-event-id") for path, headers in server.requests if path.startswith("/stream/WG7")]
+        assert resumed[:2] == [None, "3"]
+        assert all("event_types" not in path for path, headers in server.requests)  # 客戶端過濾
+
+        stats = client.stats()["WG7"]
+        assert stats["events"] >= 6
+        assert stats["reconnects"] >= 1
+        assert stats["last_event_id"] is not None
+
+    def test_connection_error_counts_and_backs_off(self):
+        """測試連線失敗時記錄錯誤並退避重試"""
+        statuses = []
+
+        async def scenario():
+            server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            server.close()
+            await server.wait_closed()
+
+            client = AsyncT9StreamClient(
+                retry_delay=0.05,
+                max_retry_delay=0.1,
+                on_status=lambda stream, status, detail: statuses.append(status),
+            )
+            client.add_stream("WG7", f"http://127.0.0.1:{port}/stream")
+            await _run_until(client, lambda: statuses.count("error") >= 2)
+            return client
+
+        client = asyncio.run(scenario())
+        assert client.stats()["WG7"]["errors"] >= 2
+        assert statuses[-1] == "stopped"
@@ -0,0 +1,163 @@
+# tests/test_t9_feeder.py
+"""
+T9ResultFeeder 測試
+
+測試範圍：
+- T9 結果資料轉為 RESULT 事件（贏家代碼、桌號、時間戳）
+- 本地 SSE 伺服器：async（預設）與 thread 客戶端都把結果送進事件佇列
+- EngineWorker 依 result_stream 設定啟動串流，串流結果由 GameStateManager 補上局號
+"""
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from ipc.t9_feeder import CLIENT_ASYNC, CLIENT_THREAD, T9ResultFeeder, to_result_event
+
+
+class TestToResultEvent:
+    """測試結果轉換"""
+
+    def test_winner_names_map_to_codes(self):
+        """測試英文、中文與代碼都轉為 B/P/T"""
+        for raw, code in [("banker", "B"), ("閒", "P"), ("t", "T"), ("Player", "P")]:
+            assert to_result_event({"winner": raw})["winner"] == code
+
+    def test_fields(self):
+        """測試桌號、局號與時間戳沿用串流資料，缺少時使用串流名稱"""
+        event = to_result_event({"table_id": "WG7", "round_id": "r1", "winner": "B", "received_at": 1700000000000})
+        assert event == {
+            "type": "RESULT",
+            "source": "t9_stream",
+            "table_id": "WG7",
+            "round_id": "r1",
+            "winner": "B",
+            "received_at": 1700000000000,
+        }
+        event = to_result_event({"result": "P"}, "WG8")
+        assert event["table_id"] == "WG8" and event["round_id"] is None
+        assert abs(event["received_at"] / 1000.0 - time.time()) < 5
+
+    def test_unknown_winner_ignored(self):
+        """測試無法辨識的資料返回 None"""
+        assert to_result_event({"winner": "?"}) is None
+        assert to_result_event({"stage": "betting"}) is None
+        assert to_result_event(["B"]) is None
+
+    def test_unknown_client_rejected(self):
+        """測試未知的客戶端類型"""
+        with pytest.raises(ValueError):
+            T9ResultFeeder("http://127.0.0.1/stream", lambda event: None, client="grpc")
+
+
+@pytest.fixture
+def result_server():
+    paths = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            paths.append(self.path)
+            table = self.path.partition("table=")[2] or "main"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            if self.headers.get("Last-Event-ID"):
+                time.sleep(0.5)
+                return
+            for seq, winner in enumerate(["banker", "player"], start=1):
+                data = json.dumps({"table_id": table, "winner": winner})
+                self.wfile.write(f"id: {seq}\nevent: result\ndata: {data}\n\n".encode())
+                self.wfile.write(f"event: status\ndata: {json.dumps({'table_id': table})}\n\n".encode())
+                self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/stream", paths
+    server.shutdown()
+    server.server_close()
+
+
+def _collect(events, count, timeout=5.0):
+    received = []
+    deadline = time.time() + timeout
+    while len(received) < count and time.time() < deadline:
+        try:
+            received.append(events.get(timeout=0.05))
+        except queue.Empty:
+            pass
+    return received
+
+
+class TestFeeder:
+    """測試本地伺服器上的結果來源"""
+
+    @pytest.mark.parametrize("client", [CLIENT_ASYNC, CLIENT_THREAD])
+    def test_results_reach_queue(self, result_server, client):
+        """測試每桌一條串流，只有結果事件進入佇列"""
+        url, paths = result_server
+        events = queue.Queue()
+        feeder = T9ResultFeeder(url, events.put, tables=["WG7", "WG8"], client=client)
+        feeder.start()
+        assert feeder.is_running()
+        received = _collect(events, 4)
+        time.sleep(0.1)
+        feeder.stop()
+
+        assert not feeder.is_running()
+        assert events.empty()  # status 事件沒有進入佇列
+        assert sorted((e["table_id"], e["winner"]) for e in received) == [
+            ("WG7", "B"), ("WG7", "P"), ("WG8", "B"), ("WG8", "P"),
+        ]
+        assert all(e["source"] == "t9_stream" for e in received)
+        assert {"/stream?table=WG7", "/stream?table=WG8"} <= set(paths)
+        assert set(feeder.stats()) <= {"WG7", "WG8"}
+
+
+class TestEngineWorkerIntegration:
+    """測試 EngineWorker 使用 T9 結果串流"""
+
+    def worker(self, stream_config):
+        from ui.workers.engine_worker import EngineWorker
+
+        rounds = []
+        stub = SimpleNamespace(
+            engine=SimpleNamespace(ui={"result_stream": stream_config}),
+            event_feeder=None,
+            _incoming_events=queue.Queue(),
+            _emit_log=lambda *args: None,
+            _is_selected_table=lambda table_id: table_id == "WG7",
+            _game_state=SimpleNamespace(
+                on_result_detected=lambda table_id, winner, ts: rounds.append(table_id) or f"{table_id}-{len(rounds)}"
+            ),
+        )
+        return EngineWorker, stub, rounds
+
+    def test_disabled_keeps_image_detection(self):
+        """測試未啟用時不建立串流"""
+        EngineWorker, stub, _ = self.worker({"enabled": False, "url": "http://127.0.0.1/stream"})
+        assert EngineWorker._start_result_stream(stub) is False
+        assert stub.event_feeder is None
+
+    def test_stream_results_get_round_ids(self, result_server):
+        """測試串流結果進入事件佇列，選定桌號的結果由 GameStateManager 產生局號"""
+        url, _ = result_server
+        EngineWorker, stub, rounds = self.worker({"enabled": True, "url": url, "tables": ["WG7", "WG8"]})
+        assert EngineWorker._start_result_stream(stub) is True
+        assert stub.event_feeder.client == CLIENT_ASYNC
+        received = _collect(stub._incoming_events, 4)
+        stub.event_feeder.stop()
+
+        for event in received:
+            EngineWorker._assign_stream_round(stub, event)
+        assigned = {e["table_id"]: e["round_id"] for e in received}
+        assert assigned["WG7"] == "WG7-2"
+        assert assigned["WG8"] is None  # 非選定桌號不推進遊戲狀態
+        assert rounds == ["WG7", "WG7"]
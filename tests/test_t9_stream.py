@@ -0,0 +1,131 @@
+# tests/test_t9_stream.py
+"""
+T9StreamClient 斷線續傳與跳號檢測測試
+
+測試範圍：
+- SequenceGapDetector：連續、跳號、重複（只限收過的序號）、重置
+- 本地 SSE 伺服器：重連帶 Last-Event-ID、丟棄重送事件、跳號觸發補抓、客戶端過濾事件類型
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ipc.t9_stream import STREAM_SEQ_KEY, SequenceGapDetector, T9StreamClient
+
+
+class TestSequenceGapDetector:
+    """測試序號追蹤"""
+
+    def test_observe(self):
+        """測試連續、跳號、重複與重置"""
+        detector = SequenceGapDetector()
+        assert detector.observe("WG7", 10) == ("new", None)
+        assert detector.observe("WG7", 11) == ("new", None)
+        assert detector.observe("WG7", 14) == ("gap", (12, 13))
+        assert detector.observe("WG7", 14) == ("duplicate", None)
+        assert detector.observe("WG8", 1) == ("new", None)  # 各桌獨立
+        assert detector.snapshot()["missing"] == 2
+
+    def test_reset_after_large_rewind(self):
+        """測試序號大幅倒退時視為伺服器重啟"""
+        detector = SequenceGapDetector()
+        detector.observe("WG7", 5000)
+        assert detector.observe("WG7", 1) == ("reset", None)
+        assert detector.observe("WG7", 2) == ("new", None)
+
+    def test_unseen_small_rewind_is_reset(self):
+        """測試倒退到沒收過的序號（hub 重啟）視為重置，不當作重複丟棄"""
+        detector = SequenceGapDetector(history=4)
+        for seq in range(1, 11):
+            detector.observe(STREAM_SEQ_KEY, seq)
+        assert detector.observe(STREAM_SEQ_KEY, 9) == ("duplicate", None)
+        assert detector.observe(STREAM_SEQ_KEY, 3) == ("reset", None)  # 已超出記憶範圍
+        assert detector.observe(STREAM_SEQ_KEY, 4) == ("new", None)
+        assert detector.observe(STREAM_SEQ_KEY, 4) == ("duplicate", None)
+
+        detector.reset()
+        assert detector.observe(STREAM_SEQ_KEY, 1) == ("new", None)
+        assert detector.snapshot()["last_seq"] == {STREAM_SEQ_KEY: 1}
+
+    def test_extract(self):
+        """測試從 seq 欄位或 SSE id 取序號"""
+        assert SequenceGapDetector.extract({"table_id": "WG7", "seq": 5}, "x") == ("WG7", 5)
+        assert SequenceGapDetector.extract({"table_id": "WG7"}, "WG7:42") == (STREAM_SEQ_KEY, 42)
+        assert SequenceGapDetector.extract({"table_id": "WG7"}, None) is None
+
+    def test_interleaved_tables_share_stream_ids(self):
+        """測試 SSE id 為整條串流共用時，多桌交錯不誤報跳號"""
+        detector = SequenceGapDetector()
+        events = [(1, "A"), (2, "B"), (3, "A"), (4, "B"), (6, "A")]
+        results = [
+            detector.observe(*SequenceGapDetector.extract({"table_id": table}, str(event_id)))
+            for event_id, table in events
+        ]
+        assert [status for status, _ in results] == ["new", "new", "new", "new", "gap"]
+        assert results[-1][1] == (5, 5)
+        assert detector.snapshot()["last_seq"] == {STREAM_SEQ_KEY: 6}
+
+
+# 每次連線送出的事件序號（第二次連線包含重送的 3 和缺漏的 5；2 是非 result 事件）
+_CONNECTIONS = [[1, 2, 3], [3, 4, 6]]
+_STATUS_EVENTS = {2}
+
+
+@pytest.fixture
+def sse_server():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            index = len(requests_seen)
+            requests_seen.append({**self.headers, "path": self.path})
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            seqs = _CONNECTIONS[index] if index < len(_CONNECTIONS) else []
+            if not seqs:
+                time.sleep(0.5)
+            for seq in seqs:
+                data = json.dumps({"table_id": "WG7", "round_id": f"r{seq}"})
+                event = "status" if seq in _STATUS_EVENTS else "result"
+                self.wfile.write(f"id: WG7:{seq}\nevent: {event}\ndata: {data}\n\n".encode())
+                self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/stream", requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+class TestResume:
+    """測試斷線續傳"""
+
+    def test_resume_drops_duplicates_and_reports_gap(self, sse_server):
+        """測試重連帶 Last-Event-ID、重複事件被丟棄、跳號觸發補抓"""
+        url, requests_seen = sse_server
+        received, gaps = [], []
+        client = T9StreamClient(
+            url,
+            on_event=lambda name, data: received.append(data["round_id"]),
+            on_gap=lambda table, first, last: gaps.append((table, first, last)),
+        )
+        client.start()
+        deadline = time.time() + 5
+        while len(received) < 4 and time.time() < deadline:
+            time.sleep(0.02)
+        client.stop()
+
+        assert received == ["r1", "r3", "r4", "r6"]
+        assert gaps == [(STREAM_SEQ_KEY, 5, 5)]  # 被過濾的 status 事件不算跳號
+        assert "event_types" not in requests_seen[0]["path"]
+        assert "Last-Event-ID" not in requests_seen[0]
+        assert requests_seen[1]["Last-Event-ID"] == "WG7:3"
+        assert client.gap_detector.snapshot()["duplicates"] == 1
@@ -0,0 +1,90 @@
+# tests/test_ui_bridge.py
+"""
+UiSignalBridge 測試
+
+測試範圍：
+- 多筆日誌在一次 flush 中以單一批次送出
+- 狀態更新合併，只送出變更的 key
+- 待送日誌超過上限時丟棄最舊的
+- 跨執行緒 post 後於 flush 時送出
+"""
+import threading
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from ui.workers.ui_bridge import UiSignalBridge
+
+
+@pytest.fixture
+def bridge():
+    if QCoreApplication.instance() is None:
+        QCoreApplication([])
+    bridge = UiSignalBridge(fps=30, max_pending_logs=100)
+    received = {"logs": [], "deltas": []}
+    bridge.log_batch.connect(received["logs"].append)
+    bridge.status_delta.connect(received["deltas"].append)
+    bridge.received = received
+    return bridge
+
+
+class TestUiSignalBridge:
+    """測試訊號橋"""
+
+    def test_logs_batched_per_flush(self, bridge):
+        """測試同一幀內的日誌合併為一個訊號"""
+        for i in range(10):
+            bridge.post_log("INFO", "Engine", f"msg {i}")
+        bridge.flush()
+        bridge.flush()  # 沒有新日誌時不送出
+
+        assert len(bridge.received["logs"]) == 1
+        assert bridge.received["logs"][0][-1] == ("INFO", "Engine", "msg 9")
+        assert len(bridge.received["logs"][0]) == 10
+
+    def test_status_coalesced_and_diffed(self, bridge):
+        """測試狀態合併後只送變更的 key"""
+        bridge.post_status({"enabled": False, "rounds": 1, "latest_results": {"main": {"winner": "B"}}})
+        bridge.post_status({"rounds": 2})
+        _, delta = bridge.flush()
+        assert delta == {"enabled": False, "rounds": 2, "latest_results": {"main": {"winner": "B"}}}
+
+        bridge.post_status({"enabled": False, "rounds": 2, "latest_results": {"main": {"winner": "B"}}})
+        _, delta = bridge.flush()
+        assert delta == {}
+
+        bridge.post_status({"enabled": True, "rounds": 2})
+        _, delta = bridge.flush()
+        assert delta == {"enabled": True}
+        assert len(bridge.received["deltas"]) == 2
+        assert bridge.current_status()["enabled"] is True
+
+        bridge.reset()
+        bridge.post_status({"rounds": 2})
+        assert bridge.flush()[1] == {"rounds": 2}
+
+    def test_pending_logs_bounded(self, bridge):
+        """測試待送日誌上限"""
+        for i in range(150):
+            bridge.post_log("DEBUG", "Result", str(i))
+        logs, _ = bridge.flush()
+        assert len(logs) == 100
+        assert logs[0][2] == "50"
+        assert bridge.stats()["dropped_logs"] == 50
+
+    def test_post_from_worker_thread(self, bridge):
+        """測試工作執行緒 post，UI 執行緒 flush"""
+        def worker():
+            for i in range(50):
+                bridge.post_log("INFO", "Thread", str(i))
+                bridge.post_status({"rounds": i})
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        logs, delta = bridge.flush()
+        assert len(logs) == 100
+        assert delta == {"rounds": 49}
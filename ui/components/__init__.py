@@ -3,6 +3,7 @@ from .toast import Toast, show_toast
 from .overview_panel import OverviewPanel, MetricCard, StatusIndicator
 from .table_card import TableCard, TableCardsPanel, LineStatusBadge
 from .event_panel import EventPanel, EventItem
+from .event_log_view import EventLogModel, EventLogView, EventLogDelegate
 from .compact_strategy_info_card import CompactStrategyInfoCard
 from .compact_live_card import CompactLiveCard
 
@@ -17,6 +18,9 @@ __all__ = [
     'LineStatusBadge',
     'EventPanel',
     'EventItem',
+    'EventLogModel',
+    'EventLogView',
+    'EventLogDelegate',
     'CompactStrategyInfoCard',
     'CompactLiveCard',
 ]
\ No newline at end of file
@@ -0,0 +1,320 @@
+# ui/components/event_log_view.py
+"""
+虛擬化事件 / 日誌列表（model/view）
+
+舊做法：EventPanel 每個事件建立一個 EventItem(QFrame)，
+LogViewer 在 QTextEdit 持續 append HTML；長時間執行後 widget 與文件
+不斷增長，GUI 越來越慢。
+
+做法：
+- EventLogModel(QAbstractListModel)：固定容量環形緩衝（預設 100k 筆），
+  每筆只存一個 tuple；序號遞增，超出容量時覆寫最舊的
+- 篩選（等級 / 模組 / 桌號 / 文字）維護「通過篩選的序號」列表：
+  新事件只檢查新的那幾筆（增量），變更篩選條件時才重新掃描一次
+- 批次 append_many() 對 view 只發一次 rowsInserted / rowsRemoved
+- EventLogDelegate 直接繪製單行文字，QListView 以 uniformItemSizes
+  只繪製可見列，不為每筆事件建立 widget
+- EventLogView 在捲到最新位置時自動跟隨
+
+使用範例:
+    >>> model = EventLogModel(capacity=100_000)
+    >>> view = EventLogView(model)
+    >>> model.append("INFO", "Line", "決策生成", table="T1")
+    >>> model.set_filter(levels={"WARNING", "ERROR"})
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt
+from PySide6.QtGui import QColor, QFont, QPainter
+from PySide6.QtWidgets import QAbstractItemView, QListView, QStyle, QStyledItemDelegate, QWidget
+
+# (timestamp, level, module, table, message, metadata)
+LogEntry = Tuple[float, str, str, str, str, Optional[Dict[str, Any]]]
+
+ROLE_ENTRY = Qt.UserRole + 1
+ROLE_LEVEL = Qt.UserRole + 2
+ROLE_MODULE = Qt.UserRole + 3
+ROLE_TABLE = Qt.UserRole + 4
+ROLE_METADATA = Qt.UserRole + 5
+
+# 等級（日誌等級與 EventPanel 事件類型）→ 顏色
+LEVEL_COLORS: Dict[str, str] = {
+    "DEBUG": "#9ca3af",
+    "INFO": "#60a5fa",
+    "WARNING": "#f59e0b",
+    "ERROR": "#ef4444",
+    "info": "#3b82f6",
+    "success": "#10b981",
+    "warning": "#f59e0b",
+    "error": "#ef4444",
+    "conflict": "#8b5cf6",
+    "risk": "#dc2626",
+}
+
+
+def format_entry(entry: LogEntry) -> str:
+    timestamp, level, module, table, message, metadata = entry
+    parts = [time.strftime("%H:%M:%S", time.localtime(timestamp)), f"[{level}]"]
+    if module:
+        parts.append(f"{module}:")
+    if table:
+        parts.append(f"({table})")
+    parts.append(message)
+    if metadata:
+        parts.append("| " + " ".join(f"{k}={v}" for k, v in list(metadata.items())[:3]))
+    return " ".join(parts)
+
+
+class EventLogModel(QAbstractListModel):
+    """環形緩衝 + 增量篩選的列表 model"""
+
+    def __init__(self, capacity: int = 100_000, newest_first: bool = False, parent: Optional[QWidget] = None):
+        """
+        Args:
+            capacity: 保留的事件數上限（超過時覆寫最舊的）
+            newest_first: True 時最新事件在第 0 列（EventPanel），否則在最後一列（日誌）
+        """
+        super().__init__(parent)
+        self.capacity = max(1, capacity)
+        self.newest_first = newest_first
+        self._slots: List[Optional[LogEntry]] = [None] * self.capacity
+        self._next_seq = 0
+        self._start = 0  # clear() 之後的第一筆序號
+
+        # 通過篩選的序號（遞增）；_head 之前的項目已被淘汰，累積過多時才壓縮
+        self._rows: List[int] = []
+        self._head = 0
+
+        self._levels: Optional[Set[str]] = None
+        self._modules: Optional[Set[str]] = None
+        self._tables: Optional[Set[str]] = None
+        self._text: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # 寫入
+    def append(
+        self,
+        level: str,
+        module: str,
+        message: str,
+        *,
+        table: str = "",
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        self.append_many([(timestamp or time.time(), level, module, table, message, metadata)])
+
+    def append_many(self, entries: Iterable[LogEntry]) -> None:
+        """批次加入（一次 rowsRemoved + 一次 rowsInserted）"""
+        batch = list(entries)
+        if not batch:
+            return
+        if len(batch) > self.capacity:
+            self._next_seq += len(batch) - self.capacity
+            batch = batch[-self.capacity:]
+
+        # 先移除將被覆寫的列，再寫入環形緩衝
+        self._evict_before(max(0, self._next_seq + len(batch) - self.capacity))
+
+        matched: List[int] = []
+        for entry in batch:
+            seq = self._next_seq
+            self._slots[seq % self.capacity] = entry
+            self._next_seq += 1
+            if self._matches(entry):
+                matched.append(seq)
+
+        if matched:
+            count = self.rowCount()
+            first, last = (0, len(matched) - 1) if self.newest_first else (count, count + len(matched) - 1)
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._rows.extend(matched)
+            self.endInsertRows()
+
+    def _evict_before(self, oldest: int) -> None:
+        rows, head = self._rows, self._head
+        end = head
+        while end < len(rows) and rows[end] < oldest:
+            end += 1
+        removed = end - head
+        if removed:
+            count = self.rowCount()
+            first, last = (count - removed, count - 1) if self.newest_first else (0, removed - 1)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._head = end
+            self.endRemoveRows()
+        if self._head > 4096 and self._head * 2 > len(self._rows):
+            del self._rows[:self._head]
+            self._head = 0
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._slots = [None] * self.capacity
+        self._start = self._next_seq
+        self._rows = []
+        self._head = 0
+        self.endResetModel()
+
+    # ------------------------------------------------------------------
+    # 篩選
+    def set_filter(
+        self,
+        *,
+        levels: Optional[Iterable[str]] = None,
+        modules: Optional[Iterable[str]] = None,
+        tables: Optional[Iterable[str]] = None,
+        text: Optional[str] = None,
+    ) -> None:
+        """設定篩選（None 表示不限）並重新掃描緩衝"""
+        self._levels = set(levels) if levels is not None else None
+        self._modules = set(modules) if modules is not None else None
+        self._tables = set(tables) if tables is not None else None
+        self._text = text.lower() if text else None
+
+        self.beginResetModel()
+        oldest = max(self._start, self._next_seq - self.capacity)
+        slots, capacity = self._slots, self.capacity
+        self._rows = [seq for seq in range(oldest, self._next_seq) if self._matches(slots[seq % capacity])]
+        self._head = 0
+        self.endResetModel()
+
+    def _matches(self, entry: LogEntry) -> bool:
+        _, level, module, table, message, metadata = entry
+        if self._levels is not None and level not in self._levels:
+            return False
+        if self._modules is not None and module not in self._modules:
+            return False
+        if self._tables is not None:
+            entry_table = table or (metadata or {}).get("table", "")
+            if entry_table not in self._tables:
+                return False
+        if self._text is not None and self._text not in message.lower():
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Qt model 介面
+    @property
+    def total(self) -> int:
+        """緩衝中的事件數（不論篩選）"""
+        return min(self._next_seq - self._start, self.capacity)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows) - self._head
+
+    def entry(self, row: int) -> Optional[LogEntry]:
+        count = self.rowCount()
+        if not 0 <= row < count:
+            return None
+        position = count - 1 - row if self.newest_first else row
+        return self._slots[self._rows[self._head + position] % self.capacity]
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        entry = self.entry(index.row())
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return format_entry(entry)
+        if role == ROLE_ENTRY:
+            return entry
+        if role == ROLE_LEVEL:
+            return entry[1]
+        if role == ROLE_MODULE:
+            return entry[2]
+        if role == ROLE_TABLE:
+            return entry[3]
+        if role == ROLE_METADATA:
+            return entry[5]
+        if role == Qt.ToolTipRole:
+            metadata = entry[5]
+            return "\n".join(f"{k}={v}" for k, v in metadata.items()) if metadata else None
+        return None
+
+
+class EventLogDelegate(QStyledItemDelegate):
+    """單行繪製：左側等級色條 + 時間 / 等級 / 模組 / 訊息"""
+
+    def __init__(self, row_height: int = 22, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.row_height = row_height
+        self._font = QFont("Consolas", 9)
+        self._colors: Dict[str, QColor] = {}
+
+    def _color(self, level: str) -> QColor:
+        color = self._colors.get(level)
+        if color is None:
+            color = self._colors[level] = QColor(LEVEL_COLORS.get(level, "#6b7280"))
+        return color
+
+    def sizeHint(self, option: Any, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.row_height)
+
+    def paint(self, painter: QPainter, option: Any, index: QModelIndex) -> None:
+        entry = index.data(ROLE_ENTRY)
+        if entry is None:
+            return
+        painter.save()
+        rect = option.rect
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(rect, QColor("#1f2937"))
+        color = self._color(entry[1])
+        painter.fillRect(QRect(rect.left(), rect.top() + 2, 3, rect.height() - 4), color)
+
+        painter.setFont(self._font)
+        text_rect = rect.adjusted(10, 0, -6, 0)
+        time_text = time.strftime("%H:%M:%S", time.localtime(entry[0]))
+        painter.setPen(QColor("#6b7280"))
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, time_text)
+
+        metrics = painter.fontMetrics()
+        offset = metrics.horizontalAdvance(time_text) + 8
+        level_text = f"[{entry[1]}]"
+        painter.setPen(color)
+        painter.drawText(text_rect.adjusted(offset, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft, level_text)
+        offset += metrics.horizontalAdvance(level_text) + 8
+
+        body = format_entry(entry).split(" ", 2)[-1]  # 去掉時間與等級
+        painter.setPen(QColor("#e5e5e5"))
+        body = metrics.elidedText(body, Qt.ElideRight, max(0, text_rect.width() - offset))
+        painter.drawText(text_rect.adjusted(offset, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft, body)
+        painter.restore()
+
+
+class EventLogView(QListView):
+    """虛擬化列表（只繪製可見列；位於最新位置時自動跟隨）"""
+
+    def __init__(self, model: EventLogModel, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(EventLogDelegate(parent=self))
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self._follow = True
+        model.rowsAboutToBeInserted.connect(self._remember_follow)
+        model.rowsInserted.connect(self._apply_follow)
+
+    def _at_latest(self) -> bool:
+        bar = self.verticalScrollBar()
+        model = self.model()
+        if getattr(model, "newest_first", False):
+            return bar.value() <= bar.minimum()
+        return bar.value() >= bar.maximum()
+
+    def _remember_follow(self, *_: Any) -> None:
+        self._follow = self._at_latest()
+
+    def _apply_follow(self, *_: Any) -> None:
+        if not self._follow:
+            return
+        if getattr(self.model(), "newest_first", False):
+            self.scrollToTop()
+        else:
+            self.scrollToBottom()
@@ -9,21 +9,23 @@
 """
 from __future__ import annotations
 
+import time
 from datetime import datetime
-from typing import List, Optional
-from PySide6.QtCore import Qt, QTimer, Signal
+from typing import Optional
+from PySide6.QtCore import QTimer, Signal
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
+    QButtonGroup,
     QFrame,
     QHBoxLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
+from .event_log_view import ROLE_ENTRY, EventLogModel, EventLogView
+
 
 class EventItem(QFrame):
     """單個事件項"""
@@ -126,16 +128,27 @@ class EventItem(QFrame):
 
 
 class EventPanel(QWidget):
-    """事件面板"""
-
-    def __init__(self, parent: Optional[QWidget] = None) -> None:
+    """事件面板（虛擬化列表；EventItem 保留給需要單一事件卡片的地方）"""
+
+    # 篩選按鈕 → 事件類型（None 表示全部）
+    FILTER_TYPES = {
+        "all": None,
+        "error": ("error",),
+        "warning": ("warning",),
+        "conflict": ("conflict",),
+        "risk": ("risk",),
+    }
+
+    def __init__(self, parent: Optional[QWidget] = None, max_events: int = 100_000) -> None:
         super().__init__(parent)
-        self.max_events = 100  # 最多顯示 100 個事件
+        self.max_events = max_events  # 環形緩衝容量，超過時覆寫最舊事件
+        self.orchestrator = None
+        self.model = EventLogModel(capacity=max_events, newest_first=True, parent=self)
         self._build_ui()
 
         # 定時刷新
         self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self._auto_refresh)
+        self.refresh_timer.timeout.connect(self._on_refresh_timer)
         self.refresh_timer.start(1000)  # 1秒刷新一次
 
     def _build_ui(self) -> None:
@@ -189,8 +202,16 @@ class EventPanel(QWidget):
         self.filter_conflict_btn = QPushButton("衝突")
         self.filter_risk_btn = QPushButton("風控")
 
-        for btn in [self.filter_all_btn, self.filter_error_btn, self.filter_warning_btn,
-                    self.filter_conflict_btn, self.filter_risk_btn]:
+        self.filter_group = QButtonGroup(self)
+        self.filter_group.setExclusive(True)
+        buttons = {
+            "all": self.filter_all_btn,
+            "error": self.filter_error_btn,
+            "warning": self.filter_warning_btn,
+            "conflict": self.filter_conflict_btn,
+            "risk": self.filter_risk_btn,
+        }
+        for key, btn in buttons.items():
             btn.setFont(QFont("Microsoft YaHei UI", 8))
             btn.setStyleSheet("""
                 QPushButton {
@@ -209,26 +230,24 @@ class EventPanel(QWidget):
                 }
             """)
             btn.setCheckable(True)
+            btn.clicked.connect(lambda _checked=False, k=key: self.set_filter(k))
+            self.filter_group.addButton(btn)
             filter_layout.addWidget(btn)
 
         self.filter_all_btn.setChecked(True)
         filter_layout.addStretch()
         main_layout.addLayout(filter_layout)
 
-        # 事件列表區
-        self.event_list = QListWidget()
+        # 事件列表區（只繪製可見列）
+        self.event_list = EventLogView(self.model)
         self.event_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #111827;
                 border: 1px solid #374151;
                 border-radius: 8px;
             }
-            QListWidget::item {
-                border: none;
-                padding: 4px;
-            }
         """)
-        self.event_list.setSpacing(8)
+        self.event_list.doubleClicked.connect(self._on_row_double_clicked)
         main_layout.addWidget(self.event_list)
 
     def add_event(
@@ -244,32 +263,17 @@ class EventPanel(QWidget):
         Args:
             event_type: "info", "success", "warning", "error", "conflict", "risk"
             message: 事件訊息
-            event_id: 事件 ID（用於修復）
+            event_id: 事件 ID（用於修復；錯誤事件雙擊時送出）
             metadata: 額外元數據
         """
-        import time
-
-        # 創建事件項
-        event_item = EventItem(
-            event_type=event_type,
-            message=message,
-            timestamp=time.time(),
-            event_id=event_id,
-            metadata=metadata,
-        )
-
-        # 添加到列表頂部
-        list_item = QListWidgetItem(self.event_list)
-        list_item.setSizeHint(event_item.sizeHint())
-        self.event_list.insertItem(0, list_item)
-        self.event_list.setItemWidget(list_item, event_item)
-
-        # 限制最大數量
-        while self.event_list.count() > self.max_events:
-            self.event_list.takeItem(self.event_list.count() - 1)
-
-        # 連接修復信號
-        event_item.fix_clicked.connect(self._on_fix_requested)
+        self.model.append_many([self._make_entry(event_type, message, event_id, metadata)])
+
+    @staticmethod
+    def _make_entry(event_type: str, message: str, event_id: str = "", metadata: Optional[dict] = None):
+        if event_id:
+            metadata = dict(metadata or {}, event_id=event_id)
+        table = str(metadata.get("table", "")) if metadata else ""
+        return (time.time(), event_type, "", table, message, metadata)
 
     def add_conflict_event(self, rejected_strategy: str, reason: str, metadata: Optional[dict] = None) -> None:
         """添加衝突事件"""
@@ -287,7 +291,16 @@ class EventPanel(QWidget):
 
     def clear_events(self) -> None:
         """清空所有事件"""
-        self.event_list.clear()
+        self.model.clear()
+
+    def set_filter(self, key: str) -> None:
+        """依事件類型篩選（套用到緩衝中所有事件）"""
+        self.model.set_filter(levels=self.FILTER_TYPES.get(key))
+
+    def _on_row_double_clicked(self, index) -> None:
+        entry = index.data(ROLE_ENTRY)
+        if entry and entry[1] == "error":
+            self._on_fix_requested((entry[5] or {}).get("event_id", ""))
 
     def _on_fix_requested(self, event_id: str) -> None:
         """處理修復請求"""
@@ -295,9 +308,37 @@ class EventPanel(QWidget):
         print(f"Fix requested for event: {event_id}")
         self.add_event("info", f"嘗試修復事件 {event_id}...")
 
+    def _on_refresh_timer(self) -> None:
+        # 透過屬性查找呼叫，子類或實例覆蓋 _auto_refresh 時才會生效
+        self._auto_refresh()
+
     def _auto_refresh(self) -> None:
-        """自動刷新（由外部提供數據源時覆蓋此方法）"""
-        pass
+        """自動刷新：有 Orchestrator 時批次讀入新事件（一次插入）"""
+        if self.orchestrator is None:
+            return
+        events = self.orchestrator.drain_events()
+        if events:
+            self.model.append_many(
+                self._make_entry(self._classify(event.level, event.message), event.message, metadata=event.metadata)
+                for event in events
+            )
+
+    @staticmethod
+    def _classify(level: str, message: str) -> str:
+        """由等級與訊息判斷事件類型"""
+        level = level.lower()
+        text = message.lower()
+        if "reject" in text or "conflict" in text:
+            return "conflict"
+        if "risk" in text or "freeze" in text:
+            return "risk"
+        if level == "error":
+            return "error"
+        if level == "warning":
+            return "warning"
+        if "enter" in text or "success" in text:
+            return "success"
+        return "info"
 
     def set_orchestrator(self, orchestrator) -> None:
         """
@@ -307,36 +348,3 @@ class EventPanel(QWidget):
             orchestrator: LineOrchestrator 實例
         """
         self.orchestrator = orchestrator
-        self.last_event_count = 0
-
-        # 覆蓋自動刷新方法
-        def refresh_from_orchestrator():
-            if not hasattr(self, 'orchestrator'):
-                return
-
-            # 獲取最新事件
-            events = self.orchestrator.drain_events()
-
-            for event in events:
-                # 解析事件類型
-                level = event.level.lower()
-                message = event.message
-                metadata = event.metadata
-
-                # 判斷事件類型
-                if "reject" in message.lower() or "conflict" in message.lower():
-                    event_type = "conflict"
-                elif "risk" in message.lower() or "freeze" in message.lower():
-                    event_type = "risk"
-                elif level == "error":
-                    event_type = "error"
-                elif level == "warning":
-                    event_type = "warning"
-                elif "enter" in message.lower() or "success" in message.lower():
-                    event_type = "success"
-                else:
-                    event_type = "info"
-
-                self.add_event(event_type, message, metadata=metadata)
-
-        self._auto_refresh = refresh_from_orchestrator
@@ -6,17 +6,20 @@ import re
 from typing import Any, Dict, Optional, List, Tuple
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QLabel, QPushButton, QFrame, QTextEdit,
+    QLabel, QPushButton, QFrame,
     QProgressBar, QComboBox, QCheckBox, QSpinBox,
     QMessageBox, QInputDialog, QTableWidget, QTableWidgetItem,
     QHeaderView, QSplitter, QScrollArea, QSizePolicy, QTabWidget
 )
 from PySide6.QtCore import Qt, Signal, QTimer
-from PySide6.QtGui import QFont, QTextCursor, QColor, QPalette
+from PySide6.QtGui import QFont, QColor, QPalette
 
 from ..workers.engine_worker import EngineWorker
+from ..workers.ui_bridge import UiSignalBridge
+from ..workers.overlay_worker import OverlayDetectionWorker
 from ..components.next_bet_card import NextBetCard  # ✅ 結果局顯示卡片
 from ..components import CompactStrategyInfoCard, CompactLiveCard
+from ..components.event_log_view import EventLogModel, EventLogView
 
 # 桌號映射: canonical_id -> display_name (僅供 UI 顯示)
 TABLE_ID_DISPLAY_MAP = {
@@ -705,8 +708,10 @@ class LineSummaryCard(QFrame):
 
 class LogViewer(QFrame):
     """日誌檢視器"""
-    def __init__(self):
+    def __init__(self, max_logs: int = 100_000):
         super().__init__()
+        self.max_logs = max_logs
+        self._table_filter: Optional[Tuple[str, ...]] = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -745,12 +750,11 @@ class LogViewer(QFrame):
         header_layout.addWidget(self.module_filter)
         header_layout.addWidget(clear_btn)
 
-        # 日誌文字區域
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setFont(QFont("Consolas", 9))
-        self.log_text.setStyleSheet("""
-            QTextEdit {
+        # 日誌列表（環形緩衝 + 虛擬化，只繪製可見列）
+        self.log_model = EventLogModel(capacity=self.max_logs, parent=self)
+        self.log_view = EventLogView(self.log_model)
+        self.log_view.setStyleSheet("""
+            QListView {
                 background-color: #0f0f0f;
                 color: #e5e5e5;
                 border: 1px solid #333333;
@@ -758,51 +762,41 @@ class LogViewer(QFrame):
             }
         """)
 
+        # 篩選套用到緩衝中所有日誌（不再只影響之後的日誌）
+        self.level_filter.currentTextChanged.connect(self._apply_filters)
+        self.module_filter.currentTextChanged.connect(self._apply_filters)
+
         layout.addLayout(header_layout)
-        layout.addWidget(self.log_text)
+        layout.addWidget(self.log_view)
+
+    def _apply_filters(self, *_):
+        level = self.level_filter.currentText()
+        module = self.module_filter.currentText()
+        self.log_model.set_filter(
+            levels=None if level == "全部" else (level,),
+            modules=None if module == "全部" else (module,),
+            tables=self._table_filter,
+        )
 
-    def add_log(self, level: str, module: str, message: str):
+    def set_table_filter(self, table_id: Optional[str]):
+        """只顯示指定桌的日誌（None 表示全部）"""
+        self._table_filter = (table_id,) if table_id else None
+        self._apply_filters()
+
+    def add_log(self, level: str, module: str, message: str, table: str = ""):
         """添加日誌"""
-        # 篩選檢查
-        if self.level_filter.currentText() != "全部" and level != self.level_filter.currentText():
-            return
-        if self.module_filter.currentText() != "全部" and module != self.module_filter.currentText():
-            return
+        self.log_model.append_many([(time.time(), level, module, table, message, None)])
 
-        # 顏色對應
-        colors = {
-            "DEBUG": "#9ca3af",
-            "INFO": "#60a5fa",
-            "WARNING": "#f59e0b",
-            "ERROR": "#ef4444"
-        }
-        color = colors.get(level, "#ffffff")
-
-        # 格式化訊息
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_msg = f'<span style="color: #6b7280;">{timestamp}</span> <span style="color: {color}; font-weight: bold;">[{level}]</span> <span style="color: #a3a3a3;">{module}:</span> <span style="color: #e5e5e5;">{message}</span>'
-
-        # 添加到文字區域
-        self.log_text.append(formatted_msg)
-
-        # 自動滾動到底部
-        cursor = self.log_text.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.log_text.setTextCursor(cursor)
-
-        # 限制日誌長度 (保持最後 1000 行)
-        document = self.log_text.document()
-        if document.blockCount() > 1000:
-            cursor = QTextCursor(document)
-            cursor.movePosition(QTextCursor.Start)
-            for _ in range(100):  # 刪除前 100 行
-                cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor)
-            cursor.removeSelectedText()
+    def add_logs(self, entries):
+        """批次添加日誌 [(level, module, message, table), ...]（一次插入）"""
+        now = time.time()
+        self.log_model.append_many(
+            (now, level, module, table, message, None) for level, module, message, table in entries
+        )
 
     def clear_logs(self):
         """清除日誌"""
-        self.log_text.clear()
+        self.log_model.clear()
 
 class ClickSequenceCard(QFrame):
     """點擊順序設定卡片"""
@@ -1200,7 +1194,7 @@ class DashboardPage(QWidget):
 
         # 直接檢測相關屬性
         self.detector = None
-        self.detection_timer = QTimer()
+        self.detection_worker: Optional[OverlayDetectionWorker] = None
         self.detection_active = False
         self.last_decision = None  # 記錄上次決策，防重複觸發
         self.is_triggering = False  # 防止重複觸發標志
@@ -1559,6 +1553,14 @@ class DashboardPage(QWidget):
         """設定引擎工作執行緒"""
         self.engine_worker = EngineWorker()
 
+        # 日誌與引擎狀態經由訊號橋合併，依幀率送到 UI（狀態只送變更的 key）
+        self._engine_status: Dict[str, Any] = {}
+        self.ui_bridge = UiSignalBridge(fps=20, parent=self)
+        self.ui_bridge.log_batch.connect(self.on_log_batch)
+        self.ui_bridge.status_delta.connect(self.on_engine_status_delta)
+        self.engine_worker.attach_ui_bridge(self.ui_bridge)
+        self.ui_bridge.start()
+
         # 連接訊號
         self.engine_worker.state_changed.connect(self.on_state_changed)
         self.engine_worker.session_stats.connect(self.on_stats_updated)
@@ -1829,7 +1831,7 @@ class DashboardPage(QWidget):
         table_id, cleaned = self._extract_log_context(message)
         if not self._should_display_log(table_id):
             return
-        self.log_viewer.add_log(level, module, cleaned)
+        self.log_viewer.add_log(level, module, cleaned, table=table_id or "")
 
     def _append_table_log(self, level: str, module: str, table_id: Optional[str], text: str) -> None:
         if table_id:
@@ -1846,6 +1848,20 @@ class DashboardPage(QWidget):
         """接收日誌訊息"""
         self._process_incoming_log(level, module, message)
 
+    def on_log_batch(self, entries):
+        """接收一批日誌（UiSignalBridge 每幀一次，整批一次插入列表）"""
+        batch = []
+        for level, module, message in entries:
+            table_id, cleaned = self._extract_log_context(message)
+            if self._should_display_log(table_id):
+                batch.append((level, module, cleaned, table_id or ""))
+        self.log_viewer.add_logs(batch)
+
+    def on_engine_status_delta(self, delta):
+        """接收狀態差異並合併成完整狀態"""
+        self._engine_status.update(delta)
+        self.on_engine_status(self._engine_status)
+
     def on_next_bet_info(self, bet_info: dict):
         """接收即將下注的詳細資訊並更新 NextBetCard"""
         try:
@@ -2330,15 +2346,20 @@ class DashboardPage(QWidget):
             QTimer.singleShot(3000, self._reset_triggering_flag)
 
     def setup_direct_detection(self):
-        """設定直接檢測（類似 Overlay Page）"""
-        self.detection_timer.timeout.connect(self.process_detection_frame)
-        self.detection_timer.setInterval(120)  # 120ms，與 Overlay Page 一致
-
-        # 初始化檢測器
-        self.create_direct_detector()
+        """設定直接檢測（截圖與檢測在背景執行緒，UI 只接收決策字典）"""
+        self.detection_worker = OverlayDetectionWorker(interval_ms=120, parent=self)  # 120ms，與 Overlay Page 一致
+        self.detection_worker.decision_ready.connect(self.on_detection_decision)
+        self.detection_worker.detection_error.connect(self._on_detection_error)
 
     def create_direct_detector(self):
-        """創建直接檢測器"""
+        """取得檢測器：優先共用引擎的 overlay 檢測器，引擎尚未建立時才自行建立"""
+        shared = self.engine_worker.get_overlay_detector() if self.engine_worker else None
+        if shared is not None:
+            self.detector = shared
+            return True
+        if self.detector is not None:
+            return True
+
         try:
             from src.autobet.detectors import ProductionOverlayDetector
 
@@ -2383,33 +2404,22 @@ class DashboardPage(QWidget):
             self.log_viewer.add_log("ERROR", "Detection", f"檢測器初始化失敗: {e}")
             return False
 
-    def process_detection_frame(self):
-        """處理檢測幀（直接檢測）"""
-        if not self.detector:
-            return
-
-        try:
-            # 截取畫面並檢測
-            import pyautogui
-            from PIL import Image
-            import numpy as np
-
-            screenshot = pyautogui.screenshot()
-            frame = np.array(screenshot)
-            frame = frame[:, :, ::-1]  # RGB -> BGR
+    def _on_detection_error(self, message: str):
+        self.log_viewer.add_log("ERROR", "Detection", f"檢測錯誤: {message}")
+        self.detection_card.update_content(f"× 檢測錯誤\n{message}", "#ef4444", False)
 
-            # 執行檢測
-            result = self.detector.process_frame(frame)
+    def on_detection_decision(self, result: dict):
+        """處理檢測執行緒送來的決策（UI 執行緒）"""
+        if not self.detection_active:
+            return  # 停止後仍在佇列中的結果
 
+        try:
             # 提取關鍵檢測數據
             decision = result.get('decision', 'UNKNOWN')
             ncc_qing = result.get('ncc_qing', 0.0)
-            hue = result.get('hue', 0.0)
-            sat = result.get('sat', 0.0)
             in_green_gate = result.get('in_green_gate', False)
             open_counter = result.get('open_counter', '0/2')
             close_counter = result.get('close_counter', '0/2')
-            reason = result.get('reason', '未知原因')
 
             # 格式化檢測詳情（精簡版）
             details = (
@@ -2459,7 +2469,7 @@ class DashboardPage(QWidget):
                 if counter_state != self._last_counter_log:
                     debug_msg = (
                         f"綠色護欄✓但未OPEN: NCC={ncc_qing:.3f} "
-                        f"(需要≥{self.detector.open_th:.2f}), 計數={open_counter}"
+                        f"(需要≥{result.get('open_th', 0.0):.2f}), 計數={open_counter}"
                     )
                     self.log_viewer.add_log("DEBUG", "Detection", debug_msg)
                     self._last_counter_log = counter_state
@@ -2467,8 +2477,7 @@ class DashboardPage(QWidget):
                 self._last_counter_log = None
 
         except Exception as e:
-            self.log_viewer.add_log("ERROR", "Detection", f"檢測錯誤: {e}")
-            self.detection_card.update_content(f"× 檢測錯誤\n{str(e)}", "#ef4444", False)
+            self._on_detection_error(str(e))
 
     def trigger_click_sequence(self):
         """觸發點擊序列（當檢測到可下注時）"""
@@ -2498,15 +2507,20 @@ class DashboardPage(QWidget):
 
     def start_direct_detection(self):
         """開始直接檢測"""
-        if self.detector:
-            self.detection_active = True
-            self.detection_timer.start()
-            self.log_viewer.add_log("INFO", "Detection", "開始直接檢測")
+        if not self.create_direct_detector():
+            self.log_viewer.add_log("WARNING", "Detection", "檢測器不可用，無法開始直接檢測")
+            return
+        self.detection_worker.set_detector(self.detector)
+        self.detection_active = True
+        if not self.detection_worker.isRunning():
+            self.detection_worker.start()
+        self.log_viewer.add_log("INFO", "Detection", "開始直接檢測")
 
     def stop_direct_detection(self):
         """停止直接檢測"""
         self.detection_active = False
-        self.detection_timer.stop()
+        if self.detection_worker:
+            self.detection_worker.stop()
         self.is_triggering = False  # 重置觸發標志
         self.last_decision = None  # 重置決策記錄
         self.log_viewer.add_log("INFO", "Detection", "停止直接檢測")
@@ -2554,4 +2568,6 @@ class DashboardPage(QWidget):
             self.engine_worker.stop_engine()
             self.engine_worker.quit()
             self.engine_worker.wait(3000)  # 等待最多 3 秒
+        if getattr(self, "ui_bridge", None):
+            self.ui_bridge.stop()
         event.accept()
@@ -2,20 +2,27 @@
 import os, json, time, threading, random, logging, queue, unicodedata
 from pathlib import Path
 from typing import Optional, Callable, Dict, Any, Tuple, List
-from PySide6.QtCore import QThread, Signal, QTimer
+from PySide6.QtCore import Qt, QThread, Signal, QTimer
 import cv2
 import numpy as np
 
 from src.autobet.autobet_engine import AutoBetEngine
+from src.autobet.click_planner import ClickSequencePlanner
+from src.autobet.execution_deadline import DeadlineStats, ExecutionDeadline
 from src.autobet.chip_profile_manager import ChipProfileManager
 from src.autobet.detectors import BeadPlateResultDetector
 from src.autobet.game_state_manager import GameStateManager, GamePhase
+from src.autobet.io_events import NDJSONPlayer as _NDJSONPlayer, REPLAY_INTERVAL
+from src.autobet.loop_timing import LoopTimer
+from src.autobet.session_archive import SessionArchive
+from src.autobet.session_writer import RotationPolicy, get_session_writer
 from src.autobet.lines import (
     LineOrchestrator,
     TablePhase,
     BetDecision,
     load_strategy_definitions,
 )
+from .ui_bridge import UiSignalBridge
 
 # 桌號映射: canonical_id -> display_name (僅供 UI 顯示)
 TABLE_DISPLAY_MAP = {
@@ -75,43 +82,22 @@ class DemoFeeder:
         return self._running
 
 
-class NDJSONPlayer:
-    def __init__(self, file_path: str, on_event: Callable, interval: float = 1.0):
+class NDJSONPlayer(_NDJSONPlayer):
+    """NDJSON 回放（沿用 io_events 的實作；保留 UI 端的參數名稱）"""
+
+    def __init__(
+        self,
+        file_path: str,
+        on_event: Callable,
+        interval: float = 1.0,
+        *,
+        mode: str = REPLAY_INTERVAL,
+        speed: float = 1.0,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        super().__init__(file_path, on_event, interval, mode=mode, speed=speed, on_complete=on_complete)
         self.file_path = file_path
         self.on_event = on_event
-        self.interval = interval
-        self._running = False
-        self._thread = None
-
-    def start(self):
-        if self._running: return
-        self._running = True
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
-
-    def _run(self):
-        try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if not self._running:
-                        break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    evt = json.loads(line)
-                    try:
-                        self.on_event(evt)
-                    except Exception as e:
-                        logger.exception("NDJSON on_event error: %s", e)
-                    time.sleep(self.interval)
-        except Exception as e:
-            logger.exception("NDJSONPlayer _run error: %s", e)
-
-    def stop(self):
-        self._running = False
-
-    def is_running(self):
-        return self._running
 
 
 # --- 引擎工作執行緒 ---
@@ -145,20 +131,35 @@ class EngineWorker(QThread):
         # BeadPlateResultDetector 相關狀態
         self._result_detector: Optional[BeadPlateResultDetector] = None
         self._detection_timer: Optional[QTimer] = None
+        self._detection_loop = LoopTimer("engine.result_detection", 0.2)  # 結果檢測時序統計
         self._detection_enabled = False
 
         # GameStateManager - 統一管理局號和階段轉換（合併 PhaseDetector + RoundManager）
         self._game_state: Optional[GameStateManager] = None
 
         self._latest_results: Dict[str, Dict[str, Any]] = {}
+        # 每筆結果 info 存入後不再修改，快照只在內容變更時重建
+        self._latest_results_version = 0
+        self._latest_snapshot_cache: Tuple[int, Dict[str, Dict[str, Any]]] = (-1, {})
+
+        # UI 訊號橋（由 Dashboard 設置；未設置時直接 emit）
+        self._ui_bridge: Optional[UiSignalBridge] = None
+        self._log_call_chain = os.getenv("AUTOBET_LOG_CALL_CHAIN") == "1"
         self._line_orchestrator: Optional[LineOrchestrator] = None
         self._line_order_queue: "queue.Queue[BetDecision]" = queue.Queue()
+        self._deadline_stats = DeadlineStats()  # 下注窗口期限統計（中止 / 錯過）
         self._line_summary: Dict[str, Any] = {}
         self._selected_table: Optional[str] = None  # 使用者選擇的桌號
         base_dir = Path("data/sessions")
         base_dir.mkdir(parents=True, exist_ok=True)
         self._line_state_path = base_dir / "line_state.json"
         self._line_orders_path = base_dir / "line_orders.ndjson"
+        self._session_writer = get_session_writer()
+        self._session_writer.register(self._line_orders_path, RotationPolicy(
+            max_bytes=20 * 1024 * 1024,
+            max_age_sec=24 * 3600,
+        ))
+        self._session_archive = SessionArchive(Path("data/archive"))
 
         # ChipProfile 管理器
         self._chip_profile_manager = ChipProfileManager()
@@ -177,6 +178,7 @@ class EngineWorker(QThread):
             # 初始化引擎，傳入 ChipProfile
             self.engine = AutoBetEngine(dry_run=dry_run, chip_profile=chip_profile)
             self.engine.set_log_callback(self._emit_log)  # 設置日誌回調
+            self.engine.set_overlay_callback(self._on_overlay_changed)  # 提供階段時長估計
             self._dry_run = dry_run
             self._emit_log("INFO", "Engine", "引擎已初始化")
 
@@ -191,6 +193,7 @@ class EngineWorker(QThread):
             # 開始狀態輪詢
             self._tick_running = True
             self._init_line_orchestrator()
+            self._precompute_chip_recipes()
 
             # 初始化 PhaseDetector（階段檢測器）
             self._setup_phase_detector()
@@ -262,7 +265,10 @@ class EngineWorker(QThread):
                 self._status_push_count += 1
                 if self._status_push_count % 10 == 0:
                     self._emit_log("DEBUG", "Status", f"📤 [定期] 推送狀態到 UI: latest_results keys={list(latest_snapshot.keys())}, 數量={len(latest_snapshot)}")
-                self.engine_status.emit(status)
+                self._publish_status(status)
+
+                # 歸檔緩衝每秒寫入一次
+                self._session_archive.flush()
 
             except Exception as e:
                 self._emit_log("ERROR", "Status", f"狀態檢查錯誤: {e}")
@@ -326,8 +332,10 @@ class EngineWorker(QThread):
 
             self._enabled = True
 
-            # 啟動結果檢測
-            if self._result_detector:
+            # 啟動結果檢測（設定了 T9 結果串流時改用串流）
+            if self._start_result_stream():
+                self._emit_log("INFO", "Engine", "✅ T9 結果串流已啟動")
+            elif self._result_detector:
                 self._start_result_detection()
                 self._emit_log("INFO", "Engine", "✅ 結果檢測已啟動")
             else:
@@ -409,6 +417,7 @@ class EngineWorker(QThread):
         if self._detection_timer:
             self._detection_timer.stop()
             self._detection_enabled = False
+            self._detection_loop.stop()
             self._emit_log("INFO", "Engine", "結果檢測已停止")
 
         if self.engine:
@@ -423,6 +432,20 @@ class EngineWorker(QThread):
                 pass
             self.event_feeder = None
 
+        try:
+            self._session_archive.flush()
+        except Exception as e:
+            self._emit_log("WARNING", "Engine", f"歸檔寫入失敗: {e}")
+
+        if self._line_orchestrator and self._line_orchestrator.profiler:
+            profiling = self.engine.ui.get("profiling", {}) if self.engine else {}
+            output = profiling.get("output", "data/profiles/lines.folded")
+            try:
+                self._line_orchestrator.stop_profiling(output)
+                self._emit_log("INFO", "Engine", f"熱路徑分析已寫出: {output}")
+            except Exception as e:
+                self._emit_log("WARNING", "Engine", f"熱路徑分析寫出失敗: {e}")
+
         self._emit_log("INFO", "Engine", "引擎已停止")
 
         # 立即發送狀態更新
@@ -524,13 +547,9 @@ class EngineWorker(QThread):
                 self._last_winner = winner
                 self._store_latest_result(event)
 
-                # ✅ 從 LineOrchestrator 獲取真實 PnL（累積所有策略的 PnL）
+                # ✅ 從 LineOrchestrator 獲取真實 PnL（風控的 global_day 範圍累計所有結算）
                 if self._line_orchestrator:
-                    total_pnl = 0.0
-                    risk_snapshot = self._line_orchestrator.risk.snapshot()
-                    for scope_key, tracker_data in risk_snapshot.items():
-                        total_pnl += tracker_data.get("pnl", 0.0)
-                    self._net_profit = total_pnl
+                    self._net_profit = self._line_orchestrator.risk.net_pnl
 
                 result_text_map = {"B": "莊", "P": "閒", "T": "和"}
                 result_text = result_text_map.get(winner, winner)
@@ -751,6 +770,7 @@ class EngineWorker(QThread):
         # 將最新資料移到字典尾端維持近序（只用 canonical ID）
         self._latest_results.pop(canonical_id, None)
         self._latest_results[canonical_id] = info
+        self._latest_results_version += 1
         self._emit_log("DEBUG", "Result", f"✅ 已存儲最新結果: key={canonical_id}, winner={info.get('winner')}, _latest_results 數量={len(self._latest_results)}")
 
         # 限制最多保留 20 個桌號
@@ -760,9 +780,29 @@ class EngineWorker(QThread):
             if first_key == canonical_id and len(self._latest_results) == 1:
                 break
             self._latest_results.pop(first_key, None)
+            self._latest_results_version += 1
 
     def _latest_results_snapshot(self) -> Dict[str, Dict[str, Any]]:
-        return {k: v.copy() for k, v in self._latest_results.items()}
+        # info 存入後不會被修改，淺拷貝即可；內容未變時重用同一份快照
+        version, snapshot = self._latest_snapshot_cache
+        if version != self._latest_results_version:
+            snapshot = dict(self._latest_results)
+            self._latest_snapshot_cache = (self._latest_results_version, snapshot)
+        return snapshot
+
+    def attach_ui_bridge(self, bridge: Optional[UiSignalBridge]) -> None:
+        """設置 UI 訊號橋：日誌與狀態改為合併後依幀率送出"""
+        self._ui_bridge = bridge
+
+    def get_overlay_detector(self):
+        """引擎的 overlay 檢測器（OverlayDetectorWrapper），供 Dashboard 檢測執行緒共用"""
+        return getattr(self.engine, "overlay", None) if self.engine else None
+
+    def _publish_status(self, status: Dict[str, Any]) -> None:
+        if self._ui_bridge is not None:
+            self._ui_bridge.post_status(status)
+        else:
+            self.engine_status.emit(status)
 
     def _push_status_immediately(self):
         """立即推送狀態到UI（不等200ms迴圈）"""
@@ -779,11 +819,12 @@ class EngineWorker(QThread):
             "latest_results": latest_snapshot,
         }
         self._emit_log("DEBUG", "Status", f"📤 推送狀態到 UI: latest_results keys={list(latest_snapshot.keys())}, 數量={len(latest_snapshot)}")
-        self.engine_status.emit(status)
+        self._publish_status(status)
 
     def _emit_log(self, level: str, module: str, msg: str):
-        # 調試：對 Result 和 Events 模組的日誌加上堆棧追蹤
-        if module in ["Result", "Events"] and "結果：" in msg:
+        bridge = self._ui_bridge
+        # 調試：對 Result 和 Events 模組的日誌加上堆棧追蹤（AUTOBET_LOG_CALL_CHAIN=1 時）
+        if self._log_call_chain and module in ["Result", "Events"] and "結果：" in msg:
             import traceback
             stack_lines = traceback.format_stack()
             # 取最後5層調用，跳過當前函數
@@ -792,9 +833,16 @@ class EngineWorker(QThread):
                 line.split(",")[0].split('"')[-2].split("/")[-1].split("\\")[-1] + ":" + line.split(",")[1].strip().split()[1]
                 for line in relevant_stack if "File" in line
             ])
-            self.log_message.emit("DEBUG", "StackFull", f"📞 {module} 完整調用鏈: {caller_summary}")
+            chain = f"📞 {module} 完整調用鏈: {caller_summary}"
+            if bridge is not None:
+                bridge.post_log("DEBUG", "StackFull", chain)
+            else:
+                self.log_message.emit("DEBUG", "StackFull", chain)
 
-        self.log_message.emit(level, module, msg)
+        if bridge is not None:
+            bridge.post_log(level, module, msg)
+        else:
+            self.log_message.emit(level, module, msg)
 
     # _trigger_engine_execution 方法已移除
     # 觸發邏輯現在由 Dashboard 直接處理
@@ -1095,7 +1143,7 @@ class EngineWorker(QThread):
         - LINE_STRATEGY_DIR: 策略目錄 (預設: configs/line_strategies)
 
         注意：
-        - 系統只追蹤 PnL 和止盈止損，不做資金檢查
+        - 系統只追蹤 PnL 和止盈止損；資金上限預設關閉（ui_config 的 capital）
         - 止盈止損配置在各策略的 risk.levels 中設定
         - table_id 固定為 "main"（單桌模式）
         """
@@ -1103,8 +1151,22 @@ class EngineWorker(QThread):
         strategy_dir = Path(strategy_dir_env)
 
         try:
-            # ✅ 不再需要 bankroll 相關參數
-            self._line_orchestrator = LineOrchestrator()
+            # 跨桌資金上限（ui_config.json 的 capital，未設定時不限）
+            capital = self.engine.ui.get("capital", {}) if self.engine else {}
+            self._line_orchestrator = LineOrchestrator(
+                capital_budget=capital.get("bankroll"),
+                per_hand_cap=capital.get("per_hand_cap"),
+            )
+            self._line_orchestrator.attach_archive(self._session_archive)
+
+            # 熱路徑分析（ui_config.json 的 profiling，預設關閉）
+            profiling = self.engine.ui.get("profiling", {}) if self.engine else {}
+            if profiling.get("enabled"):
+                self._line_orchestrator.start_profiling(
+                    mode=profiling.get("mode", "sample"),
+                    interval_ms=float(profiling.get("interval_ms", 1.0)),
+                )
+                self._emit_log("INFO", "Line", f"熱路徑分析已啟用 ({profiling.get('mode', 'sample')})")
 
             if strategy_dir.exists():
                 definitions = load_strategy_definitions(strategy_dir)
@@ -1146,6 +1208,29 @@ class EngineWorker(QThread):
             self._line_orchestrator = None
             self._emit_log("ERROR", "Strategy", f"❌ 策略系統初始化失敗: {exc}")
 
+    # ------------------------------------------------------------------
+    def _precompute_chip_recipes(self) -> None:
+        """為所有策略注碼預先計算籌碼配方，下注時 plan_bet 只需查表
+
+        ClickSequencePlanner 會合併同一下注區的訂單，因此也預先計算任兩筆注碼的和；
+        三筆以上合併的金額由 plan_bet 即時計算後快取。
+        """
+        if not self.engine or not self.engine.smart_planner or not self._line_orchestrator:
+            return
+        stakes = sorted({
+            abs(stake)
+            for definition in self._line_orchestrator.strategies.values()
+            for stake in definition.staking.sequence
+        })
+        amounts = set(stakes)
+        amounts.update(a + b for i, a in enumerate(stakes) for b in stakes[i:])
+        max_clicks = self.engine.chip_profile.constraints.get("max_clicks_per_hand", 8) if self.engine.chip_profile else 8
+        try:
+            added = self.engine.smart_planner.precompute(amounts, max_clicks)
+            self._emit_log("INFO", "Engine", f"✅ 已預先計算 {added} 組籌碼配方")
+        except Exception as exc:
+            self._emit_log("WARNING", "Engine", f"預先計算籌碼配方失敗: {exc}")
+
     # ------------------------------------------------------------------
     def _load_line_state(self) -> None:
         if not self._line_orchestrator or not self._line_state_path.exists():
@@ -1161,10 +1246,12 @@ class EngineWorker(QThread):
         if not self._line_orchestrator:
             return
         try:
-            payload = self._line_orchestrator.snapshot()
-            payload["saved_at"] = int(time.time())
+            # 完整版本化狀態（緊湊 JSON），先寫暫存檔再替換，避免中途崩潰留下半個檔案
+            payload = self._line_orchestrator.export_state()
             self._line_state_path.parent.mkdir(parents=True, exist_ok=True)
-            self._line_state_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp_path = self._line_state_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self._line_state_path)
         except Exception as exc:
             self._emit_log("ERROR", "Line", f"寫入 Line 狀態失敗: {exc}")
 
@@ -1188,6 +1275,11 @@ class EngineWorker(QThread):
             self._emit_log("ERROR", "GameStateManager", f"初始化失敗: {e}")
             self._game_state = None
 
+    def _on_overlay_changed(self, is_open: bool) -> None:
+        """引擎偵測到 overlay 開 / 關（引擎執行緒調用），轉給 GameStateManager 校正階段"""
+        if self._game_state:
+            self._game_state.on_overlay_changed(self._selected_table or "main", is_open)
+
     def _on_result_confirmed(self, table_id: str, round_id: str, winner: str, timestamp: float) -> None:
         """
         處理 GameStateManager 發送的結果確認信號
@@ -1390,21 +1482,75 @@ class EngineWorker(QThread):
         # self._load_initial_beads()
 
         # 建立 QTimer（必須在 QThread 內部建立）
+        # 單次觸發：每輪結束後依 LoopTimer 排程重新啟動，扣除檢測耗時避免漂移
         self._detection_timer = QTimer()
+        self._detection_timer.setSingleShot(True)
+        self._detection_timer.setTimerType(Qt.PreciseTimer)
         self._detection_timer.timeout.connect(self._on_detection_tick)
-        self._detection_timer.start(200)  # 每 200ms 檢測一次
+        self._detection_loop.stop()
         self._detection_enabled = True
+        self._detection_timer.start(200)  # 每 200ms 檢測一次
         self._emit_log("INFO", "ResultDetector", "檢測循環已啟動 (200ms)")
         self._emit_log("INFO", "ResultDetector", "💡 啟動後將從新結果開始記錄")
 
         # 立即推送狀態更新到 UI
         self._push_status_immediately()
 
+    def _start_result_stream(self) -> bool:
+        """依 ui_config.json 的 result_stream 啟動 T9 結果串流；未啟用時返回 False"""
+        stream = self.engine.ui.get("result_stream", {}) if self.engine else {}
+        if not stream.get("enabled") or not stream.get("url"):
+            return False
+        if self.event_feeder:
+            self.event_feeder.stop()
+
+        from ipc.t9_feeder import T9ResultFeeder
+        try:
+            self.event_feeder = T9ResultFeeder(
+                stream["url"],
+                self._incoming_events.put,
+                tables=stream.get("tables") or None,
+                client=stream.get("client", "async"),
+                on_gap=lambda table_id, first, last: self._emit_log(
+                    "WARNING", "T9Stream", f"⚠️ 序號缺口: {table_id} {first}-{last}"
+                ),
+                on_status=lambda name, status, detail: self._emit_log(
+                    "INFO", "T9Stream", f"{name}: {status}" + (f" ({detail})" if detail else "")
+                ),
+            )
+            self.event_feeder.start()
+        except Exception as e:
+            self.event_feeder = None
+            self._emit_log("ERROR", "T9Stream", f"結果串流啟動失敗: {e}")
+            return False
+        return True
+
+    def _assign_stream_round(self, event: Dict[str, Any]) -> None:
+        """串流結果沒有局號時，與圖像檢測一樣由 GameStateManager 產生"""
+        if event.get("source") != "t9_stream" or event.get("round_id") or not self._game_state:
+            return
+        if not self._is_selected_table(event.get("table_id")):
+            return
+        event["round_id"] = self._game_state.on_result_detected(
+            event["table_id"], event["winner"], event["received_at"] / 1000.0
+        )
+
     def _on_detection_tick(self) -> None:
-        """檢測循環回調"""
+        """檢測循環回調（記錄時序並排程下一輪）"""
         if not self._detection_enabled or not self._result_detector:
+            self._detection_loop.stop()
             return
 
+        start = self._detection_loop.begin()
+        try:
+            self._detect_result_once()
+        finally:
+            delay = self._detection_loop.end(start)
+            if self._detection_enabled and self._detection_timer:
+                self._detection_timer.start(int(delay * 1000))
+
+    def _detect_result_once(self) -> None:
+        """截圖並執行一次結果檢測"""
         try:
             # 截取螢幕
             import mss
@@ -1471,6 +1617,7 @@ class EngineWorker(QThread):
                 break
             else:
                 processed += 1
+                self._assign_stream_round(evt)
                 self._handle_event(evt)
         self._drain_line_orders_queue()
 
@@ -1561,9 +1708,9 @@ class EngineWorker(QThread):
                 "layer": decision.layer_index,
                 "reason": decision.reason,
             }
-            self._line_orders_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._line_orders_path.open("a", encoding="utf-8") as fp:
-                fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # 交給背景寫入器，避免磁碟 I/O 進入下注執行路徑
+            if not self._session_writer.write_json(self._line_orders_path, record):
+                self._emit_log("WARNING", "Line", "Line 訂單寫入佇列已滿，本筆記錄被丟棄")
         except Exception as exc:
             self._emit_log("ERROR", "Line", f"記錄 Line 訂單失敗: {exc}")
 
@@ -1578,200 +1725,244 @@ class EngineWorker(QThread):
             else:
                 pending.append(decision)
 
+        # 同一桌同一局的訂單合併成一個點擊序列（每種籌碼只選一次、只 confirm 一次）
+        batches: Dict[Tuple[str, str], List[BetDecision]] = {}
         for decision in pending:
-            self._dispatch_line_order(decision)
+            batches.setdefault((decision.table_id, decision.round_id), []).append(decision)
+
+        for decisions in batches.values():
+            self._dispatch_line_orders(decisions)
 
     # ------------------------------------------------------------------
     def _dispatch_line_order(self, decision: BetDecision) -> None:
         """執行 Line 策略產生的下注決策"""
-        self._emit_log(
-            "INFO",
-            "Line",
-            f"📋 執行 Line 訂單: {decision.strategy_key} -> table {decision.table_id} {decision.direction.value} ${decision.amount}",
-        )
+        self._dispatch_line_orders([decision])
+
+    # ------------------------------------------------------------------
+    def _dispatch_line_orders(self, decisions: List[BetDecision]) -> None:
+        """執行同一桌同一局的 Line 下注決策（合併為單一點擊序列）
+
+        點擊序列沒有完整執行時（下注期未開放、元件未初始化、籌碼規劃失敗、
+        期限中止或執行失敗）一律撤回決策：移除倉位、釋放資金預留並重置
+        Line 狀態，下一個結果不會把沒下的注當成真注結算。
+        """
+        if not decisions:
+            return
+        placed = False
+        try:
+            placed = self._place_line_orders(decisions)
+        finally:
+            if not placed and self._line_orchestrator:
+                self._line_orchestrator.cancel_decisions(decisions)
+                self._emit_log("WARNING", "Line", f"↩️ 未完成下注，已撤回 {len(decisions)} 筆訂單")
+
+    # ------------------------------------------------------------------
+    def _place_line_orders(self, decisions: List[BetDecision]) -> bool:
+        """規劃並執行點擊序列，返回是否完整下注"""
+        head = decisions[0]
+        completed = False  # 點擊序列已完整執行（之後的記錄失敗不撤回）
+        for decision in decisions:
+            self._emit_log(
+                "INFO",
+                "Line",
+                f"📋 執行 Line 訂單: {decision.strategy_key} -> table {decision.table_id} {decision.direction.value} ${decision.amount}",
+            )
 
         if not self.engine:
             self._emit_log("ERROR", "Line", "引擎未初始化，無法執行訂單")
-            return
+            return False
 
-        # 將 BetDecision 轉換成 AutobetEngine 可以執行的格式
         try:
-            # 轉換方向：BetDirection -> target string
-            direction_map = {
-                "B": "banker",
-                "P": "player",
-                "T": "tie",
-                "BANKER": "banker",  # 向後兼容
-                "PLAYER": "player",
-                "TIE": "tie"
-            }
-            target = direction_map.get(decision.direction.value, decision.direction.value.lower())
-            self._emit_log("DEBUG", "Line", f"🔄 方向轉換: {decision.direction.value} -> {target}")
-
             # 檢查下注期是否開放
             if self._line_orchestrator:
-                # 獲取該桌的當前階段
-                current_phase = self._line_orchestrator.table_phases.get(decision.table_id)
-
-                # 檢查是否在 BETTABLE 階段
+                current_phase = self._line_orchestrator.table_phases.get(head.table_id)
                 if current_phase and current_phase != TablePhase.BETTABLE:
                     self._emit_log(
                         "WARNING",
                         "Line",
-                        f"⚠️ 下注期未開放 (當前階段: {current_phase.name})，跳過訂單"
+                        f"⚠️ 下注期未開放 (當前階段: {current_phase.name})，跳過 {len(decisions)} 筆訂單"
                     )
-                    return
-
-            # 構建下注計畫
-            from src.autobet.chip_planner import SmartChipPlanner
+                    return False
 
-            if self.engine.smart_planner:
-                # 使用 SmartChipPlanner 規劃籌碼組合
-                bet_plan = self.engine.smart_planner.plan_bet(
-                    target_amount=decision.amount,
-                    max_clicks=self.engine.chip_profile.constraints.get("max_clicks_per_hand", 8) if self.engine.chip_profile else 8
-                )
+            if not self.engine.smart_planner:
+                self._emit_log("ERROR", "Line", "SmartChipPlanner 未初始化，無法執行訂單")
+                return False
 
-                if not bet_plan.success:
-                    self._emit_log("ERROR", "Line", f"❌ 籌碼規劃失敗: {bet_plan.reason}")
-                    return
+            # 轉換方向：BetDirection -> target string
+            targets = [self._line_target(decision) for decision in decisions]
 
-                # 獲取當前層數資訊
-                current_layer_info = decision.layer_index + 1
-                total_layers = "N/A"
-                if self._line_orchestrator and decision.strategy_key in self._line_orchestrator.strategies:
-                    strategy_def = self._line_orchestrator.strategies[decision.strategy_key]
-                    if strategy_def.staking and strategy_def.staking.sequence:
-                        total_layers = len(strategy_def.staking.sequence)
+            max_clicks = self.engine.chip_profile.constraints.get("max_clicks_per_hand", 8) if self.engine.chip_profile else 8
+            sequence = ClickSequencePlanner(self.engine.smart_planner, max_clicks).plan(
+                [(target, decision.amount) for target, decision in zip(targets, decisions)]
+            )
+            if not sequence.success:
+                self._emit_log("ERROR", "Line", f"❌ 籌碼規劃失敗: {sequence.reason}")
+                return False
 
-                # 發送即時更新到 NextBetCard
+            for target, decision in zip(targets, decisions):
                 self.next_bet_info.emit({
                     'table_id': decision.table_id,
                     'strategy': decision.strategy_key,
-                    'layer': f"{current_layer_info}/{total_layers}",
+                    'layer': f"{decision.layer_index + 1}/{self._line_total_layers(decision)}",
                     'direction': target,
                     'amount': decision.amount,
-                    'recipe': bet_plan.recipe
+                    'recipe': sequence.recipe(target)
                 })
 
-                self._emit_log(
-                    "INFO",
-                    "Line",
-                    f"✅ 籌碼配方: {bet_plan.recipe} (總點擊{bet_plan.clicks}次)"
-                )
+            for target, amount in sequence.amounts.items():
+                self._emit_log("INFO", "Line", f"✅ 籌碼配方: {target} {sequence.recipe(target)} (${amount})")
+            self._emit_log(
+                "INFO",
+                "Line",
+                f"🧭 點擊序列: {sequence.describe()} (移動 {sequence.moves} 次，逐顆執行需 {sequence.naive_moves} 次)"
+            )
 
-                # 執行下注序列（帶詳細日誌和回滾）
-                if self.engine.act:
-                    execution_log = []  # 記錄執行步驟，用於錯誤追蹤
-                    is_dry_run = getattr(self.engine, 'dry', False)  # 檢查是否為乾跑模式
+            if not self.engine.act:
+                self._emit_log("ERROR", "Line", "Actuator 未初始化")
+                return False
 
-                    # Debug: 顯示乾跑模式狀態
-                    self._emit_log("DEBUG", "Line", f"🔍 乾跑模式檢查: engine.dry={is_dry_run}")
+            is_dry_run = getattr(self.engine, 'dry', False)
+            mode_text = "乾跑" if is_dry_run else "實戰"
+            self._emit_log("INFO", "Line", f"🚀 開始執行下注序列 (共 {sequence.clicks} 次點擊) [{mode_text}模式]")
 
-                    try:
-                        total_steps = len(bet_plan.chips)
-                        mode_text = "乾跑" if is_dry_run else "實戰"
-                        self._emit_log("INFO", "Line", f"🚀 開始執行下注序列 (共 {total_steps} 個籌碼) [{mode_text}模式]")
-
-                        # 依序執行每個籌碼的放置
-                        for idx, chip in enumerate(bet_plan.chips, 1):
-                            step_info = f"步驟 {idx}/{total_steps}"
-
-                            # 點擊籌碼
-                            chip_desc = f"點擊籌碼 {chip.value}"
-                            self._emit_log("DEBUG", "Line", f"  [{step_info}] {chip_desc}")
-                            execution_log.append(("chip", chip.value))
-
-                            click_result = self.engine.act.click_chip_value(chip.value)
-                            if not click_result and not is_dry_run:
-                                raise Exception(f"{step_info} 失敗: {chip_desc}")
-
-                            # 點擊下注區
-                            bet_desc = f"點擊下注區 {target}"
-                            self._emit_log("DEBUG", "Line", f"  [{step_info}] {bet_desc}")
-                            self._emit_log("DEBUG", "Line", f"  [DEBUG] 準備調用 click_bet('{target}')")
-                            execution_log.append(("bet", target))
-
-                            bet_result = self.engine.act.click_bet(target)
-                            self._emit_log("DEBUG", "Line", f"  [DEBUG] click_bet 返回: {bet_result}")
-                            if not bet_result and not is_dry_run:
-                                raise Exception(f"{step_info} 失敗: {bet_desc}")
-
-                        # 所有步驟成功，確認下注
-                        self._emit_log("DEBUG", "Line", "  最後步驟: 確認下注")
-                        self.engine.act.confirm()
-
-                        if is_dry_run:
-                            self._emit_log("INFO", "Line", f"✅ 訂單執行完成 (乾跑模擬): {decision.strategy_key}")
-                        else:
-                            self._emit_log("INFO", "Line", f"✅ 訂單執行完成: {decision.strategy_key}")
-
-                        # 🔥 標記 GameStateManager：這一局有下注（用於排除歷史）
-                        if self._game_state:
-                            self._game_state.mark_bet_placed(decision.table_id, decision.round_id)
-                            self._emit_log("DEBUG", "GameStateManager",
-                                         f"✅ 已標記下注: round={decision.round_id}")
-
-                        # 🔥 發送「下注已執行」信號
-                        if self._line_orchestrator:
-                            definition = self._line_orchestrator.strategies.get(decision.strategy_key)
-                            if definition:
-                                # 檢查當前層是否為反向（序列值為負數）
-                                sequence = definition.staking.sequence
-                                current_stake = sequence[decision.layer_index] if decision.layer_index < len(sequence) else 0
-                                is_reverse_layer = (current_stake < 0)
-
-                                # 生成籌碼字串（簡化版）
-                                chips_str = f"{decision.amount}元"
-
-                                # 將方向轉換為完整格式 (b/p/t → banker/player/tie)
-                                direction_map = {"B": "banker", "P": "player", "T": "tie"}
-                                direction_full = direction_map.get(decision.direction.value, decision.direction.value.lower())
-
-                                self.bet_executed.emit({
-                                    "strategy": decision.strategy_key,
-                                    "direction": direction_full,
-                                    "amount": decision.amount,
-                                    "current_layer": decision.layer_index + 1,  # UI 顯示從1開始
-                                    "total_layers": len(definition.staking.sequence),
-                                    "round_id": decision.round_id,
-                                    "sequence": list(definition.staking.sequence),
-                                    "on_win": "RESET" if definition.staking.reset_on_win else "ADVANCE",
-                                    "on_loss": "ADVANCE" if definition.staking.advance_on.value == "loss" else "RESET",
-                                    "is_reverse": is_reverse_layer,  # 新增：當前層是否為反向
-                                    "chips_str": chips_str  # ✅ 新增：籌碼字串
-                                })
-                                self._emit_log("DEBUG", "Line", f"📍 bet_executed 信號已發送")
+            executed: List[str] = []
+            try:
+                deadline = self._bet_deadline(head.table_id)
+                ok, executed = self.engine.act.execute_sequence(sequence, deadline=deadline)
+                timing = getattr(self.engine.act, "last_execution", None)
+                if timing:
+                    self._emit_log(
+                        "INFO",
+                        "Line",
+                        f"⏱️ 執行順序: {' → '.join(executed)} | 預估 {timing['estimated_ms']:.0f}ms / 實際 {timing['actual_ms']:.0f}ms"
+                        f" | 移動 {timing['travel_px']:.0f}px (原順序 {timing['travel_px_unoptimized']:.0f}px)"
+                    )
+                    self._deadline_stats.record(timing)
+                    deadline_info = timing.get("deadline") or {}
+                    if deadline_info.get("aborted"):
+                        # Actuator 已在中止前 cancel()，這一局視為未下注
+                        self._emit_log(
+                            "WARNING",
+                            "Line",
+                            f"⏰ 下注窗口不足，已中止並撤回 ({deadline_info['aborted']}，剩餘 {deadline_info['slack_ms']:.0f}ms)"
+                            f" | 累計中止 {self._deadline_stats.aborted} / 錯過 {self._deadline_stats.missed}"
+                        )
+                        return False
+                    if deadline_info.get("missed"):
+                        self._emit_log(
+                            "WARNING",
+                            "Line",
+                            f"⏰ 下注完成時已超過窗口期限 {-deadline_info['slack_ms']:.0f}ms，請檢查遊戲畫面"
+                        )
+                if not ok:
+                    raise Exception(f"點擊步驟失敗: {executed[-1] if executed else '-'}")
+                completed = True
+            except Exception as e:
+                # 執行失敗，記錄詳細錯誤和已執行步驟
+                self._emit_log("ERROR", "Line", f"❌ 執行下注失敗: {e}")
+                if executed:
+                    self._emit_log("DEBUG", "Line", f"已執行步驟: {' → '.join(executed)}")
 
-                    except Exception as e:
-                        # 執行失敗，記錄詳細錯誤和已執行步驟
-                        self._emit_log("ERROR", "Line", f"❌ 執行下注失敗: {e}")
-
-                        # 記錄已執行的步驟
-                        if execution_log:
-                            executed_steps = " → ".join([f"{action}:{value}" for action, value in execution_log])
-                            self._emit_log("DEBUG", "Line", f"已執行步驟: {executed_steps}")
-
-                        # 嘗試回滾（取消不完整的下注）
-                        self._emit_log("WARNING", "Line", "🔄 嘗試回滾不完整的下注...")
-                        try:
-                            if self.engine.act.cancel():
-                                self._emit_log("INFO", "Line", "✅ 已成功取消不完整的下注")
-                            else:
-                                self._emit_log("WARNING", "Line", "⚠️ 取消操作未確認成功，請手動檢查遊戲畫面")
-                        except Exception as cancel_error:
-                            self._emit_log("ERROR", "Line", f"❌ 回滾失敗: {cancel_error}，請立即手動檢查遊戲畫面！")
-
-                        # 重新拋出異常，讓外層處理
-                        raise
-                else:
-                    self._emit_log("ERROR", "Line", "Actuator 未初始化")
+                # 嘗試回滾（取消不完整的下注）
+                self._emit_log("WARNING", "Line", "🔄 嘗試回滾不完整的下注...")
+                try:
+                    if self.engine.act.cancel():
+                        self._emit_log("INFO", "Line", "✅ 已成功取消不完整的下注")
+                    else:
+                        self._emit_log("WARNING", "Line", "⚠️ 取消操作未確認成功，請手動檢查遊戲畫面")
+                except Exception as cancel_error:
+                    self._emit_log("ERROR", "Line", f"❌ 回滾失敗: {cancel_error}，請立即手動檢查遊戲畫面！")
+
+                # 重新拋出異常，讓外層處理
+                raise
+
+            strategies = ", ".join(decision.strategy_key for decision in decisions)
+            if is_dry_run:
+                self._emit_log("INFO", "Line", f"✅ 訂單執行完成 (乾跑模擬): {strategies}")
             else:
-                self._emit_log("ERROR", "Line", "SmartChipPlanner 未初始化，無法執行訂單")
+                self._emit_log("INFO", "Line", f"✅ 訂單執行完成: {strategies}")
+
+            # 🔥 標記 GameStateManager：這一局有下注（用於排除歷史）
+            if self._game_state:
+                self._game_state.mark_bet_placed(head.table_id, head.round_id)
+                self._emit_log("DEBUG", "GameStateManager", f"✅ 已標記下注: round={head.round_id}")
+
+            # 🔥 發送「下注已執行」信號
+            for decision in decisions:
+                self._emit_bet_executed(decision)
+            return True
 
         except Exception as e:
             import traceback
             tb_str = ''.join(traceback.format_tb(e.__traceback__))
             self._emit_log("ERROR", "Line", f"處理 Line 訂單錯誤: {e}")
             self._emit_log("DEBUG", "Line", f"錯誤堆棧:\n{tb_str}")
+            return completed
+
+    # ------------------------------------------------------------------
+    def _bet_deadline(self, table_id: str) -> Optional[ExecutionDeadline]:
+        """由 GameStateManager 的下注窗口建立執行期限（可選擇加上即時 overlay 檢查）"""
+        if not self._game_state:
+            return None
+        closes_at = self._game_state.bettable_deadline(table_id)
+        if closes_at is None:
+            return None
+        safety = self.engine.ui.get("safety", {}) if self.engine else {}
+        window_open = None
+        if safety.get("overlay_check_during_bet", False) and getattr(self.engine, "overlay", None):
+            window_open = self.engine.overlay.overlay_is_open
+        return ExecutionDeadline(
+            at=closes_at,
+            safety_margin=float(safety.get("deadline_margin_ms", 500)) / 1000.0,
+            window_open=window_open,
+        )
+
+    def get_deadline_stats(self) -> Dict[str, Any]:
+        """下注窗口期限統計（完成 / 中止 / 錯過）"""
+        return self._deadline_stats.to_dict()
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _line_target(decision: BetDecision) -> str:
+        direction_map = {
+            "B": "banker",
+            "P": "player",
+            "T": "tie",
+            "BANKER": "banker",  # 向後兼容
+            "PLAYER": "player",
+            "TIE": "tie"
+        }
+        return direction_map.get(decision.direction.value, decision.direction.value.lower())
+
+    def _line_total_layers(self, decision: BetDecision):
+        if self._line_orchestrator and decision.strategy_key in self._line_orchestrator.strategies:
+            strategy_def = self._line_orchestrator.strategies[decision.strategy_key]
+            if strategy_def.staking and strategy_def.staking.sequence:
+                return len(strategy_def.staking.sequence)
+        return "N/A"
+
+    def _emit_bet_executed(self, decision: BetDecision) -> None:
+        if not self._line_orchestrator:
+            return
+        definition = self._line_orchestrator.strategies.get(decision.strategy_key)
+        if not definition:
+            return
+        # 檢查當前層是否為反向（序列值為負數）
+        sequence = definition.staking.sequence
+        current_stake = sequence[decision.layer_index] if decision.layer_index < len(sequence) else 0
+
+        self.bet_executed.emit({
+            "strategy": decision.strategy_key,
+            "direction": self._line_target(decision),
+            "amount": decision.amount,
+            "current_layer": decision.layer_index + 1,  # UI 顯示從1開始
+            "total_layers": len(sequence),
+            "round_id": decision.round_id,
+            "sequence": list(sequence),
+            "on_win": "RESET" if definition.staking.reset_on_win else "ADVANCE",
+            "on_loss": "ADVANCE" if definition.staking.advance_on.value == "loss" else "RESET",
+            "is_reverse": current_stake < 0,  # 當前層是否為反向
+            "chips_str": f"{decision.amount}元"
+        })
+        self._emit_log("DEBUG", "Line", "📍 bet_executed 信號已發送")
 
@@ -0,0 +1,143 @@
+# ui/workers/overlay_worker.py
+"""
+Dashboard 的 overlay 檢測執行緒
+
+舊做法：DashboardPage 在 GUI 執行緒以 120ms QTimer 執行全螢幕截圖、
+RGB→BGR 轉換與 ProductionOverlayDetector.process_frame，任何卡頓都會
+凍結整個 UI 並延遲觸發。
+
+做法：
+- 截圖與檢測在 OverlayDetectionWorker(QThread) 中以固定間隔執行，
+  只透過 decision_ready(dict) 送出精簡的決策字典（不傳影像）
+- 檢測器與 AutoBetEngine.overlay 共用（OverlayDetectorWrapper）：
+  引擎 tick 正在輪詢時（engine_polling），只有引擎截圖，這裡只讀
+  recent_result（容許到兩個引擎截圖間隔），沒有新結果就略過這一輪；
+  引擎停止時才自行截圖。連續幀計數器只由一邊推進，開 / 關防抖不會減半
+
+使用範例:
+    >>> worker = OverlayDetectionWorker(interval_ms=120)
+    >>> worker.decision_ready.connect(page.on_detection_decision)
+    >>> worker.set_detector(engine.overlay)
+    >>> worker.start()
+    >>> worker.stop()
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QObject, QThread, Signal
+
+from src.autobet.loop_timing import LoopTimer
+
+# 送到 UI 的欄位（其餘檢測細節留在執行緒內）
+DECISION_KEYS = (
+    "decision",
+    "is_open",
+    "ncc_qing",
+    "hue",
+    "sat",
+    "in_green_gate",
+    "open_counter",
+    "close_counter",
+    "reason",
+)
+
+
+def grab_screen_bgr() -> np.ndarray:
+    """全螢幕截圖並轉為 BGR"""
+    import pyautogui
+
+    frame = np.asarray(pyautogui.screenshot())
+    code = cv2.COLOR_RGBA2BGR if frame.shape[2] == 4 else cv2.COLOR_RGB2BGR
+    return cv2.cvtColor(frame, code)
+
+
+class OverlayDetectionWorker(QThread):
+    """在背景執行緒截圖並檢測，只送出決策字典"""
+
+    decision_ready = Signal(dict)
+    detection_error = Signal(str)
+
+    def __init__(
+        self,
+        detector: Any = None,
+        interval_ms: int = 120,
+        grab: Callable[[], np.ndarray] = grab_screen_bgr,
+        parent: Optional[QObject] = None,
+    ):
+        """
+        Args:
+            detector: 具 process_frame(frame) 的檢測器；若另有 recent_result(max_age_s) /
+                      engine_polling()（OverlayDetectorWrapper），引擎輪詢期間只讀其結果
+            interval_ms: 檢測間隔
+            grab: 截圖函數（返回 BGR 影像）
+        """
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self._grab = grab
+        self._detector = detector
+        self._detector_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.loop = LoopTimer("dashboard.overlay_detection", interval_ms / 1000.0)  # 時序統計
+
+        self.frames = 0  # 自行截圖檢測的次數
+        self.reused = 0  # 沿用共用檢測器結果的次數
+        self.waiting = 0  # 引擎輪詢中但尚無新結果而略過的次數
+        self.errors = 0
+
+    def set_detector(self, detector: Any) -> None:
+        with self._detector_lock:
+            self._detector = detector
+
+    @property
+    def detector(self) -> Any:
+        with self._detector_lock:
+            return self._detector
+
+    def detect_once(self) -> Optional[Dict[str, Any]]:
+        """執行一次檢測，返回決策字典（沒有檢測器或等待引擎新結果時返回 None）"""
+        detector = self.detector
+        if detector is None:
+            return None
+
+        engine_polling = getattr(detector, "engine_polling", None)
+        if engine_polling is not None and engine_polling():
+            # 引擎負責截圖：只讀結果，不推進共用的連續幀計數器
+            max_age = 2 * max(getattr(detector, "frame_interval", 0.0), self.interval_ms / 1000.0)
+            result = detector.recent_result(max_age)
+            if result is None:
+                self.waiting += 1
+                return None
+            self.reused += 1
+        else:
+            result = detector.process_frame(self._grab())
+            self.frames += 1
+
+        decision = {key: result[key] for key in DECISION_KEYS if key in result}
+        decision.setdefault("decision", "UNKNOWN")
+        decision["open_th"] = getattr(detector, "open_th", 0.0)
+        decision["timestamp"] = time.time()
+        return decision
+
+    def _step(self) -> None:
+        try:
+            decision = self.detect_once()
+            if decision is not None:
+                self.decision_ready.emit(decision)
+        except Exception as e:
+            self.errors += 1
+            self.detection_error.emit(str(e))
+
+    def run(self) -> None:
+        self._stop_event.clear()
+        # 固定節拍；落後時跳過錯過的排程點，不連續補跑
+        self.loop.run(self._step, self._stop_event)
+
+    def stop(self, timeout_ms: int = 2000) -> None:
+        self._stop_event.set()
+        if self.isRunning():
+            self.wait(timeout_ms)
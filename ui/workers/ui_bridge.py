@@ -0,0 +1,124 @@
+# ui/workers/ui_bridge.py
+"""
+EngineWorker → UI 的合併 / 限速訊號橋
+
+問題：EngineWorker 幾乎每一步都 emit log_message，並且每秒加上每次推送
+都 emit 一份完整的 engine_status；跨執行緒的 signal 每次都是一個
+queued event，多桌時 UI 事件迴圈會被塞滿。
+
+做法：
+- 工作執行緒只呼叫 post_log / post_status（加鎖寫入待送緩衝，不產生 Qt 事件）
+- UI 執行緒的單一 QTimer 以目標幀率（fps）呼叫 flush()：
+  - log_batch(list):  本幀累積的所有日誌 [(level, module, message), ...]，一次送出
+  - status_delta(dict): 多次狀態更新合併後，只送與上次送出值不同的 key
+- 待送日誌有上限，超過時丟棄最舊的並計數（dropped_logs）
+
+使用範例:
+    >>> bridge = UiSignalBridge(fps=20, parent=dashboard)
+    >>> bridge.log_batch.connect(dashboard.on_log_batch)
+    >>> bridge.status_delta.connect(dashboard.on_engine_status_delta)
+    >>> worker.attach_ui_bridge(bridge)
+    >>> bridge.start()
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+LogEntry = Tuple[str, str, str]
+
+
+class UiSignalBridge(QObject):
+    """合併日誌與狀態更新，依幀率送到 UI"""
+
+    log_batch = Signal(list)
+    status_delta = Signal(dict)
+
+    def __init__(self, fps: float = 20.0, max_pending_logs: int = 5000, parent: Optional[QObject] = None):
+        """
+        Args:
+            fps: 每秒最多送出幾次（日誌批次與狀態差異各一次）
+            max_pending_logs: 兩次 flush 之間最多保留的日誌數
+            parent: Qt parent（通常是 UI 頁面，決定 QTimer 所在執行緒）
+        """
+        super().__init__(parent)
+        self.fps = fps
+        self._lock = threading.Lock()
+        self._logs: Deque[LogEntry] = deque(maxlen=max_pending_logs)
+        self._pending_status: Dict[str, Any] = {}
+        self._sent_status: Dict[str, Any] = {}
+        self._timer: Optional[QTimer] = None
+
+        self.posted_logs = 0
+        self.dropped_logs = 0
+        self.posted_status = 0
+        self.batches = 0
+        self.deltas = 0
+
+    # ------------------------------------------------------------------
+    # 工作執行緒端
+    def post_log(self, level: str, module: str, message: str) -> None:
+        with self._lock:
+            if len(self._logs) == self._logs.maxlen:
+                self.dropped_logs += 1
+            self._logs.append((level, module, message))
+            self.posted_logs += 1
+
+    def post_status(self, status: Dict[str, Any]) -> None:
+        """合併狀態（同一 key 只保留最新值；值在送出前不應再被修改）"""
+        with self._lock:
+            self._pending_status.update(status)
+            self.posted_status += 1
+
+    # ------------------------------------------------------------------
+    # UI 執行緒端
+    def start(self) -> None:
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.timeout.connect(self.flush)
+        self._timer.start(max(1, int(1000 / self.fps)))
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.stop()
+        self.flush()
+
+    def flush(self) -> Tuple[List[LogEntry], Dict[str, Any]]:
+        """送出累積的日誌與狀態差異，返回 (日誌, 差異) 方便測試"""
+        with self._lock:
+            logs = list(self._logs)
+            self._logs.clear()
+            pending, self._pending_status = self._pending_status, {}
+
+        delta = {key: value for key, value in pending.items()
+                 if key not in self._sent_status or self._sent_status[key] != value}
+        self._sent_status.update(delta)
+
+        if logs:
+            self.batches += 1
+            self.log_batch.emit(logs)
+        if delta:
+            self.deltas += 1
+            self.status_delta.emit(delta)
+        return logs, delta
+
+    def current_status(self) -> Dict[str, Any]:
+        """最近送出的完整狀態（差異合併後）"""
+        return dict(self._sent_status)
+
+    def reset(self) -> None:
+        """清除已送出狀態（下次 flush 送出完整狀態）"""
+        with self._lock:
+            self._sent_status.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "posted_logs": self.posted_logs,
+            "dropped_logs": self.dropped_logs,
+            "posted_status": self.posted_status,
+            "batches": self.batches,
+            "deltas": self.deltas,
+        }